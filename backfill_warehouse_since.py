@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Backfill de assets.current_warehouse_since (fecha de llegada a la bodega actual).
+
+El trigger de la migración 20260311_current_warehouse_since.sql mantiene la
+columna en cada cambio de bodega. Este script la recalcula para los activos
+existentes con backfill_current_warehouse_since(): un solo UPDATE que toma,
+con DISTINCT ON, el último movimiento de cada activo hacia su bodega actual.
+
+Uso:
+    python backfill_warehouse_since.py          # solo activos sin fecha
+    python backfill_warehouse_since.py --all    # recalcular todos
+    python backfill_warehouse_since.py --check  # contar activos sin fecha
+"""
+
+import argparse
+import sys
+
+from document_renderer import create_supabase_client
+
+
+def count_missing(supabase):
+    res = (
+        supabase.table('assets')
+        .select('id', count='exact', head=True)
+        .not_.is_('current_warehouse_id', 'null')
+        .is_('current_warehouse_since', 'null')
+        .execute()
+    )
+    return res.count or 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backfill de current_warehouse_since')
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--all', action='store_true', help='Recalcular todos los activos en bodega')
+    group.add_argument('--check', action='store_true', help='Solo contar activos sin fecha')
+    args = parser.parse_args()
+
+    supabase = create_supabase_client()
+
+    missing = count_missing(supabase)
+    print(f"📦 Activos en bodega sin fecha de llegada: {missing}")
+    if args.check:
+        sys.exit(1 if missing else 0)
+
+    if not missing and not args.all:
+        print("✅ Nada que actualizar")
+        return
+
+    print("🔄 Calculando desde inventory_movements...")
+    res = supabase.rpc('backfill_current_warehouse_since', {'p_only_missing': not args.all}).execute()
+    print(f"✅ {res.data} activos actualizados")
+
+    missing = count_missing(supabase)
+    if missing:
+        print(f"⚠️  Quedan {missing} activos sin fecha")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
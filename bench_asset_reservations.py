@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Benchmark de concurrencia de reservas de equipos para venta (base local).
+
+Simula N vendedores armando borradores a la vez, cada uno pidiendo
+--quantity equipos del mismo modelo, y compara:
+  naive   leer los equipos libres más antiguos y apartarlos con un INSERT
+          simple: todos leen los mismos equipos, el segundo espera al primero
+          y falla con llave duplicada, y reintenta.
+  skip    reserve_assets_by_quantity (migración 20260318_asset_reservations.sql):
+          candidatos bloqueados con FOR UPDATE SKIP LOCKED.
+
+Cada reserva mantiene la transacción abierta --hold-ms adicionales para
+simular el resto del trabajo de la petición. Hay exactamente el stock que se
+pide, así que al final todos los equipos deben quedar apartados una sola
+vez. Después se vencen las reservas y se comprueba que el barrido
+(expire_asset_reservations) las limpia.
+
+Crea sus propios datos (seriales BENCH-RES-...) y los borra al final.
+
+Uso:
+    python bench_asset_reservations.py
+    python bench_asset_reservations.py --sellers 1,8,32 --drafts 10 --quantity 3
+    python bench_asset_reservations.py --modes skip --keep
+"""
+
+import argparse
+import sys
+import time
+import uuid
+
+from bench_utils import print_latency_table, run_workers, summarize
+from db_connection import connect, get_database_url, require_local
+
+MODES = ('naive', 'skip')
+MAX_RETRIES = 20
+UNIQUE_VIOLATION = '23505'
+
+
+def load_asset_type(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT asset_type FROM assets WHERE asset_type IS NOT NULL LIMIT 1")
+        row = cur.fetchone()
+    return row[0] if row else None
+
+
+def create_fixtures(conn, run_id, units, asset_type):
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO assets (serial_number, asset_type, status, manufacturer, model, sales_price, created_at)
+            SELECT %s || lpad(g::TEXT, 6, '0'), %s, 'ready_for_sale', 'BENCH', %s, 100,
+                   NOW() - make_interval(secs => %s - g)
+            FROM generate_series(1, %s) g
+            """,
+            (f'BENCH-RES-{run_id}-', asset_type, f'RES-{run_id}', units, units),
+        )
+
+
+def cleanup(conn, run_id):
+    with conn.cursor() as cur:
+        cur.execute(
+            "DELETE FROM asset_reservations WHERE asset_id IN (SELECT id FROM assets WHERE serial_number LIKE %s)",
+            (f'BENCH-RES-{run_id}-%',),
+        )
+        cur.execute("DELETE FROM assets WHERE serial_number LIKE %s", (f'BENCH-RES-{run_id}-%',))
+
+
+def reserve_naive(cur, model, hold_id, quantity, hold):
+    """Devuelve (reservó, reintentos)."""
+    conn = cur.connection
+    for attempt in range(MAX_RETRIES):
+        try:
+            cur.execute(
+                """
+                SELECT a.id
+                FROM assets a
+                WHERE a.status = 'ready_for_sale'
+                  AND lower(a.manufacturer) = 'bench'
+                  AND lower(a.model) = lower(%s)
+                  AND NOT EXISTS (
+                    SELECT 1 FROM asset_reservations r
+                    WHERE r.asset_id = a.id AND r.expires_at > NOW()
+                  )
+                ORDER BY a.created_at
+                LIMIT %s
+                """,
+                (model, quantity),
+            )
+            ids = [row[0] for row in cur.fetchall()]
+            if len(ids) < quantity:
+                conn.rollback()
+                return False, attempt
+            cur.execute(
+                """
+                INSERT INTO asset_reservations (asset_id, hold_id, expires_at)
+                SELECT unnest(%s::uuid[]), %s, NOW() + INTERVAL '15 minutes'
+                """,
+                (ids, hold_id),
+            )
+            cur.execute("SELECT pg_sleep(%s)", (hold,))
+            conn.commit()
+            return True, attempt
+        except Exception as exc:  # noqa: BLE001 - solo se reintenta la llave duplicada
+            conn.rollback()
+            if getattr(exc, 'pgcode', None) != UNIQUE_VIOLATION:
+                raise
+    return False, MAX_RETRIES
+
+
+def reserve_skip(cur, model, hold_id, quantity, hold):
+    cur.execute(
+        "SELECT reserve_assets_by_quantity(%s, 'BENCH', %s, %s)",
+        (hold_id, model, quantity),
+    )
+    result = cur.fetchone()[0]
+    if not result.get('success'):
+        cur.connection.rollback()
+        return False, 0
+    cur.execute("SELECT pg_sleep(%s)", (hold,))
+    cur.connection.commit()
+    return True, 0
+
+
+def run_mode(url, mode, model, sellers, drafts, quantity, hold_ms):
+    reserve = reserve_naive if mode == 'naive' else reserve_skip
+    hold = hold_ms / 1000
+
+    def seller(index):
+        latencies = []
+        failures = 0
+        retries = 0
+        conn = connect(url)
+        try:
+            with conn.cursor() as cur:
+                for _ in range(drafts):
+                    hold_id = str(uuid.uuid4())
+                    start = time.perf_counter()
+                    ok, attempts = reserve(cur, model, hold_id, quantity, hold)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    failures += 0 if ok else 1
+                    retries += attempts
+        finally:
+            conn.close()
+        return latencies, failures, retries
+
+    results, elapsed = run_workers(sellers, seller)
+    errors = [r for r in results if isinstance(r, Exception)]
+    for error in errors[:3]:
+        print(f"  ⚠️  {mode}: {error}")
+    ok_results = [r for r in results if not isinstance(r, Exception)]
+    latencies = [value for lat, _, _ in ok_results for value in lat]
+    failures = sum(f for _, f, _ in ok_results)
+    retries = sum(r for _, _, r in ok_results)
+    return latencies, failures, retries, len(errors), elapsed
+
+
+def verify(conn, run_id, expected):
+    """Cada equipo del lote apartado una sola vez y todos los pedidos cubiertos."""
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT COUNT(*), COUNT(DISTINCT r.asset_id)
+            FROM asset_reservations r
+            JOIN assets a ON a.id = r.asset_id
+            WHERE a.serial_number LIKE %s AND r.expires_at > NOW()
+            """,
+            (f'BENCH-RES-{run_id}-%',),
+        )
+        held, distinct = cur.fetchone()
+    return held == distinct == expected, held
+
+
+def verify_sweep(conn, run_id):
+    """Vence las reservas del lote y comprueba que el barrido las borra."""
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            UPDATE asset_reservations SET expires_at = NOW() - INTERVAL '1 second'
+            WHERE asset_id IN (SELECT id FROM assets WHERE serial_number LIKE %s)
+            """,
+            (f'BENCH-RES-{run_id}-%',),
+        )
+        start = time.perf_counter()
+        cur.execute("SELECT expire_asset_reservations(100000)")
+        expired = cur.fetchone()[0]
+        elapsed = (time.perf_counter() - start) * 1000
+        cur.execute(
+            """
+            SELECT COUNT(*) FROM asset_reservations
+            WHERE asset_id IN (SELECT id FROM assets WHERE serial_number LIKE %s)
+            """,
+            (f'BENCH-RES-{run_id}-%',),
+        )
+        remaining = cur.fetchone()[0]
+    return remaining == 0, expired, elapsed
+
+
+def parse_counts(value):
+    counts = [int(v) for v in value.split(',') if v.strip()]
+    if not counts or min(counts) < 1:
+        raise argparse.ArgumentTypeError('Lista de vendedores inválida, ej. 1,8,32')
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de reservas concurrentes de equipos')
+    parser.add_argument('--sellers', type=parse_counts, default=[1, 8, 32],
+                        help='Vendedores simultáneos, lista separada por comas')
+    parser.add_argument('--drafts', type=int, default=10, help='Borradores por vendedor')
+    parser.add_argument('--quantity', type=int, default=3, help='Equipos por borrador')
+    parser.add_argument('--hold-ms', type=float, default=20, help='Trabajo simulado dentro de la transacción')
+    parser.add_argument('--modes', default=','.join(MODES), help='naive, skip o ambos')
+    parser.add_argument('--keep', action='store_true', help='No borrar los datos de prueba')
+    parser.add_argument('--allow-remote', action='store_true')
+    args = parser.parse_args()
+
+    modes = [m.strip() for m in args.modes.split(',') if m.strip()]
+    if not set(modes) <= set(MODES):
+        print(f"❌ Modos válidos: {', '.join(MODES)}")
+        sys.exit(1)
+
+    url = get_database_url()
+    require_local(url, args.allow_remote)
+    admin = connect(url, autocommit=True)
+    with admin.cursor() as cur:
+        cur.execute(
+            "SELECT to_regprocedure('public.reserve_assets_by_quantity(uuid, text, text, integer, text, text, integer, uuid, boolean)')"
+        )
+        if cur.fetchone()[0] is None:
+            print("❌ Falta reserve_assets_by_quantity: aplica 20260318_asset_reservations.sql")
+            sys.exit(1)
+
+    asset_type = load_asset_type(admin)
+    if not asset_type:
+        print("❌ Se necesita al menos un activo con asset_type")
+        sys.exit(1)
+
+    rows = []
+    run_ids = []
+    try:
+        for count in args.sellers:
+            for mode in modes:
+                run_id = uuid.uuid4().hex[:8]
+                run_ids.append(run_id)
+                units = count * args.drafts * args.quantity
+                create_fixtures(admin, run_id, units, asset_type)
+
+                print(f"🛒 {mode}: {count} vendedores x {args.drafts} borradores de {args.quantity} equipos...")
+                latencies, failures, retries, errors, elapsed = run_mode(
+                    url, mode, f'RES-{run_id}', count, args.drafts, args.quantity, args.hold_ms
+                )
+
+                extra = f"{count} vendedores, {retries} reintentos"
+                if failures or errors:
+                    extra += f", {failures} sin stock, {errors} errores"
+                consistent, held = verify(admin, run_id, units)
+                extra += ', ✅ consistente' if consistent else f', ❌ apartados {held} de {units}'
+                if mode == 'skip':
+                    swept, expired, sweep_ms = verify_sweep(admin, run_id)
+                    extra += f", barrido {expired} en {sweep_ms:.0f} ms" + ('' if swept else ' ❌')
+                rows.append((mode, summarize(latencies), elapsed, extra))
+    finally:
+        if not args.keep:
+            for run_id in run_ids:
+                cleanup(admin, run_id)
+        admin.close()
+
+    print_latency_table(rows)
+    print(f"\nTrabajo simulado por reserva: {args.hold_ms:.0f} ms. "
+          f"Ideal sin contención: {1000 / args.hold_ms if args.hold_ms else 0:.0f} reservas/s por vendedor.")
+
+
+if __name__ == '__main__':
+    main()
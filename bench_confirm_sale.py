@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Benchmark de confirmación de ventas según el tamaño de la orden (base local).
+
+Para cada tamaño crea una orden en borrador con N equipos ready_for_sale y
+mide cuánto tarda la transacción de confirmación (el tiempo que la orden y
+sus equipos quedan bloqueados):
+
+  legacy  el ciclo de confirm_sale de sql/010_sales_module_schema.sql (un
+          UPDATE de activo y uno de renglón por equipo), cargado como
+          función temporal de la sesión. Sin el INSERT a audit_logs, que
+          usaba columnas que ya no existen.
+  bulk    confirm_sales_bulk (migración 20260316_bulk_confirm_sale.sql):
+          una sentencia por tabla, incluidos revenue_ledger y auditoría.
+
+Crea sus propios datos (seriales BENCH-SALE-...) y los borra al final.
+
+Uso:
+    python bench_confirm_sale.py
+    python bench_confirm_sale.py --sizes 10,100,500,1000 --repeat 5
+    python bench_confirm_sale.py --modes bulk --keep
+"""
+
+import argparse
+import sys
+import time
+import uuid
+
+from bench_utils import summarize
+from db_connection import connect, get_database_url, require_local
+
+MODES = ('legacy', 'bulk')
+
+LEGACY_FUNCTION = """
+CREATE OR REPLACE FUNCTION pg_temp.bench_confirm_sale_legacy(p_order_id UUID, p_confirmed_by UUID)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_order RECORD;
+    v_item RECORD;
+    v_warranty_end DATE;
+BEGIN
+    SELECT * INTO v_order FROM sales_orders WHERE id = p_order_id;
+    v_warranty_end := CURRENT_DATE + (v_order.warranty_days || ' days')::INTERVAL;
+
+    FOR v_item IN SELECT * FROM sales_order_items WHERE order_id = p_order_id
+    LOOP
+        UPDATE assets SET
+            status = 'sold',
+            sold_to = v_order.customer_id,
+            sold_at = NOW(),
+            sold_by = p_confirmed_by,
+            sale_order_id = p_order_id,
+            warranty_end_date = v_warranty_end,
+            updated_at = NOW()
+        WHERE id = v_item.asset_id;
+
+        UPDATE sales_order_items SET
+            warranty_start_date = CURRENT_DATE,
+            warranty_end_date = v_warranty_end
+        WHERE id = v_item.id;
+    END LOOP;
+
+    UPDATE sales_orders SET
+        status = 'confirmed',
+        approved_by = p_confirmed_by,
+        approved_at = NOW(),
+        updated_at = NOW()
+    WHERE id = p_order_id;
+END;
+$$;
+"""
+
+
+def load_template(conn):
+    """Cliente y asset_type se copian de filas existentes."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT id FROM crm_entities LIMIT 1")
+        customer = cur.fetchone()
+        cur.execute("SELECT asset_type FROM assets WHERE asset_type IS NOT NULL LIMIT 1")
+        asset_type = cur.fetchone()
+    if not customer or not asset_type:
+        return None, None
+    return customer[0], asset_type[0]
+
+
+def create_order(conn, run_id, size, customer_id, asset_type):
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO assets (serial_number, asset_type, status, manufacturer, model, sales_price)
+            SELECT %s || lpad(g::TEXT, 5, '0'), %s, 'ready_for_sale', 'BENCH', 'BENCH', 100
+            FROM generate_series(1, %s) g
+            RETURNING id, serial_number
+            """,
+            (f'BENCH-SALE-{run_id}-', asset_type, size),
+        )
+        assets = cur.fetchall()
+        cur.execute(
+            """
+            INSERT INTO sales_orders (customer_id, status, subtotal, total_amount, warranty_days, internal_notes)
+            VALUES (%s, 'draft', %s, %s, 30, %s)
+            RETURNING id
+            """,
+            (customer_id, 100 * size, 100 * size, f'BENCH-SALE-{run_id}'),
+        )
+        order_id = cur.fetchone()[0]
+        cur.execute(
+            """
+            INSERT INTO sales_order_items (order_id, asset_id, product_description, serial_number, list_price, unit_price)
+            SELECT %s, a.id, 'Equipo benchmark', a.serial_number, 100, 100
+            FROM unnest(%s::uuid[], %s::text[]) AS a(id, serial_number)
+            """,
+            (order_id, [a[0] for a in assets], [a[1] for a in assets]),
+        )
+    return order_id
+
+
+def cleanup(conn, run_id):
+    with conn.cursor() as cur:
+        cur.execute("SELECT id FROM sales_orders WHERE internal_notes = %s", (f'BENCH-SALE-{run_id}',))
+        order_ids = [row[0] for row in cur.fetchall()]
+        if order_ids:
+            cur.execute("DELETE FROM revenue_ledger WHERE sale_order_id = ANY(%s::uuid[])", (order_ids,))
+            cur.execute("DELETE FROM audit_logs WHERE entity_id = ANY(%s::uuid[])", (order_ids,))
+            cur.execute("DELETE FROM sales_order_items WHERE order_id = ANY(%s::uuid[])", (order_ids,))
+            cur.execute("UPDATE assets SET sale_order_id = NULL WHERE sale_order_id = ANY(%s::uuid[])", (order_ids,))
+            cur.execute("DELETE FROM sales_orders WHERE id = ANY(%s::uuid[])", (order_ids,))
+        cur.execute("DELETE FROM assets WHERE serial_number LIKE %s", (f'BENCH-SALE-{run_id}-%',))
+
+
+def confirm(conn, mode, order_id):
+    """Segundos de la transacción de confirmación."""
+    start = time.perf_counter()
+    with conn.cursor() as cur:
+        if mode == 'legacy':
+            cur.execute("SELECT pg_temp.bench_confirm_sale_legacy(%s, NULL)", (order_id,))
+        else:
+            cur.execute("SELECT confirm_sales_bulk(ARRAY[%s]::uuid[], NULL)", (order_id,))
+            result = cur.fetchone()[0]
+            if not result.get('confirmed'):
+                raise RuntimeError(result['orders'][0].get('error'))
+    conn.commit()
+    return time.perf_counter() - start
+
+
+def verify(conn, order_id, size):
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT COUNT(*) FROM assets WHERE sale_order_id = %s AND status::TEXT = 'sold' AND warranty_end_date IS NOT NULL",
+            (order_id,),
+        )
+        sold = cur.fetchone()[0]
+        cur.execute("SELECT status FROM sales_orders WHERE id = %s", (order_id,))
+        status = cur.fetchone()[0]
+    return sold == size and status == 'confirmed'
+
+
+def parse_sizes(value):
+    sizes = [int(v) for v in value.split(',') if v.strip()]
+    if not sizes or min(sizes) < 1:
+        raise argparse.ArgumentTypeError('Lista de tamaños inválida, ej. 10,100,500')
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de confirmación de ventas por tamaño de orden')
+    parser.add_argument('--sizes', type=parse_sizes, default=[10, 100, 500, 1000],
+                        help='Equipos por orden, lista separada por comas')
+    parser.add_argument('--repeat', type=int, default=3, help='Órdenes por tamaño y modo')
+    parser.add_argument('--modes', default=','.join(MODES), help='legacy, bulk o ambos')
+    parser.add_argument('--keep', action='store_true', help='No borrar los datos de prueba')
+    parser.add_argument('--allow-remote', action='store_true')
+    args = parser.parse_args()
+
+    modes = [m.strip() for m in args.modes.split(',') if m.strip()]
+    if not set(modes) <= set(MODES):
+        print(f"❌ Modos válidos: {', '.join(MODES)}")
+        sys.exit(1)
+
+    url = get_database_url()
+    require_local(url, args.allow_remote)
+    admin = connect(url, autocommit=True)
+    conn = connect(url)
+
+    with admin.cursor() as cur:
+        cur.execute("SELECT to_regprocedure('public.confirm_sales_bulk(uuid[], uuid, uuid)')")
+        if 'bulk' in modes and cur.fetchone()[0] is None:
+            print("❌ Falta confirm_sales_bulk con p_hold_id: aplica 20260318_asset_reservations.sql")
+            sys.exit(1)
+
+    customer_id, asset_type = load_template(admin)
+    if not customer_id:
+        print("❌ Se necesita al menos un cliente en crm_entities y un activo con asset_type")
+        sys.exit(1)
+
+    with conn.cursor() as cur:
+        cur.execute(LEGACY_FUNCTION)
+    conn.commit()
+
+    results = {}
+    run_ids = []
+    try:
+        for size in args.sizes:
+            for mode in modes:
+                run_id = uuid.uuid4().hex[:8]
+                run_ids.append(run_id)
+                print(f"🧾 {mode}: {args.repeat} órdenes de {size} equipos...")
+                timings = []
+                consistent = True
+                for _ in range(max(args.repeat, 1)):
+                    order_id = create_order(admin, run_id, size, customer_id, asset_type)
+                    timings.append(confirm(conn, mode, order_id) * 1000)
+                    consistent = consistent and verify(admin, order_id, size)
+                results[(size, mode)] = (summarize(timings), consistent)
+    finally:
+        conn.close()
+        if not args.keep:
+            for run_id in run_ids:
+                cleanup(admin, run_id)
+        admin.close()
+
+    header = f"\n{'Equipos':>8}"
+    for mode in modes:
+        header += f" {mode + ' p50 ms':>16} {mode + ' max ms':>16}"
+    if set(MODES) <= set(modes):
+        header += f" {'Mejora':>8}"
+    print(header)
+    print('-' * (len(header) - 1))
+    for size in args.sizes:
+        line = f"{size:>8}"
+        for mode in modes:
+            stats, consistent = results[(size, mode)]
+            mark = '' if consistent else ' ❌'
+            line += f" {stats['p50']:>16.1f} {stats['max']:>16.1f}{mark}"
+        if set(MODES) <= set(modes):
+            legacy = results[(size, 'legacy')][0]['p50']
+            bulk = results[(size, 'bulk')][0]['p50']
+            line += f" {legacy / bulk if bulk else 0:>7.1f}x"
+        print(line)
+    print("\nTiempo por orden = transacción completa de confirmación (bloqueo de la orden y sus equipos).")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Benchmark de concurrencia del despacho de piezas (base local).
+
+Simula N técnicos pidiendo el mismo SKU a la vez y compara:
+  legacy  lógica de dispatch_part original: FOR UPDATE sobre la fila de
+          parts_catalog, descuento de stock_quantity, solicitud y movimiento.
+  queue   dispatch_part_requests (migración 20260304_parts_dispatch_queue.sql):
+          unidades de part_stock_units reclamadas con SKIP LOCKED.
+
+Cada despacho mantiene la transacción abierta --hold-ms adicionales para
+simular el resto del trabajo de la petición (ida y vuelta de la acción de
+Next.js). Con legacy todos esperan la fila del catálogo y el rendimiento no
+sube con más técnicos; con queue debe crecer con el número de bancos.
+
+Crea sus propios datos (SKU BENCH-..., órdenes BENCH-...) y los borra al final.
+
+Uso:
+    python bench_parts_dispatch.py
+    python bench_parts_dispatch.py --technicians 1,4,8,16 --requests 20 --hold-ms 20
+    python bench_parts_dispatch.py --modes queue --keep
+"""
+
+import argparse
+import json
+import sys
+import time
+import uuid
+
+from bench_utils import print_latency_table, run_workers, summarize
+from db_connection import connect, get_database_url, require_local
+
+MODES = ('legacy', 'queue')
+
+
+def create_fixtures(conn, run_id, technicians, requests_per_tech, stock):
+    """Crea la pieza y una orden con sus solicitudes por técnico."""
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO parts_catalog (sku, name, category, stock_quantity, location)
+            VALUES (%s, %s, 'other', %s, 'BENCH')
+            RETURNING id, sku
+            """,
+            (f'BENCH-{run_id}', f'Pieza benchmark {run_id}', stock),
+        )
+        part_id, sku = cur.fetchone()
+
+        orders = []
+        for tech in range(technicians):
+            cur.execute(
+                """
+                INSERT INTO work_orders (work_order_number, status, reported_issue)
+                VALUES (%s, 'waiting_parts', 'Benchmark de despacho')
+                RETURNING id
+                """,
+                (f'BENCH-{run_id}-{tech:03d}',),
+            )
+            work_order_id = cur.fetchone()[0]
+            cur.execute(
+                """
+                INSERT INTO part_requests (work_order_id, part_sku, part_name, quantity, status)
+                SELECT %s, %s, 'Pieza benchmark', 1, 'pending'
+                FROM generate_series(1, %s)
+                RETURNING id
+                """,
+                (work_order_id, sku, requests_per_tech),
+            )
+            orders.append((work_order_id, [row[0] for row in cur.fetchall()]))
+    return part_id, sku, orders
+
+
+def cleanup(conn, run_id):
+    with conn.cursor() as cur:
+        cur.execute("SELECT id FROM parts_catalog WHERE sku LIKE %s", (f'BENCH-{run_id}%',))
+        part_ids = [row[0] for row in cur.fetchall()]
+        cur.execute("SELECT id FROM work_orders WHERE work_order_number LIKE %s", (f'BENCH-{run_id}-%',))
+        order_ids = [row[0] for row in cur.fetchall()]
+        if order_ids:
+            cur.execute("DELETE FROM inventory_movements WHERE work_order_id = ANY(%s::uuid[])", (order_ids,))
+        if part_ids:
+            cur.execute("DELETE FROM part_stock_units WHERE part_id = ANY(%s::uuid[])", (part_ids,))
+        if order_ids:
+            cur.execute("DELETE FROM part_requests WHERE work_order_id = ANY(%s::uuid[])", (order_ids,))
+            cur.execute("DELETE FROM work_orders WHERE id = ANY(%s::uuid[])", (order_ids,))
+        if part_ids:
+            cur.execute("DELETE FROM parts_catalog WHERE id = ANY(%s::uuid[])", (part_ids,))
+
+
+def dispatch_legacy(cur, part_id, sku, work_order_id, request_id, hold):
+    cur.execute("SELECT stock_quantity FROM parts_catalog WHERE id = %s FOR UPDATE", (part_id,))
+    if cur.fetchone()[0] < 1:
+        return False
+    # Solo se mide el bloqueo: no sincronizar part_stock_units en este modo
+    cur.execute("SELECT set_config('app.part_stock_sync', 'on', true)")
+    cur.execute(
+        "UPDATE parts_catalog SET stock_quantity = stock_quantity - 1, updated_at = NOW() WHERE id = %s",
+        (part_id,),
+    )
+    cur.execute(
+        "UPDATE part_requests SET status = 'installed', installed_at = NOW(), dispatch_date = NOW() WHERE id = %s",
+        (request_id,),
+    )
+    cur.execute(
+        """
+        INSERT INTO inventory_movements (movement_type, item_type, item_id, item_sku, quantity, work_order_id, notes)
+        VALUES ('dispatch', 'part', %s, %s, -1, %s, 'Benchmark legacy')
+        """,
+        (part_id, sku, work_order_id),
+    )
+    cur.execute("SELECT pg_sleep(%s)", (hold,))
+    return True
+
+
+def dispatch_queue(cur, part_id, sku, work_order_id, request_id, hold):
+    items = [{'part_request_id': str(request_id), 'part_id': str(part_id), 'quantity': 1}]
+    cur.execute(
+        "SELECT dispatch_part_requests(%s, %s::jsonb, NULL, 'BENCH')",
+        (work_order_id, json.dumps(items)),
+    )
+    result = cur.fetchone()[0]
+    if not result.get('success'):
+        return False
+    cur.execute("SELECT pg_sleep(%s)", (hold,))
+    return True
+
+
+def run_mode(url, mode, part_id, sku, orders, hold_ms):
+    dispatch = dispatch_legacy if mode == 'legacy' else dispatch_queue
+    hold = hold_ms / 1000
+
+    def technician(index):
+        work_order_id, request_ids = orders[index]
+        latencies = []
+        failures = 0
+        conn = connect(url)
+        try:
+            with conn.cursor() as cur:
+                for request_id in request_ids:
+                    start = time.perf_counter()
+                    ok = dispatch(cur, part_id, sku, work_order_id, request_id, hold)
+                    conn.commit()
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    failures += 0 if ok else 1
+        finally:
+            conn.close()
+        return latencies, failures
+
+    results, elapsed = run_workers(len(orders), technician)
+    errors = [r for r in results if isinstance(r, Exception)]
+    for error in errors[:3]:
+        print(f"  ⚠️  {mode}: {error}")
+    ok_results = [r for r in results if not isinstance(r, Exception)]
+    latencies = [value for lat, _ in ok_results for value in lat]
+    failures = sum(f for _, f in ok_results)
+    return latencies, failures, len(errors), elapsed
+
+
+def verify_queue(conn, part_id, orders):
+    """Cada unidad despachada pertenece a una sola solicitud y el conteo cuadra."""
+    order_ids = [o[0] for o in orders]
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT COUNT(*), COUNT(DISTINCT part_request_id)
+            FROM part_stock_units
+            WHERE part_id = %s AND status = 'dispatched' AND work_order_id = ANY(%s::uuid[])
+            """,
+            (part_id, order_ids),
+        )
+        units, requests = cur.fetchone()
+        cur.execute(
+            "SELECT COUNT(*) FROM part_requests WHERE work_order_id = ANY(%s::uuid[]) AND status = 'installed'",
+            (order_ids,),
+        )
+        installed = cur.fetchone()[0]
+    return units == requests == installed, units, installed
+
+
+def parse_counts(value):
+    counts = [int(v) for v in value.split(',') if v.strip()]
+    if not counts or min(counts) < 1:
+        raise argparse.ArgumentTypeError('Lista de técnicos inválida, ej. 1,4,8')
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de despacho concurrente de piezas')
+    parser.add_argument('--technicians', type=parse_counts, default=[1, 4, 8, 16],
+                        help='Técnicos simultáneos, lista separada por comas')
+    parser.add_argument('--requests', type=int, default=10, help='Despachos por técnico')
+    parser.add_argument('--hold-ms', type=float, default=20, help='Trabajo simulado dentro de la transacción')
+    parser.add_argument('--modes', default=','.join(MODES), help='legacy, queue o ambos')
+    parser.add_argument('--keep', action='store_true', help='No borrar los datos de prueba')
+    parser.add_argument('--allow-remote', action='store_true')
+    args = parser.parse_args()
+
+    modes = [m.strip() for m in args.modes.split(',') if m.strip()]
+    if not set(modes) <= set(MODES):
+        print(f"❌ Modos válidos: {', '.join(MODES)}")
+        sys.exit(1)
+
+    url = get_database_url()
+    require_local(url, args.allow_remote)
+    admin = connect(url, autocommit=True)
+    with admin.cursor() as cur:
+        cur.execute("SELECT to_regprocedure('public.dispatch_part_requests(uuid, jsonb, uuid, text)')")
+        if cur.fetchone()[0] is None:
+            print("❌ Falta dispatch_part_requests: aplica 20260304_parts_dispatch_queue.sql")
+            sys.exit(1)
+
+    rows = []
+    run_ids = []
+    try:
+        for count in args.technicians:
+            for mode in modes:
+                run_id = f'{uuid.uuid4().hex[:8]}'
+                run_ids.append(run_id)
+                stock = count * args.requests
+                part_id, sku, orders = create_fixtures(admin, run_id, count, args.requests, stock)
+
+                print(f"🔧 {mode}: {count} técnicos x {args.requests} despachos de {sku}...")
+                latencies, failures, errors, elapsed = run_mode(url, mode, part_id, sku, orders, args.hold_ms)
+
+                extra = f"{count} técnicos"
+                if failures or errors:
+                    extra += f", {failures} sin stock, {errors} errores"
+                if mode == 'queue':
+                    consistent, units, installed = verify_queue(admin, part_id, orders)
+                    extra += ', ✅ consistente' if consistent else f', ❌ unidades {units} vs instaladas {installed}'
+                rows.append((mode, summarize(latencies), elapsed, extra))
+    finally:
+        if not args.keep:
+            for run_id in run_ids:
+                cleanup(admin, run_id)
+        admin.close()
+
+    print_latency_table(rows)
+    print(f"\nTrabajo simulado por despacho: {args.hold_ms:.0f} ms. "
+          f"Ideal sin contención: {1000 / args.hold_ms if args.hold_ms else 0:.0f} ops/s por técnico.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Utilidades comunes de los benchmarks: varios trabajadores con su propia
+conexión que arrancan a la vez, y resumen de latencias (p50/p95/p99).
+"""
+
+import math
+import threading
+import time
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+def summarize(latencies_ms):
+    values = sorted(latencies_ms)
+    return {
+        'count': len(values),
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+        'max': values[-1] if values else 0.0,
+    }
+
+
+def run_workers(count, target):
+    """Ejecuta target(indice) en `count` hilos que arrancan juntos.
+
+    Devuelve (resultados por hilo, segundos transcurridos). Una excepción en
+    un hilo se devuelve como su resultado.
+    """
+    barrier = threading.Barrier(count + 1)
+    results = [None] * count
+
+    def wrapper(index):
+        barrier.wait()
+        try:
+            results[index] = target(index)
+        except Exception as exc:  # noqa: BLE001 - se reporta en el resumen
+            results[index] = exc
+
+    threads = [threading.Thread(target=wrapper, args=(i,), daemon=True) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - start
+
+
+def print_latency_table(rows):
+    """rows: lista de (nombre, resumen, segundos, extra)."""
+    print(f"\n{'Modo':<14} {'Ops':>7} {'Ops/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}  Extra")
+    print('-' * 90)
+    for name, stats, elapsed, extra in rows:
+        rate = stats['count'] / elapsed if elapsed else 0
+        print(f"{name:<14} {stats['count']:>7} {rate:>9.1f} {stats['p50']:>9.1f} {stats['p95']:>9.1f} "
+              f"{stats['p99']:>9.1f} {stats['max']:>9.1f}  {extra}")
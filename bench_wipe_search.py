@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Benchmark de escaneo en las estaciones de borrado (base local).
+
+Toma seriales reales de assets (y algunos recortados o con un carácter
+cambiado, como los que deja un lector mal enfocado) y mide el tiempo de
+escaneo a resultado con --stations estaciones a la vez:
+  legacy  lo que hacía searchAssetBySerial: ILIKE '%...%' sobre serial y
+          etiqueta, cliente del ticket y evidencias en consultas aparte.
+  rpc     search_wipe_assets (migración 20260319_wipe_station_search.sql)
+          con los 10 candidatos que pide searchAssetBySerial.
+
+Solo lee; no crea datos. El objetivo es p95 < 50 ms con rpc.
+
+Uso:
+    python bench_wipe_search.py
+    python bench_wipe_search.py --stations 1,4,8 --scans 200
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from bench_utils import print_latency_table, run_workers, summarize
+from db_connection import connect, get_database_url, require_local
+
+MODES = ('legacy', 'rpc')
+TARGET_MS = 50
+
+
+def load_queries(conn, count):
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT serial_number FROM assets
+            WHERE serial_number IS NOT NULL AND length(serial_number) >= 6
+            ORDER BY random()
+            LIMIT %s
+            """,
+            (count,),
+        )
+        serials = [row[0] for row in cur.fetchall()]
+    queries = []
+    for serial in serials:
+        kind = random.random()
+        if kind < 0.7:
+            queries.append(serial)
+        elif kind < 0.85:
+            queries.append(serial[:-2])
+        else:
+            pos = random.randrange(len(serial))
+            queries.append(serial[:pos] + 'X' + serial[pos + 1:])
+    return queries
+
+
+def scan_legacy(cur, query):
+    pattern = f'%{query}%'
+    cur.execute(
+        """
+        SELECT a.id, b.ticket_id
+        FROM assets a
+        LEFT JOIN batches b ON b.id = a.batch_id
+        WHERE a.serial_number ILIKE %s OR a.internal_tag ILIKE %s
+        LIMIT 1
+        """,
+        (pattern, pattern),
+    )
+    row = cur.fetchone()
+    if not row:
+        return False
+    asset_id, ticket_id = row
+    if ticket_id:
+        cur.execute(
+            """
+            SELECT c.commercial_name FROM operations_tickets t
+            LEFT JOIN crm_entities c ON c.id = t.client_id
+            WHERE t.id = %s
+            """,
+            (ticket_id,),
+        )
+        cur.fetchone()
+    cur.execute("SELECT type FROM asset_wipe_evidence WHERE asset_id = %s", (asset_id,))
+    cur.fetchall()
+    return True
+
+
+def scan_rpc(cur, query):
+    cur.execute("SELECT * FROM search_wipe_assets(%s, NULL, 10)", (query,))
+    return cur.fetchone() is not None
+
+
+def run_mode(url, mode, stations, queries):
+    scan = scan_legacy if mode == 'legacy' else scan_rpc
+
+    def station(index):
+        latencies = []
+        misses = 0
+        conn = connect(url, autocommit=True)
+        try:
+            with conn.cursor() as cur:
+                for query in queries[index::stations]:
+                    start = time.perf_counter()
+                    found = scan(cur, query)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    misses += 0 if found else 1
+        finally:
+            conn.close()
+        return latencies, misses
+
+    results, elapsed = run_workers(stations, station)
+    errors = [r for r in results if isinstance(r, Exception)]
+    for error in errors[:3]:
+        print(f"  ⚠️  {mode}: {error}")
+    ok_results = [r for r in results if not isinstance(r, Exception)]
+    latencies = [value for lat, _ in ok_results for value in lat]
+    misses = sum(m for _, m in ok_results)
+    return latencies, misses, len(errors), elapsed
+
+
+def parse_counts(value):
+    counts = [int(v) for v in value.split(',') if v.strip()]
+    if not counts or min(counts) < 1:
+        raise argparse.ArgumentTypeError('Lista de estaciones inválida, ej. 1,4,8')
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de búsqueda de seriales en borrado')
+    parser.add_argument('--stations', type=parse_counts, default=[1, 4, 8],
+                        help='Estaciones simultáneas, lista separada por comas')
+    parser.add_argument('--scans', type=int, default=200, help='Escaneos por corrida')
+    parser.add_argument('--modes', default=','.join(MODES), help='legacy, rpc o ambos')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--allow-remote', action='store_true')
+    args = parser.parse_args()
+
+    modes = [m.strip() for m in args.modes.split(',') if m.strip()]
+    if not set(modes) <= set(MODES):
+        print(f"❌ Modos válidos: {', '.join(MODES)}")
+        sys.exit(1)
+
+    url = get_database_url()
+    require_local(url, args.allow_remote)
+    admin = connect(url, autocommit=True)
+    with admin.cursor() as cur:
+        cur.execute("SELECT to_regprocedure('public.search_wipe_assets(text, text[], integer)')")
+        if 'rpc' in modes and cur.fetchone()[0] is None:
+            print("❌ Falta search_wipe_assets: aplica 20260319_wipe_station_search.sql")
+            sys.exit(1)
+
+    random.seed(args.seed)
+    queries = load_queries(admin, args.scans)
+    admin.close()
+    if not queries:
+        print("❌ No hay activos con serial para buscar")
+        sys.exit(1)
+
+    rows = []
+    for count in args.stations:
+        for mode in modes:
+            print(f"🔎 {mode}: {count} estaciones, {len(queries)} escaneos...")
+            latencies, misses, errors, elapsed = run_mode(url, mode, count, queries)
+            stats = summarize(latencies)
+            extra = f"{count} estaciones, {misses} sin resultado"
+            if errors:
+                extra += f", {errors} errores"
+            extra += ', ✅' if stats['p95'] < TARGET_MS else f", ❌ p95 > {TARGET_MS} ms"
+            rows.append((mode, stats, elapsed, extra))
+
+    print_latency_table(rows)
+    print(f"\nObjetivo: p95 de escaneo a resultado < {TARGET_MS} ms (sin contar la red hasta Next.js).")
+
+
+if __name__ == '__main__':
+    main()
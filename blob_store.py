@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Almacenamiento por contenido para evidencias de borrado.
+
+Cada archivo se guarda una sola vez bajo blobs/<aa>/<bb>/<sha256>: el hash se
+calcula mientras el archivo se copia a un temporal (una sola lectura), y si
+storage_blobs ya tiene ese hash no se vuelve a subir. Los conteos de
+referencias los mantienen los triggers de la migración
+20260302_content_addressed_storage.sql; el comando gc borra del bucket los
+blobs sin referencias después de un periodo de gracia (pensado para la
+ventana nocturna, sin cargas en curso). La fila de storage_blobs se borra
+solo después de borrar el objeto, del bucket que registra la fila.
+
+Uso:
+    python blob_store.py put archivo1.pdf foto.jpg --bucket wipe-evidence
+    python blob_store.py gc --grace-hours 24 [--dry-run]
+    python blob_store.py rebuild
+    python blob_store.py stats
+"""
+
+import argparse
+import hashlib
+import mimetypes
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from document_renderer import create_supabase_client
+from storage_backends import LocalStorage, SupabaseStorage
+
+DEFAULT_BUCKET = 'wipe-evidence'
+HASH_CHUNK = 1024 * 1024
+SPOOL_LIMIT = 8 * 1024 * 1024
+
+
+def blob_key(content_hash):
+    return f'blobs/{content_hash[:2]}/{content_hash[2:4]}/{content_hash}'
+
+
+def spool_and_hash(source):
+    """Copia el stream a un temporal calculando SHA-256 y tamaño en la misma pasada."""
+    digest = hashlib.sha256()
+    size = 0
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_LIMIT)
+    for chunk in iter(lambda: source.read(HASH_CHUNK), b''):
+        digest.update(chunk)
+        spool.write(chunk)
+        size += len(chunk)
+    spool.seek(0)
+    return digest.hexdigest(), size, spool
+
+
+class BlobStore:
+    def __init__(self, supabase, storage, bucket=DEFAULT_BUCKET):
+        self.supabase = supabase
+        self.storage = storage
+        self.bucket = bucket
+        self.uploaded = 0
+        self.deduplicated = 0
+        self._session = set()
+        self._buckets = {bucket: storage}
+
+    def storage_for(self, bucket):
+        if bucket not in self._buckets:
+            self._buckets[bucket] = SupabaseStorage(self.supabase, bucket)
+        return self._buckets[bucket]
+
+    def lookup(self, content_hash):
+        res = self.supabase.table('storage_blobs').select('hash, object_path, ref_count').eq(
+            'hash', content_hash
+        ).limit(1).execute()
+        return res.data[0] if res.data else None
+
+    def put_stream(self, source, content_type=None):
+        """Guarda el contenido si no existe. Devuelve (hash, tamaño, url)."""
+        content_hash, size, spool = spool_and_hash(source)
+        key = blob_key(content_hash)
+        try:
+            if content_hash in self._session:
+                self.deduplicated += 1
+                return content_hash, size, self.storage.url(key)
+
+            existing = self.lookup(content_hash)
+            # Un blob huérfano pudo haber sido borrado del bucket por gc: se resube
+            if existing and existing['ref_count'] > 0:
+                self._session.add(content_hash)
+                self.deduplicated += 1
+                return content_hash, size, self.storage.url(existing['object_path'])
+
+            self.storage.put(key, spool.read(), content_type or 'application/octet-stream')
+            self.supabase.rpc('register_storage_blob', {
+                'p_hash': content_hash,
+                'p_bucket': self.bucket,
+                'p_object_path': key,
+                'p_size': size,
+                'p_content_type': content_type,
+            }).execute()
+            self._session.add(content_hash)
+            self.uploaded += 1
+            return content_hash, size, self.storage.url(key)
+        finally:
+            spool.close()
+
+    def put_file(self, path, content_type=None):
+        with open(path, 'rb') as f:
+            return self.put_stream(f, content_type)
+
+    def collect_garbage(self, grace_hours=24, dry_run=False, limit=500):
+        """Borra del almacenamiento los blobs sin referencias. Devuelve (blobs, bytes)."""
+        if dry_run:
+            cutoff = (datetime.now(timezone.utc) - timedelta(hours=grace_hours)).isoformat()
+            res = self.supabase.table('storage_blobs').select('hash, size').eq(
+                'ref_count', 0
+            ).lt('orphaned_at', cutoff).execute()
+            rows = res.data or []
+            return len(rows), sum(r['size'] for r in rows)
+
+        removed = 0
+        freed = 0
+        while True:
+            res = self.supabase.rpc('claim_orphan_storage_blobs', {
+                'p_grace': f'{grace_hours} hours',
+                'p_limit': limit,
+            }).execute()
+            rows = res.data or []
+            for row in rows:
+                # Si el borrado falla la fila queda reclamada y se reintenta
+                # cuando vence el reclamo
+                try:
+                    self.storage_for(row['bucket']).delete(row['object_path'])
+                except Exception as exc:  # noqa: BLE001 - se reporta y se sigue con el resto
+                    print(f"⚠️  No se pudo borrar {row['bucket']}/{row['object_path']}: {exc}")
+                    continue
+                deleted = self.supabase.rpc('delete_storage_blob', {'p_hash': row['hash']}).execute()
+                if deleted.data:
+                    removed += 1
+                    freed += row['size']
+            if len(rows) < limit:
+                return removed, freed
+
+
+def format_bytes(value):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if value < 1024:
+            return f'{value:.1f} {unit}'
+        value /= 1024
+    return f'{value:.1f} TB'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Almacenamiento de archivos por contenido')
+    parser.add_argument('--bucket', default=DEFAULT_BUCKET)
+    parser.add_argument('--local-storage', help='Usar esta carpeta en lugar del bucket')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    put = sub.add_parser('put', help='Guardar archivos')
+    put.add_argument('files', nargs='+')
+
+    gc = sub.add_parser('gc', help='Borrar blobs sin referencias')
+    gc.add_argument('--grace-hours', type=int, default=24)
+    gc.add_argument('--dry-run', action='store_true')
+
+    sub.add_parser('rebuild', help='Recalcular conteos de referencias')
+    sub.add_parser('stats', help='Resumen de almacenamiento')
+    args = parser.parse_args()
+
+    supabase = create_supabase_client()
+    if args.local_storage:
+        storage = LocalStorage(args.local_storage)
+    else:
+        storage = SupabaseStorage(supabase, args.bucket)
+    store = BlobStore(supabase, storage, args.bucket)
+
+    if args.command == 'put':
+        for name in args.files:
+            path = Path(name)
+            if not path.is_file():
+                print(f"⚠️  {name} no existe")
+                continue
+            content_hash, size, url = store.put_file(path, mimetypes.guess_type(path.name)[0])
+            print(f"  {content_hash[:12]}  {format_bytes(size):>10}  {path.name} -> {url}")
+        print(f"✅ Subidos: {store.uploaded} | Ya existentes: {store.deduplicated}")
+
+    elif args.command == 'gc':
+        removed, freed = store.collect_garbage(args.grace_hours, args.dry_run)
+        verb = 'Se borrarían' if args.dry_run else 'Borrados'
+        print(f"🧹 {verb} {removed} blobs ({format_bytes(freed)})")
+
+    elif args.command == 'rebuild':
+        res = supabase.rpc('rebuild_storage_blob_ref_counts', {}).execute()
+        print(f"✅ Conteos corregidos: {res.data}")
+
+    elif args.command == 'stats':
+        res = supabase.table('storage_blobs').select('size, ref_count').execute()
+        rows = res.data or []
+        stored = sum(r['size'] for r in rows)
+        logical = sum(r['size'] * max(r['ref_count'], 1) for r in rows)
+        orphans = sum(1 for r in rows if r['ref_count'] == 0)
+        print(f"📦 Blobs: {len(rows)} ({format_bytes(stored)} almacenados)")
+        print(f"   Sin deduplicar serían: {format_bytes(logical)}")
+        print(f"   Huérfanos: {orphans}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Verificador de consistencia de toda la base de datos.
+
+Generaliza los scripts puntuales (diagnose_caja_10006.py, find_zero_boxes.py,
+check_box_10006_serials.py) a un motor de reglas: cada tabla se lee una sola
+vez, página por página, y todas las reglas de esa tabla se evalúan en la
+misma pasada sin cargar la tabla completa en memoria. El resultado es un
+reporte ordenado por gravedad.
+
+Uso:
+    python check_consistency.py                 # reporte en consola
+    python check_consistency.py --json out.json # además guarda el reporte
+    python check_consistency.py --rule caja_sin_numero --rule serial_duplicado
+"""
+
+import argparse
+import json
+import os
+import sys
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import requests
+from dotenv import load_dotenv
+
+load_dotenv('.env.local')
+
+SUPABASE_URL = os.getenv('NEXT_PUBLIC_SUPABASE_URL', '').strip()
+SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY', '').strip()
+
+PAGE_SIZE = 1000
+MAX_EXAMPLES = 20
+
+SEVERITY_WEIGHT = {'critica': 100, 'alta': 10, 'media': 3, 'baja': 1}
+
+# Bodegas permitidas por estado del activo (None = sin bodega asignada).
+# Los estados que no aparecen aquí no se validan contra la bodega.
+STATUS_WAREHOUSES = {
+    'pending_reception': {None, 'BOD-REC'},
+    'scrapped': {None, 'BOD-DES'},
+    'ready_for_sale': {'BOD-REM', 'BOD-VAL', 'BOD-VENTA'},
+}
+
+
+def normalize_serial(value):
+    if value is None:
+        return ''
+    return str(value).strip().upper()
+
+
+class Rule(ABC):
+    """Regla base: se alimenta fila por fila durante la pasada de su tabla."""
+
+    name = ''
+    table = ''
+    columns = ()
+    severity = 'media'
+    description = ''
+
+    def __init__(self):
+        self.findings = []
+
+    def start(self, lookups):
+        """Recibe los índices de otras tablas antes de la pasada."""
+
+    @abstractmethod
+    def visit(self, row):
+        """Evalúa una fila de la tabla de la regla."""
+
+    def finish(self):
+        return self.findings
+
+    def flag(self, row_id, detail):
+        self.findings.append({'id': row_id, 'detail': detail})
+
+
+class BoxWithoutNumberRule(Rule):
+    name = 'caja_sin_numero'
+    table = 'ticket_items'
+    columns = ('id', 'ticket_id', 'box_number')
+    severity = 'alta'
+    description = 'Items con box_number nulo o 0'
+
+    def visit(self, row):
+        if not row.get('box_number'):
+            self.flag(row['id'], f"ticket {row.get('ticket_id')} box_number={row.get('box_number')}")
+
+
+class ItemWithoutSerialRule(Rule):
+    name = 'item_sin_serial'
+    table = 'ticket_items'
+    columns = ('id', 'ticket_id', 'box_number', 'collected_serial', 'box_reception_code', 'validation_status')
+    severity = 'media'
+    description = 'Items de cajas recibidas o validadas sin serial recolectado'
+
+    def visit(self, row):
+        received = row.get('box_reception_code') or row.get('validation_status') == 'VALIDADO'
+        if received and not normalize_serial(row.get('collected_serial')):
+            self.flag(row['id'], f"ticket {row.get('ticket_id')} caja #{row.get('box_number')}")
+
+
+class ItemWithMissingAssetRule(Rule):
+    name = 'item_activo_inexistente'
+    table = 'ticket_items'
+    columns = ('id', 'ticket_id', 'asset_id')
+    severity = 'critica'
+    description = 'Items cuyo asset_id no existe en assets'
+
+    def start(self, lookups):
+        self.asset_ids = lookups['asset_ids']
+
+    def visit(self, row):
+        asset_id = row.get('asset_id')
+        if asset_id and asset_id not in self.asset_ids:
+            self.flag(row['id'], f"asset_id {asset_id} no existe")
+
+
+class AssetWarehouseStatusRule(Rule):
+    name = 'activo_bodega_inconsistente'
+    table = 'assets'
+    columns = ('id', 'internal_tag', 'status', 'current_warehouse_id')
+    severity = 'alta'
+    description = 'Activos en una bodega que no corresponde a su estado'
+
+    def start(self, lookups):
+        self.warehouse_codes = lookups['warehouse_codes']
+
+    def visit(self, row):
+        allowed = STATUS_WAREHOUSES.get(row.get('status'))
+        if allowed is None:
+            return
+        warehouse_id = row.get('current_warehouse_id')
+        code = self.warehouse_codes.get(warehouse_id, warehouse_id) if warehouse_id else None
+        if code not in allowed:
+            self.flag(row['id'], f"{row.get('internal_tag')} status={row.get('status')} bodega={code}")
+
+
+class DuplicateSerialRule(Rule):
+    name = 'serial_duplicado'
+    table = 'assets'
+    columns = ('id', 'serial_number')
+    severity = 'critica'
+    description = 'Seriales repetidos en assets'
+
+    def __init__(self):
+        super().__init__()
+        self.seen = defaultdict(list)
+
+    def visit(self, row):
+        serial = normalize_serial(row.get('serial_number'))
+        if serial:
+            self.seen[serial].append(row['id'])
+
+    def finish(self):
+        for serial, ids in self.seen.items():
+            if len(ids) > 1:
+                self.flag(ids[0], f"serial {serial} en {len(ids)} activos: {', '.join(ids)}")
+        return self.findings
+
+
+class DuplicateTicketSerialRule(DuplicateSerialRule):
+    name = 'serial_duplicado_ticket'
+    table = 'ticket_items'
+    columns = ('id', 'ticket_id', 'collected_serial')
+    severity = 'alta'
+    description = 'Seriales recolectados repetidos dentro del mismo ticket'
+
+    def visit(self, row):
+        serial = normalize_serial(row.get('collected_serial'))
+        if serial:
+            self.seen[(row.get('ticket_id'), serial)].append(row['id'])
+
+    def finish(self):
+        for (ticket_id, serial), ids in self.seen.items():
+            if len(ids) > 1:
+                self.flag(ids[0], f"ticket {ticket_id} serial {serial} repetido {len(ids)} veces")
+        return self.findings
+
+
+RULES = [
+    BoxWithoutNumberRule,
+    ItemWithoutSerialRule,
+    ItemWithMissingAssetRule,
+    AssetWarehouseStatusRule,
+    DuplicateSerialRule,
+    DuplicateTicketSerialRule,
+]
+
+
+def fetch_table(table, columns):
+    """Recorre una tabla completa paginando por id (keyset) con PostgREST.
+
+    Devuelve las filas de a una página a la vez, sin acumularlas.
+    """
+    headers = {
+        'apikey': SUPABASE_KEY,
+        'Authorization': f'Bearer {SUPABASE_KEY}',
+    }
+    select = ','.join(sorted(set(columns) | {'id'}))
+    last_id = None
+    while True:
+        params = {'select': select, 'order': 'id.asc', 'limit': PAGE_SIZE}
+        if last_id is not None:
+            params['id'] = f'gt.{last_id}'
+        res = requests.get(f'{SUPABASE_URL}/rest/v1/{table}', headers=headers, params=params)
+        if res.status_code != 200:
+            raise RuntimeError(f'Error leyendo {table}: {res.status_code} {res.text}')
+        page = res.json()
+        yield from page
+        if len(page) < PAGE_SIZE:
+            return
+        last_id = page[-1]['id']
+
+
+def run_checks(rule_classes):
+    rules = [cls() for cls in rule_classes]
+    by_table = defaultdict(list)
+    for rule in rules:
+        by_table[rule.table].append(rule)
+
+    # Una sola lectura por tabla con la unión de columnas de sus reglas.
+    # assets va primero: sus ids se juntan durante su propia pasada y las
+    # reglas de ticket_items los usan después.
+    wanted = {table: {c for r in table_rules for c in r.columns} for table, table_rules in by_table.items()}
+    wanted.setdefault('assets', set()).add('id')
+    order = ['assets'] + sorted(t for t in wanted if t != 'assets')
+
+    lookups = {
+        'asset_ids': set(),
+        'warehouse_codes': {row['id']: row['code'] for row in fetch_table('warehouses', ('id', 'code'))},
+    }
+    scanned = {'warehouses': len(lookups['warehouse_codes'])}
+
+    results = []
+    for table in order:
+        table_rules = by_table.get(table, [])
+        for rule in table_rules:
+            rule.start(lookups)
+        count = 0
+        for row in fetch_table(table, wanted[table]):
+            count += 1
+            if table == 'assets':
+                lookups['asset_ids'].add(row['id'])
+            for rule in table_rules:
+                rule.visit(row)
+        scanned[table] = count
+        results.extend((rule, rule.finish()) for rule in table_rules)
+
+    return results, scanned
+
+
+def build_report(results, scanned):
+    entries = []
+    for rule, findings in results:
+        entries.append({
+            'rule': rule.name,
+            'table': rule.table,
+            'severity': rule.severity,
+            'description': rule.description,
+            'count': len(findings),
+            'score': SEVERITY_WEIGHT[rule.severity] * len(findings),
+            'examples': findings[:MAX_EXAMPLES],
+        })
+    entries.sort(key=lambda e: (-e['score'], e['rule']))
+    return {
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'scanned_rows': scanned,
+        'total_findings': sum(e['count'] for e in entries),
+        'rules': entries,
+    }
+
+
+def print_report(report):
+    print("🔎 REPORTE DE CONSISTENCIA")
+    print("=" * 80)
+    for table, count in sorted(report['scanned_rows'].items()):
+        print(f"  {table}: {count} filas revisadas")
+    print()
+    for entry in report['rules']:
+        icon = '✅' if entry['count'] == 0 else '❌'
+        print(f"{icon} [{entry['severity'].upper()}] {entry['rule']} ({entry['table']}): {entry['count']}")
+        print(f"   {entry['description']}")
+        for example in entry['examples'][:5]:
+            print(f"     - {example['id']}: {example['detail']}")
+    print()
+    print(f"Total de hallazgos: {report['total_findings']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Verificador de consistencia de la base de datos')
+    parser.add_argument('--rule', action='append', help='Ejecutar solo estas reglas (repetible)')
+    parser.add_argument('--json', help='Guardar el reporte en este archivo JSON')
+    args = parser.parse_args()
+
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        print("❌ Error: NEXT_PUBLIC_SUPABASE_URL o SUPABASE_SERVICE_ROLE_KEY no configurados")
+        sys.exit(1)
+
+    selected = RULES
+    if args.rule:
+        known = {cls.name: cls for cls in RULES}
+        unknown = [name for name in args.rule if name not in known]
+        if unknown:
+            print(f"❌ Reglas desconocidas: {', '.join(unknown)}")
+            print(f"   Disponibles: {', '.join(known)}")
+            sys.exit(1)
+        selected = [known[name] for name in args.rule]
+
+    results, scanned = run_checks(selected)
+    report = build_report(results, scanned)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 Reporte guardado en {args.json}")
+
+    sys.exit(1 if report['total_findings'] else 0)
+
+
+if __name__ == '__main__':
+    main()
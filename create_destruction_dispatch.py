@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Despacho de destrucción masivo a partir de un filtro de bodega/estado.
+
+Selecciona los activos de una bodega (por defecto BOD-DES), opcionalmente
+filtrados por estado y tipo, muestra cómo se repartirá el peso total entre
+ellos y, con --execute, crea el despacho con create_destruction_dispatch_bulk
+(migración 20260303_bulk_destruction_dispatch.sql): una sentencia por tabla
+en una sola transacción corta, sin importar cuántos equipos salgan.
+
+El reparto es el mismo que hace allocate_dispatch_weight en la base: partes
+proporcionales al factor del tipo (1 si no se indica), truncadas a centésimas,
+y los centavos sobrantes para las partes con mayor residuo.
+
+Uso:
+    python create_destruction_dispatch.py --total-weight 1520.5
+    python create_destruction_dispatch.py --warehouse BOD-DES --status scrapped \\
+        --factor Laptop=5 --factor Monitor=12 --total-weight 2400 --show 20
+    python create_destruction_dispatch.py --total-weight 2400 --client "Recicladora" \\
+        --driver "Juan Pérez" --plate P123ABC --user-id <uuid> --execute
+"""
+
+import argparse
+import sys
+import uuid
+from collections import defaultdict
+from decimal import ROUND_FLOOR, ROUND_HALF_UP, Decimal
+
+from document_renderer import create_supabase_client
+
+DEFAULT_WAREHOUSE = 'BOD-DES'
+PAGE_SIZE = 1000
+CENT = Decimal('0.01')
+
+
+def parse_factor(value):
+    asset_type, sep, factor = value.partition('=')
+    if not sep or not asset_type:
+        raise argparse.ArgumentTypeError(f'Factor inválido: {value} (usar Tipo=número)')
+    try:
+        factor = Decimal(factor)
+    except ArithmeticError:
+        raise argparse.ArgumentTypeError(f'Factor inválido: {value}')
+    if factor <= 0:
+        raise argparse.ArgumentTypeError(f'El factor debe ser positivo: {value}')
+    return asset_type, factor
+
+
+def allocate_weights(assets, total_weight, factors=None):
+    """Devuelve {asset_id: peso} cuya suma es exactamente total_weight (a centésimas)."""
+    if not assets:
+        return {}
+    factors = factors or {}
+    total_cents = int(Decimal(str(total_weight)).quantize(CENT, ROUND_HALF_UP) * 100)
+    weights = [factors.get(a.get('asset_type'), Decimal(1)) for a in assets]
+    factor_sum = sum(weights)
+
+    shares = []
+    for asset, factor in zip(assets, weights):
+        exact = Decimal(total_cents) * factor / factor_sum
+        base = exact.to_integral_value(ROUND_FLOOR)
+        shares.append((asset['id'], base, exact - base))
+
+    leftover = int(total_cents - sum(base for _, base, _ in shares))
+    ranked = sorted(shares, key=lambda s: (-s[2], s[0]))
+    bonus = {asset_id for asset_id, _, _ in ranked[:leftover]}
+    return {
+        asset_id: (base + (1 if asset_id in bonus else 0)) / 100
+        for asset_id, base, _ in shares
+    }
+
+
+def fetch_warehouse(supabase, code):
+    res = supabase.table('warehouses').select('id, code, name').eq('code', code).limit(1).execute()
+    return res.data[0] if res.data else None
+
+
+def fetch_assets(supabase, warehouse_id, statuses=None, asset_types=None, limit=None):
+    """Activos de la bodega paginando por id (keyset)."""
+    assets = []
+    last_id = None
+    while True:
+        query = supabase.table('assets').select(
+            'id, internal_tag, serial_number, manufacturer, model, asset_type, status'
+        ).eq('current_warehouse_id', warehouse_id)
+        if statuses:
+            query = query.in_('status', statuses)
+        if asset_types:
+            query = query.in_('asset_type', asset_types)
+        if last_id:
+            query = query.gt('id', last_id)
+        page = query.order('id').limit(PAGE_SIZE).execute().data or []
+        assets.extend(page)
+        if limit and len(assets) >= limit:
+            return assets[:limit]
+        if len(page) < PAGE_SIZE:
+            return assets
+        last_id = page[-1]['id']
+
+
+def resolve_client(supabase, value):
+    try:
+        return str(uuid.UUID(value)), None
+    except ValueError:
+        pass
+    res = supabase.table('crm_entities').select('id, commercial_name').ilike(
+        'commercial_name', f'%{value}%'
+    ).limit(5).execute()
+    rows = res.data or []
+    if len(rows) != 1:
+        return None, rows
+    return rows[0]['id'], rows
+
+
+def print_preview(assets, allocation, show):
+    by_type = defaultdict(lambda: [0, Decimal(0)])
+    for asset in assets:
+        entry = by_type[asset.get('asset_type') or 'N/A']
+        entry[0] += 1
+        entry[1] += allocation[asset['id']]
+
+    print(f"\n{'Tipo':<24} {'Equipos':>8} {'Peso (lb)':>12} {'Por equipo':>11}")
+    print('-' * 58)
+    for asset_type, (count, weight) in sorted(by_type.items(), key=lambda kv: -kv[1][1]):
+        print(f"{asset_type:<24} {count:>8} {weight:>12.2f} {weight / count:>11.2f}")
+    print('-' * 58)
+    print(f"{'Total':<24} {len(assets):>8} {sum(allocation.values()):>12.2f}")
+
+    if show:
+        print(f"\nPrimeros {min(show, len(assets))} activos:")
+        for asset in assets[:show]:
+            tag = asset.get('internal_tag') or asset.get('serial_number') or asset['id'][:8]
+            summary = ' '.join(filter(None, (asset.get('manufacturer'), asset.get('model'))))
+            print(f"  {tag:<20} {summary[:30]:<30} {allocation[asset['id']]:>8.2f} lb")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Despacho de destrucción masivo')
+    parser.add_argument('--warehouse', default=DEFAULT_WAREHOUSE, help='Código de la bodega de origen')
+    parser.add_argument('--status', action='append', help='Filtrar por estado (repetible)')
+    parser.add_argument('--type', dest='asset_types', action='append', help='Filtrar por asset_type (repetible)')
+    parser.add_argument('--limit', type=int, help='Máximo de activos a despachar')
+    parser.add_argument('--total-weight', type=Decimal, required=True, help='Peso total en libras')
+    parser.add_argument('--factor', type=parse_factor, action='append', default=[],
+                        help='Peso relativo por tipo, ej. Monitor=12 (repetible)')
+    parser.add_argument('--show', type=int, default=10, help='Activos a listar en la vista previa')
+    parser.add_argument('--client', help='UUID o nombre del cliente (crm_entities)')
+    parser.add_argument('--driver', help='Nombre del piloto')
+    parser.add_argument('--plate', help='Placa del vehículo')
+    parser.add_argument('--user-id', help='UUID del usuario que despacha')
+    parser.add_argument('--execute', action='store_true', help='Crear el despacho (sin esto solo es vista previa)')
+    args = parser.parse_args()
+
+    if args.total_weight < 0:
+        print("❌ El peso total no puede ser negativo")
+        sys.exit(1)
+
+    supabase = create_supabase_client()
+    warehouse = fetch_warehouse(supabase, args.warehouse)
+    if not warehouse:
+        print(f"❌ Bodega {args.warehouse} no encontrada")
+        sys.exit(1)
+
+    print(f"🔍 Buscando activos en {warehouse['code']} ({warehouse.get('name') or ''})...")
+    assets = fetch_assets(supabase, warehouse['id'], args.status, args.asset_types, args.limit)
+    if not assets:
+        print("⚠️  No hay activos que cumplan el filtro")
+        sys.exit(0)
+
+    factors = dict(args.factor)
+    allocation = allocate_weights(assets, args.total_weight, factors)
+    print_preview(assets, allocation, args.show)
+
+    if not args.execute:
+        print("\nℹ️  Vista previa: usa --execute para crear el despacho")
+        return
+
+    client_id = None
+    if args.client:
+        client_id, matches = resolve_client(supabase, args.client)
+        if not client_id:
+            print(f"❌ Cliente '{args.client}' no encontrado o ambiguo")
+            for row in matches or []:
+                print(f"   {row['id']}  {row['commercial_name']}")
+            sys.exit(1)
+
+    res = supabase.rpc('create_destruction_dispatch_bulk', {
+        'p_origin_warehouse': warehouse['code'],
+        'p_client_id': client_id,
+        'p_driver_name': args.driver,
+        'p_vehicle_plate': args.plate,
+        'p_total_weight': str(args.total_weight),
+        'p_asset_ids': [a['id'] for a in assets],
+        'p_user_id': args.user_id,
+        'p_type_factors': {k: str(v) for k, v in factors.items()} or None,
+    }).execute()
+    result = res.data or {}
+    print(f"\n✅ Despacho {result.get('dispatch_code')} creado con {result.get('count')} activos")
+
+
+if __name__ == '__main__':
+    main()
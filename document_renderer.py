@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Motor de plantillas del lado del servidor para document_templates.
+
+Cada plantilla (content_html con tokens {Placeholder}) se compila una sola vez
+a una cadena de formato y se guarda en caché con la llave id + updated_at;
+si la plantilla se edita en el panel, el cambio de updated_at invalida la
+versión compilada. El render de un documento es una sola llamada a
+str.format sobre la versión compilada, sin regex ni replaceAll por variable.
+
+Uso:
+    python document_renderer.py guias-y-manifiestos --data datos.json --out guia.html
+    python document_renderer.py guias-y-manifiestos --check
+    python document_renderer.py guias-y-manifiestos --data datos.json --bench 10000
+"""
+
+import argparse
+import html
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+# Sintaxis de las plantillas: {Ticket_ID}, {Cliente Dirección}. Palabras
+# separadas por un solo espacio, sin espacios en los extremos.
+_WORD = r'[\wÁÉÍÓÚÜÑáéíóúüñ]'
+PLACEHOLDER_RE = re.compile(r'\{(?=.{1,64}\})([A-Za-zÁÉÍÓÚÜÑáéíóúüñ]%s*(?: %s+)*)\}' % (_WORD, _WORD))
+
+# El contenido de <script> y <style> se copia tal cual: sus llaves son código.
+RAW_BLOCK_RE = re.compile(r'<(script|style)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+
+DEFAULT_MISSING = 'N/A'
+
+
+class TemplateError(Exception):
+    pass
+
+
+class Markup(str):
+    """Valor HTML de confianza: se inserta sin escapar."""
+
+
+def normalize_variable(value):
+    """Acepta 'Ticket_ID', '{Ticket_ID}' o {'code': '{Ticket_ID}', ...}."""
+    if isinstance(value, dict):
+        value = value.get('code') or value.get('name') or ''
+    value = str(value).strip()
+    if value.startswith('{') and value.endswith('}'):
+        value = value[1:-1]
+    return value.strip()
+
+
+class CompiledTemplate:
+    """Plantilla parseada: cadena de formato y nombres de sus campos."""
+
+    __slots__ = ('fields', '_format')
+
+    def __init__(self, content_html):
+        fields = []
+        index = {}
+        parts = []
+
+        def literal(text):
+            parts.append(text.replace('{', '{{').replace('}', '}}'))
+
+        def compile_markup(text):
+            pos = 0
+            for match in PLACEHOLDER_RE.finditer(text):
+                literal(text[pos:match.start()])
+                name = match.group(1)
+                if name not in index:
+                    index[name] = len(fields)
+                    fields.append(name)
+                parts.append('{%d}' % index[name])
+                pos = match.end()
+            literal(text[pos:])
+
+        pos = 0
+        for block in RAW_BLOCK_RE.finditer(content_html):
+            compile_markup(content_html[pos:block.start()])
+            literal(block.group(0))
+            pos = block.end()
+        compile_markup(content_html[pos:])
+
+        self.fields = tuple(fields)
+        self._format = ''.join(parts)
+
+    def validate(self, variables):
+        """Devuelve los placeholders que no están declarados en variables.
+
+        Una lista de variables vacía (el default de la tabla) no se valida.
+        """
+        declared = {normalize_variable(v) for v in variables or []}
+        declared.discard('')
+        if not declared:
+            return []
+        return [name for name in self.fields if name not in declared]
+
+    def render(self, values, missing=DEFAULT_MISSING, escape=True):
+        out = []
+        for name in self.fields:
+            value = values.get(name)
+            if value is None or value == '':
+                value = missing
+            elif escape and not isinstance(value, Markup):
+                value = html.escape(str(value), quote=False)
+            out.append(value)
+        return self._format.format(*out)
+
+
+class TemplateCache:
+    """Caché de plantillas compiladas por id y modo; updated_at decide si sigue vigente.
+
+    La llave incluye strict: una compilación sin validar (strict=False) no
+    se reutiliza para un llamador que exige validar los placeholders.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, template, strict=True):
+        """Recibe una fila de document_templates y devuelve su CompiledTemplate."""
+        key = (template['id'], strict)
+        version = template.get('updated_at')
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        compiled = CompiledTemplate(template['content_html'])
+        unknown = compiled.validate(template.get('variables'))
+        if strict and unknown:
+            raise TemplateError(
+                f"Plantilla {template.get('slug', template['id'])} usa variables no declaradas: {', '.join(unknown)}"
+            )
+
+        with self._lock:
+            self._entries[key] = (version, compiled)
+        return compiled
+
+    def render(self, template, values, **kwargs):
+        return self.get(template).render(values, **kwargs)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+default_cache = TemplateCache()
+
+
+def render_document(template, values, **kwargs):
+    return default_cache.render(template, values, **kwargs)
+
+
+def fetch_templates(supabase, slugs=None):
+    """Carga plantillas activas de document_templates, indexadas por slug."""
+    query = supabase.table('document_templates').select(
+        'id, slug, name, content_html, variables, updated_at'
+    ).eq('is_active', True)
+    if slugs:
+        query = query.in_('slug', list(slugs))
+    response = query.execute()
+    return {row['slug']: row for row in response.data or []}
+
+
+def create_supabase_client():
+    from dotenv import load_dotenv
+    from supabase import create_client
+
+    load_dotenv('.env.local')
+    url = os.getenv('NEXT_PUBLIC_SUPABASE_URL')
+    key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+    if not url or not key:
+        print("❌ Error: NEXT_PUBLIC_SUPABASE_URL o SUPABASE_SERVICE_ROLE_KEY no configurados")
+        sys.exit(1)
+    return create_client(url, key)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Renderiza plantillas de document_templates')
+    parser.add_argument('slug', help='Slug de la plantilla (ej. guias-y-manifiestos)')
+    parser.add_argument('--data', help='Archivo JSON con los valores de las variables')
+    parser.add_argument('--out', help='Archivo HTML de salida (por defecto stdout)')
+    parser.add_argument('--check', action='store_true', help='Solo validar placeholders contra variables')
+    parser.add_argument('--bench', type=int, default=0, help='Renderizar N veces y medir documentos/segundo')
+    args = parser.parse_args()
+
+    templates = fetch_templates(create_supabase_client(), [args.slug])
+    template = templates.get(args.slug)
+    if not template:
+        print(f"❌ Plantilla {args.slug} no encontrada o inactiva")
+        sys.exit(1)
+
+    compiled = default_cache.get(template, strict=False)
+    unknown = compiled.validate(template.get('variables'))
+
+    if args.check:
+        print(f"📋 {template['name']}: {len(compiled.fields)} variables usadas")
+        for name in compiled.fields:
+            print(f"  {'❌' if name in unknown else '✓'} {{{name}}}")
+        sys.exit(1 if unknown else 0)
+
+    if unknown:
+        print(f"⚠️  Variables no declaradas: {', '.join(unknown)}", file=sys.stderr)
+
+    values = {}
+    if args.data:
+        with open(args.data, encoding='utf-8') as f:
+            values = json.load(f)
+
+    if args.bench:
+        # Mismo camino que el render normal (sin validar), con la consulta a
+        # la caché incluida en cada documento
+        start = time.perf_counter()
+        for _ in range(args.bench):
+            default_cache.get(template, strict=False).render(values)
+        elapsed = time.perf_counter() - start
+        print(f"⏱️  {args.bench} documentos en {elapsed:.3f}s ({args.bench / elapsed:,.0f} docs/s)")
+        return
+
+    output = compiled.render(values)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"✅ Documento generado: {args.out}")
+    else:
+        sys.stdout.write(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Exportación de auditoría (v_auditoria_detallada) con memoria constante.
+
+Lee con un cursor del lado del servidor (psycopg2 named cursor) y escribe
+CSV, JSONL o XLSX fila por fila, así que un año completo de auditoría para
+un cliente de certificación queda limitado por el disco y no por la RAM.
+XLSX usa openpyxl en modo write_only.
+
+Filtros: --ticket (readable_id o uuid), --batch (internal_batch_id o uuid),
+--serial (serial, etiqueta interna o entity_reference), --desde/--hasta,
+--modulo, --accion. --with-data agrega data_before/data_after.
+
+Uso:
+    python export_audit.py --ticket TK-2026-00006 -o tk6.csv
+    python export_audit.py --desde 2025-01-01 --hasta 2025-12-31 --format jsonl -o 2025.jsonl
+    python export_audit.py --batch LOTE-2026-0042 --format xlsx -o lote42.xlsx
+    python export_audit.py --serial 5CG1234XYZ --with-data --format jsonl
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+from db_connection import connect
+
+ITERSIZE = 5000
+PROGRESS_EVERY = 100000
+XLSX_MAX_ROWS = 1048575
+
+COLUMNS = [
+    'created_at', 'action', 'module', 'entity_type', 'entity_reference', 'description',
+    'user_name', 'user_email', 'user_role', 'ticket_code', 'batch_code', 'serial_number',
+    'ticket_id', 'batch_id', 'asset_id', 'changes_summary', 'id',
+]
+DATA_COLUMNS = ['data_before', 'data_after']
+
+
+def build_query(args):
+    select = """
+        SELECT
+            v.created_at, v.action, v.module, v.entity_type, v.entity_reference, v.description,
+            COALESCE(v.profile_name, v.user_name) AS user_name,
+            COALESCE(v.profile_email, v.user_email) AS user_email,
+            COALESCE(v.profile_role, v.user_role) AS user_role,
+            t.readable_id AS ticket_code, b.internal_batch_id AS batch_code, a.serial_number,
+            v.ticket_id, v.batch_id, v.asset_id, v.changes_summary, v.id
+    """
+    if args.with_data:
+        select += ", v.data_before, v.data_after"
+
+    where = []
+    params = {}
+    if args.ticket:
+        where.append("v.ticket_id IN (SELECT id FROM operations_tickets "
+                     "WHERE id::text = %(ticket)s OR readable_id ILIKE %(ticket)s)")
+        params['ticket'] = args.ticket
+    if args.batch:
+        where.append("v.batch_id IN (SELECT id FROM batches "
+                     "WHERE id::text = %(batch)s OR internal_batch_id ILIKE %(batch)s)")
+        params['batch'] = args.batch
+    if args.serial:
+        where.append("(v.asset_id IN (SELECT id FROM assets WHERE serial_number = %(serial)s "
+                     "OR internal_tag = %(serial)s) OR v.entity_reference = %(serial)s)")
+        params['serial'] = args.serial
+    if args.desde:
+        where.append("v.created_at >= %(desde)s")
+        params['desde'] = args.desde
+    if args.hasta:
+        where.append("v.created_at <= %(hasta)s")
+        params['hasta'] = args.hasta
+    if args.modulo:
+        where.append("v.module::text = %(modulo)s")
+        params['modulo'] = args.modulo
+    if args.accion:
+        where.append("v.action::text = %(accion)s")
+        params['accion'] = args.accion
+
+    query = select + """
+        FROM v_auditoria_detallada v
+        LEFT JOIN operations_tickets t ON t.id = v.ticket_id
+        LEFT JOIN batches b ON b.id = v.batch_id
+        LEFT JOIN assets a ON a.id = v.asset_id
+    """
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    query += " ORDER BY v.created_at, v.id"
+    return query, params
+
+
+def plain(value):
+    """Valor listo para CSV/XLSX: JSON como texto, fechas en ISO."""
+    if value is None:
+        return None
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value if isinstance(value, (int, float, str)) else str(value)
+
+
+def json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+class CsvWriter:
+    def __init__(self, stream, columns):
+        self.writer = csv.writer(stream)
+        self.writer.writerow(columns)
+
+    def write(self, row):
+        self.writer.writerow(['' if v is None else plain(v) for v in row])
+
+    def close(self):
+        pass
+
+
+class JsonlWriter:
+    def __init__(self, stream, columns):
+        self.stream = stream
+        self.columns = columns
+
+    def write(self, row):
+        self.stream.write(json.dumps(dict(zip(self.columns, row)), ensure_ascii=False, default=json_default))
+        self.stream.write('\n')
+
+    def close(self):
+        pass
+
+
+class XlsxWriter:
+    """openpyxl en modo write_only: las filas se vuelcan al disco al escribirse."""
+
+    def __init__(self, path, columns):
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            print("❌ Error: openpyxl no está instalado")
+            print("Instala con: pip install openpyxl")
+            sys.exit(1)
+        self.path = path
+        self.columns = columns
+        self.workbook = Workbook(write_only=True)
+        self.sheet = None
+        self.rows_in_sheet = 0
+        self.sheets = 0
+        self._new_sheet()
+
+    def _new_sheet(self):
+        self.sheets += 1
+        self.sheet = self.workbook.create_sheet(f'Auditoria {self.sheets}' if self.sheets > 1 else 'Auditoria')
+        self.sheet.append(self.columns)
+        self.rows_in_sheet = 0
+
+    def write(self, row):
+        if self.rows_in_sheet >= XLSX_MAX_ROWS:
+            self._new_sheet()
+        self.sheet.append([plain(v) for v in row])
+        self.rows_in_sheet += 1
+
+    def close(self):
+        self.workbook.save(self.path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Exportación de auditoría en streaming')
+    parser.add_argument('--format', choices=('csv', 'jsonl', 'xlsx'), default='csv')
+    parser.add_argument('-o', '--output', help='Archivo de salida (por defecto stdout; obligatorio para xlsx)')
+    parser.add_argument('--ticket', help='readable_id o uuid del ticket')
+    parser.add_argument('--batch', help='internal_batch_id o uuid del lote')
+    parser.add_argument('--serial', help='Serial, etiqueta interna o entity_reference')
+    parser.add_argument('--desde', help='Fecha/hora inicial (ISO)')
+    parser.add_argument('--hasta', help='Fecha/hora final (ISO)')
+    parser.add_argument('--modulo', help='Filtrar por módulo')
+    parser.add_argument('--accion', help='Filtrar por acción')
+    parser.add_argument('--with-data', action='store_true', help='Incluir data_before/data_after')
+    parser.add_argument('--itersize', type=int, default=ITERSIZE, help='Filas por viaje al servidor')
+    args = parser.parse_args()
+
+    if args.format == 'xlsx' and not args.output:
+        parser.error('--format xlsx requiere --output')
+
+    columns = COLUMNS + (DATA_COLUMNS if args.with_data else [])
+    query, params = build_query(args)
+
+    conn = connect()
+    # Los cursores con nombre viven dentro de una transacción; solo lectura
+    conn.set_session(readonly=True)
+    cursor = conn.cursor(name='audit_export')
+    cursor.itersize = args.itersize
+
+    stream = None
+    if args.format == 'xlsx':
+        writer = XlsxWriter(args.output, columns)
+    else:
+        stream = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+        writer = (CsvWriter if args.format == 'csv' else JsonlWriter)(stream, columns)
+
+    log = sys.stderr
+    start = time.perf_counter()
+    count = 0
+    try:
+        cursor.execute(query, params)
+        for row in cursor:
+            writer.write(row)
+            count += 1
+            if count % PROGRESS_EVERY == 0:
+                rate = count / (time.perf_counter() - start)
+                print(f"   {count:,} filas ({rate:,.0f}/s)", file=log)
+        writer.close()
+    finally:
+        cursor.close()
+        conn.rollback()
+        conn.close()
+        if stream and stream is not sys.stdout:
+            stream.close()
+
+    elapsed = time.perf_counter() - start
+    target = args.output or 'stdout'
+    print(f"✅ {count:,} registros exportados a {target} en {elapsed:.1f}s", file=log)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Hoja de etiquetas por lotes (cajas y activos) con códigos de barras vectoriales.
+
+En recepción las etiquetas se imprimen una por una y cada código de barras es
+una llamada a /api/utils/generate-barcode (PNG rasterizado). Este script toma
+un ticket (opcionalmente un rango de cajas), genera todos los códigos Code128
+como SVG vectorial (box_reception_code por caja; internal_tag y serial por
+activo) y los compone en una sola hoja HTML o PDF lista para imprimir.
+
+Los SVG se guardan en caché por contenido (hash de valor + opciones), en
+memoria y en disco, así que reimprimir un ticket no vuelve a generar nada.
+
+Uso:
+    python generate_label_sheet.py TK-2026-00006
+    python generate_label_sheet.py TK-2026-00006 --boxes 3-10 --format pdf
+    python generate_label_sheet.py TK-2026-00006 --only assets --columns 2
+"""
+
+import argparse
+import hashlib
+import html
+import io
+import json
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+
+from document_renderer import create_supabase_client
+
+DEFAULT_CACHE_DIR = '.barcode_cache'
+IN_CHUNK = 200
+PAGE_SIZE = 1000
+
+BARCODE_OPTIONS = {
+    'module_width': 0.25,
+    'module_height': 9.0,
+    'quiet_zone': 2.0,
+    'font_size': 7,
+    'text_distance': 3.0,
+}
+
+SHEET_CSS = """
+@page { size: letter; margin: 0.4in; }
+body { margin: 0; font-family: Arial, sans-serif; }
+.sheet { display: grid; grid-template-columns: repeat(%(columns)d, 1fr); gap: 0.12in; }
+.label { border: 1px dashed #999; padding: 0.08in; text-align: center; page-break-inside: avoid; }
+.label .title { font-size: 9pt; font-weight: bold; }
+.label .meta { font-size: 7pt; color: #444; }
+"""
+
+
+class BarcodeCache:
+    """Caché de SVG Code128 por contenido: memoria primero, luego disco."""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, options=None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.options = dict(BARCODE_OPTIONS, **(options or {}))
+        self._memory = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, value):
+        payload = json.dumps({'code': 'code128', 'value': value, 'options': self.options}, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, value):
+        key = self._key(value)
+        svg = self._memory.get(key)
+        if svg is not None:
+            self.hits += 1
+            return svg
+
+        path = self.directory / f'{key}.svg'
+        if path.exists():
+            self.hits += 1
+            svg = path.read_text(encoding='utf-8')
+        else:
+            self.misses += 1
+            svg = render_code128_svg(value, self.options)
+            path.write_text(svg, encoding='utf-8')
+        self._memory[key] = svg
+        return svg
+
+
+def render_code128_svg(value, options):
+    import barcode
+    from barcode.writer import SVGWriter
+
+    buffer = io.BytesIO()
+    barcode.get('code128', value, writer=SVGWriter()).write(buffer, options)
+    svg = buffer.getvalue().decode('utf-8')
+    # Se incrusta inline: quitar la declaración XML y el DOCTYPE
+    return re.sub(r'^\s*<\?xml[^>]*>\s*(<!DOCTYPE[^>]*>\s*)?', '', svg)
+
+
+def parse_box_range(value):
+    if not value:
+        return None
+    start, _, end = value.partition('-')
+    start = int(start)
+    end = int(end) if end else start
+    if end < start:
+        raise argparse.ArgumentTypeError(f'Rango de cajas inválido: {value}')
+    return start, end
+
+
+def load_label_data(supabase, readable_id, box_range=None):
+    ticket_res = supabase.table('operations_tickets').select('id, readable_id').eq(
+        'readable_id', readable_id
+    ).limit(1).execute()
+    if not ticket_res.data:
+        return None, [], {}
+    ticket = ticket_res.data[0]
+
+    items = []
+    offset = 0
+    while True:
+        query = supabase.table('ticket_items').select(
+            'box_number, box_reception_code, collected_serial, asset_id, brand_full, brand, model_full, model'
+        ).eq('ticket_id', ticket['id'])
+        if box_range:
+            query = query.gte('box_number', box_range[0]).lte('box_number', box_range[1])
+        page = query.order('box_number').order('id').range(offset, offset + PAGE_SIZE - 1).execute().data or []
+        items.extend(page)
+        if len(page) < PAGE_SIZE:
+            break
+        offset += PAGE_SIZE
+
+    asset_ids = sorted({i['asset_id'] for i in items if i.get('asset_id')})
+    assets = {}
+    for offset in range(0, len(asset_ids), IN_CHUNK):
+        chunk = asset_ids[offset:offset + IN_CHUNK]
+        res = supabase.table('assets').select('id, internal_tag, serial_number').in_('id', chunk).execute()
+        assets.update({row['id']: row for row in res.data or []})
+
+    return ticket, items, assets
+
+
+def build_labels(ticket, items, assets, only=None):
+    """Devuelve la lista de etiquetas: (título, código, detalle)."""
+    labels = []
+    if only in (None, 'boxes'):
+        counts = Counter()
+        codes = {}
+        for item in items:
+            number = item.get('box_number')
+            if not number:
+                continue
+            counts[number] += 1
+            if item.get('box_reception_code'):
+                codes.setdefault(number, item['box_reception_code'].strip())
+        for number, count in counts.items():
+            if number in codes:
+                labels.append((f"{ticket['readable_id']} · Caja #{number}", codes[number], f'{count} equipos'))
+
+    if only in (None, 'assets'):
+        for item in items:
+            asset = assets.get(item.get('asset_id'))
+            serial = (asset or {}).get('serial_number') or item.get('collected_serial')
+            if not asset and not serial:
+                continue
+            detail = f"{item.get('brand_full') or item.get('brand') or ''} {item.get('model_full') or item.get('model') or ''}".strip()
+            if asset and asset.get('internal_tag'):
+                labels.append((f"ID: {asset['internal_tag']}", asset['internal_tag'], detail))
+            if serial:
+                labels.append((f"S/N: {serial}", serial, detail))
+    return labels
+
+
+def render_sheet(labels, cache, columns=3):
+    cells = []
+    for title, code, detail in labels:
+        cells.append(
+            '<div class="label">'
+            f'<div class="title">{html.escape(title)}</div>'
+            f'{cache.get(code)}'
+            f'<div class="meta">{html.escape(detail or "")}</div>'
+            '</div>'
+        )
+    return (
+        '<!DOCTYPE html><html><head><meta charset="UTF-8">'
+        f'<style>{SHEET_CSS % {"columns": columns}}</style></head>'
+        f'<body><div class="sheet">{"".join(cells)}</div></body></html>'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Genera una hoja de etiquetas con códigos de barras')
+    parser.add_argument('ticket', help='readable_id del ticket (ej. TK-2026-00006)')
+    parser.add_argument('--boxes', type=parse_box_range, help='Rango de cajas, ej. 3-10')
+    parser.add_argument('--only', choices=('boxes', 'assets'), help='Solo etiquetas de cajas o de activos')
+    parser.add_argument('--columns', type=int, default=3, help='Etiquetas por fila')
+    parser.add_argument('--format', choices=('html', 'pdf'), default='html')
+    parser.add_argument('--out', help='Archivo de salida (por defecto Etiquetas-<ticket>.<formato>)')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    args = parser.parse_args()
+
+    try:
+        import barcode  # noqa: F401
+    except ImportError:
+        print("❌ Error: python-barcode no está instalado")
+        print("Instala con: pip install python-barcode")
+        sys.exit(1)
+
+    supabase = create_supabase_client()
+    print(f"🔍 Cargando ticket {args.ticket}...")
+    ticket, items, assets = load_label_data(supabase, args.ticket, args.boxes)
+    if not ticket:
+        print(f"❌ Ticket {args.ticket} no encontrado")
+        sys.exit(1)
+
+    labels = build_labels(ticket, items, assets, args.only)
+    if not labels:
+        print("⚠️  No hay etiquetas para generar (¿cajas sin código de recepción o sin seriales?)")
+        sys.exit(0)
+
+    cache = BarcodeCache(args.cache_dir)
+    document = render_sheet(labels, cache, args.columns)
+    out = args.out or f"Etiquetas-{ticket['readable_id']}.{args.format}"
+
+    if args.format == 'pdf':
+        try:
+            from weasyprint import HTML
+        except ImportError:
+            print("❌ Error: weasyprint no está instalado")
+            print("Instala con: pip install weasyprint")
+            sys.exit(1)
+        HTML(string=document).write_pdf(out)
+    else:
+        with open(out, 'w', encoding='utf-8') as f:
+            f.write(document)
+
+    print(f"✅ {len(labels)} etiquetas generadas en {out}")
+    print(f"   Códigos de barras: {cache.misses} nuevos, {cache.hits} desde caché")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Generación por lotes de guías y manifiestos en PDF, sin navegador.
+
+Reemplaza el flujo del navegador (div oculto + html2canvas a escala 2 + PNG
+dentro de jsPDF) por HTML de document_templates renderizado con
+document_renderer y convertido a PDF vectorial con WeasyPrint. Los PDF
+resultantes tienen texto seleccionable/buscable y pesan una fracción del PNG.
+Cada caja del ticket es un trabajo independiente y se procesa en un pool de
+procesos; los archivos se escriben en una carpeta local (sustituto del bucket)
+o directamente en un bucket de Supabase Storage.
+
+Uso:
+    python generate_manifest_pdfs.py TK-2026-00006
+    python generate_manifest_pdfs.py TK-2026-00006 --boxes 1 2 3 --workers 8
+    python generate_manifest_pdfs.py TK-2026-00006 --bucket manifiestos
+"""
+
+import argparse
+import html
+import os
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from document_renderer import CompiledTemplate, Markup, create_supabase_client, fetch_templates
+from storage_backends import LocalStorage, SupabaseStorage
+
+DEFAULT_TEMPLATE_SLUG = 'guias-y-manifiestos'
+DEFAULT_OUT_DIR = 'manifiestos'
+PAGE_SIZE = 1000
+
+MONTHS_ES = (
+    'enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio',
+    'julio', 'agosto', 'septiembre', 'octubre', 'noviembre', 'diciembre',
+)
+
+# Estado por proceso del pool: plantilla compilada y configuración de fuentes
+_worker = {}
+
+
+def format_date_es(value):
+    return f"{value.day:02d} de {MONTHS_ES[value.month - 1]} de {value.year}"
+
+
+def html_lines(lines):
+    return Markup('<br>'.join(html.escape(line, quote=False) for line in lines))
+
+
+def load_ticket_data(supabase, readable_id):
+    ticket_res = supabase.table('operations_tickets').select(
+        'id, readable_id, client_id, pickup_address, collector_name, collector_phone, vehicle_model, vehicle_plate, notes'
+    ).eq('readable_id', readable_id).limit(1).execute()
+    if not ticket_res.data:
+        return None, None, None, []
+    ticket = ticket_res.data[0]
+
+    client = {}
+    if ticket.get('client_id'):
+        client_res = supabase.table('crm_entities').select(
+            'commercial_name, tax_id_nit, address, phone'
+        ).eq('id', ticket['client_id']).limit(1).execute()
+        client = client_res.data[0] if client_res.data else {}
+
+    company_res = supabase.table('company_settings').select('name, nit, address, phone').limit(1).execute()
+    company = company_res.data[0] if company_res.data else {}
+
+    items = []
+    offset = 0
+    while True:
+        page = supabase.table('ticket_items').select(
+            'box_number, box_seal, brand, brand_full, model, model_full, product_type, collected_serial'
+        ).eq('ticket_id', ticket['id']).order('box_number').order('id').range(
+            offset, offset + PAGE_SIZE - 1
+        ).execute().data or []
+        items.extend(page)
+        if len(page) < PAGE_SIZE:
+            break
+        offset += PAGE_SIZE
+
+    return ticket, client, company, items
+
+
+def build_box_jobs(ticket, client, company, items, boxes=None, notes=None):
+    """Arma los valores de variables de cada caja (mismos nombres que PDFTemplateModal)."""
+    by_box = OrderedDict()
+    for item in items:
+        number = item.get('box_number') or 0
+        if number <= 0 or (boxes and number not in boxes):
+            continue
+        by_box.setdefault(number, []).append(item)
+
+    issued = datetime.now()
+    order_date = format_date_es(issued)
+    stamp = issued.strftime('%H%M%S')
+    base = {
+        'Ticket_ID': ticket['readable_id'],
+        'Order_Date': order_date,
+        'Client_Name': client.get('commercial_name'),
+        'Client_Location': ticket.get('pickup_address'),
+        'Collector_User': ticket.get('collector_name'),
+        'Collector_Phone': ticket.get('collector_phone'),
+        'Vehicle_Model': ticket.get('vehicle_model'),
+        'Vehicle_Plate': ticket.get('vehicle_plate'),
+        'Total_Boxes': str(len(by_box)),
+        'Notes': notes or ticket.get('notes') or 'Sin observaciones',
+        'Company Name': company.get('name'),
+        'Company NIT': company.get('nit'),
+        'Company Address': company.get('address'),
+        'Company Phone': company.get('phone'),
+    }
+
+    jobs = []
+    for number, box_items in by_box.items():
+        seal = next((i['box_seal'] for i in box_items if i.get('box_seal')), 'SIN PRECINTO')
+        first = box_items[0]
+        serials = [i['collected_serial'] for i in box_items if i.get('collected_serial')]
+        equipment = [
+            f"{i.get('brand_full') or i.get('brand') or ''} {i.get('model_full') or i.get('model') or ''}"
+            f" (Serie: {i.get('collected_serial') or 'N/A'})".strip()
+            for i in box_items
+        ]
+        values = dict(base)
+        values.update({
+            'Manifest_Number': f'{number}-{stamp}',
+            'Box_ID': f'#{number}',
+            'Box_List': f'Caja #{number} - Precinto: {seal}',
+            'Box_Seal': seal,
+            'Box_Seals': seal,
+            'Marchamo': seal,
+            'Precinto': seal,
+            'Equipment_Brand': first.get('brand_full') or first.get('brand'),
+            'Equipment_Model': first.get('model_full') or first.get('model'),
+            'Equipment_Type': first.get('product_type'),
+            'Asset_Series': ', '.join(serials),
+            'Equipment_List': html_lines(equipment),
+            'Total_Items': str(len(box_items)),
+        })
+        filename = f"{ticket['readable_id']}/Manifiesto-{number}-{issued.strftime('%Y-%m-%d')}.pdf"
+        jobs.append((filename, values))
+    return jobs
+
+
+def _init_worker(content_html):
+    from weasyprint.text.fonts import FontConfiguration
+
+    _worker['template'] = CompiledTemplate(content_html)
+    _worker['fonts'] = FontConfiguration()
+
+
+def _render_job(job):
+    from weasyprint import HTML
+
+    filename, values = job
+    document = _worker['template'].render(values)
+    pdf = HTML(string=document).write_pdf(font_config=_worker['fonts'])
+    return filename, pdf
+
+
+def render_pdfs(content_html, jobs, storage, workers=None):
+    written = []
+    total_bytes = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(content_html,)) as pool:
+        chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+        for filename, pdf in pool.map(_render_job, jobs, chunksize=chunksize):
+            storage.put(filename, pdf, 'application/pdf')
+            written.append(filename)
+            total_bytes += len(pdf)
+    return written, total_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Genera los PDF de guías/manifiestos de un ticket')
+    parser.add_argument('ticket', help='readable_id del ticket (ej. TK-2026-00006)')
+    parser.add_argument('--boxes', type=int, nargs='*', help='Solo estas cajas')
+    parser.add_argument('--template', default=DEFAULT_TEMPLATE_SLUG, help='Slug de document_templates')
+    parser.add_argument('--notes', help='Observaciones para todos los manifiestos')
+    parser.add_argument('--workers', type=int, help='Procesos del pool (por defecto: CPUs)')
+    parser.add_argument('--out-dir', default=DEFAULT_OUT_DIR, help='Carpeta local de salida')
+    parser.add_argument('--bucket', help='Subir a este bucket de Supabase en lugar de la carpeta local')
+    args = parser.parse_args()
+
+    try:
+        import weasyprint  # noqa: F401
+    except ImportError:
+        print("❌ Error: weasyprint no está instalado")
+        print("Instala con: pip install weasyprint")
+        sys.exit(1)
+
+    supabase = create_supabase_client()
+
+    template = fetch_templates(supabase, [args.template]).get(args.template)
+    if not template:
+        print(f"❌ Plantilla {args.template} no encontrada o inactiva")
+        sys.exit(1)
+
+    print(f"🔍 Cargando ticket {args.ticket}...")
+    ticket, client, company, items = load_ticket_data(supabase, args.ticket)
+    if not ticket:
+        print(f"❌ Ticket {args.ticket} no encontrado")
+        sys.exit(1)
+
+    jobs = build_box_jobs(ticket, client, company, items, set(args.boxes or []), args.notes)
+    if not jobs:
+        print("⚠️  No hay cajas con items para generar")
+        sys.exit(0)
+
+    storage = SupabaseStorage(supabase, args.bucket) if args.bucket else LocalStorage(args.out_dir)
+
+    print(f"📄 Generando {len(jobs)} manifiestos con la plantilla '{template['name']}'...")
+    start = time.perf_counter()
+    written, total_bytes = render_pdfs(template['content_html'], jobs, storage, args.workers)
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ {len(written)} PDF generados en {elapsed:.2f}s")
+    print(f"   Tamaño promedio: {total_bytes / len(written) / 1024:.1f} KB")
+    print(f"   Destino: {storage.url(written[0]).rsplit('/', 1)[0]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Carga masiva de reportes de borrado (Blancco, KillDisk, WipeDrive...) a
+asset_wipe_evidence.
+
+Vigila una carpeta donde las estaciones de borrado dejan sus certificados.
+Cada archivo se lee en streaming (hash SHA-256 por bloques; los XML con
+iterparse) para obtener serial y resultado, se asocia a su activo con un
+índice de seriales en memoria, se sube al bucket con concurrencia acotada
+(por contenido, con blob_store: un archivo idéntico se guarda una sola vez) y
+las filas de evidencia se insertan por lotes con insert_wipe_evidence_batch.
+Los archivos ya cargados (mismo hash para el mismo activo) se omiten. Los
+reportes que indican borrado fallido no se cargan como evidencia: se mueven
+a la carpeta fallidos/ para que el equipo vuelva a borrado.
+
+Uso:
+    python ingest_wipe_reports.py /ruta/reportes
+    python ingest_wipe_reports.py /ruta/reportes --watch 30 --workers 8
+    python ingest_wipe_reports.py /ruta/reportes --local-storage evidencias --dry-run
+"""
+
+import argparse
+import hashlib
+import mimetypes
+import re
+import shutil
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from blob_store import BlobStore
+from document_renderer import create_supabase_client
+from storage_backends import LocalStorage, SupabaseStorage
+
+BUCKET = 'wipe-evidence'
+PAGE_SIZE = 1000
+HASH_CHUNK = 1024 * 1024
+INSERT_BATCH = 200
+IN_CHUNK = 200
+
+PROCESSED_DIR = 'procesados'
+FAILED_DIR = 'fallidos'
+
+EXTENSION_TYPES = {
+    '.xml': 'xml',
+    '.pdf': 'pdf',
+    '.jpg': 'photo',
+    '.jpeg': 'photo',
+    '.png': 'photo',
+    '.webp': 'photo',
+}
+
+# Límites iguales a /api/wipe/upload-evidence
+MAX_SIZE = {
+    'photo': 6 * 1024 * 1024,
+    'xml': 2 * 1024 * 1024,
+    'pdf': 10 * 1024 * 1024,
+}
+
+SERIAL_KEYS = {'serial', 'serialnumber', 'serial_number', 'system_serial', 'device_serial', 'sn'}
+RESULT_KEYS = {'result', 'state', 'status', 'erasure_result', 'erasure_status'}
+SUCCESS_WORDS = ('success', 'successful', 'passed', 'erased', 'completed', 'exitoso', 'completado')
+FAILURE_WORDS = ('fail', 'error', 'aborted', 'fallido', 'incomplete')
+
+
+def normalize_serial(value):
+    return re.sub(r'\s+', '', value or '').upper()
+
+
+def _key(name):
+    return re.sub(r'[^a-z_]', '', name.rsplit('}', 1)[-1].lower())
+
+
+def parse_xml_report(path, max_candidates=20):
+    """Extrae seriales candidatos y resultado de un reporte XML sin cargarlo completo."""
+    serials = []
+    result = None
+    try:
+        for _, elem in ET.iterparse(path, events=('end',)):
+            keys = {_key(elem.tag), _key(elem.get('name', ''))}
+            text = (elem.text or '').strip()
+            if text:
+                if keys & SERIAL_KEYS and len(serials) < max_candidates:
+                    serials.append(text)
+                elif result is None and keys & RESULT_KEYS:
+                    result = classify_result(text)
+            elem.clear()
+    except ET.ParseError:
+        pass
+    return serials, result
+
+
+def classify_result(text):
+    lowered = text.lower()
+    if any(word in lowered for word in FAILURE_WORDS):
+        return 'failed'
+    if any(word in lowered for word in SUCCESS_WORDS):
+        return 'success'
+    return None
+
+
+def filename_serials(path):
+    """Las estaciones nombran fotos/PDF con el serial: 'SN123_foto1.jpg', 'SN123-cert.pdf'."""
+    stem = Path(path).stem
+    tokens = [t for t in re.split(r'[\s_\-.]+', stem) if len(t) >= 4]
+    return [stem] + tokens
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def load_serial_index(supabase):
+    """serial normalizado -> asset_id para todos los activos con serial."""
+    index = {}
+    offset = 0
+    while True:
+        res = supabase.table('assets').select('id, serial_number').not_.is_(
+            'serial_number', 'null'
+        ).order('id').range(offset, offset + PAGE_SIZE - 1).execute()
+        rows = res.data or []
+        for row in rows:
+            index.setdefault(normalize_serial(row['serial_number']), row['id'])
+        if len(rows) < PAGE_SIZE:
+            return index
+        offset += PAGE_SIZE
+
+
+def existing_hashes(supabase, hashes):
+    found = set()
+    hashes = sorted(hashes)
+    for offset in range(0, len(hashes), IN_CHUNK):
+        res = supabase.table('asset_wipe_evidence').select('asset_id, content_hash').in_(
+            'content_hash', hashes[offset:offset + IN_CHUNK]
+        ).execute()
+        found.update((row['asset_id'], row['content_hash']) for row in res.data or [])
+    return found
+
+
+def scan_file(path, serial_index):
+    evidence_type = EXTENSION_TYPES.get(path.suffix.lower())
+    if evidence_type is None:
+        return None
+    content_hash, size = hash_file(path)
+    record = {
+        'path': path,
+        'type': evidence_type,
+        'file_name': path.name,
+        'file_size': size,
+        'content_hash': content_hash,
+        'content_type': mimetypes.guess_type(path.name)[0] or 'application/octet-stream',
+        'result': None,
+        'asset_id': None,
+        'serial': None,
+    }
+    if size > MAX_SIZE[evidence_type]:
+        record['error'] = f'excede {MAX_SIZE[evidence_type] // (1024 * 1024)} MB'
+        return record
+
+    candidates = []
+    if evidence_type == 'xml':
+        candidates, record['result'] = parse_xml_report(path)
+    candidates += filename_serials(path)
+    for candidate in candidates:
+        asset_id = serial_index.get(normalize_serial(candidate))
+        if asset_id:
+            record['asset_id'] = asset_id
+            record['serial'] = candidate
+            break
+    return record
+
+
+def upload_record(store, record):
+    _, _, record['file_url'] = store.put_file(record['path'], record['content_type'])
+    return record
+
+
+def move_to(path, folder):
+    target_dir = path.parent / folder
+    target_dir.mkdir(exist_ok=True)
+    shutil.move(str(path), str(target_dir / path.name))
+
+
+def ingest(supabase, store, directory, serial_index, workers, uploaded_by=None, dry_run=False):
+    files = sorted(p for p in directory.iterdir() if p.is_file())
+    if not files:
+        return {'files': 0}
+
+    records = [r for r in (scan_file(p, serial_index) for p in files) if r is not None]
+    rejected = [r for r in records if r.get('error')]
+    unmatched = [r for r in records if not r.get('error') and not r['asset_id']]
+    matched = [r for r in records if not r.get('error') and r['asset_id']]
+    failed = [r for r in matched if r['result'] == 'failed']
+    matched = [r for r in matched if r['result'] != 'failed']
+
+    already = existing_hashes(supabase, {r['content_hash'] for r in matched})
+    seen = set()
+    pending = []
+    duplicates = []
+    for record in matched:
+        key = (record['asset_id'], record['content_hash'])
+        if key in already or key in seen:
+            duplicates.append(record)
+        else:
+            seen.add(key)
+            pending.append(record)
+
+    summary = {
+        'files': len(records),
+        'matched': len(matched),
+        'unmatched': len(unmatched),
+        'rejected': len(rejected),
+        'duplicates': len(duplicates),
+        'failed_results': len(failed),
+        'inserted': 0,
+    }
+    for record in rejected:
+        print(f"  ⚠️  {record['file_name']}: {record['error']}")
+    for record in unmatched:
+        print(f"  ❓ {record['file_name']}: serial sin activo")
+    for record in failed:
+        print(f"  ❌ {record['file_name']}: borrado fallido ({record['serial']})")
+    if dry_run:
+        return summary
+
+    for record in failed:
+        move_to(record['path'], FAILED_DIR)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        uploaded = list(pool.map(lambda r: upload_record(store, r), pending))
+
+    fields = ('asset_id', 'type', 'file_name', 'file_url', 'content_type', 'file_size', 'content_hash')
+    for offset in range(0, len(uploaded), INSERT_BATCH):
+        batch = [{k: r[k] for k in fields} for r in uploaded[offset:offset + INSERT_BATCH]]
+        res = supabase.rpc('insert_wipe_evidence_batch', {
+            'p_rows': batch,
+            'p_uploaded_by': uploaded_by,
+        }).execute()
+        if res.data:
+            summary['inserted'] += res.data[0]['inserted']
+
+    # Los archivos sin coincidencia se quedan en la carpeta para reintentar
+    # cuando el activo se reciba.
+    for record in uploaded + duplicates:
+        move_to(record['path'], PROCESSED_DIR)
+    return summary
+
+
+def print_summary(summary, elapsed):
+    if not summary.get('files'):
+        return
+    print(f"📦 {summary['files']} archivos en {elapsed:.1f}s")
+    print(f"   Asociados a activo: {summary['matched']} | Sin coincidencia: {summary['unmatched']} | "
+          f"Rechazados: {summary['rejected']}")
+    print(f"   Duplicados omitidos: {summary['duplicates']} | Insertados: {summary['inserted']}")
+    if summary['failed_results']:
+        print(f"   ⚠️  {summary['failed_results']} reportes indican borrado fallido (movidos a {FAILED_DIR}/)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Carga masiva de evidencias de borrado')
+    parser.add_argument('directory', help='Carpeta donde las estaciones dejan los reportes')
+    parser.add_argument('--watch', type=int, metavar='SEGUNDOS', help='Revisar la carpeta cada N segundos')
+    parser.add_argument('--workers', type=int, default=4, help='Subidas simultáneas')
+    parser.add_argument('--uploaded-by', help='UUID del usuario responsable de la carga')
+    parser.add_argument('--local-storage', help='Guardar en esta carpeta en lugar del bucket wipe-evidence')
+    parser.add_argument('--dry-run', action='store_true', help='Solo analizar, sin subir ni insertar')
+    args = parser.parse_args()
+
+    directory = Path(args.directory)
+    if not directory.is_dir():
+        print(f"❌ {directory} no es una carpeta")
+        sys.exit(1)
+
+    supabase = create_supabase_client()
+    storage = LocalStorage(args.local_storage) if args.local_storage else SupabaseStorage(supabase, BUCKET)
+    store = BlobStore(supabase, storage, BUCKET)
+
+    print("🔍 Cargando índice de seriales...")
+    serial_index = load_serial_index(supabase)
+    print(f"   {len(serial_index)} seriales indexados")
+
+    while True:
+        start = time.perf_counter()
+        summary = ingest(supabase, store, directory, serial_index, args.workers,
+                         args.uploaded_by, args.dry_run)
+        print_summary(summary, time.perf_counter() - start)
+        if not args.watch:
+            break
+        time.sleep(args.watch)
+        if summary.get('unmatched'):
+            serial_index = load_serial_index(supabase)
+
+
+if __name__ == '__main__':
+    main()
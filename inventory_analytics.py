@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Analítica de inventario: clasificación ABC, antigüedad y rotación por modelo.
+
+Lee de assets solo las columnas necesarias (paginando por id), calcula con
+NumPy por marca/modelo/tipo los conteos, el valor, la clase ABC, percentiles
+y cubetas de antigüedad, el costo mediano y la rotación de los últimos 90
+días, y guarda el resultado en inventory_model_analytics e
+inventory_abc_snapshot (migración 20260309_inventory_analytics_snapshot.sql).
+
+Los estados siguen a inventory_analytics_view (sql/009): en stock son
+received, wiped, wiping, diagnosing y ready_for_sale; disponibles son
+received, wiped y ready_for_sale. La antigüedad y el valor se calculan sobre
+los disponibles, igual que rotation_days y total_cost_value en la vista.
+
+Por defecto la corrida es incremental: solo recalcula los modelos con
+activos modificados desde la última corrida (assets.updated_at) y los que
+no se recalculan desde hace más de --refresh-hours (la antigüedad avanza
+aunque nada cambie). La clase ABC y el resumen se recalculan siempre sobre
+la tabla de modelos, que es pequeña.
+
+Uso:
+    python inventory_analytics.py               # incremental
+    python inventory_analytics.py --full        # recalcular todo
+    python inventory_analytics.py --full --dry-run
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from document_renderer import create_supabase_client
+
+try:
+    import numpy as np
+except ImportError:
+    print("❌ Error: numpy no está instalado")
+    print("Instala con: pip install numpy")
+    sys.exit(1)
+
+PAGE_SIZE = 1000
+IN_CHUNK = 100
+UPSERT_CHUNK = 500
+DAY = 86400.0
+
+AVAILABLE_STATUSES = ('received', 'wiped', 'ready_for_sale')
+IN_PROCESS_STATUSES = ('diagnosing', 'wiping')
+SOLD_STATUS = 'sold'
+TURNOVER_WINDOW_DAYS = 90
+AGE_EDGES = (30, 60, 90, 180)
+AGE_COLUMNS = ('age_0_30', 'age_31_60', 'age_61_90', 'age_91_180', 'age_over_180')
+ABC_LIMITS = (80, 95)
+# Solapamiento con la marca de agua anterior para no perder filas de
+# transacciones que confirmaron tarde; recalcular un modelo dos veces es inocuo
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+ASSET_COLUMNS = 'id, manufacturer, model, asset_type, status, cost_amount, created_at, sold_at, updated_at'
+
+
+def parse_ts(value):
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def model_key(row):
+    return (
+        row.get('manufacturer') or 'Sin Marca',
+        row.get('model') or 'Sin Modelo',
+        row.get('asset_type') or 'Sin Tipo',
+    )
+
+
+# ---------------------------------------------------------------------------
+# Lectura
+# ---------------------------------------------------------------------------
+
+def fetch_assets(supabase, columns=ASSET_COLUMNS, since=None, brands=None):
+    """Activos paginando por id. since filtra por updated_at; brands por marca."""
+    def pages(configure):
+        last_id = None
+        while True:
+            query = configure(supabase.table('assets').select(columns))
+            if last_id:
+                query = query.gt('id', last_id)
+            page = query.order('id').limit(PAGE_SIZE).execute().data or []
+            yield from page
+            if len(page) < PAGE_SIZE:
+                return
+            last_id = page[-1]['id']
+
+    if brands is None:
+        if since is None:
+            return list(pages(lambda q: q))
+        return list(pages(lambda q: q.gt('updated_at', since.isoformat())))
+
+    rows = []
+    named = sorted(b for b in brands if b != 'Sin Marca')
+    for offset in range(0, len(named), IN_CHUNK):
+        chunk = named[offset:offset + IN_CHUNK]
+        rows.extend(pages(lambda q, chunk=chunk: q.in_('manufacturer', chunk)))
+    if 'Sin Marca' in brands:
+        rows.extend(pages(lambda q: q.is_('manufacturer', 'null')))
+    return rows
+
+
+def last_watermark(supabase):
+    res = supabase.table('inventory_analytics_runs').select('watermark').not_.is_(
+        'finished_at', 'null'
+    ).order('finished_at', desc=True).limit(1).execute()
+    if res.data and res.data[0].get('watermark'):
+        return parse_ts(res.data[0]['watermark'])
+    return None
+
+
+def stale_keys(supabase, older_than):
+    rows = []
+    offset = 0
+    while True:
+        page = supabase.table('inventory_model_analytics').select('brand, model, type').lt(
+            'computed_at', older_than.isoformat()
+        ).order('brand').order('model').order('type').range(offset, offset + PAGE_SIZE - 1).execute().data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            break
+        offset += PAGE_SIZE
+    return {(r['brand'], r['model'], r['type']) for r in rows}
+
+
+def load_model_rows(supabase):
+    rows = []
+    offset = 0
+    while True:
+        page = supabase.table('inventory_model_analytics').select(
+            'brand, model, type, available_count, total_quantity, total_cost_value, '
+            'age_avg_days, age_91_180, age_over_180'
+        ).order('brand').order('model').order('type').range(offset, offset + PAGE_SIZE - 1).execute().data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        offset += PAGE_SIZE
+
+
+# ---------------------------------------------------------------------------
+# Cálculo
+# ---------------------------------------------------------------------------
+
+def grouped_percentiles(groups, values, n_groups, percentiles):
+    """Percentiles (interpolación lineal) de values dentro de cada grupo.
+
+    Devuelve una matriz n_groups x len(percentiles); NaN en grupos vacíos.
+    """
+    result = np.full((n_groups, len(percentiles)), np.nan)
+    if values.size == 0:
+        return result
+    order = np.lexsort((values, groups))
+    sorted_values = values[order]
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    present = counts > 0
+    for column, pct in enumerate(percentiles):
+        position = starts[present] + (counts[present] - 1) * (pct / 100.0)
+        low = np.floor(position).astype(np.int64)
+        high = np.ceil(position).astype(np.int64)
+        weight = position - low
+        result[present, column] = sorted_values[low] * (1 - weight) + sorted_values[high] * weight
+    return result
+
+
+def compute_model_metrics(rows, now):
+    """Métricas por modelo a partir de las filas de assets."""
+    if not rows:
+        return {}
+
+    index = {}
+    groups = np.empty(len(rows), dtype=np.int64)
+    status = np.empty(len(rows), dtype='<U32')
+    cost = np.zeros(len(rows))
+    created = np.full(len(rows), np.nan)
+    sold = np.full(len(rows), np.nan)
+    for i, row in enumerate(rows):
+        groups[i] = index.setdefault(model_key(row), len(index))
+        status[i] = row.get('status') or ''
+        cost[i] = float(row.get('cost_amount') or 0)
+        created_at = parse_ts(row.get('created_at'))
+        if created_at:
+            created[i] = created_at.timestamp()
+        sold_at = parse_ts(row.get('sold_at'))
+        if sold_at:
+            sold[i] = sold_at.timestamp()
+
+    n = len(index)
+    now_ts = now.timestamp()
+    available = np.isin(status, AVAILABLE_STATUSES)
+    in_process = np.isin(status, IN_PROCESS_STATUSES)
+    sold_recently = (status == SOLD_STATUS) & (sold >= now_ts - TURNOVER_WINDOW_DAYS * DAY)
+
+    available_count = np.bincount(groups[available], minlength=n)
+    in_process_count = np.bincount(groups[in_process], minlength=n)
+    cost_value = np.bincount(groups[available], weights=cost[available], minlength=n)
+    units_out = np.bincount(groups[sold_recently], minlength=n)
+
+    dated = available & ~np.isnan(created)
+    age_groups = groups[dated]
+    ages = (now_ts - created[dated]) / DAY
+    age_count = np.bincount(age_groups, minlength=n)
+    age_sum = np.bincount(age_groups, weights=ages, minlength=n)
+    age_pct = grouped_percentiles(age_groups, ages, n, (50, 90, 99, 100))
+    buckets = np.digitize(ages, AGE_EDGES, right=True)
+    bucket_counts = np.bincount(age_groups * len(AGE_COLUMNS) + buckets,
+                                minlength=n * len(AGE_COLUMNS)).reshape(n, len(AGE_COLUMNS))
+    oldest = np.full(n, np.inf)
+    np.minimum.at(oldest, age_groups, created[dated])
+
+    cost_p50 = grouped_percentiles(groups[available], cost[available], n, (50,))[:, 0]
+
+    def number(value, digits=1):
+        return None if value is None or np.isnan(value) else round(float(value), digits)
+
+    metrics = {}
+    computed_at = now.isoformat()
+    for key, g in index.items():
+        total = int(available_count[g] + in_process_count[g])
+        if total == 0:
+            continue
+        avail = int(available_count[g])
+        out = int(units_out[g])
+        row = {
+            'brand': key[0],
+            'model': key[1],
+            'type': key[2],
+            'available_count': avail,
+            'in_process_count': int(in_process_count[g]),
+            'total_quantity': total,
+            'total_cost_value': round(float(cost_value[g]), 2),
+            'age_avg_days': number(age_sum[g] / age_count[g]) if age_count[g] else None,
+            'age_p50_days': number(age_pct[g, 0]),
+            'age_p90_days': number(age_pct[g, 1]),
+            'age_p99_days': number(age_pct[g, 2]),
+            'age_max_days': number(age_pct[g, 3]),
+            'cost_p50': number(cost_p50[g], 2),
+            'units_out_90d': out,
+            'turnover_90d': round(out / avail, 3) if avail else None,
+            'days_of_supply': round(avail / (out / TURNOVER_WINDOW_DAYS), 1) if out else None,
+            'oldest_entry_date': (
+                datetime.fromtimestamp(oldest[g], tz=timezone.utc).isoformat() if np.isfinite(oldest[g]) else None
+            ),
+            'computed_at': computed_at,
+        }
+        row.update({column: int(bucket_counts[g, i]) for i, column in enumerate(AGE_COLUMNS)})
+        metrics[key] = row
+    return metrics
+
+
+def classify_abc(model_rows):
+    """Clase ABC por valor acumulado, igual que inventory_analytics_view."""
+    if not model_rows:
+        return []
+    values = np.array([float(r['total_cost_value'] or 0) for r in model_rows])
+    order = np.argsort(-values, kind='stable')
+    total = values.sum()
+    cumulative = np.cumsum(values[order]) / total * 100 if total > 0 else np.full(len(values), 100.0)
+    classes = np.where(cumulative <= ABC_LIMITS[0], 'A', np.where(cumulative <= ABC_LIMITS[1], 'B', 'C'))
+
+    updates = []
+    for position, i in enumerate(order):
+        row = model_rows[i]
+        updates.append({
+            'brand': row['brand'],
+            'model': row['model'],
+            'type': row['type'],
+            'cumulative_pct': round(float(cumulative[position]), 2),
+            'abc_class': str(classes[position]),
+        })
+    return updates
+
+
+def abc_summary(model_rows, abc_rows, now):
+    classes = {(r['brand'], r['model'], r['type']): r['abc_class'] for r in abc_rows}
+    summary = {c: {'abc_class': c, 'model_count': 0, 'total_units': 0, 'total_value': 0.0,
+                   'age_weighted': 0.0, 'age_units': 0, 'units_over_90_days': 0}
+               for c in ('A', 'B', 'C')}
+    for row in model_rows:
+        entry = summary[classes[(row['brand'], row['model'], row['type'])]]
+        entry['model_count'] += 1
+        entry['total_units'] += int(row['total_quantity'] or 0)
+        entry['total_value'] += float(row['total_cost_value'] or 0)
+        entry['units_over_90_days'] += int(row['age_91_180'] or 0) + int(row['age_over_180'] or 0)
+        if row.get('age_avg_days') is not None:
+            entry['age_weighted'] += float(row['age_avg_days']) * int(row['available_count'] or 0)
+            entry['age_units'] += int(row['available_count'] or 0)
+
+    rows = []
+    for entry in summary.values():
+        age_units = entry.pop('age_units')
+        age_weighted = entry.pop('age_weighted')
+        entry['avg_rotation_days'] = round(age_weighted / age_units) if age_units else None
+        entry['total_value'] = round(entry['total_value'], 2)
+        entry['computed_at'] = now.isoformat()
+        rows.append(entry)
+    return rows
+
+
+# ---------------------------------------------------------------------------
+# Escritura
+# ---------------------------------------------------------------------------
+
+def upsert(supabase, table, rows, on_conflict):
+    for offset in range(0, len(rows), UPSERT_CHUNK):
+        supabase.table(table).upsert(rows[offset:offset + UPSERT_CHUNK], on_conflict=on_conflict).execute()
+
+
+def delete_models(supabase, keys):
+    for brand, model, asset_type in keys:
+        supabase.table('inventory_model_analytics').delete().eq('brand', brand).eq(
+            'model', model
+        ).eq('type', asset_type).execute()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Analítica ABC y antigüedad de inventario')
+    parser.add_argument('--full', action='store_true', help='Recalcular todos los modelos')
+    parser.add_argument('--refresh-hours', type=float, default=24,
+                        help='Recalcular modelos cuya instantánea tenga más de estas horas')
+    parser.add_argument('--dry-run', action='store_true', help='Calcular y mostrar sin escribir')
+    args = parser.parse_args()
+
+    supabase = create_supabase_client()
+    now = datetime.now(timezone.utc)
+    start = time.perf_counter()
+
+    watermark = None if args.full else last_watermark(supabase)
+    mode = 'incremental' if watermark else 'full'
+
+    if mode == 'full':
+        print("🔍 Corrida completa: leyendo activos...")
+        rows = fetch_assets(supabase)
+        affected = None
+        scanned = len(rows)
+        new_watermark = max((r['updated_at'] for r in rows if r.get('updated_at')), default=None)
+    else:
+        since = watermark - WATERMARK_OVERLAP
+        print(f"🔍 Corrida incremental desde {since.isoformat()}...")
+        changed = fetch_assets(supabase, since=since)
+        affected = {model_key(r) for r in changed}
+        affected |= stale_keys(supabase, now - timedelta(hours=args.refresh_hours))
+        new_watermark = max((r['updated_at'] for r in changed if r.get('updated_at')), default=None)
+        new_watermark = new_watermark or watermark.isoformat()
+        print(f"   {len(changed)} activos modificados, {len(affected)} modelos por recalcular")
+        rows = fetch_assets(supabase, brands={k[0] for k in affected}) if affected else []
+        rows = [r for r in rows if model_key(r) in affected]
+        scanned = len(changed) + len(rows)
+
+    metrics = compute_model_metrics(rows, now)
+    removed = (affected or set()) - set(metrics)
+    print(f"📊 {len(metrics)} modelos calculados a partir de {len(rows)} activos")
+
+    if args.dry_run:
+        top = sorted(metrics.values(), key=lambda r: -r['total_cost_value'])[:15]
+        print(f"\n{'Marca / Modelo':<40} {'Disp':>6} {'Valor':>12} {'p50':>6} {'p90':>6} {'Rot.90d':>8}")
+        print('-' * 82)
+        for row in top:
+            name = f"{row['brand']} {row['model']}"[:40]
+            print(f"{name:<40} {row['available_count']:>6} {row['total_cost_value']:>12,.2f} "
+                  f"{row['age_p50_days'] or 0:>6.0f} {row['age_p90_days'] or 0:>6.0f} "
+                  f"{row['turnover_90d'] or 0:>8.2f}")
+        print("\nℹ️  --dry-run: no se escribió nada")
+        return
+
+    run = supabase.table('inventory_analytics_runs').insert({
+        'mode': mode,
+        'started_at': now.isoformat(),
+    }).execute().data[0]
+
+    if mode == 'full':
+        existing = {(r['brand'], r['model'], r['type']) for r in load_model_rows(supabase)}
+        removed = existing - set(metrics)
+
+    upsert(supabase, 'inventory_model_analytics', list(metrics.values()), 'brand,model,type')
+    delete_models(supabase, removed)
+
+    model_rows = load_model_rows(supabase)
+    abc_rows = classify_abc(model_rows)
+    upsert(supabase, 'inventory_model_analytics', abc_rows, 'brand,model,type')
+    upsert(supabase, 'inventory_abc_snapshot', abc_summary(model_rows, abc_rows, now), 'abc_class')
+
+    supabase.table('inventory_analytics_runs').update({
+        'watermark': new_watermark,
+        'assets_scanned': scanned,
+        'models_written': len(metrics),
+        'models_removed': len(removed),
+        'finished_at': datetime.now(timezone.utc).isoformat(),
+    }).eq('id', run['id']).execute()
+
+    counts = {c: sum(1 for r in abc_rows if r['abc_class'] == c) for c in 'ABC'}
+    print(f"✅ {len(metrics)} modelos actualizados, {len(removed)} sin stock eliminados "
+          f"(A: {counts['A']}, B: {counts['B']}, C: {counts['C']}) en {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga de la recepción en muelle (base local con las migraciones).
+
+Genera tickets sintéticos (cajas con ítems y seriales LT-...) y los recibe
+con varios procesos a la vez, como varios recibidores en el muelle:
+
+  box     save_box_reception, una llamada por caja (flujo actual de la UI)
+  ticket  save_ticket_reception, una llamada por ticket
+  http    POST a /api/logistica/reception de un servidor Next.js en marcha
+          (una petición por caja; --base-url y, si hace falta, --cookie)
+
+Mientras corre, un muestreador lee pg_stat_activity para contar las sesiones
+de la prueba (application_name loadtest-<run>) esperando un bloqueo; con
+--mode http las sesiones son del servidor y se cuentan todas las de la base.
+Al final compara pg_stat_database.deadlocks. Reporta
+p50/p95/p99 de latencia, esperas por bloqueo, deadlocks y timeouts.
+
+--order ticket reparte las cajas de un mismo ticket entre los recibidores
+(compiten por el mismo ticket); --order interleaved alterna tickets.
+
+Uso:
+    python loadtest_reception.py --tickets 10 --boxes 20 --items 8 --receivers 4
+    python loadtest_reception.py --mode ticket --tickets 40 --receivers 8
+    python loadtest_reception.py --mode box --order interleaved --lock-timeout-ms 2000 --retries 2
+    python loadtest_reception.py --mode http --base-url http://localhost:3000 --receivers 6
+"""
+
+import argparse
+import multiprocessing as mp
+import sys
+import threading
+import time
+import uuid
+
+from bench_utils import print_latency_table, summarize
+from db_connection import connect, get_database_url, require_local
+
+DEADLOCK = '40P01'
+LOCK_TIMEOUT = '55P03'
+SERIALIZATION = '40001'
+PRODUCT_TYPES = ('Laptop', 'Desktop', 'Monitor', 'Smartphone')
+REQUIRED_FUNCTIONS = {
+    'box': ('public.save_box_reception(uuid, integer, text, text)', '20260114_save_box_reception.sql'),
+    'ticket': ('public.save_ticket_reception(uuid, text, text, integer[])', '20260305_ticket_bulk_reception.sql'),
+}
+
+
+# ---------------------------------------------------------------------------
+# Datos sintéticos
+# ---------------------------------------------------------------------------
+
+def require_functions(conn, mode):
+    """Sin la RPC cada recepción fallaría; se corta antes de generar datos."""
+    if mode not in REQUIRED_FUNCTIONS:
+        return
+    signature, migration = REQUIRED_FUNCTIONS[mode]
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regprocedure(%s)", (signature,))
+        if cur.fetchone()[0] is None:
+            print(f"❌ Falta {signature.split('(')[0]}: aplica {migration}")
+            sys.exit(1)
+
+
+def load_template(conn, template_readable_id=None):
+    """Cliente y tipo de ticket se copian de un ticket existente."""
+    with conn.cursor() as cur:
+        if template_readable_id:
+            cur.execute(
+                "SELECT client_id, ticket_type FROM operations_tickets WHERE readable_id = %s",
+                (template_readable_id,),
+            )
+        else:
+            cur.execute(
+                "SELECT client_id, ticket_type FROM operations_tickets "
+                "WHERE client_id IS NOT NULL ORDER BY created_at DESC LIMIT 1"
+            )
+        return cur.fetchone()
+
+
+def generate_tickets(conn, run_id, tickets, boxes, items, template):
+    """Crea tickets con su lote y sus ítems. Devuelve [(ticket_id, readable_id, [cajas])]."""
+    client_id, ticket_type = template
+    created = []
+    with conn.cursor() as cur:
+        for t in range(tickets):
+            cur.execute(
+                """
+                INSERT INTO operations_tickets (client_id, ticket_type, title, status, expected_units, received_units)
+                VALUES (%s, %s, %s, 'draft', %s, 0)
+                RETURNING id, readable_id
+                """,
+                (client_id, ticket_type, f'Load test {run_id} #{t + 1}', boxes * items),
+            )
+            ticket_id, readable_id = cur.fetchone()
+            cur.execute(
+                """
+                INSERT INTO batches (internal_batch_id, ticket_id, status, expected_units, received_units, pallet_count)
+                VALUES (%s, %s, 'received', %s, 0, 1)
+                """,
+                (f'LT-{run_id}-{t + 1}', ticket_id, boxes * items),
+            )
+            cur.execute(
+                """
+                INSERT INTO ticket_items (
+                    ticket_id, box_number, collected_serial, product_type,
+                    brand, model, brand_full, model_full, processor, ram_capacity
+                )
+                SELECT
+                    %(ticket)s, b, %(prefix)s || b || '-' || i,
+                    (%(types)s::text[])[1 + (b + i) %% cardinality(%(types)s::text[])],
+                    'Dell', 'Latitude 5420', 'Dell', 'Latitude 5420', 'i5-1145G7', '16GB'
+                FROM generate_series(1, %(boxes)s) AS b, generate_series(1, %(items)s) AS i
+                """,
+                {'ticket': ticket_id, 'prefix': f'LT-{run_id}-{t + 1}-', 'types': list(PRODUCT_TYPES),
+                 'boxes': boxes, 'items': items},
+            )
+            created.append((ticket_id, readable_id, list(range(1, boxes + 1))))
+    return created
+
+
+def cleanup(conn, run_id):
+    like = f'LT-{run_id}-%'
+    with conn.cursor() as cur:
+        cur.execute("SELECT id FROM operations_tickets WHERE title LIKE %s", (f'Load test {run_id} #%',))
+        ticket_ids = [row[0] for row in cur.fetchall()]
+        cur.execute(
+            "DELETE FROM inventory_movements WHERE asset_id IN (SELECT id FROM assets WHERE serial_number LIKE %s)",
+            (like,),
+        )
+        if ticket_ids:
+            cur.execute("DELETE FROM ticket_items WHERE ticket_id = ANY(%s::uuid[])", (ticket_ids,))
+            cur.execute("DELETE FROM ticket_reception_log WHERE ticket_id = ANY(%s::uuid[])", (ticket_ids,))
+        cur.execute("DELETE FROM assets WHERE serial_number LIKE %s", (like,))
+        if ticket_ids:
+            cur.execute("DELETE FROM batches WHERE ticket_id = ANY(%s::uuid[])", (ticket_ids,))
+            cur.execute("DELETE FROM operations_tickets WHERE id = ANY(%s::uuid[])", (ticket_ids,))
+
+
+def build_jobs(created, mode, order):
+    if mode == 'ticket':
+        return [(ticket_id, readable_id, None) for ticket_id, readable_id, _ in created]
+    if order == 'ticket':
+        return [(tid, rid, box) for tid, rid, boxes in created for box in boxes]
+    jobs = []
+    longest = max(len(boxes) for _, _, boxes in created)
+    for index in range(longest):
+        for tid, rid, boxes in created:
+            if index < len(boxes):
+                jobs.append((tid, rid, boxes[index]))
+    return jobs
+
+
+# ---------------------------------------------------------------------------
+# Recibidores (un proceso cada uno)
+# ---------------------------------------------------------------------------
+
+def classify_error(exc):
+    code = getattr(exc, 'pgcode', None)
+    if code == DEADLOCK:
+        return 'deadlock'
+    if code == LOCK_TIMEOUT:
+        return 'lock_timeout'
+    if code == SERIALIZATION:
+        return 'serialization'
+    return 'error'
+
+
+def db_receiver(url, app_name, mode, warehouse, lock_timeout_ms, retries, jobs, results):
+    conn = connect(url, application_name=app_name)
+    with conn.cursor() as cur:
+        if lock_timeout_ms:
+            cur.execute("SET lock_timeout = %s", (f'{lock_timeout_ms}ms',))
+        conn.commit()
+        while True:
+            job = jobs.get()
+            if job is None:
+                break
+            ticket_id, _, box = job
+            attempts = 0
+            start = time.perf_counter()
+            while True:
+                attempts += 1
+                try:
+                    if mode == 'box':
+                        cur.execute("SELECT * FROM save_box_reception(%s, %s, %s, 'asset')",
+                                    (ticket_id, box, warehouse))
+                    else:
+                        cur.execute("SELECT * FROM save_ticket_reception(%s, %s, 'asset', NULL)",
+                                    (ticket_id, warehouse))
+                    cur.fetchall()
+                    conn.commit()
+                    outcome = 'ok'
+                except Exception as exc:  # noqa: BLE001 - se clasifica y reporta
+                    conn.rollback()
+                    outcome = classify_error(exc)
+                    if outcome in ('deadlock', 'serialization') and attempts <= retries:
+                        results.put(('retry', outcome, 0.0))
+                        continue
+                    if outcome == 'error':
+                        results.put(('message', str(exc).splitlines()[0], 0.0))
+                break
+            results.put(('done', outcome, (time.perf_counter() - start) * 1000))
+    conn.close()
+
+
+def http_receiver(base_url, cookie, warehouse, jobs, results):
+    import requests
+
+    session = requests.Session()
+    if cookie:
+        session.headers['Cookie'] = cookie
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+        ticket_id, readable_id, box = job
+        start = time.perf_counter()
+        try:
+            res = session.post(f'{base_url}/api/logistica/reception', json={
+                'ticketId': ticket_id,
+                'ticketReadableId': readable_id,
+                'boxNumber': box,
+                'warehouseCode': warehouse,
+            }, timeout=120)
+            body = res.text.lower()
+            if res.ok:
+                outcome = 'ok'
+            elif 'deadlock' in body:
+                outcome = 'deadlock'
+            elif 'lock timeout' in body or 'lock_timeout' in body:
+                outcome = 'lock_timeout'
+            else:
+                outcome = 'error'
+                results.put(('message', f'HTTP {res.status_code}: {res.text[:120]}', 0.0))
+        except requests.RequestException as exc:
+            outcome = 'error'
+            results.put(('message', str(exc), 0.0))
+        results.put(('done', outcome, (time.perf_counter() - start) * 1000))
+
+
+# ---------------------------------------------------------------------------
+# Muestreo de bloqueos
+# ---------------------------------------------------------------------------
+
+class LockSampler(threading.Thread):
+    """Cuenta sesiones esperando un bloqueo cada interval segundos.
+
+    Con app_name solo cuenta las sesiones de la prueba; sin él, todas las de
+    la base (vacuum, otras aplicaciones o el servidor Next.js incluidos).
+    """
+
+    def __init__(self, url, interval, app_name=None):
+        super().__init__(daemon=True)
+        self.conn = connect(url, autocommit=True)
+        self.interval = interval
+        self.app_name = app_name
+        self.stop_event = threading.Event()
+        self.samples = 0
+        self.waiting_samples = 0
+        self.waiter_sum = 0
+        self.max_waiters = 0
+        self.lock_types = {}
+
+    def run(self):
+        with self.conn.cursor() as cur:
+            while not self.stop_event.is_set():
+                cur.execute(
+                    """
+                    SELECT wait_event, COUNT(*)
+                    FROM pg_stat_activity
+                    WHERE datname = current_database()
+                      AND pid <> pg_backend_pid()
+                      AND wait_event_type = 'Lock'
+                      AND (%(app)s::text IS NULL OR application_name = %(app)s)
+                    GROUP BY wait_event
+                    """,
+                    {'app': self.app_name},
+                )
+                rows = cur.fetchall()
+                waiters = sum(count for _, count in rows)
+                self.samples += 1
+                self.waiter_sum += waiters
+                self.max_waiters = max(self.max_waiters, waiters)
+                if waiters:
+                    self.waiting_samples += 1
+                for event, count in rows:
+                    self.lock_types[event] = self.lock_types.get(event, 0) + count
+                self.stop_event.wait(self.interval)
+
+    def stop(self):
+        self.stop_event.set()
+        self.join()
+        self.conn.close()
+
+    @property
+    def lock_wait_seconds(self):
+        """Estimación: sesiones esperando por muestra x intervalo."""
+        return self.waiter_sum * self.interval
+
+
+def deadlock_count(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT deadlocks FROM pg_stat_database WHERE datname = current_database()")
+        return cur.fetchone()[0]
+
+
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description='Prueba de carga de recepción en muelle')
+    parser.add_argument('--mode', choices=('box', 'ticket', 'http'), default='box')
+    parser.add_argument('--tickets', type=int, default=10)
+    parser.add_argument('--boxes', type=int, default=20, help='Cajas por ticket')
+    parser.add_argument('--items', type=int, default=8, help='Ítems por caja')
+    parser.add_argument('--receivers', type=int, default=4, help='Procesos recibiendo a la vez')
+    parser.add_argument('--order', choices=('ticket', 'interleaved'), default='ticket')
+    parser.add_argument('--warehouse', default='BOD-REC')
+    parser.add_argument('--lock-timeout-ms', type=int, default=0, help='SET lock_timeout en cada sesión')
+    parser.add_argument('--retries', type=int, default=0, help='Reintentos ante deadlock')
+    parser.add_argument('--sample-ms', type=float, default=50, help='Intervalo de muestreo de bloqueos')
+    parser.add_argument('--template-ticket', help='readable_id del ticket cuyo cliente/tipo se copia')
+    parser.add_argument('--base-url', default='http://localhost:3000', help='Servidor para --mode http')
+    parser.add_argument('--cookie', help='Cookie de sesión para --mode http')
+    parser.add_argument('--keep', action='store_true', help='No borrar los datos generados')
+    parser.add_argument('--allow-remote', action='store_true')
+    args = parser.parse_args()
+
+    url = get_database_url()
+    require_local(url, args.allow_remote)
+    admin = connect(url, autocommit=True)
+    require_functions(admin, args.mode)
+
+    template = load_template(admin, args.template_ticket)
+    if not template:
+        print("❌ No hay un ticket con cliente para usar como plantilla (--template-ticket)")
+        sys.exit(1)
+
+    run_id = uuid.uuid4().hex[:8]
+    app_name = f'loadtest-{run_id}'
+    print(f"🔧 Generando {args.tickets} tickets x {args.boxes} cajas x {args.items} ítems (run {run_id})...")
+    created = generate_tickets(admin, run_id, args.tickets, args.boxes, args.items, template)
+    jobs_list = build_jobs(created, args.mode, args.order)
+
+    ctx = mp.get_context('spawn')
+    jobs = ctx.Queue()
+    results = ctx.Queue()
+    for job in jobs_list:
+        jobs.put(job)
+    for _ in range(args.receivers):
+        jobs.put(None)
+
+    if args.mode == 'http':
+        target, extra = http_receiver, (args.base_url, args.cookie, args.warehouse, jobs, results)
+    else:
+        target, extra = db_receiver, (url, app_name, args.mode, args.warehouse,
+                                      args.lock_timeout_ms, args.retries, jobs, results)
+
+    deadlocks_before = deadlock_count(admin)
+    sampler = LockSampler(url, args.sample_ms / 1000, None if args.mode == 'http' else app_name)
+    sampler.start()
+
+    print(f"🚚 {len(jobs_list)} recepciones ({args.mode}) con {args.receivers} recibidores...")
+    start = time.perf_counter()
+    processes = [ctx.Process(target=target, args=extra) for _ in range(args.receivers)]
+    for process in processes:
+        process.start()
+
+    latencies = []
+    outcomes = {}
+    retries = {}
+    messages = []
+    finished = 0
+    try:
+        while finished < len(jobs_list):
+            kind, value, latency = results.get()
+            if kind == 'done':
+                finished += 1
+                outcomes[value] = outcomes.get(value, 0) + 1
+                if value == 'ok':
+                    latencies.append(latency)
+            elif kind == 'retry':
+                retries[value] = retries.get(value, 0) + 1
+            elif len(messages) < 5:
+                messages.append(value)
+    finally:
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+        sampler.stop()
+        deadlocks = deadlock_count(admin) - deadlocks_before
+        if not args.keep:
+            cleanup(admin, run_id)
+        admin.close()
+
+    extra = ', '.join(f'{k}: {v}' for k, v in sorted(outcomes.items()) if k != 'ok') or 'sin errores'
+    print_latency_table([(args.mode, summarize(latencies), elapsed, extra)])
+
+    print("\n🔒 Bloqueos")
+    waiting_pct = 100 * sampler.waiting_samples / sampler.samples if sampler.samples else 0
+    print(f"   Muestras con sesiones esperando: {sampler.waiting_samples}/{sampler.samples} ({waiting_pct:.0f}%)")
+    print(f"   Máximo de sesiones esperando a la vez: {sampler.max_waiters}")
+    print(f"   Tiempo total estimado en espera: {sampler.lock_wait_seconds:.1f}s")
+    if sampler.lock_types:
+        kinds = ', '.join(f'{k}: {v}' for k, v in sorted(sampler.lock_types.items(), key=lambda kv: -kv[1]))
+        print(f"   Tipos de espera: {kinds}")
+    print(f"   Deadlocks (pg_stat_database): {deadlocks}")
+    if retries:
+        print(f"   Reintentos: {', '.join(f'{k}: {v}' for k, v in retries.items())}")
+    for message in messages:
+        print(f"   ⚠️  {message}")
+
+
+if __name__ == '__main__':
+    main()
@@ -60,8 +60,9 @@ try:
     
     # 5. Count assets in BOD-HARV
     print('\n5. Contando assets en BOD-HARV...')
-    count_result = supabase.table('assets').select('id', count='exact').eq('current_warehouse_id', warehouse['id']).execute()
-    print(f'✓ Total de assets en BOD-HARV: {count_result.count}')
+    count_result = supabase.table('warehouse_stock_totals').select('quantity').eq('warehouse_id', warehouse['id']).execute()
+    total = count_result.data[0]['quantity'] if count_result.data else 0
+    print(f'✓ Total de assets en BOD-HARV: {total}')
     
     print('\n' + '='*60)
     print('✓ PROCESO COMPLETADO EXITOSAMENTE')
@@ -61,8 +61,8 @@ try:
         print('⚠ Verificación sin datos')
 
     print('\n5) Conteo en BOD-VAL...')
-    count = supabase.table('assets').select('id', count='exact').eq('current_warehouse_id', warehouse['id']).execute()
-    print(f"✓ Total en BOD-VAL: {count.count}")
+    count = supabase.table('warehouse_stock_totals').select('quantity').eq('warehouse_id', warehouse['id']).execute()
+    print(f"✓ Total en BOD-VAL: {count.data[0]['quantity'] if count.data else 0}")
 
     print('\nListo. Revisa Inventario > Bodega > Bodega Valorización')
 except Exception as e:
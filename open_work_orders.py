@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Apertura masiva de órdenes de servicio (ingreso de un lote o ticket a taller).
+
+Abre una orden por equipo con open_work_orders_bulk (migración
+20260314_bulk_work_orders.sql): órdenes, clasificaciones de recepción,
+traslado a BOD-REP, asset_history y auditoría en una sola transacción, en
+lugar de la cadena de consultas que hace createWorkOrder por cada unidad.
+Se omiten los equipos destruidos y los que ya tienen una orden abierta.
+
+La selección puede ser por lote, por ticket, por ids o por un archivo de
+seriales (uno por línea). Sin --execute solo muestra el resumen.
+
+Uso:
+    python open_work_orders.py --batch LOTE-2026-0042 --issue "Revisión de ingreso"
+    python open_work_orders.py --ticket TK-2026-0150 --issue "Diagnóstico" --execute
+    python open_work_orders.py --serials-file pallet_17.txt --issue "No enciende" \\
+        --priority high --user-id <uuid> --execute
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter
+
+from document_renderer import create_supabase_client
+
+PAGE_SIZE = 1000
+IN_CHUNK = 200
+DEFAULT_CHUNK = 5000
+# Igual que open_work_orders_bulk: estados de cierre en inglés y en español
+CLOSED_STATUSES = (
+    'completed', 'cancelled',
+    'Completada', 'Completado', 'Finalizado', 'Cerrado', 'Cancelada', 'Cancelado',
+)
+ASSET_COLUMNS = 'id, serial_number, asset_type, status'
+
+
+def read_serials(path):
+    with open(path, encoding='utf-8') as f:
+        serials = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    return list(dict.fromkeys(serials))
+
+
+def fetch_by_column(supabase, table, columns, column, values):
+    rows = []
+    for offset in range(0, len(values), IN_CHUNK):
+        res = supabase.table(table).select(columns).in_(column, values[offset:offset + IN_CHUNK]).execute()
+        rows.extend(res.data or [])
+    return rows
+
+
+def fetch_batch_assets(supabase, batch_id):
+    """Activos del lote, paginando por id (keyset)."""
+    assets = []
+    last_id = None
+    while True:
+        query = supabase.table('assets').select(ASSET_COLUMNS).eq('batch_id', batch_id)
+        if last_id:
+            query = query.gt('id', last_id)
+        page = query.order('id').limit(PAGE_SIZE).execute().data or []
+        assets.extend(page)
+        if len(page) < PAGE_SIZE:
+            return assets
+        last_id = page[-1]['id']
+
+
+def fetch_ticket_assets(supabase, ticket_id):
+    """Activos recibidos en el ticket, paginando ticket_items por id (keyset)."""
+    ids = []
+    last_id = None
+    while True:
+        query = supabase.table('ticket_items').select('id, asset_id').eq('ticket_id', ticket_id)
+        if last_id:
+            query = query.gt('id', last_id)
+        page = query.order('id').limit(PAGE_SIZE).execute().data or []
+        ids.extend(r['asset_id'] for r in page if r.get('asset_id'))
+        if len(page) < PAGE_SIZE:
+            break
+        last_id = page[-1]['id']
+    return fetch_by_column(supabase, 'assets', ASSET_COLUMNS, 'id', list(dict.fromkeys(ids)))
+
+
+def fetch_open_orders(supabase, asset_ids):
+    """{asset_id: work_order_number} de las órdenes abiertas de los activos."""
+    rows = fetch_by_column(supabase, 'work_orders', 'asset_id, work_order_number, status', 'asset_id', asset_ids)
+    return {
+        r['asset_id']: r['work_order_number']
+        for r in rows
+        if r.get('status') not in CLOSED_STATUSES
+    }
+
+
+def print_summary(assets, open_orders):
+    by_type = Counter(a.get('asset_type') or 'N/A' for a in assets)
+    destroyed = sum(1 for a in assets if a.get('status') == 'destroyed')
+
+    print(f"\n{'Tipo':<20} {'Equipos':>8}")
+    print('-' * 29)
+    for asset_type, count in by_type.most_common():
+        print(f"{asset_type:<20} {count:>8}")
+    if open_orders:
+        sample = ', '.join(sorted(open_orders.values())[:5])
+        print(f"\n⚠️  {len(open_orders)} ya tienen orden abierta y se omiten ({sample}{' ...' if len(open_orders) > 5 else ''})")
+    if destroyed:
+        print(f"⚠️  {destroyed} destruidos se omiten")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Apertura masiva de órdenes de servicio')
+    selection = parser.add_mutually_exclusive_group(required=True)
+    selection.add_argument('--batch', help='internal_batch_id del lote')
+    selection.add_argument('--ticket', help='readable_id del ticket')
+    selection.add_argument('--ids', nargs='+', help='UUIDs de activos')
+    selection.add_argument('--serials-file', help='Archivo con un serial por línea')
+    parser.add_argument('--issue', required=True, help='Falla reportada para todas las órdenes')
+    parser.add_argument('--priority', default='normal', help='Prioridad de las órdenes (default: normal)')
+    parser.add_argument('--user-id', help='UUID del usuario que abre las órdenes')
+    parser.add_argument('--chunk', type=int, default=DEFAULT_CHUNK, help='Activos por transacción')
+    parser.add_argument('--execute', action='store_true', help='Abrir las órdenes (sin esto solo es vista previa)')
+    args = parser.parse_args()
+
+    supabase = create_supabase_client()
+
+    missing = []
+    if args.batch:
+        res = supabase.table('batches').select('id').eq('internal_batch_id', args.batch).limit(1).execute()
+        if not res.data:
+            print(f"❌ Lote {args.batch} no encontrado")
+            sys.exit(1)
+        assets = fetch_batch_assets(supabase, res.data[0]['id'])
+    elif args.ticket:
+        res = supabase.table('operations_tickets').select('id').eq('readable_id', args.ticket).limit(1).execute()
+        if not res.data:
+            print(f"❌ Ticket {args.ticket} no encontrado")
+            sys.exit(1)
+        assets = fetch_ticket_assets(supabase, res.data[0]['id'])
+    elif args.ids:
+        assets = fetch_by_column(supabase, 'assets', ASSET_COLUMNS, 'id', args.ids)
+        missing = sorted(set(args.ids) - {a['id'] for a in assets})
+    else:
+        serials = read_serials(args.serials_file)
+        assets = fetch_by_column(supabase, 'assets', ASSET_COLUMNS, 'serial_number', serials)
+        missing = sorted(set(serials) - {a['serial_number'] for a in assets})
+
+    if missing:
+        print(f"⚠️  {len(missing)} no encontrados: {', '.join(missing[:10])}{' ...' if len(missing) > 10 else ''}")
+    if not assets:
+        print("⚠️  No hay activos para abrir órdenes")
+        sys.exit(0)
+
+    ids = [a['id'] for a in assets]
+    open_orders = fetch_open_orders(supabase, ids)
+    print(f"🔧 {len(assets)} activos → BOD-REP, falla: {args.issue!r}")
+    print_summary(assets, open_orders)
+
+    if not args.execute:
+        print("\nℹ️  Vista previa: usa --execute para abrir las órdenes")
+        return
+
+    chunk = max(args.chunk, 1)
+    created = skipped = 0
+    numbers = []
+    start = time.perf_counter()
+    for offset in range(0, len(ids), chunk):
+        res = supabase.rpc('open_work_orders_bulk', {
+            'p_asset_ids': ids[offset:offset + chunk],
+            'p_reported_issue': args.issue,
+            'p_priority': args.priority,
+            'p_created_by': args.user_id,
+        }).execute()
+        result = res.data or {}
+        created += int(result.get('created') or 0)
+        skipped += int(result.get('skipped') or 0)
+        numbers.extend(o['work_order_number'] for o in result.get('work_orders') or [])
+
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ {created} órdenes abiertas en {elapsed:.2f}s"
+          f"{f', {skipped} equipos omitidos' if skipped else ''}")
+    if numbers:
+        print(f"   {numbers[0]} … {numbers[-1]}")
+
+
+if __name__ == '__main__':
+    main()
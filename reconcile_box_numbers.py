@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Conciliación de números de caja heredados del cálculo max(box_number)+1.
+
+Busca en ticket_items:
+  - cajas con box_number 0 o por debajo de 10001 (como las que corregían
+    fix_box_zero.py y fix_caja_10006.py)
+  - números de caja usados por más de un ticket (dos usuarios recibieron el
+    mismo número); el ticket que lo usó primero lo conserva
+
+Con --apply cada caja afectada recibe un número nuevo de reserve_box_numbers
+(migración 20260306_box_number_allocator.sql), se actualizan sus ítems y su
+registro en ticket_reception_log, y al final la secuencia se coloca por
+encima de todo lo usado con sync_box_number_sequence. Sin --apply solo
+muestra el plan.
+
+Uso:
+    python reconcile_box_numbers.py
+    python reconcile_box_numbers.py --apply
+    python reconcile_box_numbers.py --ticket TK-2026-00006 --apply
+"""
+
+import argparse
+from collections import defaultdict
+
+from document_renderer import create_supabase_client
+
+FIRST_BOX_NUMBER = 10001
+PAGE_SIZE = 1000
+IN_CHUNK = 200
+
+
+def fetch_all(query_factory):
+    rows = []
+    offset = 0
+    while True:
+        page = query_factory().range(offset, offset + PAGE_SIZE - 1).execute().data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        offset += PAGE_SIZE
+
+
+def load_boxes(supabase, ticket_id=None):
+    """(ticket_id, box_number) -> {'items': n, 'first_seen': created_at mínimo}."""
+    def query():
+        q = supabase.table('ticket_items').select('ticket_id, box_number, created_at')
+        if ticket_id:
+            q = q.eq('ticket_id', ticket_id)
+        return q.order('id')
+
+    boxes = {}
+    for row in fetch_all(query):
+        key = (row['ticket_id'], row['box_number'] or 0)
+        entry = boxes.setdefault(key, {'items': 0, 'first_seen': row['created_at']})
+        entry['items'] += 1
+        entry['first_seen'] = min(entry['first_seen'], row['created_at'])
+    return boxes
+
+
+def load_ticket_names(supabase, ticket_ids):
+    ids = list(ticket_ids)
+    names = {}
+    for offset in range(0, len(ids), IN_CHUNK):
+        res = supabase.table('operations_tickets').select('id, readable_id').in_(
+            'id', ids[offset:offset + IN_CHUNK]
+        ).execute()
+        names.update({row['id']: row['readable_id'] for row in res.data or []})
+    return names
+
+
+def plan_fixes(boxes, all_boxes):
+    """Lista de (ticket_id, box_number, motivo) a renumerar."""
+    fixes = []
+    by_number = defaultdict(list)
+    for (ticket_id, number), info in all_boxes.items():
+        by_number[number].append((info['first_seen'], ticket_id))
+
+    for (ticket_id, number) in sorted(boxes, key=lambda k: (k[1], k[0])):
+        if number < FIRST_BOX_NUMBER:
+            fixes.append((ticket_id, number, f'número inválido ({number})'))
+            continue
+        owners = sorted(by_number[number])
+        if len(owners) > 1 and owners[0][1] != ticket_id:
+            fixes.append((ticket_id, number, f'compartido con {len(owners) - 1} ticket(s)'))
+    return fixes
+
+
+def box_filters(old_number):
+    """Filtros que seleccionan la caja; load_boxes junta box_number NULL con 0."""
+    filters = [lambda q: q.eq('box_number', old_number)]
+    if old_number == 0:
+        filters.append(lambda q: q.is_('box_number', 'null'))
+    return filters
+
+
+def renumber(supabase, ticket_id, old_number):
+    res = supabase.rpc('reserve_box_numbers', {'p_ticket_id': ticket_id, 'p_quantity': 1}).execute()
+    new_number = res.data[0]['first_box']
+    for match in box_filters(old_number):
+        match(supabase.table('ticket_items').update({'box_number': new_number}).eq(
+            'ticket_id', ticket_id
+        )).execute()
+        match(supabase.table('ticket_reception_log').update({'box_number': new_number}).eq(
+            'ticket_id', ticket_id
+        )).execute()
+    return new_number
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Conciliación de números de caja')
+    parser.add_argument('--ticket', help='readable_id de un ticket específico')
+    parser.add_argument('--apply', action='store_true', help='Renumerar (por defecto solo se muestra el plan)')
+    args = parser.parse_args()
+
+    supabase = create_supabase_client()
+
+    print("🔍 Leyendo cajas de ticket_items...")
+    all_boxes = load_boxes(supabase)
+    boxes = all_boxes
+    if args.ticket:
+        res = supabase.table('operations_tickets').select('id').ilike('readable_id', args.ticket).limit(1).execute()
+        if not res.data:
+            print(f"❌ Ticket {args.ticket} no encontrado")
+            return
+        target = res.data[0]['id']
+        boxes = {key: info for key, info in all_boxes.items() if key[0] == target}
+
+    fixes = plan_fixes(boxes, all_boxes)
+    numbers = {number for _, number in all_boxes}
+    print(f"📦 {len(all_boxes)} cajas, {len(numbers)} números distintos")
+
+    if not fixes:
+        print("✅ No hay números de caja por corregir")
+    else:
+        names = load_ticket_names(supabase, {ticket_id for ticket_id, _, _ in fixes})
+        print(f"⚠️  {len(fixes)} cajas por renumerar:")
+        for ticket_id, number, reason in fixes:
+            items = all_boxes[(ticket_id, number)]['items']
+            print(f"   {names.get(ticket_id, ticket_id)} caja #{number}: {items} ítems, {reason}")
+
+        if not args.apply:
+            print("\nEjecuta con --apply para renumerar")
+            return
+
+        print("\n🔄 Renumerando...")
+        for ticket_id, number, _ in fixes:
+            new_number = renumber(supabase, ticket_id, number)
+            print(f"   ✓ {names.get(ticket_id, ticket_id)}: caja #{number} → #{new_number}")
+
+    if args.apply:
+        res = supabase.rpc('sync_box_number_sequence', {}).execute()
+        print(f"🔢 Siguiente número de caja: {res.data}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Recepción masiva de tickets con save_ticket_reception.
+
+Recibe todas las cajas pendientes de uno o varios tickets, cada ticket en una
+sola transacción (migración 20260305_ticket_bulk_reception.sql), y muestra el
+código de recepción de cada caja. Sirve para descargar de una vez un retiro
+grande en el muelle o para volver a procesar tickets cuya recepción quedó a
+medias. Con --per-box usa save_box_reception caja por caja (el flujo anterior)
+para comparar tiempos.
+
+Uso:
+    python replay_receptions.py TK-2026-00006 TK-2026-00007
+    python replay_receptions.py --pending --dry-run
+    python replay_receptions.py --file tickets.txt --workers 4
+    python replay_receptions.py TK-2026-00006 --boxes 1,2,5 --warehouse BOD-REC
+"""
+
+import argparse
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from document_renderer import create_supabase_client
+
+DEFAULT_WAREHOUSE = 'BOD-REC'
+PAGE_SIZE = 1000
+IN_CHUNK = 200
+
+
+def parse_boxes(value):
+    try:
+        return sorted({int(v) for v in value.split(',') if v.strip()})
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'Lista de cajas inválida: {value}')
+
+
+def fetch_all(query_factory):
+    rows = []
+    offset = 0
+    while True:
+        page = query_factory().range(offset, offset + PAGE_SIZE - 1).execute().data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        offset += PAGE_SIZE
+
+
+def resolve_tickets(supabase, readable_ids):
+    found = {}
+    for readable_id in readable_ids:
+        res = supabase.table('operations_tickets').select('id, readable_id').ilike(
+            'readable_id', readable_id
+        ).limit(1).execute()
+        if res.data:
+            found[res.data[0]['id']] = res.data[0]['readable_id']
+        else:
+            print(f"⚠️  Ticket {readable_id} no encontrado")
+    return found
+
+
+def pending_boxes(supabase, ticket_ids=None):
+    """ticket_id -> cajas con ítems que no están en ticket_reception_log."""
+    def items_query():
+        query = supabase.table('ticket_items').select('ticket_id, box_number').not_.is_('box_number', 'null')
+        if ticket_ids:
+            query = query.in_('ticket_id', list(ticket_ids))
+        return query.order('id')
+
+    def log_query():
+        query = supabase.table('ticket_reception_log').select('ticket_id, box_number')
+        if ticket_ids:
+            query = query.in_('ticket_id', list(ticket_ids))
+        return query.order('id')
+
+    received = {(r['ticket_id'], r['box_number']) for r in fetch_all(log_query)}
+    pending = defaultdict(set)
+    for row in fetch_all(items_query):
+        key = (row['ticket_id'], row['box_number'])
+        if key not in received:
+            pending[row['ticket_id']].add(row['box_number'])
+    return {ticket_id: sorted(boxes) for ticket_id, boxes in pending.items()}
+
+
+def receive_ticket(supabase, ticket_id, warehouse, item_type, boxes=None):
+    start = time.perf_counter()
+    res = supabase.rpc('save_ticket_reception', {
+        'p_ticket_id': ticket_id,
+        'p_warehouse_code': warehouse,
+        'p_item_type': item_type,
+        'p_box_numbers': boxes,
+    }).execute()
+    return res.data or [], time.perf_counter() - start
+
+
+def receive_per_box(supabase, ticket_id, warehouse, item_type, boxes):
+    start = time.perf_counter()
+    rows = []
+    for box in boxes:
+        res = supabase.rpc('save_box_reception', {
+            'p_ticket_id': ticket_id,
+            'p_box_number': box,
+            'p_warehouse_code': warehouse,
+            'p_item_type': item_type,
+        }).execute()
+        for row in res.data or []:
+            rows.append(dict(row, box_number=box))
+    return rows, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recepción masiva de tickets')
+    parser.add_argument('tickets', nargs='*', help='readable_id de los tickets')
+    parser.add_argument('--file', help='Archivo con un readable_id por línea')
+    parser.add_argument('--pending', action='store_true', help='Todos los tickets con cajas sin recibir')
+    parser.add_argument('--boxes', type=parse_boxes, help='Cajas específicas (solo con un ticket), ej. 1,2,5')
+    parser.add_argument('--warehouse', default=DEFAULT_WAREHOUSE)
+    parser.add_argument('--item-type', default='asset', choices=('asset', 'part', 'seedstock'))
+    parser.add_argument('--workers', type=int, default=1, help='Tickets procesados en paralelo')
+    parser.add_argument('--per-box', action='store_true', help='Usar save_box_reception caja por caja')
+    parser.add_argument('--dry-run', action='store_true', help='Solo listar las cajas pendientes')
+    args = parser.parse_args()
+
+    readable_ids = list(args.tickets)
+    if args.file:
+        with open(args.file, encoding='utf-8') as f:
+            readable_ids += [line.strip() for line in f if line.strip()]
+    if not readable_ids and not args.pending:
+        parser.error('Indica tickets, --file o --pending')
+    if args.boxes and len(readable_ids) != 1:
+        parser.error('--boxes requiere exactamente un ticket')
+
+    supabase = create_supabase_client()
+    tickets = resolve_tickets(supabase, readable_ids) if readable_ids else {}
+
+    if args.boxes:
+        plan = {ticket_id: args.boxes for ticket_id in tickets}
+    else:
+        print("🔍 Buscando cajas pendientes...")
+        plan = pending_boxes(supabase, tickets.keys() if readable_ids else None)
+        if args.pending and not readable_ids:
+            ids = list(plan)
+            for offset in range(0, len(ids), IN_CHUNK):
+                res = supabase.table('operations_tickets').select('id, readable_id').in_(
+                    'id', ids[offset:offset + IN_CHUNK]
+                ).execute()
+                tickets.update({row['id']: row['readable_id'] for row in res.data or []})
+
+    plan = {ticket_id: boxes for ticket_id, boxes in plan.items() if boxes}
+    if not plan:
+        print("✅ No hay cajas pendientes")
+        return
+
+    total_boxes = sum(len(b) for b in plan.values())
+    print(f"📦 {len(plan)} tickets, {total_boxes} cajas")
+    if args.dry_run:
+        for ticket_id, boxes in sorted(plan.items(), key=lambda kv: tickets.get(kv[0], kv[0])):
+            print(f"   {tickets.get(ticket_id, ticket_id)}: cajas {', '.join(map(str, boxes))}")
+        return
+
+    def process(ticket_id):
+        boxes = plan[ticket_id]
+        try:
+            if args.per_box:
+                return ticket_id, receive_per_box(supabase, ticket_id, args.warehouse, args.item_type, boxes), None
+            explicit = boxes if args.boxes else None
+            return ticket_id, receive_ticket(supabase, ticket_id, args.warehouse, args.item_type, explicit), None
+        except Exception as exc:  # noqa: BLE001 - se reporta por ticket
+            return ticket_id, ([], 0.0), exc
+
+    start = time.perf_counter()
+    failed = 0
+    assets = 0
+    with ThreadPoolExecutor(max_workers=max(args.workers, 1)) as pool:
+        for ticket_id, (rows, elapsed), error in pool.map(process, plan):
+            name = tickets.get(ticket_id, ticket_id)
+            if error:
+                failed += 1
+                print(f"❌ {name}: {error}")
+                continue
+            moved = sum(int(r.get('moved_assets') or 0) for r in rows)
+            assets += moved
+            print(f"✅ {name}: {len(rows)} cajas, {moved} activos en {elapsed:.2f}s")
+            for row in rows:
+                print(f"     Caja #{row['box_number']}: código {row.get('reception_code')} "
+                      f"({row.get('moved_assets')} activos)")
+
+    elapsed = time.perf_counter() - start
+    print(f"\n📊 {len(plan) - failed}/{len(plan)} tickets, {assets} activos en {elapsed:.1f}s")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
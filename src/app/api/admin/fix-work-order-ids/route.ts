@@ -2,11 +2,12 @@ import { NextResponse } from 'next/server'
 import { createClient } from '@/lib/supabase/server'
 
 const OS_NUMBER_PREFIX = 'OS-'
-const OS_START_SEQUENCE = 100
 
 /**
  * Endpoint para corregir los IDs de work_orders
  * Cambia formatos como "WO-MJTISDHW" a "OS-100", "OS-101", etc.
+ * Los números nuevos salen de work_order_number_seq (next_work_order_numbers),
+ * así no chocan con órdenes que se creen mientras corre.
  * GET /api/admin/fix-work-order-ids
  */
 export async function GET() {
@@ -23,7 +24,11 @@ export async function GET() {
       return NextResponse.json({ error: fetchError.message }, { status: 500 })
     }
 
-    if (!workOrders || workOrders.length === 0) {
+    const pending = (workOrders || []).filter(
+      (wo) => !wo.work_order_number?.match(new RegExp(`^${OS_NUMBER_PREFIX}\\d+$`, 'i'))
+    )
+
+    if (pending.length === 0) {
       return NextResponse.json({ 
         success: true, 
         message: 'No hay work_orders para corregir',
@@ -31,44 +36,40 @@ export async function GET() {
       })
     }
 
+    // Asegurar que la secuencia esté por encima de los OS-### existentes
+    const { error: syncError } = await supabase.rpc('sync_work_order_number_sequence')
+    if (syncError) {
+      return NextResponse.json({ error: syncError.message }, { status: 500 })
+    }
+
+    const { data: numbers, error: numbersError } = await supabase
+      .rpc('next_work_order_numbers', { p_quantity: pending.length })
+
+    if (numbersError || !numbers) {
+      return NextResponse.json({ error: numbersError?.message || 'No se generaron números' }, { status: 500 })
+    }
+
     let fixedCount = 0
-    let nextSequence = OS_START_SEQUENCE
     const updates = []
 
-    for (const wo of workOrders) {
-      // Verificar si ya tiene el formato correcto OS-XXX
-      const isCorrectFormat = wo.work_order_number?.match(new RegExp(`^${OS_NUMBER_PREFIX}\\d+$`, 'i'))
-      
-      if (!isCorrectFormat) {
-        // Necesita corrección
-        const newNumber = `${OS_NUMBER_PREFIX}${nextSequence}`
-        
-        const { error: updateError } = await supabase
-          .from('work_orders')
-          .update({ 
-            work_order_number: newNumber,
-            updated_at: new Date().toISOString()
-          })
-          .eq('id', wo.id)
+    for (const [index, wo] of pending.entries()) {
+      const newNumber = (numbers as string[])[index]
 
-        if (!updateError) {
-          updates.push({
-            id: wo.id,
-            old: wo.work_order_number,
-            new: newNumber
-          })
-          fixedCount++
-        }
-        nextSequence++
-      } else {
-        // Ya tiene formato correcto, extraer el número para continuar la secuencia
-        const match = wo.work_order_number.match(new RegExp(`^${OS_NUMBER_PREFIX}(\\d+)$`, 'i'))
-        if (match) {
-          const num = Number(match[1])
-          if (num >= nextSequence) {
-            nextSequence = num + 1
-          }
-        }
+      const { error: updateError } = await supabase
+        .from('work_orders')
+        .update({ 
+          work_order_number: newNumber,
+          updated_at: new Date().toISOString()
+        })
+        .eq('id', wo.id)
+
+      if (!updateError) {
+        updates.push({
+          id: wo.id,
+          old: wo.work_order_number,
+          new: newNumber
+        })
+        fixedCount++
       }
     }
 
@@ -76,7 +77,6 @@ export async function GET() {
       success: true,
       message: `Se corrigieron ${fixedCount} work_orders`,
       fixed: fixedCount,
-      nextSequence,
       updates
     })
 
@@ -85,4 +85,3 @@ export async function GET() {
     return NextResponse.json({ error: message }, { status: 500 })
   }
 }
-
@@ -22,14 +22,12 @@ export async function POST(request: Request) {
       return NextResponse.json({ error: 'BOD-HARV warehouse not found' }, { status: 404 })
     }
 
-    // Move asset to BOD-HARV
-    const { error: updateError } = await supabase
-      .from('assets')
-      .update({
-        current_warehouse_id: warehouse.id,
-        updated_at: new Date().toISOString()
-      })
-      .eq('id', assetId)
+    // Move asset to BOD-HARV (registra el movimiento en inventory_movements)
+    const { error: updateError } = await supabase.rpc('transfer_assets_bulk', {
+      p_destination_code: 'BOD-HARV',
+      p_asset_ids: [assetId],
+      p_reason: 'Traslado a BOD-HARV'
+    })
 
     if (updateError) {
       return NextResponse.json({
@@ -100,13 +98,11 @@ export async function GET(request: Request) {
     }
 
     // Move asset
-    const { error: updateError } = await supabase
-      .from('assets')
-      .update({
-        current_warehouse_id: warehouse.id,
-        updated_at: new Date().toISOString()
-      })
-      .eq('id', asset.id)
+    const { error: updateError } = await supabase.rpc('transfer_assets_bulk', {
+      p_destination_code: 'BOD-HARV',
+      p_asset_ids: [asset.id],
+      p_reason: 'Traslado a BOD-HARV'
+    })
 
     if (updateError) {
       return NextResponse.json({
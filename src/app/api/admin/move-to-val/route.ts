@@ -87,13 +87,11 @@ export async function POST(request: NextRequest) {
     const previousWarehouseId = asset.current_warehouse_id
     console.log('[move-to-val] Moviendo asset de', previousWarehouseId, 'a', warehouseId)
 
-    const { error: updateError } = await supabase
-      .from('assets')
-      .update({
-        current_warehouse_id: warehouseId,
-        updated_at: new Date().toISOString()
-      })
-      .eq('id', asset.id)
+    const { error: updateError } = await supabase.rpc('transfer_assets_bulk', {
+      p_destination_code: 'BOD-VAL',
+      p_asset_ids: [asset.id],
+      p_reason: 'Traslado a BOD-VAL'
+    })
 
     if (updateError) {
       console.error('[move-to-val] Error moviendo asset:', updateError)
@@ -112,10 +110,11 @@ export async function POST(request: NextRequest) {
     console.log('[move-to-val] Verificación:', verifyAsset)
 
     // Contar assets en BOD-VAL
-    const { count } = await supabase
-      .from('assets')
-      .select('id', { count: 'exact', head: true })
-      .eq('current_warehouse_id', warehouseId)
+    const { data: stockTotal } = await supabase
+      .from('warehouse_stock_totals')
+      .select('quantity')
+      .eq('warehouse_id', warehouseId)
+      .maybeSingle()
 
     return NextResponse.json({
       success: true,
@@ -128,7 +127,7 @@ export async function POST(request: NextRequest) {
         newWarehouse: warehouseId
       },
       verification: verifyAsset,
-      totalInBodVal: count
+      totalInBodVal: Number(stockTotal?.quantity ?? 0)
     })
 
   } catch (error) {
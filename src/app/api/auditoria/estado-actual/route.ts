@@ -14,7 +14,7 @@ export async function GET(request: NextRequest) {
   // Buscar en assets primero
   let { data, error } = await supabase
     .from('assets')
-    .select('id, current_warehouse_id, status, serial_number, internal_tag, location, updated_at, batch_id')
+    .select('id, current_warehouse_id, current_warehouse_since, status, serial_number, internal_tag, location, updated_at, batch_id')
     .or(`serial_number.eq.${serie},internal_tag.eq.${serie}`)
     .maybeSingle();
 
@@ -58,26 +58,8 @@ export async function GET(request: NextRequest) {
 
     console.log(`[API/estado-actual] Final ubicacion value: ${ubicacion || 'No disponible'}`);
 
-    // Obtener fecha en bodega desde inventory_movements
-    if (assetId && data.current_warehouse_id) {
-      const { data: movement } = await supabase
-        .from('inventory_movements')
-        .select('created_at')
-        .eq('asset_id', assetId)
-        .eq('to_warehouse_id', data.current_warehouse_id)
-        .order('created_at', { ascending: false })
-        .limit(1)
-        .maybeSingle();
-
-      if (movement?.created_at) {
-        fechaEnBodega = movement.created_at;
-      } else {
-        // Fallback: usar created_at del asset
-        fechaEnBodega = data.updated_at || '';
-      }
-    } else {
-      fechaEnBodega = data.updated_at || '';
-    }
+    // Fecha en bodega: current_warehouse_since la mantiene un trigger en assets
+    fechaEnBodega = (data.current_warehouse_id && data.current_warehouse_since) || data.updated_at || '';
 
     // Obtener box_number desde ticket_items
     if (assetId) {
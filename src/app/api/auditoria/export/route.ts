@@ -0,0 +1,138 @@
+import { createClient } from '@/lib/supabase/server'
+import { getSql } from '@/lib/db/postgres'
+import { NextResponse } from 'next/server'
+
+export const dynamic = 'force-dynamic'
+export const runtime = 'nodejs'
+
+const CURSOR_ROWS = 500
+
+const BASE_COLUMNS = [
+    'created_at', 'action', 'module', 'entity_type', 'entity_reference', 'description',
+    'user_name', 'user_email', 'user_role', 'ticket_code', 'batch_code', 'serial_number',
+    'ticket_id', 'batch_id', 'asset_id', 'changes_summary', 'id'
+] as const
+const DATA_COLUMNS = ['data_before', 'data_after'] as const
+
+const csvCell = (value: unknown) => {
+    if (value === null || value === undefined) return ''
+    const text = value instanceof Date
+        ? value.toISOString()
+        : typeof value === 'object' ? JSON.stringify(value) : String(value)
+    return /[",\n\r]/.test(text) ? `"${text.replace(/"/g, '""')}"` : text
+}
+
+// Exportación de auditoría sin cargar el resultado en memoria: lee
+// v_auditoria_detallada con un cursor del lado del servidor y va escribiendo
+// CSV o JSONL a medida que llegan las filas. Filtros: ticket (readable_id o
+// uuid), batch (internal_batch_id o uuid), serial (serial, etiqueta o
+// entity_reference), desde/hasta, modulo, accion. withData=1 incluye
+// data_before/data_after. Para XLSX usar export_audit.py.
+export async function GET(request: Request) {
+    const { searchParams } = new URL(request.url)
+    const format = (searchParams.get('format') || 'csv').toLowerCase()
+    const ticket = searchParams.get('ticket')?.trim() || null
+    const batch = searchParams.get('batch')?.trim() || null
+    const serial = searchParams.get('serial')?.trim() || null
+    const desde = searchParams.get('desde') || null
+    const hasta = searchParams.get('hasta') || null
+    const modulo = searchParams.get('modulo') || null
+    const accion = searchParams.get('accion') || null
+    const withData = searchParams.get('withData') === '1'
+
+    if (format !== 'csv' && format !== 'jsonl') {
+        return NextResponse.json({
+            error: 'Formato no soportado en línea; use csv o jsonl (XLSX: export_audit.py)'
+        }, { status: 400 })
+    }
+
+    const supabase = await createClient()
+    const { data: { user } } = await supabase.auth.getUser()
+    if (!user) {
+        return NextResponse.json({ error: 'No autorizado' }, { status: 401 })
+    }
+
+    let sql: ReturnType<typeof getSql>
+    try {
+        sql = getSql()
+    } catch (error) {
+        const message = error instanceof Error ? error.message : 'Sin conexión a la base de datos'
+        return NextResponse.json({ error: message }, { status: 500 })
+    }
+
+    const columns: string[] = [...BASE_COLUMNS, ...(withData ? DATA_COLUMNS : [])]
+
+    const query = sql`
+        SELECT
+            v.created_at, v.action, v.module, v.entity_type, v.entity_reference, v.description,
+            COALESCE(v.profile_name, v.user_name) AS user_name,
+            COALESCE(v.profile_email, v.user_email) AS user_email,
+            COALESCE(v.profile_role, v.user_role) AS user_role,
+            t.readable_id AS ticket_code, b.internal_batch_id AS batch_code, a.serial_number,
+            v.ticket_id, v.batch_id, v.asset_id, v.changes_summary, v.id
+            ${withData ? sql`, v.data_before, v.data_after` : sql``}
+        FROM v_auditoria_detallada v
+        LEFT JOIN operations_tickets t ON t.id = v.ticket_id
+        LEFT JOIN batches b ON b.id = v.batch_id
+        LEFT JOIN assets a ON a.id = v.asset_id
+        WHERE true
+        ${ticket ? sql`AND v.ticket_id IN (
+            SELECT id FROM operations_tickets WHERE id::text = ${ticket} OR readable_id ILIKE ${ticket}
+        )` : sql``}
+        ${batch ? sql`AND v.batch_id IN (
+            SELECT id FROM batches WHERE id::text = ${batch} OR internal_batch_id ILIKE ${batch}
+        )` : sql``}
+        ${serial ? sql`AND (
+            v.asset_id IN (SELECT id FROM assets WHERE serial_number = ${serial} OR internal_tag = ${serial})
+            OR v.entity_reference = ${serial}
+        )` : sql``}
+        ${desde ? sql`AND v.created_at >= ${desde}` : sql``}
+        ${hasta ? sql`AND v.created_at <= ${hasta}` : sql``}
+        ${modulo ? sql`AND v.module::text = ${modulo}` : sql``}
+        ${accion ? sql`AND v.action::text = ${accion}` : sql``}
+        ORDER BY v.created_at, v.id
+    `
+
+    const encoder = new TextEncoder()
+    const iterator = query.cursor(CURSOR_ROWS)[Symbol.asyncIterator]()
+    let headerSent = false
+
+    const stream = new ReadableStream<Uint8Array>({
+        async pull(controller) {
+            try {
+                if (!headerSent && format === 'csv') {
+                    headerSent = true
+                    controller.enqueue(encoder.encode(columns.join(',') + '\n'))
+                    return
+                }
+
+                const { value: rows, done } = await iterator.next()
+                if (done) {
+                    controller.close()
+                    return
+                }
+
+                const chunk = (rows as Record<string, unknown>[]).map((row) => format === 'csv'
+                    ? columns.map((column) => csvCell(row[column])).join(',') + '\n'
+                    : JSON.stringify(row) + '\n'
+                ).join('')
+                controller.enqueue(encoder.encode(chunk))
+            } catch (error) {
+                console.error('Audit export stream error:', error)
+                controller.error(error)
+            }
+        },
+        async cancel() {
+            await iterator.return?.()
+        }
+    })
+
+    const stamp = new Date().toISOString().slice(0, 10)
+    return new Response(stream, {
+        headers: {
+            'Content-Type': format === 'csv' ? 'text/csv; charset=utf-8' : 'application/x-ndjson; charset=utf-8',
+            'Content-Disposition': `attachment; filename="auditoria_${stamp}.${format}"`,
+            'Cache-Control': 'no-store'
+        }
+    })
+}
@@ -16,8 +16,8 @@ export async function POST(req: Request) {
             return NextResponse.json({ error: 'No autorizado' }, { status: 401 })
         }
 
-        // Call Transactional RPC - Using NAMED parameters to ensure strict matching
-        const { data, error } = await supabase.rpc('create_destruction_dispatch', {
+        // Set-based RPC: one statement per table, short transaction even for large dispatches
+        const { data, error } = await supabase.rpc('create_destruction_dispatch_bulk', {
             p_origin_warehouse: 'BOD-DES',
             p_client_id: clientId,
             p_driver_name: driverName || null,
@@ -36,7 +36,7 @@ export async function POST(req: Request) {
             message: 'Salida procesada correctamente',
             dispatch_id: (data as any)?.dispatch_id,
             dispatch_code: (data as any)?.dispatch_code,
-            count: assetIds.length
+            count: (data as any)?.count ?? assetIds.length
         })
     } catch (error: any) {
         console.error('Dispatch error:', error)
@@ -17,82 +17,40 @@ export async function POST(request: Request) {
             return NextResponse.json({ error: 'Falta código de bodega destino' }, { status: 400 })
         }
 
-        // 1. Obtener ID de la bodega destino
-        const { data: warehouse, error: whError } = await supabase
-            .from('warehouses')
-            .select('id, name')
-            .eq('code', destinationWarehouseCode)
-            .single()
-
-        if (whError || !warehouse) {
-            return NextResponse.json({ error: 'Bodega destino no encontrada' }, { status: 404 })
-        }
-
-        // 1.5 Validar que los equipos no estén destruidos
-        const { data: assetsToCheck } = await supabase
-            .from('assets')
-            .select('id, status, serial_number')
-            .in('id', assetIds)
-
-        const destroyedAssets = assetsToCheck?.filter(a => a.status === 'destroyed') || []
-        if (destroyedAssets.length > 0) {
-            const serials = destroyedAssets.map(a => a.serial_number).join(', ')
-            return NextResponse.json({
-                error: `No se pueden mover equipos destruidos: ${serials}`
-            }, { status: 400 })
-        }
-
-        // 2. Obtener bodega origen de los assets antes de actualizar
-        const { data: assetsBeforeUpdate } = await supabase
-            .from('assets')
-            .select('id, current_warehouse_id')
-            .in('id', assetIds)
-
         const transferDate = providedTransferDate ? new Date(providedTransferDate).toISOString() : new Date().toISOString()
+        const { data: { user } } = await supabase.auth.getUser()
 
-        // 3. Actualizar assets con fecha de traslado
-        const { error: updateError } = await supabase
-            .from('assets')
-            .update({
-                current_warehouse_id: warehouse.id,
-                last_transfer_date: transferDate,
-                // Si es bodega de destrucción, podríamos cambiar el status si se requiere
-                // status: destinationWarehouseCode === 'BOD-DES' ? 'ready_to_recycle' : undefined 
-                // Por ahora mantenemos status, solo movemos.
-            })
-            .in('id', assetIds)
+        // 1. Trasladar todos los equipos y registrar sus movimientos en una sola transacción
+        const { data: result, error: transferError } = await supabase.rpc('transfer_assets_bulk', {
+            p_destination_code: destinationWarehouseCode,
+            p_asset_ids: assetIds,
+            p_reason: reason || null,
+            p_reference_number: correlative || null,
+            p_transfer_date: transferDate,
+            p_created_by: user?.id || null
+        })
 
-        if (updateError) {
-            console.error('Error updating assets:', updateError)
+        if (transferError) {
+            console.error('Error transferring assets:', transferError)
+            const message = transferError.message || ''
+            if (message.includes('Bodega destino no encontrada')) {
+                return NextResponse.json({ error: 'Bodega destino no encontrada' }, { status: 404 })
+            }
+            if (message.includes('destruidos') || message.includes('No se seleccionaron')) {
+                return NextResponse.json({ error: message }, { status: 400 })
+            }
             return NextResponse.json({ error: 'Error al actualizar equipos' }, { status: 500 })
         }
 
-        // 4. Registrar movimientos en inventory_movements con fecha de traslado
-        const { data: { user } } = await supabase.auth.getUser()
-        const movements = assetIds.map(assetId => {
-            const asset = assetsBeforeUpdate?.find(a => a.id === assetId)
-            return {
-                asset_id: assetId,
-                from_warehouse_id: asset?.current_warehouse_id || null,
-                to_warehouse_id: warehouse.id,
-                movement_type: 'transfer',
-                transfer_date: transferDate,
-                notes: reason || null,
-                created_by: user?.id || null,
-                reference_number: correlative || null
-            }
-        })
-
-        const { error: movementsError } = await supabase
-            .from('inventory_movements')
-            .insert(movements)
-
-        if (movementsError) {
-            console.error('Error inserting movements:', movementsError)
-            // No fallar el proceso si solo falla el registro de movimientos
+        const transfer = result as {
+            destination_id: string
+            destination_name: string
+            moved: number
+            skipped: number
         }
+        const warehouse = { id: transfer.destination_id, name: transfer.destination_name }
 
-        // 5. Registrar Audit Log detallado
+        // 2. Registrar Audit Log detallado
         try {
             const { AuditService } = await import('@/lib/services/audit-service')
             await AuditService.registrar({
@@ -104,6 +62,8 @@ export async function POST(request: Request) {
                 entityReference: correlative || `TRAS-${new Date().getTime()}`,
                 additionalData: {
                     asset_count: assetIds.length,
+                    moved: transfer.moved,
+                    skipped: transfer.skipped,
                     reason,
                     correlative,
                     destination: warehouse.name,
@@ -114,7 +74,7 @@ export async function POST(request: Request) {
             console.error('Error recording audit:', auditError)
         }
 
-        return NextResponse.json({ success: true, count: assetIds.length, correlative })
+        return NextResponse.json({ success: true, count: transfer.moved, skipped: transfer.skipped, correlative })
     } catch (error) {
         console.error('Error interno:', error)
         return NextResponse.json({ error: 'Error interno del servidor' }, { status: 500 })
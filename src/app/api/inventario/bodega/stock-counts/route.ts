@@ -0,0 +1,72 @@
+import { createClient } from '@/lib/supabase/server'
+import { NextResponse } from 'next/server'
+
+export const dynamic = 'force-dynamic'
+
+// Conteo de equipos por bodega desde warehouse_stock_counters.
+// ?warehouse=BOD-VAL devuelve además el desglose por estado y tipo de activo.
+export async function GET(request: Request) {
+    try {
+        const { searchParams } = new URL(request.url)
+        const warehouseCode = searchParams.get('warehouse')?.trim() || null
+
+        const supabase = await createClient()
+
+        let totalsQuery = supabase
+            .from('warehouse_stock_totals')
+            .select('warehouse_id, code, name, quantity')
+            .eq('is_active', true)
+            .order('code', { ascending: true })
+
+        if (warehouseCode) {
+            totalsQuery = totalsQuery.eq('code', warehouseCode)
+        }
+
+        const { data: totals, error } = await totalsQuery
+
+        if (error) {
+            console.error('Error fetching stock counts:', error)
+            return NextResponse.json({ error: error.message }, { status: 500 })
+        }
+
+        const warehouses = (totals || []).map((row) => ({
+            warehouseId: row.warehouse_id,
+            code: row.code,
+            name: row.name,
+            quantity: Number(row.quantity ?? 0)
+        }))
+
+        if (!warehouseCode) {
+            return NextResponse.json({ warehouses })
+        }
+
+        if (warehouses.length === 0) {
+            return NextResponse.json({ error: 'Bodega no encontrada' }, { status: 404 })
+        }
+
+        const { data: breakdown, error: breakdownError } = await supabase
+            .from('warehouse_stock_counters')
+            .select('status, asset_type, quantity')
+            .eq('warehouse_id', warehouses[0].warehouseId)
+            .gt('quantity', 0)
+            .order('status', { ascending: true })
+            .order('asset_type', { ascending: true })
+
+        if (breakdownError) {
+            console.error('Error fetching stock breakdown:', breakdownError)
+            return NextResponse.json({ error: breakdownError.message }, { status: 500 })
+        }
+
+        return NextResponse.json({
+            ...warehouses[0],
+            breakdown: (breakdown || []).map((row) => ({
+                status: row.status || null,
+                assetType: row.asset_type || null,
+                quantity: Number(row.quantity ?? 0)
+            }))
+        })
+    } catch (error) {
+        const message = error instanceof Error ? error.message : 'Error obteniendo conteos de bodega'
+        return NextResponse.json({ error: message }, { status: 500 })
+    }
+}
@@ -3,28 +3,47 @@ import { createClient } from '@/lib/supabase/server'
 
 export const dynamic = 'force-dynamic'
 
-export async function GET() {
+const MAX_BOXES_PER_REQUEST = 1000
+
+// Reserva números de caja con reserve_box_numbers (secuencia en la base), así
+// dos usuarios de logística a la vez nunca reciben el mismo número. Cada
+// llamada consume números de la secuencia, por eso es POST y solo se llama
+// al crear una caja. Body: { ticketId?: uuid, count?: N } reserva N números
+// contiguos (firstBoxNumber..lastBoxNumber) registrados para el ticket.
+export async function POST(request: Request) {
     try {
+        const body = await request.json().catch(() => ({})) as { ticketId?: string | null; count?: number }
+        const ticketId = typeof body.ticketId === 'string' ? body.ticketId.trim() || null : null
+        const count = body.count === undefined ? 1 : Number(body.count)
+
+        if (!Number.isInteger(count) || count < 1 || count > MAX_BOXES_PER_REQUEST) {
+            return NextResponse.json({ error: 'Cantidad de cajas inválida' }, { status: 400 })
+        }
+
         const supabase = await createClient()
+        const { data: { user } } = await supabase.auth.getUser()
 
-        // Consultar el número de caja más alto en la tabla ticket_items
-        const { data, error } = await supabase
-            .from('ticket_items')
-            .select('box_number')
-            .order('box_number', { ascending: false })
-            .limit(1)
-            .maybeSingle()
+        const { data, error } = await supabase.rpc('reserve_box_numbers', {
+            p_ticket_id: ticketId,
+            p_quantity: count,
+            p_reserved_by: user?.id ?? null
+        })
 
         if (error) {
-            console.error('Error fetching max box number:', error)
+            console.error('Error reserving box numbers:', error)
             return NextResponse.json({ error: error.message }, { status: 500 })
         }
 
-        // Si hay datos, el siguiente es max + 1. Si no (null), iniciar en 10001
-        const currentMax = data?.box_number ?? 10000
-        const nextBoxNumber = currentMax >= 10000 ? currentMax + 1 : 10001
+        const range = (Array.isArray(data) ? data[0] : data) as { first_box: number; last_box: number } | null
+        if (!range) {
+            return NextResponse.json({ error: 'No se pudo reservar el número de caja' }, { status: 500 })
+        }
 
-        return NextResponse.json({ nextBoxNumber })
+        return NextResponse.json({
+            nextBoxNumber: range.first_box,
+            firstBoxNumber: range.first_box,
+            lastBoxNumber: range.last_box
+        })
     } catch (error) {
         const message = error instanceof Error ? error.message : 'Error obteniendo siguiente número de caja'
         return NextResponse.json({ error: message }, { status: 500 })
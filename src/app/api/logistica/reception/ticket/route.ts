@@ -0,0 +1,90 @@
+import { NextResponse } from 'next/server'
+import { createClient } from '@/lib/supabase/server'
+
+const RECEIVING_WAREHOUSE_CODE = 'BOD-REC'
+
+const isUuid = (value: string) => /^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$/i.test(value)
+
+interface TicketReceptionRequest {
+  ticketId?: string | null
+  ticketReadableId?: string | null
+  warehouseCode?: string | null
+  itemType?: string | null
+  boxNumbers?: Array<string | number> | null
+}
+
+// Recibe todas las cajas pendientes del ticket (o las indicadas) en una sola
+// transacción con save_ticket_reception y devuelve el código de cada caja.
+export async function POST(request: Request) {
+  try {
+    const body = (await request.json()) as TicketReceptionRequest
+    const explicitId = body.ticketId?.trim() || ''
+    const readableId = body.ticketReadableId?.trim() || ''
+
+    if (!explicitId && !readableId) {
+      return NextResponse.json({ error: 'Falta el ticket a procesar' }, { status: 400 })
+    }
+
+    let boxNumbers: number[] | null = null
+    if (Array.isArray(body.boxNumbers) && body.boxNumbers.length > 0) {
+      boxNumbers = body.boxNumbers.map((value) => Number.parseInt(String(value).replace(/\D/g, ''), 10))
+      if (boxNumbers.some((value) => Number.isNaN(value))) {
+        return NextResponse.json({ error: 'Número de caja inválido' }, { status: 400 })
+      }
+    }
+
+    const supabase = await createClient()
+
+    let ticketId = isUuid(explicitId) ? explicitId : null
+    if (!ticketId) {
+      const { data, error } = await supabase
+        .from('operations_tickets')
+        .select('id')
+        .ilike('readable_id', readableId || explicitId)
+        .maybeSingle()
+
+      if (error) {
+        throw new Error(error.message)
+      }
+      ticketId = data?.id ?? null
+    }
+
+    if (!ticketId) {
+      return NextResponse.json({ error: 'Ticket no encontrado' }, { status: 404 })
+    }
+
+    const { data, error } = await supabase.rpc('save_ticket_reception', {
+      p_ticket_id: ticketId,
+      p_warehouse_code: body.warehouseCode?.trim() || RECEIVING_WAREHOUSE_CODE,
+      p_item_type: body.itemType?.trim() || 'asset',
+      p_box_numbers: boxNumbers
+    })
+
+    if (error) {
+      throw new Error(error.message)
+    }
+
+    const boxes = ((data as Array<{
+      box_number: number
+      reception_code: string | null
+      moved_assets: number | null
+      warehouse_code: string | null
+    }>) || []).map((row) => ({
+      boxNumber: row.box_number,
+      code: row.reception_code,
+      movedAssets: Number(row.moved_assets ?? 0),
+      warehouseCode: row.warehouse_code ?? RECEIVING_WAREHOUSE_CODE
+    }))
+
+    return NextResponse.json({
+      success: true,
+      boxes,
+      movedAssets: boxes.reduce((sum, box) => sum + box.movedAssets, 0)
+    })
+  } catch (error) {
+    const message = error instanceof Error ? error.message : 'Error procesando la recepción'
+    const normalized = message.toLowerCase()
+    const status = normalized.includes('tipo de activo') || normalized.includes('no se encontraron items') ? 400 : 500
+    return NextResponse.json({ error: message }, { status })
+  }
+}
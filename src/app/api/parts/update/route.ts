@@ -6,7 +6,9 @@ type UpdatePartPayload = {
   sku: string
   description?: string | null
   location?: string | null
-  stock_quantity?: number
+  // Ajuste relativo (+n entra, -n sale); el stock absoluto no se escribe
+  // porque los despachos lo cambian en paralelo
+  stock_adjustment?: number
   min_stock_level?: number
 }
 
@@ -27,25 +29,41 @@ export async function POST(request: Request) {
   if (payload.location !== undefined) {
     updates.location = sanitize(payload.location)
   }
-  if (payload.stock_quantity !== undefined) {
-    updates.stock_quantity = Math.max(0, Math.floor(payload.stock_quantity))
-  }
   if (payload.min_stock_level !== undefined) {
     updates.min_stock_level = Math.max(0, Math.floor(payload.min_stock_level))
   }
 
-  if (Object.keys(updates).length === 0) {
+  const stockAdjustment = Math.trunc(payload.stock_adjustment ?? 0)
+
+  if (Object.keys(updates).length === 0 && stockAdjustment === 0) {
     return NextResponse.json({ success: false, error: 'No hay campos para actualizar' }, { status: 400 })
   }
 
   const supabase = await createClient()
-  const { error } = await supabase
-    .from('parts_catalog')
-    .update(updates)
-    .eq('sku', payload.sku)
 
-  if (error) {
-    return NextResponse.json({ success: false, error: error.message }, { status: 500 })
+  if (stockAdjustment !== 0) {
+    const { data: result, error: adjustError } = await supabase.rpc('adjust_part_stock', {
+      p_sku: payload.sku,
+      p_delta: stockAdjustment
+    })
+
+    if (adjustError || !result?.success) {
+      return NextResponse.json(
+        { success: false, error: adjustError?.message || result?.error || 'Error al ajustar stock' },
+        { status: adjustError ? 500 : 400 }
+      )
+    }
+  }
+
+  if (Object.keys(updates).length > 0) {
+    const { error } = await supabase
+      .from('parts_catalog')
+      .update(updates)
+      .eq('sku', payload.sku)
+
+    if (error) {
+      return NextResponse.json({ success: false, error: error.message }, { status: 500 })
+    }
   }
 
   revalidatePath('/dashboard/inventario/partes')
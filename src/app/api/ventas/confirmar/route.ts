@@ -0,0 +1,87 @@
+import { createClient } from '@/lib/supabase/server'
+import { NextResponse } from 'next/server'
+import { revalidatePath } from 'next/cache'
+import { setSession } from '@/lib/supabase/session'
+
+const MAX_ORDERS = 200
+
+const isUuid = (value: unknown): value is string =>
+    typeof value === 'string' && /^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$/i.test(value)
+
+// Confirma varias órdenes de venta en borrador con confirm_sales_bulk.
+// Cada orden se valida por separado: las que fallan vuelven con su error y
+// las demás quedan confirmadas. Los equipos apartados por un carrito distinto
+// de holdId hacen fallar su orden.
+export async function POST(request: Request) {
+    try {
+        const supabase = await createClient()
+        await setSession(supabase)
+        const body = await request.json()
+        const orderIds: unknown = body?.orderIds
+        // Carrito que armó las órdenes: sus reservas no bloquean la confirmación
+        const holdId: unknown = body?.holdId || null
+
+        if (!Array.isArray(orderIds) || orderIds.length === 0) {
+            return NextResponse.json({ error: 'No se seleccionaron órdenes' }, { status: 400 })
+        }
+
+        if (orderIds.length > MAX_ORDERS) {
+            return NextResponse.json({ error: `Máximo ${MAX_ORDERS} órdenes por solicitud` }, { status: 400 })
+        }
+
+        if (!orderIds.every(isUuid)) {
+            return NextResponse.json({ error: 'Identificador de orden inválido' }, { status: 400 })
+        }
+
+        if (holdId !== null && !isUuid(holdId)) {
+            return NextResponse.json({ error: 'Identificador de carrito inválido' }, { status: 400 })
+        }
+
+        const { data: { user } } = await supabase.auth.getUser()
+        if (!user) {
+            return NextResponse.json({ error: 'Usuario no autenticado' }, { status: 401 })
+        }
+
+        const { data: result, error } = await supabase.rpc('confirm_sales_bulk', {
+            p_order_ids: orderIds,
+            p_confirmed_by: user.id,
+            p_hold_id: holdId
+        })
+
+        if (error) {
+            console.error('Error confirming sales:', error)
+            return NextResponse.json({ error: 'Error al confirmar las ventas' }, { status: 500 })
+        }
+
+        const confirmation = result as {
+            confirmed: number
+            failed: number
+            units: number
+            orders: Array<{
+                order_id: string
+                order_number?: string
+                success: boolean
+                error?: string
+                items_count: number
+                warranty_end?: string
+            }>
+        }
+
+        if (confirmation.confirmed > 0) {
+            revalidatePath('/dashboard/ventas')
+            revalidatePath('/dashboard/inventario')
+            revalidatePath('/dashboard/finanzas')
+        }
+
+        return NextResponse.json({
+            success: confirmation.failed === 0,
+            confirmed: confirmation.confirmed,
+            failed: confirmation.failed,
+            units: confirmation.units,
+            orders: confirmation.orders
+        })
+    } catch (error) {
+        console.error('Error interno:', error)
+        return NextResponse.json({ error: 'Error interno del servidor' }, { status: 500 })
+    }
+}
@@ -1,5 +1,6 @@
 import { createClient } from '@/lib/supabase/server'
 import { NextResponse } from 'next/server'
+import { createHash } from 'crypto'
 
 export async function POST(request: Request) {
   try {
@@ -57,20 +58,27 @@ export async function POST(request: Request) {
     }
 
     const bucket = 'wipe-evidence'
-    const timestamp = Date.now()
-    const randomToken = Math.random().toString(36).slice(2, 8)
-    const safeName = file.name.replace(/[^a-zA-Z0-9._-]/g, '_')
-    const filePath = `${assetId}/${normalizedType}/${timestamp}-${randomToken}-${safeName}`
-
     const arrayBuffer = await file.arrayBuffer()
     const buffer = Buffer.from(arrayBuffer)
 
-    const { error: uploadError } = await supabase.storage
-      .from(bucket)
-      .upload(filePath, buffer, {
-        contentType: file.type,
-        upsert: false
-      })
+    // Almacenamiento por contenido: un archivo idéntico se guarda una sola vez
+    const contentHash = createHash('sha256').update(buffer).digest('hex')
+    const filePath = `blobs/${contentHash.slice(0, 2)}/${contentHash.slice(2, 4)}/${contentHash}`
+
+    const { data: existingBlob } = await supabase
+      .from('storage_blobs')
+      .select('hash, ref_count')
+      .eq('hash', contentHash)
+      .maybeSingle()
+
+    const { error: uploadError } = existingBlob && existingBlob.ref_count > 0
+      ? { error: null }
+      : await supabase.storage
+        .from(bucket)
+        .upload(filePath, buffer, {
+          contentType: file.type,
+          upsert: true
+        })
 
     if (uploadError) {
       console.error('Error uploading wipe evidence:', uploadError)
@@ -96,6 +104,30 @@ export async function POST(request: Request) {
       )
     }
 
+    // Se registra también un blob huérfano que se acaba de resubir, para
+    // reiniciar su periodo de gracia y cancelar un reclamo del recolector
+    if (!existingBlob || existingBlob.ref_count === 0) {
+      const { error: blobError } = await supabase.rpc('register_storage_blob', {
+        p_hash: contentHash,
+        p_bucket: bucket,
+        p_object_path: filePath,
+        p_size: file.size,
+        p_content_type: file.type || null
+      })
+
+      if (blobError) {
+        console.error('Error registering storage blob:', blobError)
+        // Sin fila en storage_blobs el objeto nunca se recolectaría
+        if (!existingBlob) {
+          await supabase.storage.from(bucket).remove([filePath])
+        }
+        return NextResponse.json(
+          { error: `Error registrando archivo: ${blobError.message}` },
+          { status: 500 }
+        )
+      }
+    }
+
     // Usar SQL directo para evitar problemas con schema cache
     const { data: insertedRecord, error: insertError } = await supabase.rpc('insert_wipe_evidence', {
       p_asset_id: assetId,
@@ -104,7 +136,8 @@ export async function POST(request: Request) {
       p_file_url: urlData.publicUrl,
       p_content_type: file.type || null,
       p_file_size: file.size,
-      p_uploaded_by: user?.id || null
+      p_uploaded_by: user?.id || null,
+      p_content_hash: contentHash
     })
 
     if (insertError) {
@@ -61,219 +61,98 @@ export interface WipeEvidenceRecord {
   uploaded_at: string
 }
 
-// Obtener activos pendientes de borrado (received o wiping)
+// Fila de search_wipe_assets / get_pending_wipe_assets
+// (20260319_wipe_station_search.sql)
+function toWipeAsset(row: any): WipeAsset {
+  return {
+    id: row.id,
+    internal_tag: row.internal_tag,
+    serial_number: row.serial_number,
+    asset_type: row.asset_type,
+    manufacturer: row.manufacturer,
+    model: row.model,
+    status: row.status as AssetStatus,
+    batch_id: row.batch_id,
+    batch_code: row.batch_code || 'N/A',
+    client_name: row.client_name || 'N/A',
+    wipe_started_at: row.wipe_started_at,
+    wipe_completed_at: row.wipe_completed_at,
+    wipe_certificate_id: row.wipe_certificate_id,
+    wipe_software: row.wipe_software,
+    created_at: row.created_at,
+    photoEvidenceCount: row.photo_count || 0,
+    xmlEvidenceCount: row.xml_count || 0,
+    pdfEvidenceCount: row.pdf_count || 0,
+  }
+}
+
+// Obtener activos pendientes de borrado (órdenes de trabajo en data_wipe)
 export async function getPendingWipeAssets(): Promise<{ data: WipeAsset[] | null; error: string | null }> {
   const supabase = await createClient()
 
   try {
-    const { data: workOrders, error: workOrdersError } = await supabase
-      .from('work_orders')
-      .select(`
-        asset:assets(
-          id,
-          internal_tag,
-          serial_number,
-          asset_type,
-          manufacturer,
-          model,
-          status,
-          batch_id,
-          wipe_started_at,
-          wipe_completed_at,
-          wipe_certificate_id,
-          wipe_software,
-          created_at,
-          batches (
-            internal_batch_id,
-            ticket_id
-          )
-        )
-      `)
-      .eq('status', 'data_wipe')
-      .order('created_at', { ascending: true })
-
-    if (workOrdersError) {
-      console.error('Error fetching pending wipe assets from work orders:', workOrdersError)
-      return { data: null, error: workOrdersError.message }
-    }
+    const { data, error } = await supabase.rpc('get_pending_wipe_assets')
 
-    const assetRows = (workOrders || [])
-      .map((workOrder: any) => workOrder.asset)
-      .filter(Boolean) as Array<Record<string, any>>
-    const pendingAssetRows = assetRows.filter((asset) => ['received', 'wiping'].includes(asset.status))
-    if (pendingAssetRows.length === 0) {
-      return { data: [], error: null }
-    }
-
-    const ticketIds = Array.from(new Set(pendingAssetRows.map((a) => a.batches?.ticket_id).filter(Boolean)))
-
-    const wipeAssetIds = pendingAssetRows.map((asset: any) => asset.id).filter(Boolean)
-    const evidenceCounts: Record<string, { photo: number; xml: number; pdf: number }> = {}
-    if (wipeAssetIds.length > 0) {
-      const { data: evidenceRows, error: evidenceError } = await supabase
-        .from('asset_wipe_evidence')
-        .select('asset_id, type')
-        .in('asset_id', wipeAssetIds)
-
-      if (evidenceError) {
-        console.error('Error fetching wipe evidence counts:', evidenceError)
-      } else {
-        evidenceRows?.forEach((row: any) => {
-          if (!row?.asset_id || !row?.type) return
-          const current = evidenceCounts[row.asset_id] || { photo: 0, xml: 0, pdf: 0 }
-          if (row.type === 'photo') {
-            current.photo += 1
-          } else if (row.type === 'xml') {
-            current.xml += 1
-          } else if (row.type === 'pdf') {
-            current.pdf += 1
-          }
-          evidenceCounts[row.asset_id] = current
-        })
-      }
-    }
-
-    // Consulta para obtener los nombres de clientes
-    let clientNames: Record<string, string> = {}
-
-    if (ticketIds.length > 0) {
-      const { data: tickets } = await supabase
-        .from('operations_tickets')
-        .select(`
-          id,
-          crm_entities (
-            name
-          )
-        `)
-        .in('id', ticketIds)
-
-      if (tickets) {
-        tickets.forEach((t: any) => {
-          clientNames[t.id] = t.crm_entities?.name || 'N/A'
-        })
-      }
+    if (error) {
+      console.error('Error fetching pending wipe assets:', error)
+      return { data: null, error: error.message }
     }
 
-    // Transformar datos para la UI
-    const transformedData: WipeAsset[] = assetRows.map((asset: any) => ({
-      id: asset.id,
-      internal_tag: asset.internal_tag,
-      serial_number: asset.serial_number,
-      asset_type: asset.asset_type,
-      manufacturer: asset.manufacturer,
-      model: asset.model,
-      status: asset.status,
-      batch_id: asset.batch_id,
-      batch_code: asset.batches?.internal_batch_id || 'N/A',
-      client_name: clientNames[asset.batches?.ticket_id] || 'N/A',
-      wipe_started_at: asset.wipe_started_at,
-      wipe_completed_at: asset.wipe_completed_at,
-      wipe_certificate_id: asset.wipe_certificate_id,
-      wipe_software: asset.wipe_software,
-      created_at: asset.created_at,
-      photoEvidenceCount: evidenceCounts[asset.id]?.photo || 0,
-      xmlEvidenceCount: evidenceCounts[asset.id]?.xml || 0,
-      pdfEvidenceCount: evidenceCounts[asset.id]?.pdf || 0,
-    }))
-
-    return { data: transformedData, error: null }
+    return { data: (data || []).map(toWipeAsset), error: null }
   } catch (err) {
     console.error('Unexpected error in getPendingWipeAssets:', err)
     return { data: null, error: err instanceof Error ? err.message : 'Error inesperado' }
   }
 }
 
-// Buscar activo por serial o tag
-export async function searchAssetBySerial(query: string): Promise<{ data: WipeAsset | null; error: string | null }> {
+// Rango mínimo de search_wipe_assets que se acepta sin confirmar (1.0
+// exacto, 0.9 prefijo); por debajo son referencias de ticket o parecidos
+const PREFIX_MATCH_RANK = 0.9
+const WIPE_CANDIDATE_LIMIT = 10
+
+// Buscar activo por serial o tag. Solo se acepta directamente un serial/tag
+// exacto o un prefijo que identifique un único equipo; lo demás se devuelve
+// en candidates para que el operador elija.
+export async function searchAssetBySerial(query: string): Promise<{
+  data: WipeAsset | null
+  candidates: WipeAsset[]
+  error: string | null
+}> {
   const supabase = await createClient()
 
   try {
-    const { data, error } = await supabase
-      .from('assets')
-      .select(`
-        id,
-        internal_tag,
-        serial_number,
-        asset_type,
-        manufacturer,
-        model,
-        status,
-        batch_id,
-        wipe_started_at,
-        wipe_completed_at,
-        wipe_certificate_id,
-        wipe_software,
-        created_at,
-        batches (
-          internal_batch_id,
-          ticket_id
-        )
-      `)
-      .or(`serial_number.ilike.%${query}%,internal_tag.ilike.%${query}%`)
-      .in('status', ['received', 'wiping'])
-      .limit(1)
-      .single()
+    const { data, error } = await supabase.rpc('search_wipe_assets', {
+      p_query: query,
+      p_statuses: ['received', 'wiping'],
+      p_limit: WIPE_CANDIDATE_LIMIT
+    })
 
     if (error) {
-      if (error.code === 'PGRST116') {
-        return { data: null, error: 'No se encontró ningún activo con ese serial/tag pendiente de borrado' }
-      }
       console.error('Error searching asset:', error)
-      return { data: null, error: error.message }
+      return { data: null, candidates: [], error: error.message }
     }
 
-    // Obtener nombre del cliente si hay ticket
-    let clientName = 'N/A'
-    const ticketId = (data.batches as any)?.ticket_id
-
-    if (ticketId) {
-      const { data: ticket } = await supabase
-        .from('operations_tickets')
-        .select('crm_entities(name)')
-        .eq('id', ticketId)
-        .single()
-
-      clientName = (ticket?.crm_entities as any)?.name || 'N/A'
+    const rows: any[] = data || []
+    if (rows.length === 0) {
+      return { data: null, candidates: [], error: 'No se encontró ningún activo con ese serial/tag pendiente de borrado' }
     }
 
-    const evidenceResult = await supabase
-      .from('asset_wipe_evidence')
-      .select('type')
-      .eq('asset_id', data.id)
-
-    const evidenceCounts = { photo: 0, xml: 0, pdf: 0 }
-    evidenceResult.data?.forEach((row: any) => {
-      if (!row?.type) return
-      if (row.type === 'photo') evidenceCounts.photo += 1
-      if (row.type === 'xml') evidenceCounts.xml += 1
-      if (row.type === 'pdf') evidenceCounts.pdf += 1
-    })
-
-    const transformedData: WipeAsset = {
-      id: data.id,
-      internal_tag: data.internal_tag,
-      serial_number: data.serial_number,
-      asset_type: data.asset_type,
-      manufacturer: data.manufacturer,
-      model: data.model,
-      status: data.status as AssetStatus,
-      batch_id: data.batch_id,
-      batch_code: (data.batches as any)?.internal_batch_id || 'N/A',
-      client_name: clientName,
-      wipe_started_at: data.wipe_started_at,
-      wipe_completed_at: data.wipe_completed_at,
-      wipe_certificate_id: data.wipe_certificate_id,
-      wipe_software: data.wipe_software,
-      created_at: data.created_at,
-      photoEvidenceCount: evidenceCounts.photo,
-      xmlEvidenceCount: evidenceCounts.xml,
-      pdfEvidenceCount: evidenceCounts.pdf,
+    // Dos equipos con el mismo rango (p. ej. dos seriales con ese prefijo)
+    // también se dejan al operador
+    const [top, second] = rows
+    const isUnique = !second || second.match_rank < top.match_rank
+    if (top.match_rank >= PREFIX_MATCH_RANK && isUnique) {
+      return { data: toWipeAsset(top), candidates: [], error: null }
     }
 
-    return { data: transformedData, error: null }
+    return {
+      data: null,
+      candidates: rows.map(toWipeAsset),
+      error: 'No hay un serial/tag que coincida exactamente; confirma el equipo en la lista'
+    }
   } catch (err) {
     console.error('Unexpected error in searchAssetBySerial:', err)
-    return { data: null, error: err instanceof Error ? err.message : 'Error inesperado' }
+    return { data: null, candidates: [], error: err instanceof Error ? err.message : 'Error inesperado' }
   }
 }
 
@@ -47,6 +47,7 @@ export function WipeWorkstation({ initialAssets }: WipeWorkstationProps) {
   const [searchQuery, setSearchQuery] = useState('')
   const [searchResult, setSearchResult] = useState<WipeAsset | null>(null)
   const [searchError, setSearchError] = useState<string | null>(null)
+  const [searchCandidates, setSearchCandidates] = useState<WipeAsset[]>([])
   const [isSearching, setIsSearching] = useState(false)
 
   // Modal state
@@ -70,11 +71,13 @@ export function WipeWorkstation({ initialAssets }: WipeWorkstationProps) {
     setIsSearching(true)
     setSearchError(null)
     setSearchResult(null)
+    setSearchCandidates([])
 
-    const { data, error } = await searchAssetBySerial(searchQuery.trim())
+    const { data, candidates, error } = await searchAssetBySerial(searchQuery.trim())
 
     if (error) {
       setSearchError(error)
+      setSearchCandidates(candidates)
     } else if (data) {
       setSearchResult(data)
     }
@@ -87,9 +90,17 @@ export function WipeWorkstation({ initialAssets }: WipeWorkstationProps) {
     setSearchQuery('')
     setSearchResult(null)
     setSearchError(null)
+    setSearchCandidates([])
     searchInputRef.current?.focus()
   }
 
+  // El operador confirma uno de los equipos parecidos
+  const handlePickCandidate = (asset: WipeAsset) => {
+    setSearchResult(asset)
+    setSearchError(null)
+    setSearchCandidates([])
+  }
+
   // Abrir modal de inicio de borrado
   const handleOpenStart = (asset: WipeAsset) => {
     setSelectedAsset(asset)
@@ -347,6 +358,27 @@ export function WipeWorkstation({ initialAssets }: WipeWorkstationProps) {
             </div>
           )}
 
+          {searchCandidates.length > 0 && (
+            <div className="mt-3 divide-y divide-surface-800 border border-surface-700 rounded-xl overflow-hidden">
+              {searchCandidates.map((candidate) => (
+                <button
+                  key={candidate.id}
+                  type="button"
+                  onClick={() => handlePickCandidate(candidate)}
+                  className="w-full flex items-center justify-between gap-4 px-4 py-3 text-left hover:bg-surface-800 transition-colors"
+                >
+                  <div>
+                    <p className="text-white font-semibold">{candidate.serial_number || candidate.internal_tag}</p>
+                    <p className="text-surface-400 text-sm">
+                      {candidate.internal_tag} • {candidate.manufacturer} {candidate.model} • {candidate.batch_code}
+                    </p>
+                  </div>
+                  {renderStatusBadge(candidate.status)}
+                </button>
+              ))}
+            </div>
+          )}
+
           {searchResult && (
             <div className="mt-4 p-4 bg-emerald-500/10 border border-emerald-500/30 rounded-xl">
               <div className="flex items-center justify-between">
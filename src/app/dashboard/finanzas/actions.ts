@@ -872,35 +872,25 @@ export async function getSettlementById(id: string) {
 export async function getFinancialSummary() {
   const supabase = await createClient()
 
-  // Total de liquidaciones finalizadas
-  const { data: settlements } = await supabase
-    .from('settlements')
-    .select('total_revenue, total_expenses, net_profit')
-    .eq('status', 'finalized')
-
-  const totalRevenue = settlements?.reduce((sum, s) => sum + (s.total_revenue || 0), 0) || 0
-  const totalExpenses = settlements?.reduce((sum, s) => sum + (s.total_expenses || 0), 0) || 0
-  const totalProfit = settlements?.reduce((sum, s) => sum + (s.net_profit || 0), 0) || 0
-
-  // Ventas del mes actual
-  const startOfMonth = new Date()
-  startOfMonth.setDate(1)
-  startOfMonth.setHours(0, 0, 0, 0)
+  // Totales precalculados en financial_summary_snapshot / financial_monthly_sales
+  const { data, error } = await supabase.rpc('get_financial_summary').single()
 
-  const { data: monthSales } = await supabase
-    .from('sales_orders')
-    .select('total_amount')
-    .eq('status', 'confirmed')
-    .gte('created_at', startOfMonth.toISOString())
+  if (error) {
+    console.error('Error fetching financial summary:', error)
+  }
 
-  const monthRevenue = monthSales?.reduce((sum, s) => sum + (s.total_amount || 0), 0) || 0
+  const summary = (data || {}) as Record<string, unknown>
+  const totalRevenue = Number(summary.total_revenue) || 0
+  const totalExpenses = Number(summary.total_expenses) || 0
+  const totalProfit = Number(summary.net_profit) || 0
+  const monthRevenue = Number(summary.month_revenue) || 0
 
   return {
     totalRevenue,
     totalExpenses,
     totalProfit,
     monthRevenue,
-    settlementCount: settlements?.length || 0,
+    settlementCount: Number(summary.settlement_count) || 0,
     avgMargin: totalRevenue > 0 ? Math.round((totalProfit / totalRevenue) * 100) : 0
   }
 }
@@ -328,3 +328,37 @@ export async function getInventoryMaster(): Promise<{
 
   return { data: result, error: null }
 }
+
+// =====================================================
+// INSTANTÁNEA ABC (inventory_analytics.py)
+// =====================================================
+
+export interface InventoryAbcSnapshotRow {
+  abc_class: 'A' | 'B' | 'C'
+  model_count: number
+  total_units: number
+  total_value: number
+  avg_rotation_days: number | null
+  units_over_90_days: number
+  computed_at: string
+}
+
+// Resumen por clase calculado por el job de analítica; vacío si aún no corre
+export async function getInventoryAbcSnapshot(): Promise<InventoryAbcSnapshotRow[]> {
+  const supabase = await createClient()
+
+  const { data, error } = await supabase
+    .from('inventory_abc_snapshot')
+    .select('abc_class, model_count, total_units, total_value, avg_rotation_days, units_over_90_days, computed_at')
+    .order('abc_class', { ascending: true })
+
+  if (error) {
+    console.error('Error fetching ABC snapshot:', error)
+    return []
+  }
+
+  return (data || []).map((row) => ({
+    ...row,
+    total_value: Number(row.total_value ?? 0)
+  })) as InventoryAbcSnapshotRow[]
+}
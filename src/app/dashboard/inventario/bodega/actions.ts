@@ -40,484 +40,285 @@ interface Warehouse {
   status?: string | null
 }
 
-interface ExpectedItemColor {
-  batch_id: string
-  product_type: string | null
-  brand: string | null
-  model: string | null
-  color: string | null
+export interface WarehouseAssetFilters {
+  warehouse?: string
+  grade?: string
+  status?: string
+  search?: string
 }
 
-const normalize = (value?: string | null) => value?.trim().toLowerCase() || ''
-
-function getExpectedItemColor(items: ExpectedItemColor[] | undefined, asset: any): string | null {
-  if (!items || items.length === 0) return null
-
-  const assetBrand = normalize(asset.manufacturer)
-  const assetModel = normalize(asset.model)
-  const assetType = normalize(asset.asset_type)
-
-  const match = items.find((item) => {
-    if (!item.color) return false
-    const itemColor = normalize(item.color)
-    if (!itemColor) return false
-
-    const itemBrand = normalize(item.brand)
-    const itemModel = normalize(item.model)
-    const itemType = normalize(item.product_type)
-
-    const matchesBrandModel = itemBrand && itemModel && itemBrand === assetBrand && itemModel === assetModel
-    const matchesModelType = itemModel && itemModel === assetModel && itemType && itemType === assetType
-    const matchesType = itemType && itemType === assetType
-
-    return matchesBrandModel || matchesModelType || matchesType
-  })
-
-  if (match) {
-    return match.color
-  }
-
-  const fallback = items.find((item) => item.color && item.color.trim().length > 0)
-  return fallback?.color || null
+export interface WarehouseAssetCursor {
+  createdAt: string
+  id: string
 }
 
-export async function getWarehouseAssets(): Promise<WarehouseAsset[]> {
-  const supabase = await createClient()
-
-  // Obtener activos con bodega asignada
-  const { data, error } = await supabase
-    .from('assets')
-    .select(`
-      id,
-      serial_number,
-      internal_tag,
-      manufacturer,
-      model,
-      asset_type,
-      color,
-      status,
-      condition_grade,
-      created_at,
-      batch_id,
-      specifications,
-      current_warehouse_id,
-      sales_price,
-      last_transfer_date
-    `)
-    .not('current_warehouse_id', 'is', null)
-    .order('created_at', { ascending: false })
-
-  if (error) {
-    console.error('Error fetching warehouse assets:', error)
-    return []
-  }
-
-  if (!data || data.length === 0) return []
+export interface WarehouseAssetPage {
+  assets: WarehouseAsset[]
+  nextCursor: WarehouseAssetCursor | null
+  error?: string
+}
 
-  // Obtener IDs únicos
-  // Obtener IDs únicos
-  const warehouseIds = Array.from(new Set(data.map(a => a.current_warehouse_id).filter(Boolean)))
-  const batchIds = Array.from(new Set(data.map(a => a.batch_id).filter(Boolean)))
+const WAREHOUSE_PAGE_SIZE = 100
+const WAREHOUSE_PAGE_MAX = 500
+
+interface TicketItemData {
+  id: string | null
+  asset_id: string | null
+  collected_serial: string | null
+  color_detail: string | null
+  classification_rec: string | null
+  classification_f: string | null
+  classification_c: string | null
+  processor: string | null
+  bios_version: string | null
+  ram_capacity: string | null
+  ram_type: string | null
+  disk_capacity: string | null
+  disk_type: string | null
+  keyboard_type: string | null
+  keyboard_version: string | null
+  observations: string | null
+  box_number: number | null
+}
 
-  // Obtener bodegas
-  let warehousesMap: Record<string, { code: string; name: string }> = {}
-  if (warehouseIds.length > 0) {
-    const { data: warehouses } = await supabase
-      .from('warehouses')
-      .select('id, code, name')
-      .in('id', warehouseIds)
+interface WorkOrderClassifications {
+  rec_classification: string | null
+  f_classification: string | null
+  c_classification: string | null
+}
 
-    warehouses?.forEach(w => {
-      warehousesMap[w.id] = { code: w.code, name: w.name }
-    })
-  }
+// Fila de get_warehouse_assets_page: activo ya unido con bodega, lote,
+// ticket, color esperado, llegada a la bodega, renglón de recepción y QC
+interface WarehouseAssetPageRow {
+  id: string
+  serial_number: string | null
+  internal_tag: string
+  manufacturer: string | null
+  model: string | null
+  asset_type: string | null
+  color: string | null
+  status: string
+  condition_grade: string | null
+  created_at: string | null
+  batch_id: string | null
+  specifications: Record<string, unknown> | null
+  current_warehouse_id: string | null
+  sales_price: number | null
+  last_transfer_date: string | null
+  warehouse_code: string | null
+  warehouse_name: string | null
+  batch_code: string | null
+  batch_location: string | null
+  container_type: string | null
+  ticket_id: string | null
+  ticket_code: string | null
+  expected_color: string | null
+  warehouse_received_at: string | null
+  ticket_item: TicketItemData | null
+  accessories: { name: string; quantity: number }[] | null
+  work_order_classifications: WorkOrderClassifications | null
+}
 
-  // Obtener lotes con ubicación, tipo de contenedor y ticket
-  let batchesMap: Record<string, {
-    code: string
-    location: string | null
-    container_type: string | null
-    ticket_id: string | null
-    ticket_code: string | null
-  }> = {}
-  if (batchIds.length > 0) {
-    const { data: batches } = await supabase
-      .from('batches')
-      .select(`
-        id, 
-        internal_batch_id, 
-        location, 
-        container_type,
-        ticket_id
-      `)
-      .in('id', batchIds)
-
-    // Obtener IDs de tickets
-    const ticketIds = batches?.map(b => b.ticket_id).filter(Boolean) || []
-    let ticketsMap: Record<string, string> = {}
-
-    if (ticketIds.length > 0) {
-      const { data: tickets } = await supabase
-        .from('operations_tickets')
-        .select('id, readable_id')
-        .in('id', ticketIds)
-
-      tickets?.forEach(t => {
-        ticketsMap[t.id] = t.readable_id
-      })
+function toWarehouseAsset(asset: WarehouseAssetPageRow, userRole: string): WarehouseAsset {
+  const specs = (asset.specifications ?? null) as Record<string, unknown> | null;
+  const specColor = specs && typeof (specs as Record<string, unknown>).color === 'string'
+    ? (specs as Record<string, unknown>).color
+    : null;
+
+  // Datos de ticket_items como fallback
+  const ticketItem = asset.ticket_item;
+  const workOrder = asset.work_order_classifications;
+
+  // Construir specifications combinando datos existentes con fallback de ticket_items
+  let finalSpecs: Record<string, unknown> = specs ? { ...specs } : {};
+
+  if (ticketItem) {
+    // Workshop classifications (REC de Ingreso)
+    const existingClassifications = (finalSpecs.workshop_classifications as Record<string, unknown>) || {};
+    const hasExistingRec = existingClassifications.rec;
+    const hasExistingF = existingClassifications.f;
+    const hasExistingC = existingClassifications.c;
+
+    // Actualizar solo los campos que faltan
+    if (!hasExistingRec || !hasExistingF || !hasExistingC) {
+      finalSpecs.workshop_classifications = {
+        rec: existingClassifications.rec || ticketItem.classification_rec || undefined,
+        f: existingClassifications.f || ticketItem.classification_f || undefined,
+        c: existingClassifications.c || ticketItem.classification_c || undefined
+      };
     }
 
-    batches?.forEach(b => {
-      batchesMap[b.id] = {
-        code: b.internal_batch_id,
-        location: b.location,
-        container_type: b.container_type,
-        ticket_id: b.ticket_id,
-        ticket_code: b.ticket_id ? ticketsMap[b.ticket_id] : null
-      }
-    })
-  }
+    // Hardware specs
+    const existingHardware = (finalSpecs.hardware_specs as Record<string, unknown>) || {};
+    const hasExistingHardware = existingHardware.processor || existingHardware.ram_capacity || existingHardware.disk_capacity;
 
-  // Obtener colores definidos en los items esperados del lote
-  const expectedItemsMap: Record<string, ExpectedItemColor[]> = {}
-  if (batchIds.length > 0) {
-    const { data: expectedItems } = await supabase
-      .from('batch_expected_items')
-      .select('batch_id, product_type, brand, model, color')
-      .in('batch_id', batchIds)
-
-    expectedItems?.forEach((item) => {
-      if (!item.batch_id) return
-      expectedItemsMap[item.batch_id] = expectedItemsMap[item.batch_id] || []
-      expectedItemsMap[item.batch_id].push(item)
-    })
-  }
-
-  // Registrar la última fecha en que el activo llegó a su bodega actual
-  const assetIds = data.map((asset: any) => asset.id).filter(Boolean)
-  const serialNumbers = data.map((asset: any) => asset.serial_number).filter(Boolean)
-  const movementDates: Record<string, string | null> = {}
-
-  if (assetIds.length > 0) {
-    const { data: movements } = await supabase
-      .from('inventory_movements')
-      .select('asset_id, to_warehouse_id, created_at')
-      .in('asset_id', assetIds)
-      .order('created_at', { ascending: false })
+    // Agregar accesorios si existen
+    const accessoriesArr = asset.accessories || [];
 
-    const assetsById = data.reduce((acc: Record<string, any>, asset: any) => {
-      acc[asset.id] = asset
-      return acc
-    }, {})
-
-    // Primero marcar con fecha de creación como fallback
-    data.forEach((asset: any) => {
-      movementDates[asset.id] = asset.created_at
-    })
-
-    const recorded = new Set<string>();
-    // Forzar el tipo any para iterar sin problemas de linter
-    (movements as any[])?.forEach((movement: any) => {
-      if (!movement.asset_id || recorded.has(movement.asset_id)) return
-      const asset = assetsById[movement.asset_id]
-      if (!asset) return
-      if (movement.to_warehouse_id === asset.current_warehouse_id) {
-        movementDates[movement.asset_id] = movement.created_at
-        recorded.add(movement.asset_id)
+    if (!hasExistingHardware) {
+      if (ticketItem.processor || ticketItem.ram_capacity || ticketItem.disk_capacity || ticketItem.keyboard_type || accessoriesArr.length > 0) {
+        finalSpecs.hardware_specs = {
+          processor: ticketItem.processor || undefined,
+          bios_version: ticketItem.bios_version || undefined,
+          ram_capacity: ticketItem.ram_capacity || undefined,
+          ram_type: ticketItem.ram_type || undefined,
+          disk_capacity: ticketItem.disk_capacity || undefined,
+          disk_type: ticketItem.disk_type || undefined,
+          keyboard_type: ticketItem.keyboard_type || undefined,
+          keyboard_version: ticketItem.keyboard_version || undefined,
+          accessories: accessoriesArr.length > 0 ? accessoriesArr : undefined
+        };
       }
-    })
-  } else {
-    // Fallback: usar fecha de creación del asset
-    data.forEach((asset: any) => {
-      movementDates[asset.id] = asset.created_at
-    })
-  }
+    } else if (accessoriesArr.length > 0) {
+      // Si ya hay hardware_specs, solo agrega accesorios
+      finalSpecs.hardware_specs = {
+        ...existingHardware,
+        accessories: accessoriesArr
+      };
+    }
 
-  // Obtener datos de clasificación directamente de ticket_items como fallback
-  interface TicketItemData {
-    id: string | null
-    asset_id: string | null
-    collected_serial: string | null
-    color_detail: string | null
-    classification_rec: string | null
-    classification_f: string | null
-    classification_c: string | null
-    processor: string | null
-    bios_version: string | null
-    ram_capacity: string | null
-    ram_type: string | null
-    disk_capacity: string | null
-    disk_type: string | null
-    keyboard_type: string | null
-    keyboard_version: string | null
-    observations: string | null
-    box_number: number | null
+    // Reception notes
+    if (!finalSpecs.reception_notes && ticketItem.observations) {
+      finalSpecs.reception_notes = ticketItem.observations;
+    }
   }
 
-  const ticketItemsMap: Record<string, TicketItemData> = {}
+  // Agregar clasificaciones de Salida (Control de Calidad)
+  if (workOrder?.rec_classification || workOrder?.f_classification || workOrder?.c_classification) {
+    if (workOrder.rec_classification) {
+      finalSpecs.rec_classification_out = workOrder.rec_classification
+    }
+    if (workOrder.f_classification) {
+      finalSpecs.f_classification_out = workOrder.f_classification
+    }
+    if (workOrder.c_classification) {
+      finalSpecs.c_classification_out = workOrder.c_classification
+    }
 
-  // Obtener clasificaciones de Salida (Control de Calidad) de work_orders
-  interface WorkOrderClassifications {
-    rec_classification: string | null
-    f_classification: string | null
-    c_classification: string | null
-  }
-  const workOrdersMap: Record<string, WorkOrderClassifications> = {}
-
-  if (assetIds.length > 0) {
-    const { data: workOrders } = await supabase
-      .from('work_orders')
-      .select('asset_id, rec_classification, f_classification, c_classification, updated_at')
-      .in('asset_id', assetIds)
-      .or('rec_classification.not.is.null,f_classification.not.is.null,c_classification.not.is.null')
-      .order('updated_at', { ascending: false })
-
-    workOrders?.forEach((wo) => {
-      if (wo.asset_id && !workOrdersMap[wo.asset_id]) {
-        if (wo.rec_classification || wo.f_classification || wo.c_classification) {
-          workOrdersMap[wo.asset_id] = {
-            rec_classification: wo.rec_classification,
-            f_classification: wo.f_classification,
-            c_classification: wo.c_classification
-          }
-        }
+    // Si no hay REC en workshop_classifications, usar el del work_order como fallback
+    const existingClassifications = (finalSpecs.workshop_classifications as Record<string, unknown>) || {}
+    if (!existingClassifications.rec && workOrder.rec_classification) {
+      finalSpecs.workshop_classifications = {
+        ...existingClassifications,
+        rec: workOrder.rec_classification
       }
-    })
+    }
   }
 
-  if (assetIds.length > 0 || serialNumbers.length > 0) {
-    // Buscar por asset_id, incluyendo box_number
-    const { data: ticketItemsByAssetId } = await supabase
-      .from('ticket_items')
-      .select(`
-        id,
-        asset_id,
-        collected_serial,
-        color_detail,
-        classification_rec,
-        classification_f,
-        classification_c,
-        processor,
-        bios_version,
-        ram_capacity,
-        ram_type,
-        disk_capacity,
-        disk_type,
-        keyboard_type,
-        keyboard_version,
-        observations,
-        box_number
-      `)
-      .in('asset_id', assetIds)
-
-    ticketItemsByAssetId?.forEach((ti) => {
-      if (ti.asset_id) {
-        ticketItemsMap[ti.asset_id] = ti
-      }
-    })
-
-    // Buscar por serial_number para assets que no tienen asset_id en ticket_items, incluyendo box_number
-    const { data: ticketItemsBySerial } = await supabase
-      .from('ticket_items')
-      .select(`
-        id,
-        asset_id,
-        collected_serial,
-        color_detail,
-        classification_rec,
-        classification_f,
-        classification_c,
-        processor,
-        bios_version,
-        ram_capacity,
-        ram_type,
-        disk_capacity,
-        disk_type,
-        keyboard_type,
-        keyboard_version,
-        observations,
-        box_number
-      `)
-      .in('collected_serial', serialNumbers)
-
-    // Crear mapa de serial -> asset_id
-    const serialToAssetId: Record<string, string> = {}
-    data.forEach((asset: any) => {
-      if (asset.serial_number && asset.id) {
-        serialToAssetId[asset.serial_number] = asset.id
-      }
-    })
-
-    ticketItemsBySerial?.forEach((ti) => {
-      if (ti.collected_serial) {
-        const assetId = serialToAssetId[ti.collected_serial]
-        if (assetId && !ticketItemsMap[assetId]) {
-          ticketItemsMap[assetId] = ti
-        }
-      }
-    })
+  // Determinar el color final
+  const ticketColor = ticketItem?.color_detail || null
+  const finalColor = asset.color || ticketColor || asset.expected_color || (typeof specColor === 'string' ? specColor : null)
+
+  const rawAsset = {
+    id: asset.id,
+    serial_number: asset.serial_number,
+    internal_tag: asset.internal_tag,
+    manufacturer: asset.manufacturer,
+    model: asset.model,
+    asset_type: asset.asset_type,
+    color: finalColor,
+    status: asset.status,
+    condition_grade: asset.condition_grade,
+    created_at: asset.created_at,
+    batch_id: asset.batch_id,
+    batch_code: asset.batch_code,
+    batch_location: asset.batch_location,
+    container_type: asset.container_type,
+    ticket_id: asset.ticket_id,
+    ticket_code: asset.ticket_code,
+    warehouse_code: asset.warehouse_code,
+    warehouse_name: asset.warehouse_name,
+    current_warehouse_id: asset.current_warehouse_id,
+    warehouse_received_at: asset.warehouse_received_at || null,
+    last_transfer_date: asset.last_transfer_date || null,
+    sales_price: asset.sales_price,
+    specifications: Object.keys(finalSpecs).length > 0 ? finalSpecs : null,
+    box_number: ticketItem?.box_number ?? null,
+    wipe_status: null,
+    wiped_at: null
   }
 
+  // Aplicar filtrado por rol (RBAC)
+  return sanitizeAssetData(rawAsset, userRole)
+}
 
-  // Obtener accesorios para todos los ticket_items
-  const ticketItemIds = Object.values(ticketItemsMap).map(ti => ti && ti.id).filter(Boolean);
-  let accessoriesByTicketItem: Record<string, { name: string, quantity: number }[]> = {};
-  if (ticketItemIds.length > 0) {
-    const supabase = await createClient();
-    const { data: accessoriesData } = await supabase
-      .from('ticket_item_accessories')
-      .select('ticket_item_id, quantity, catalog_accessories(name)')
-      .in('ticket_item_id', ticketItemIds);
-    if (accessoriesData) {
-      for (const acc of accessoriesData) {
-        if (!acc.ticket_item_id) continue;
-        accessoriesByTicketItem[acc.ticket_item_id] = accessoriesByTicketItem[acc.ticket_item_id] || [];
-        const accData = acc.catalog_accessories as any
-        const accessoriesName = Array.isArray(accData) ? accData[0]?.name : accData?.name
-        accessoriesByTicketItem[acc.ticket_item_id].push({
-          name: accessoriesName || 'Accesorio',
-          quantity: acc.quantity || 1
-        });
-      }
-    }
-  }
-
-  // Obtener rol del usuario actual para RBAC
+async function getCurrentUserRole(supabase: Awaited<ReturnType<typeof createClient>>): Promise<string> {
   const { data: { user } } = await supabase.auth.getUser()
+  if (!user) return 'technician'
+
   const { data: profile } = await supabase
     .from('profiles')
     .select('role')
-    .eq('id', user?.id)
+    .eq('id', user.id)
     .single()
 
-  const userRole = profile?.role || 'technician'
-
-  return data.map((asset: any) => {
-    const specs = (asset.specifications ?? null) as Record<string, unknown> | null;
-    const specColor = specs && typeof (specs as Record<string, unknown>).color === 'string'
-      ? (specs as Record<string, unknown>).color
-      : null;
-    const batchExpectedColor = getExpectedItemColor(expectedItemsMap[asset.batch_id], asset);
-
-    // Obtener datos de ticket_items como fallback
-    const ticketItem = ticketItemsMap[asset.id];
-    const workOrder = workOrdersMap[asset.id];
-
-    // Construir specifications combinando datos existentes con fallback de ticket_items
-    let finalSpecs = specs ? { ...specs } : {};
-
-    if (ticketItem) {
-      // Workshop classifications (REC de Ingreso)
-      const existingClassifications = (finalSpecs.workshop_classifications as Record<string, unknown>) || {};
-      const hasExistingRec = existingClassifications.rec;
-      const hasExistingF = existingClassifications.f;
-      const hasExistingC = existingClassifications.c;
-
-      // Actualizar solo los campos que faltan
-      if (!hasExistingRec || !hasExistingF || !hasExistingC) {
-        finalSpecs.workshop_classifications = {
-          rec: existingClassifications.rec || ticketItem.classification_rec || undefined,
-          f: existingClassifications.f || ticketItem.classification_f || undefined,
-          c: existingClassifications.c || ticketItem.classification_c || undefined
-        };
-      }
-
-      // Hardware specs
-      const existingHardware = (finalSpecs.hardware_specs as Record<string, unknown>) || {};
-      const hasExistingHardware = existingHardware.processor || existingHardware.ram_capacity || existingHardware.disk_capacity;
-
-      // Agregar accesorios si existen
-      let accessoriesArr: { name: string; quantity: number }[] = [];
-      if (ticketItem.id && accessoriesByTicketItem[ticketItem.id]) {
-        accessoriesArr = accessoriesByTicketItem[ticketItem.id];
-      }
+  return profile?.role || 'technician'
+}
 
-      if (!hasExistingHardware) {
-        if (ticketItem.processor || ticketItem.ram_capacity || ticketItem.disk_capacity || ticketItem.keyboard_type || accessoriesArr.length > 0) {
-          finalSpecs.hardware_specs = {
-            processor: ticketItem.processor || undefined,
-            bios_version: ticketItem.bios_version || undefined,
-            ram_capacity: ticketItem.ram_capacity || undefined,
-            ram_type: ticketItem.ram_type || undefined,
-            disk_capacity: ticketItem.disk_capacity || undefined,
-            disk_type: ticketItem.disk_type || undefined,
-            keyboard_type: ticketItem.keyboard_type || undefined,
-            keyboard_version: ticketItem.keyboard_version || undefined,
-            accessories: accessoriesArr.length > 0 ? accessoriesArr : undefined
-          };
-        }
-      } else if (accessoriesArr.length > 0) {
-        // Si ya hay hardware_specs, solo agrega accesorios
-        finalSpecs.hardware_specs = {
-          ...existingHardware,
-          accessories: accessoriesArr
-        };
-      }
+/**
+ * Una página de activos en bodega (get_warehouse_assets_page), más recientes
+ * primero. Para la siguiente página pasar el nextCursor devuelto.
+ */
+export async function getWarehouseAssetsPage(
+  filters: WarehouseAssetFilters = {},
+  cursor: WarehouseAssetCursor | null = null,
+  limit: number = WAREHOUSE_PAGE_SIZE
+): Promise<WarehouseAssetPage> {
+  const supabase = await createClient()
+  const pageSize = Math.min(Math.max(limit, 1), WAREHOUSE_PAGE_MAX - 1)
+
+  const [{ data, error }, userRole] = await Promise.all([
+    supabase.rpc('get_warehouse_assets_page', {
+      p_warehouse_code: filters.warehouse || null,
+      p_grade: filters.grade || null,
+      p_status: filters.status || null,
+      p_search: filters.search?.trim() || null,
+      p_after_created_at: cursor?.createdAt ?? null,
+      p_after_id: cursor?.id ?? null,
+      // Una fila extra para saber si hay más páginas
+      p_limit: pageSize + 1
+    }),
+    getCurrentUserRole(supabase)
+  ])
 
-      // Reception notes
-      if (!finalSpecs.reception_notes && ticketItem.observations) {
-        finalSpecs.reception_notes = ticketItem.observations;
-      }
-    }
+  if (error) {
+    console.error('Error fetching warehouse assets:', error)
+    return { assets: [], nextCursor: null, error: error.message }
+  }
 
-    // Agregar clasificaciones de Salida (Control de Calidad)
-    if (workOrder?.rec_classification || workOrder?.f_classification || workOrder?.c_classification) {
-      if (workOrder.rec_classification) {
-        finalSpecs.rec_classification_out = workOrder.rec_classification
-      }
-      if (workOrder.f_classification) {
-        finalSpecs.f_classification_out = workOrder.f_classification
-      }
-      if (workOrder.c_classification) {
-        finalSpecs.c_classification_out = workOrder.c_classification
-      }
+  const rows = (data || []) as WarehouseAssetPageRow[]
+  const pageRows = rows.slice(0, pageSize)
+  const last = pageRows[pageRows.length - 1]
 
-      // Si no hay REC en workshop_classifications, usar el del work_order como fallback
-      const existingClassifications = (finalSpecs.workshop_classifications as Record<string, unknown>) || {}
-      if (!existingClassifications.rec && workOrder.rec_classification) {
-        finalSpecs.workshop_classifications = {
-          ...existingClassifications,
-          rec: workOrder.rec_classification
-        }
-      }
-    }
+  return {
+    assets: pageRows.map((row) => toWarehouseAsset(row, userRole)),
+    nextCursor: rows.length > pageSize && last?.created_at
+      ? { createdAt: last.created_at, id: last.id }
+      : null
+  }
+}
 
-    // Determinar el color final
-    const ticketColor = ticketItem?.color_detail || null
-    const finalColor = asset.color || ticketColor || batchExpectedColor || (typeof specColor === 'string' ? specColor : null)
-
-    const rawAsset = {
-      id: asset.id,
-      serial_number: asset.serial_number,
-      internal_tag: asset.internal_tag,
-      manufacturer: asset.manufacturer,
-      model: asset.model,
-      asset_type: asset.asset_type,
-      color: finalColor,
-      status: asset.status,
-      condition_grade: asset.condition_grade,
-      created_at: asset.created_at,
-      batch_id: asset.batch_id,
-      batch_code: asset.batch_id ? batchesMap[asset.batch_id]?.code : null,
-      batch_location: asset.batch_id ? batchesMap[asset.batch_id]?.location : null,
-      container_type: asset.batch_id ? batchesMap[asset.batch_id]?.container_type : null,
-      ticket_id: asset.batch_id ? batchesMap[asset.batch_id]?.ticket_id : null,
-      ticket_code: asset.batch_id ? batchesMap[asset.batch_id]?.ticket_code : null,
-      warehouse_code: asset.current_warehouse_id ? warehousesMap[asset.current_warehouse_id]?.code : null,
-      warehouse_name: asset.current_warehouse_id ? warehousesMap[asset.current_warehouse_id]?.name : null,
-      current_warehouse_id: asset.current_warehouse_id,
-      warehouse_received_at: movementDates[asset.id] || null,
-      last_transfer_date: asset.last_transfer_date || null,
-      sales_price: asset.sales_price,
-      specifications: Object.keys(finalSpecs).length > 0 ? finalSpecs : null,
-      box_number: ticketItem?.box_number ?? null,
-      wipe_status: null,
-      wiped_at: null
+/**
+ * Todos los activos que cumplen los filtros, recorriendo las páginas.
+ * Solo para exportaciones; las pantallas usan getWarehouseAssetsPage.
+ * Si una página falla se devuelve el error y no una lista incompleta.
+ */
+export async function getWarehouseAssets(
+  filters: WarehouseAssetFilters = {}
+): Promise<{ data: WarehouseAsset[]; error: string | null }> {
+  const assets: WarehouseAsset[] = []
+  let cursor: WarehouseAssetCursor | null = null
+
+  do {
+    const page: WarehouseAssetPage = await getWarehouseAssetsPage(filters, cursor, WAREHOUSE_PAGE_MAX - 1)
+    if (page.error) {
+      return { data: [], error: page.error }
     }
+    assets.push(...page.assets)
+    cursor = page.nextCursor
+  } while (cursor)
 
-    // Aplicar filtrado por rol (RBAC)
-    return sanitizeAssetData(rawAsset, userRole)
-  })
+  return { data: assets, error: null }
 }
 
 export async function getAccessoryLookup(): Promise<Record<string, string>> {
@@ -554,6 +355,31 @@ export async function getWarehouses(): Promise<Warehouse[]> {
   return data || []
 }
 
+export interface WarehouseStockTotal {
+  warehouse_id: string
+  code: string
+  name: string
+  quantity: number
+}
+
+// Cantidad de equipos por bodega desde warehouse_stock_counters, sin recorrer assets
+export async function getWarehouseStockTotals(): Promise<WarehouseStockTotal[]> {
+  const supabase = await createClient()
+
+  const { data, error } = await supabase
+    .from('warehouse_stock_totals')
+    .select('warehouse_id, code, name, quantity')
+    .eq('is_active', true)
+    .order('code', { ascending: true })
+
+  if (error) {
+    console.error('Error fetching warehouse stock totals:', error)
+    return []
+  }
+
+  return (data || []).map((row) => ({ ...row, quantity: Number(row.quantity ?? 0) }))
+}
+
 import { setSession } from '@/lib/supabase/session'
 
 // Asignar precio a todos los assets de un lote en una bodega específica (diviendo el precio total)
@@ -101,45 +101,21 @@ const formatTransportLabel = (asset: WarehouseAsset) => {
   return pieces.join(' | ')
 }
 
-const applyFilters = (
-  asset: WarehouseAsset,
-  gradeFilter: string,
-  warehouseFilter: string,
-  searchTerm: string
-) => {
-  if (gradeFilter && (asset.condition_grade || '').toUpperCase() !== gradeFilter) {
-    return false
-  }
-  if (warehouseFilter && asset.warehouse_code !== warehouseFilter) {
-    return false
-  }
-  if (searchTerm) {
-    const haystack = [
-      asset.serial_number,
-      asset.manufacturer,
-      asset.model,
-      asset.ticket_code,
-      asset.batch_code,
-      asset.batch_location
-    ]
-      .filter(Boolean)
-      .some((value) => value?.toLowerCase().includes(searchTerm))
-
-    if (!haystack) return false
-  }
-  return true
-}
-
 export async function GET(req: NextRequest) {
   const { searchParams } = req.nextUrl
   const gradeFilter = (searchParams.get('grade') || '').toUpperCase()
   const warehouseFilter = searchParams.get('warehouse') || ''
   const searchTerm = (searchParams.get('search') || '').trim().toLowerCase()
 
-  const assets = await getWarehouseAssets()
-  const filteredAssets = assets.filter((asset) =>
-    applyFilters(asset, gradeFilter, warehouseFilter, searchTerm)
-  )
+  const { data: filteredAssets, error } = await getWarehouseAssets({
+    grade: gradeFilter || undefined,
+    warehouse: warehouseFilter || undefined,
+    search: searchTerm || undefined
+  })
+
+  if (error) {
+    return NextResponse.json({ error: `No se pudo exportar la bodega: ${error}` }, { status: 500 })
+  }
 
   const sheetData = filteredAssets.map((asset) => {
     const hardwareSpecs = getHardwareSpecs(asset)
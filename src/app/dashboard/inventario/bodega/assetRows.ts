@@ -0,0 +1,149 @@
+import { formatBodegaDate } from '@/lib/formatBodegaDate'
+import type { WarehouseAsset } from './actions'
+
+// Filas y secciones de la tabla de bodega. Se usan en page.tsx para la
+// primera página y en WarehouseAssetTable al cargar las siguientes.
+
+export type WorkshopClassifications = { rec?: string; c?: string; f?: string }
+export type HardwareSpecs = {
+  processor?: string
+  ram_capacity?: string
+  ram_type?: string
+  disk_capacity?: string
+  disk_type?: string
+  keyboard_type?: string
+  keyboard_version?: string
+  bios_version?: string
+}
+
+export type WarehouseAssetRow = WarehouseAsset & {
+  inputClassifications: WorkshopClassifications
+  outputClassifications: WorkshopClassifications
+  hardwareSpecs: HardwareSpecs
+  receptionNotes?: string
+  formattedReceivedDate: string | null
+  formattedTransferDate: string | null
+}
+
+export type WarehouseSection = {
+  key: string
+  code: string | null
+  name: string | null
+  status?: string | null
+  total?: number
+  assets: WarehouseAssetRow[]
+}
+
+type WarehouseInfo = { code: string; status?: string | null }
+
+function getInputClassifications(asset: WarehouseAsset): WorkshopClassifications {
+  const specs = asset.specifications as any
+
+  let rec: string | undefined
+  let f: string | undefined
+  let c: string | undefined
+
+  if (specs?.workshop_classifications) {
+    const wc = specs.workshop_classifications
+    rec = wc.rec && wc.rec !== '$undefined' ? wc.rec : undefined
+    f = wc.f && wc.f !== '$undefined' ? wc.f : undefined
+    c = wc.c && wc.c !== '$undefined' ? wc.c : undefined
+  }
+
+  // Fallback a otros campos si existen
+  if (!rec && specs?.rec) rec = specs.rec
+  if (!f && specs?.f) f = specs.f
+  if (!c && specs?.c) c = specs.c
+
+  return { rec, f, c }
+}
+
+function getOutputClassifications(asset: WarehouseAsset): WorkshopClassifications {
+  const specs = asset.specifications as any
+  if (!specs) return {}
+
+  // Clasificaciones de salida provienen de control de calidad (QC)
+  // Se guardan con el sufijo _out en specifications
+  const rec = specs.rec_classification_out && specs.rec_classification_out !== '$undefined'
+    ? specs.rec_classification_out
+    : undefined
+  const c = specs.c_classification_out && specs.c_classification_out !== '$undefined'
+    ? specs.c_classification_out
+    : undefined
+  const f = specs.f_classification_out && specs.f_classification_out !== '$undefined'
+    ? specs.f_classification_out
+    : undefined
+
+  return { rec, f, c }
+}
+
+function getHardwareSpecs(asset: WarehouseAsset): HardwareSpecs {
+  const specs = asset.specifications as any
+  if (!specs || !specs.hardware_specs) return {}
+  const hw = specs.hardware_specs as any
+  return {
+    processor: hw.processor,
+    ram_capacity: hw.ram_capacity,
+    ram_type: hw.ram_type,
+    disk_capacity: hw.disk_capacity,
+    disk_type: hw.disk_type,
+    keyboard_type: hw.keyboard_type,
+    keyboard_version: hw.keyboard_version,
+    bios_version: hw.bios_version
+  }
+}
+
+function getReceptionNotes(asset: WarehouseAsset): string | undefined {
+  const specs = asset.specifications as any
+  return specs?.reception_notes
+}
+
+export function toWarehouseAssetRow(asset: WarehouseAsset): WarehouseAssetRow {
+  const receivedDate = asset.warehouse_received_at || asset.created_at
+
+  return {
+    ...asset,
+    inputClassifications: getInputClassifications(asset),
+    outputClassifications: getOutputClassifications(asset),
+    hardwareSpecs: getHardwareSpecs(asset),
+    receptionNotes: getReceptionNotes(asset),
+    formattedReceivedDate: receivedDate ? formatBodegaDate(receivedDate) : null,
+    formattedTransferDate: asset.last_transfer_date ? formatBodegaDate(asset.last_transfer_date) : null
+  }
+}
+
+type SectionRow = { warehouse_code: string | null; warehouse_name: string | null }
+type SectionOf<T> = Omit<WarehouseSection, 'assets'> & { assets: T[] }
+
+/**
+ * Agrega filas a las secciones por bodega sin perder el orden de llegada.
+ * Las secciones existentes se conservan (y su total, si lo traen).
+ */
+export function appendToWarehouseSections<T extends SectionRow>(
+  sections: SectionOf<T>[],
+  rows: T[],
+  warehouses: WarehouseInfo[]
+): SectionOf<T>[] {
+  const next = sections.map((section) => ({ ...section, assets: [...section.assets] }))
+  const byKey = new Map(next.map((section) => [section.key, section]))
+
+  rows.forEach((asset) => {
+    const key = asset.warehouse_code || 'SIN_BODEGA'
+    let section = byKey.get(key)
+    if (!section) {
+      const warehouseInfo = warehouses.find((w) => w.code === asset.warehouse_code)
+      section = {
+        key,
+        code: asset.warehouse_code,
+        name: asset.warehouse_name,
+        status: warehouseInfo?.status || 'activa',
+        assets: []
+      }
+      byKey.set(key, section)
+      next.push(section)
+    }
+    section.assets.push(asset)
+  })
+
+  return next
+}
@@ -2,7 +2,7 @@
 
 import { useCallback, useState } from 'react'
 import Link from 'next/link'
-import { Package, Printer, Warehouse, X, Truck, Trash2, AlertTriangle, Download, FileText, ShieldCheck, Settings, Check, LogOut } from 'lucide-react'
+import { Package, Printer, Warehouse, X, Truck, Trash2, AlertTriangle, Download, FileText, ShieldCheck, Settings, Check, LogOut, Loader2 } from 'lucide-react'
 import { cn } from '@/lib/utils'
 import { Text } from '@/components/ui/Text'
 import { FormLabel } from '@/components/ui/FormLabel'
@@ -12,6 +12,8 @@ import MoveItemsModal from '@/components/MoveItemsModal'
 import DestructionModal from '@/components/DestructionModal'
 import DestructionDispatchModal from './DestructionDispatchModal'
 import { useToast } from '@/context/ToastContext'
+import { getWarehouseAssetsPage, type WarehouseAssetCursor, type WarehouseAssetFilters } from '../actions'
+import { appendToWarehouseSections, toWarehouseAssetRow } from '../assetRows'
 
 type WorkshopClassifications = { rec?: string; f?: string; c?: string }
 type HardwareSpecs = {
@@ -109,6 +111,8 @@ type WarehouseAssetRow = {
   batch_location: string | null
   container_type: string | null
   ticket_code: string | null
+  warehouse_code: string | null
+  warehouse_name: string | null
   inputClassifications: WorkshopClassifications
   outputClassifications: WorkshopClassifications
   hardwareSpecs: HardwareSpecs
@@ -127,6 +131,7 @@ type WarehouseSection = {
   name: string | null
   code: string | null
   status?: string | null
+  total?: number
   assets: WarehouseAssetRow[]
 }
 
@@ -172,6 +177,9 @@ const QC_TESTS = [
 
 type WarehouseAssetTableProps = {
   sections: WarehouseSection[]
+  filters?: WarehouseAssetFilters
+  nextCursor?: WarehouseAssetCursor | null
+  warehouses?: { code: string; status?: string | null }[]
 }
 
 const getQCStatusLabel = (value: boolean | null | undefined) => {
@@ -198,7 +206,12 @@ const formatTimestamp = (value?: string | null) => {
   })
 }
 
-export default function WarehouseAssetTable({ sections }: WarehouseAssetTableProps) {
+export default function WarehouseAssetTable({
+  sections: initialSections,
+  filters = {},
+  nextCursor: initialCursor = null,
+  warehouses = []
+}: WarehouseAssetTableProps) {
   // Column Visibility
   const [visibleColumns, setVisibleColumns] = useState<Record<string, boolean>>(() => {
     const initial: Record<string, boolean> = {};
@@ -214,6 +227,31 @@ export default function WarehouseAssetTable({ sections }: WarehouseAssetTablePro
 
   const { toast } = useToast()
 
+  // Paginación: page.tsx entrega la primera página, el resto se pide al bajar
+  const [sections, setSections] = useState<WarehouseSection[]>(initialSections)
+  const [nextCursor, setNextCursor] = useState<WarehouseAssetCursor | null>(initialCursor)
+  const [loadingMore, setLoadingMore] = useState(false)
+
+  const loadMore = useCallback(async () => {
+    if (!nextCursor || loadingMore) return
+    setLoadingMore(true)
+    try {
+      const page = await getWarehouseAssetsPage(filters, nextCursor)
+      if (page.error) {
+        // Se conserva el cursor para poder reintentar
+        toast.error('Error al cargar', 'No se pudieron cargar más equipos')
+        return
+      }
+      setSections((prev) => appendToWarehouseSections<WarehouseAssetRow>(prev, page.assets.map(toWarehouseAssetRow), warehouses))
+      setNextCursor(page.nextCursor)
+    } catch (error) {
+      console.error('Error al cargar más equipos:', error)
+      toast.error('Error al cargar', 'No se pudieron cargar más equipos')
+    } finally {
+      setLoadingMore(false)
+    }
+  }, [filters, nextCursor, loadingMore, warehouses, toast])
+
   const [selectedAsset, setSelectedAsset] = useState<WarehouseAssetRow | null>(null)
   const [isRemovingAsset, setIsRemovingAsset] = useState<string | null>(null)
   const [historyCache, setHistoryCache] = useState<Record<string, AssetHistoryPayload>>({})
@@ -547,6 +585,7 @@ export default function WarehouseAssetTable({ sections }: WarehouseAssetTablePro
               <span className="bg-white/20 px-4 py-1.5 rounded-full text-white font-semibold flex items-center gap-2">
                 <Package className="w-4 h-4" />
                 {section.assets.length}
+                {section.total && section.total > section.assets.length ? ` / ${section.total}` : ''}
               </span>
 
               <button
@@ -1024,6 +1063,19 @@ export default function WarehouseAssetTable({ sections }: WarehouseAssetTablePro
       ))
       }
 
+      {nextCursor && (
+        <div className="flex justify-center">
+          <button
+            onClick={loadMore}
+            disabled={loadingMore}
+            className="flex items-center gap-2 px-6 py-3 rounded-2xl border-2 border-gray-100 dark:border-gray-800 text-[10px] font-black uppercase tracking-widest text-gray-600 dark:text-gray-300 hover:bg-gray-100 dark:hover:bg-gray-800 transition-all disabled:opacity-50"
+          >
+            {loadingMore && <Loader2 className="w-4 h-4 animate-spin" />}
+            {loadingMore ? 'Cargando...' : 'Cargar más equipos'}
+          </button>
+        </div>
+      )}
+
       {/* Floating Action Bar for Selection */}
       {
         selectedAssetIds.size > 0 && (
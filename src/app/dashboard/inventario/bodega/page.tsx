@@ -1,7 +1,7 @@
-import { Package, ArrowLeft, Warehouse } from 'lucide-react'
+import { Package, ArrowLeft, Warehouse, AlertTriangle } from 'lucide-react'
 import Link from 'next/link'
-import { getWarehouseAssets, getWarehouses, type WarehouseAsset } from './actions'
-import { formatBodegaDate } from '@/lib/formatBodegaDate'
+import { getWarehouseAssetsPage, getWarehouses, getWarehouseStockTotals } from './actions'
+import { appendToWarehouseSections, toWarehouseAssetRow } from './assetRows'
 import WarehouseAssetTable from './components/WarehouseAssetTable'
 import ExcelExportButton from './components/ExcelExportButton'
 
@@ -15,105 +15,24 @@ type WarehouseFilterParams = {
 
 export const dynamic = 'force-dynamic'
 
-type WorkshopClassifications = { rec?: string; c?: string; f?: string }
-type HardwareSpecs = {
-  processor?: string
-  ram_capacity?: string
-  ram_type?: string
-  disk_capacity?: string
-  disk_type?: string
-  keyboard_type?: string
-  keyboard_version?: string
-  bios_version?: string
-}
-
-type WarehouseAssetRow = WarehouseAsset & {
-  inputClassifications: WorkshopClassifications
-  outputClassifications: WorkshopClassifications
-  hardwareSpecs: HardwareSpecs
-  receptionNotes?: string
-  formattedReceivedDate: string | null
-  formattedTransferDate: string | null
-}
-
-type WarehouseSection = {
-  key: string
-  code: string | null
-  name: string | null
-  status?: string | null
-  assets: WarehouseAssetRow[]
-}
-
-// Helper functions based on component usage
-function getInputClassifications(asset: WarehouseAsset): WorkshopClassifications {
-  const specs = asset.specifications as any
-
-  let rec: string | undefined
-  let f: string | undefined
-  let c: string | undefined
-
-  if (specs?.workshop_classifications) {
-    const wc = specs.workshop_classifications
-    rec = wc.rec && wc.rec !== '$undefined' ? wc.rec : undefined
-    f = wc.f && wc.f !== '$undefined' ? wc.f : undefined
-    c = wc.c && wc.c !== '$undefined' ? wc.c : undefined
-  }
-
-  // Fallback a otros campos si existen
-  if (!rec && specs?.rec) rec = specs.rec
-  if (!f && specs?.f) f = specs.f
-  if (!c && specs?.c) c = specs.c
-
-  return { rec, f, c }
-}
-
-function getOutputClassifications(asset: WarehouseAsset): WorkshopClassifications {
-  const specs = asset.specifications as any
-  if (!specs) return {}
-
-  // Clasificaciones de salida provienen de control de calidad (QC)
-  // Se guardan con el sufijo _out en specifications
-  const rec = specs.rec_classification_out && specs.rec_classification_out !== '$undefined'
-    ? specs.rec_classification_out
-    : undefined
-  const c = specs.c_classification_out && specs.c_classification_out !== '$undefined'
-    ? specs.c_classification_out
-    : undefined
-  const f = specs.f_classification_out && specs.f_classification_out !== '$undefined'
-    ? specs.f_classification_out
-    : undefined
-
-  return { rec, f, c }
-}
-
-function getHardwareSpecs(asset: WarehouseAsset): HardwareSpecs {
-  const specs = asset.specifications as any
-  if (!specs || !specs.hardware_specs) return {}
-  const hw = specs.hardware_specs as any
-  return {
-    processor: hw.processor,
-    ram_capacity: hw.ram_capacity,
-    ram_type: hw.ram_type,
-    disk_capacity: hw.disk_capacity,
-    disk_type: hw.disk_type,
-    keyboard_type: hw.keyboard_type,
-    keyboard_version: hw.keyboard_version,
-    bios_version: hw.bios_version
-  }
-}
-
-function getReceptionNotes(asset: WarehouseAsset): string | undefined {
-  const specs = asset.specifications as any
-  return specs?.reception_notes
-}
-
 export default async function BodegaPage({
   searchParams
 }: {
   searchParams: WarehouseFilterParams
 }) {
   const { grade: gradeFilter, warehouse: warehouseFilter, search: searchTerm } = searchParams
-  const [allAssets, warehouses] = await Promise.all([getWarehouseAssets(), getWarehouses()])
+  const filters = {
+    grade: gradeFilter || undefined,
+    warehouse: warehouseFilter || undefined,
+    search: searchTerm || undefined
+  }
+
+  // Solo la primera página; la tabla pide las siguientes con el cursor
+  const [firstPage, warehouses, stockTotals] = await Promise.all([
+    getWarehouseAssetsPage(filters),
+    getWarehouses(),
+    getWarehouseStockTotals()
+  ])
 
   const gradeOptions = ['A', 'B', 'C', 'D', 'F']
   const gradeLabels: Record<string, string> = {
@@ -124,74 +43,21 @@ export default async function BodegaPage({
     F: 'Scrap'
   }
 
-  const filteredAssets = allAssets.filter((asset) => {
-    if (gradeFilter && asset.condition_grade !== gradeFilter) {
-      return false
-    }
-    if (warehouseFilter && asset.warehouse_code !== warehouseFilter) {
-      return false
-    }
-    if (searchTerm) {
-      const searchLower = searchTerm.toLowerCase()
-      const haystack = [
-        asset.serial_number,
-        asset.manufacturer,
-        asset.model,
-        asset.ticket_code,
-        asset.batch_code,
-        asset.batch_location
-      ]
-        .filter(Boolean)
-        .some((value) => value!.toLowerCase().includes(searchLower))
-
-      if (!haystack) return false
-    }
-    return true
-  })
-
-  const enrichedAssets: WarehouseAssetRow[] = filteredAssets.map((asset) => {
-    const inputClassifications = getInputClassifications(asset)
-    const outputClassifications = getOutputClassifications(asset)
-    const hardwareSpecs = getHardwareSpecs(asset)
-    const receptionNotes = getReceptionNotes(asset)
-    const receivedDate = asset.warehouse_received_at || asset.created_at
-    const formattedReceivedDate = receivedDate ? formatBodegaDate(receivedDate) : null
-    const formattedTransferDate = asset.last_transfer_date ? formatBodegaDate(asset.last_transfer_date) : null
-
-    return {
-      ...asset,
-      inputClassifications,
-      outputClassifications,
-      hardwareSpecs,
-      receptionNotes,
-      formattedReceivedDate,
-      formattedTransferDate
-    }
-  })
-
-  const assetsByWarehouse = enrichedAssets.reduce((acc, asset) => {
-    const key = asset.warehouse_code || 'SIN_BODEGA'
-    if (!acc[key]) {
-      acc[key] = {
-        code: asset.warehouse_code,
-        name: asset.warehouse_name,
-        assets: [] as WarehouseAssetRow[]
-      }
-    }
-    acc[key].assets.push(asset)
+  const isFilterActive = Boolean(gradeFilter || searchTerm)
+  const totalsByCode = stockTotals.reduce<Record<string, number>>((acc, total) => {
+    acc[total.code] = (acc[total.code] || 0) + total.quantity
     return acc
-  }, {} as Record<string, { code: string | null; name: string | null; assets: WarehouseAssetRow[] }>)
-
-  const warehouseSections: WarehouseSection[] = Object.entries(assetsByWarehouse).map(([key, warehouse]) => {
-    const warehouseInfo = warehouses.find(w => w.code === warehouse.code)
-    return {
-      key,
-      code: warehouse.code,
-      name: warehouse.name,
-      status: warehouseInfo?.status || 'activa',
-      assets: warehouse.assets
-    }
-  })
+  }, {})
+
+  const warehouseSections = appendToWarehouseSections(
+    [],
+    firstPage.assets.map(toWarehouseAssetRow),
+    warehouses
+  ).map((section) => ({
+    ...section,
+    // Con grado o búsqueda el total por bodega no aplica
+    total: !isFilterActive && section.code ? totalsByCode[section.code] : undefined
+  }))
 
   const warehouseNameMap: Record<string, string> = {
     'BOD-REC': 'Bodega Recepción',
@@ -209,7 +75,11 @@ export default async function BodegaPage({
   const warehouseLabel = headerWarehouse?.name || (warehouseFilter && warehouseNameMap[warehouseFilter]) || currentWarehouse?.name || 'Bodega'
   const warehouseCode = headerWarehouse?.code || currentWarehouse?.code || warehouseFilter || 'BODEGA'
 
-  const isFilterActive = Boolean(gradeFilter || searchTerm)
+  const storedCount = isFilterActive || stockTotals.length === 0
+    ? `${firstPage.assets.length}${firstPage.nextCursor ? '+' : ''}`
+    : stockTotals
+        .filter((total) => !warehouseFilter || total.code === warehouseFilter)
+        .reduce((sum, total) => sum + total.quantity, 0)
 
   const excelParams = new URLSearchParams()
   if (gradeFilter) excelParams.set('grade', gradeFilter)
@@ -242,7 +112,7 @@ export default async function BodegaPage({
                   {warehouseCode}
                 </span>
                 <span className="text-gray-700 dark:text-gray-300 font-bold text-[11px] uppercase tracking-wider">
-                  {filteredAssets.length} equipos en almacenamiento
+                  {storedCount} equipos en almacenamiento
                 </span>
               </div>
             </div>
@@ -339,9 +209,27 @@ export default async function BodegaPage({
         </div>
       </form>
 
-      <WarehouseAssetTable sections={warehouseSections} />
+      {/* Error State */}
+      {firstPage.error && (
+        <div className="flex items-center gap-3 rounded-2xl border border-red-300 dark:border-red-800 bg-red-100 dark:bg-red-900/10 p-4 text-sm text-red-800 dark:text-red-300">
+          <AlertTriangle className="h-5 w-5 text-red-600 dark:text-red-400" />
+          <p className="font-semibold">Error al cargar los equipos de bodega: {firstPage.error}</p>
+        </div>
+      )}
+
+      {/* key: con otros filtros la tabla se monta de nuevo en lugar de
+          conservar las páginas y el cursor de la búsqueda anterior */}
+      {!firstPage.error && (
+        <WarehouseAssetTable
+          key={JSON.stringify(filters)}
+          sections={warehouseSections}
+          filters={filters}
+          nextCursor={firstPage.nextCursor}
+          warehouses={warehouses.map(({ code, status }) => ({ code, status }))}
+        />
+      )}
 
-      {filteredAssets.length === 0 && (
+      {!firstPage.error && firstPage.assets.length === 0 && (
         <div className="bg-gray-50 dark:bg-[#1a1f2e] border-2 border-dashed border-gray-200 dark:border-gray-800 rounded-[3rem] p-20 text-center">
           <div className="w-24 h-24 bg-white dark:bg-[#0f1419] rounded-[2.5rem] flex items-center justify-center mx-auto mb-6 shadow-sm border border-gray-100 dark:border-gray-800">
             <Package className="w-12 h-12 text-gray-300 dark:text-gray-600" />
@@ -10,10 +10,11 @@ import {
   ExternalLink
 } from 'lucide-react'
 import { cn } from '@/lib/utils'
-import { type InventoryItem } from '../actions'
+import { type InventoryItem, type InventoryAbcSnapshotRow } from '../actions'
 
 interface InventoryDashboardProps {
   data: InventoryItem[]
+  abcSnapshot?: InventoryAbcSnapshotRow[]
 }
 
 // Tipo con clasificación ABC calculada
@@ -21,7 +22,7 @@ interface ItemWithABC extends InventoryItem {
   abcClass: 'A' | 'B' | 'C'
 }
 
-export function InventoryDashboard({ data }: InventoryDashboardProps) {
+export function InventoryDashboard({ data, abcSnapshot = [] }: InventoryDashboardProps) {
   const [searchQuery, setSearchQuery] = useState('')
 
   // =====================================================
@@ -228,6 +229,33 @@ export function InventoryDashboard({ data }: InventoryDashboardProps) {
         </div>
       </div>
 
+      {/* Resumen ABC (instantánea de inventory_analytics.py) */}
+      {abcSnapshot.length > 0 && (
+        <div className="grid grid-cols-3 gap-6">
+          {abcSnapshot.map((row) => (
+            <div
+              key={row.abc_class}
+              className="rounded-2xl border border-gray-200 dark:border-gray-700 bg-gray-50 dark:bg-gray-800/40 p-4"
+            >
+              <div className="flex items-center justify-between">
+                <span className={cn(
+                  "text-sm font-black uppercase tracking-wider",
+                  row.abc_class === 'A' ? 'text-amber-500' :
+                    row.abc_class === 'B' ? 'text-slate-400' : 'text-amber-700'
+                )}>
+                  Clase {row.abc_class}
+                </span>
+                <span className="text-xs text-gray-500 dark:text-gray-400">{row.model_count} modelos</span>
+              </div>
+              <p className="mt-1 text-xl font-extrabold text-gray-900 dark:text-white">{formatCurrency(row.total_value)}</p>
+              <p className="text-xs text-gray-600 dark:text-gray-400">
+                {row.total_units.toLocaleString()} unidades • {row.avg_rotation_days ?? 'N/A'}d promedio • {row.units_over_90_days.toLocaleString()} con &gt; 90 días
+              </p>
+            </div>
+          ))}
+        </div>
+      )}
+
       {/* Buscador + leyenda */}
       <div className="space-y-4">
         <div className="relative w-full min-w-0">
@@ -266,131 +266,6 @@ export async function dispatchPart(data: DispatchPartData) {
   return { success: true, data: result }
 }
 
-// =====================================================
-// DESPACHAR PIEZA (FALLBACK SIN RPC)
-// Usar si la función RPC no está disponible
-// =====================================================
-
-export async function dispatchPartFallback(data: DispatchPartData) {
-  const supabase = await createClient()
-
-  const { data: { user } } = await supabase.auth.getUser()
-  if (!user) {
-    return { success: false, error: 'Usuario no autenticado' }
-  }
-
-  // Validar datos obligatorios
-  if (!data.returnedSku || !data.returnedSerial) {
-    return {
-      success: false,
-      error: 'El SKU y Serial de la pieza dañada son obligatorios'
-    }
-  }
-
-  try {
-    // 1. Verificar stock
-    const { data: part, error: partError } = await supabase
-      .from('parts_catalog')
-      .select('id, stock_quantity, name')
-      .eq('sku', data.partSku)
-      .single()
-
-    if (partError || !part) {
-      return { success: false, error: 'Pieza no encontrada' }
-    }
-
-    if (part.stock_quantity < 1) {
-      return { success: false, error: 'Sin stock disponible' }
-    }
-
-    // 2. Restar stock
-    const { error: stockError } = await supabase
-      .from('parts_catalog')
-      .update({
-        stock_quantity: part.stock_quantity - 1,
-        updated_at: new Date().toISOString()
-      })
-      .eq('id', part.id)
-
-    if (stockError) {
-      return { success: false, error: 'Error al actualizar stock' }
-    }
-
-    // 3. Agregar a bodega mala
-    const { error: badError } = await supabase
-      .from('bad_warehouse_inventory')
-      .insert({
-        sku: data.returnedSku,
-        part_name: part.name,
-        quantity: 1,
-        condition: data.returnedCondition || 'defective',
-        work_order_id: data.workOrderId,
-        part_request_id: data.partRequestId,
-        original_serial: data.returnedSerial,
-        received_from: 'Workshop Exchange',
-        received_by: user.id,
-        notes: 'Intercambio de pieza en reparación'
-      })
-
-    if (badError) {
-      console.error('Error adding to bad warehouse:', badError)
-      // Continuar aunque falle esto
-    }
-
-    // 4. Actualizar part_request
-    const { error: reqError } = await supabase
-      .from('part_requests')
-      .update({
-        status: 'installed',
-        installed_at: new Date().toISOString(),
-        returned_part_sku: data.returnedSku,
-        returned_part_serial: data.returnedSerial,
-        returned_part_status: 'returned',
-        returned_part_condition: data.returnedCondition,
-        returned_at: new Date().toISOString()
-      })
-      .eq('id', data.partRequestId)
-
-    if (reqError) {
-      console.error('Error updating part request:', reqError)
-    }
-
-    // 5. Actualizar orden de trabajo
-    const { error: woError } = await supabase
-      .from('work_orders')
-      .update({
-        status: 'in_progress',
-        updated_at: new Date().toISOString()
-      })
-      .eq('id', data.workOrderId)
-
-    if (woError) {
-      return { success: false, error: 'Error al actualizar orden' }
-    }
-
-    // 6. Registrar movimiento
-    await supabase.from('inventory_movements').insert({
-      movement_type: 'dispatch',
-      item_type: 'part',
-      item_id: part.id,
-      item_sku: data.partSku,
-      quantity: -1,
-      work_order_id: data.workOrderId,
-      performed_by: user.id,
-      notes: `Despacho a taller. Retorno: ${data.returnedSku}`
-    })
-
-    revalidatePath('/dashboard/inventario/despacho')
-    revalidatePath('/dashboard/taller')
-
-    return { success: true }
-
-  } catch (err) {
-    console.error('Dispatch error:', err)
-    return { success: false, error: 'Error inesperado en el despacho' }
-  }
-}
-
 interface DispatchPartSimpleData {
   workOrderId: string
   partRequestId: string
@@ -407,65 +282,11 @@ export async function dispatchPartSimple(data: DispatchPartSimpleData) {
 
   try {
     const normalizeSku = (value?: string | null) => (value ? value.replace(/[^a-z0-9]/gi, '').toLowerCase() : '')
-    const finalizeWorkOrder = async (timestamp: string) => {
-      const { count: remainingPending, error: pendingError } = await supabase
-        .from('part_requests')
-        .select('*', { count: 'exact', head: true })
-        .eq('work_order_id', data.workOrderId)
-        .eq('status', 'pending')
-        // safety: ignore broken rows with 0 quantity
-        .gt('quantity', 0)
-
-      if (pendingError) {
-        console.error('Error counting pending part requests:', pendingError)
-        throw new Error(`Error al contar solicitudes pendientes: ${pendingError.message}`)
-      }
-
-      const nextStatus = (remainingPending || 0) > 0 ? 'waiting_parts' : 'in_progress'
-      console.log(`[dispatchPartSimple] OS ${data.workOrderId}: ${remainingPending || 0} pendientes → status: ${nextStatus}`)
-
-      const { data: updatedWo, error: woError } = await supabase
-        .from('work_orders')
-        .update({
-          status: nextStatus,
-          updated_at: timestamp,
-        })
-        .eq('id', data.workOrderId)
-        .select('id, status')
-        .single()
-
-      if (woError) {
-        console.error('Error updating work order:', woError)
-        throw new Error(`Error al actualizar orden: ${woError.message}`)
-      }
-
-      if (!updatedWo) {
-        throw new Error('No se pudo actualizar la orden (no se encontró registro)')
-      }
-
-      console.log(`[dispatchPartSimple] OS ${data.workOrderId} actualizada a: ${updatedWo.status}`)
-    }
     const requestedNormalized = normalizeSku(data.partSku)
     if (!requestedNormalized) {
       return { success: false, error: 'SKU inválido' }
     }
 
-    // Fetch request to support partial quantities
-    const { data: reqRow, error: reqFetchError } = await supabase
-      .from('part_requests')
-      .select('id, quantity, status, work_order_id, part_sku')
-      .eq('id', data.partRequestId)
-      .single()
-
-    if (reqFetchError || !reqRow) {
-      return { success: false, error: 'Solicitud de pieza no encontrada' }
-    }
-
-    // Guard: ensure request belongs to this work order
-    if (reqRow.work_order_id !== data.workOrderId) {
-      return { success: false, error: 'La solicitud no pertenece a la orden indicada' }
-    }
-
     // Find part by normalized SKU (handles hyphens/spaces differences)
     const skuPrefix = requestedNormalized.slice(0, 6)
     const skuTail = requestedNormalized.slice(-5)
@@ -478,6 +299,8 @@ export async function dispatchPartSimple(data: DispatchPartSimpleData) {
       .or(`sku.ilike.%${data.partSku}%,sku.ilike.%${skuPrefix}%,sku.ilike.%${skuTail}%`)
       .limit(50)
 
+    let part: { id: string; sku: string } | null = null
+
     if (candidatesError) {
       console.error('Error finding part candidates:', candidatesError)
       // Fallback: try exact match (some PostgREST setups reject complex OR strings)
@@ -491,173 +314,75 @@ export async function dispatchPartSimple(data: DispatchPartSimpleData) {
         console.error('Error exact-matching part:', exactError)
         return { success: false, error: `Error buscando pieza: ${candidatesError.message}` }
       }
-
-      if (!exact) {
-        return { success: false, error: 'Pieza no encontrada' }
-      }
-
-      const part = { id: exact.id, sku: exact.sku, stock_quantity: exact.stock_quantity, name: exact.name }
-      if (part.stock_quantity < 1) {
-        return { success: false, error: 'Sin stock disponible' }
-      }
-      // continue with this `part` below (stock update etc.)
-
-      // (fall through by reusing `part` variable scope)
-      // eslint-disable-next-line no-inner-declarations
-      const selectedPart = part
-
-      const { error: stockError } = await supabase
-        .from('parts_catalog')
-        .update({
-          stock_quantity: selectedPart.stock_quantity - 1,
-          updated_at: new Date().toISOString()
-        })
-        .eq('id', selectedPart.id)
-
-      if (stockError) {
-        return { success: false, error: 'Error al actualizar stock' }
-      }
-
-      const now = new Date().toISOString()
-      if (Number(reqRow.quantity || 1) > 1) {
-        const { error: reqError } = await supabase
-          .from('part_requests')
-          .update({
-            quantity: Number(reqRow.quantity) - 1,
-            updated_at: now,
-          })
-          .eq('id', data.partRequestId)
-
-        if (reqError) {
-          console.error('Error updating part request quantity:', reqError)
-          return { success: false, error: `Error al actualizar solicitud: ${reqError.message}` }
-        }
-      } else {
-        const { error: reqError } = await supabase
-          .from('part_requests')
-          .update({
-            status: 'installed',
-            dispatch_date: now,
-            installed_at: now,
-          })
-          .eq('id', data.partRequestId)
-
-        if (reqError) {
-          console.error('Error updating part request:', reqError)
-          return { success: false, error: `Error al marcar solicitud como despachada: ${reqError.message}` }
-        }
-      }
-
-      // Wait a tiny bit to ensure the update is committed before counting
-      await new Promise(resolve => setTimeout(resolve, 100))
-
-      try {
-        await finalizeWorkOrder(now)
-      } catch (e) {
-        return { success: false, error: `Despacho realizado, pero no se pudo actualizar la OS: ${e instanceof Error ? e.message : 'Error desconocido'}` }
-      }
-
-      await supabase.from('inventory_movements').insert({
-        movement_type: 'dispatch',
-        item_type: 'part',
-        item_id: selectedPart.id,
-        item_sku: selectedPart.sku,
-        quantity: -1,
-        work_order_id: data.workOrderId,
-        performed_by: user.id,
-        notes: `Despacho desde ${data.sourceWarehouse}`
-      })
-
-      revalidatePath('/dashboard/inventario/despacho')
-      revalidatePath('/dashboard/taller')
-
-      return { success: true }
+      part = exact
+    } else {
+      part = (candidates || []).find((row) => normalizeSku(row.sku) === requestedNormalized) || null
     }
 
-    const part = (candidates || []).find((row) => normalizeSku(row.sku) === requestedNormalized) || null
-
     if (!part) {
       return { success: false, error: 'Pieza no encontrada' }
     }
 
-    if (part.stock_quantity < 1) {
-      return { success: false, error: 'Sin stock disponible' }
-    }
-
-    const { error: stockError } = await supabase
-      .from('parts_catalog')
-      .update({
-        stock_quantity: part.stock_quantity - 1,
-        updated_at: new Date().toISOString()
-      })
-      .eq('id', part.id)
+    // Una unidad por despacho; el stock, la solicitud, el movimiento y el
+    // estado de la OS se actualizan en la misma transacción
+    return await dispatchWorkOrderParts({
+      workOrderId: data.workOrderId,
+      sourceWarehouse: data.sourceWarehouse,
+      items: [{ partRequestId: data.partRequestId, partId: part.id, quantity: 1 }]
+    })
+  } catch (err) {
+    console.error('Dispatch simple error:', err)
+    return { success: false, error: 'Error inesperado en el despacho' }
+  }
+}
 
-    if (stockError) {
-      return { success: false, error: 'Error al actualizar stock' }
-    }
+// =====================================================
+// DESPACHO POR LOTES (VARIAS SOLICITUDES DE UNA ORDEN)
+// Las unidades se reclaman con SKIP LOCKED: técnicos que piden el mismo SKU
+// no se esperan entre sí. Si una pieza no tiene stock no se despacha nada.
+// =====================================================
 
-    const now = new Date().toISOString()
-
-    // If requested quantity > 1, decrement quantity and keep pending.
-    // Otherwise mark as dispensed.
-    if (Number(reqRow.quantity || 1) > 1) {
-      const { error: reqError } = await supabase
-        .from('part_requests')
-        .update({
-          quantity: Number(reqRow.quantity) - 1,
-          updated_at: now,
-        })
-        .eq('id', data.partRequestId)
-
-      if (reqError) {
-        console.error('Error updating part request quantity:', reqError)
-        return { success: false, error: `Error al actualizar solicitud: ${reqError.message}` }
-      }
-    } else {
-      const { error: reqError } = await supabase
-        .from('part_requests')
-        .update({
-          status: 'installed',
-          dispatch_date: now,
-          installed_at: now,
-        })
-        .eq('id', data.partRequestId)
-
-      if (reqError) {
-        console.error('Error updating part request:', reqError)
-        return { success: false, error: `Error al marcar solicitud como despachada: ${reqError.message}` }
-      }
-    }
+interface DispatchWorkOrderPartsData {
+  workOrderId: string
+  sourceWarehouse?: string
+  items: { partRequestId: string; partId: string; quantity?: number }[]
+}
 
-    // Wait a tiny bit to ensure the update is committed before counting
-    await new Promise(resolve => setTimeout(resolve, 100))
+export async function dispatchWorkOrderParts(data: DispatchWorkOrderPartsData) {
+  const supabase = await createClient()
+  const { data: { user } } = await supabase.auth.getUser()
+  if (!user) {
+    return { success: false, error: 'Usuario no autenticado' }
+  }
 
-    // Keep work order in waiting_parts if there are still pending requests
-    try {
-      await finalizeWorkOrder(now)
-    } catch (e) {
-      return { success: false, error: `Despacho realizado, pero no se pudo actualizar la OS: ${e instanceof Error ? e.message : 'Error desconocido'}` }
-    }
+  if (!data.items.length) {
+    return { success: false, error: 'No se indicaron piezas a despachar' }
+  }
 
-    await supabase.from('inventory_movements').insert({
-      movement_type: 'dispatch',
-      item_type: 'part',
-      item_id: part.id,
-      item_sku: part.sku,
-      quantity: -1,
-      work_order_id: data.workOrderId,
-      performed_by: user.id,
-      notes: `Despacho desde ${data.sourceWarehouse}`
-    })
+  const { data: result, error } = await supabase.rpc('dispatch_part_requests', {
+    p_work_order_id: data.workOrderId,
+    p_items: data.items.map((item) => ({
+      part_request_id: item.partRequestId,
+      part_id: item.partId,
+      quantity: item.quantity ?? 1
+    })),
+    p_performed_by: user.id,
+    p_source_warehouse: data.sourceWarehouse || null
+  })
 
-    revalidatePath('/dashboard/inventario/despacho')
-    revalidatePath('/dashboard/taller')
+  if (error) {
+    console.error('Error dispatching parts:', error)
+    return { success: false, error: error.message }
+  }
 
-    return { success: true }
-  } catch (err) {
-    console.error('Dispatch simple error:', err)
-    return { success: false, error: 'Error inesperado en el despacho' }
+  if (!result?.success) {
+    return { success: false, error: result?.error || 'Error en el despacho' }
   }
+
+  revalidatePath('/dashboard/inventario/despacho')
+  revalidatePath('/dashboard/taller')
+
+  return { success: true, data: result }
 }
 
 interface CancelPartRequestData {
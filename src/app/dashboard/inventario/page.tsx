@@ -1,6 +1,6 @@
 import { Package, AlertTriangle, Warehouse, Download } from 'lucide-react'
 import Link from 'next/link'
-import { getInventoryMaster } from './actions'
+import { getInventoryMaster, getInventoryAbcSnapshot } from './actions'
 import { InventoryDashboard } from './components/InventoryDashboard'
 import { createClient } from '@/lib/supabase/server'
 
@@ -8,34 +8,26 @@ export const dynamic = 'force-dynamic'
 
 async function getWarehouseCounts() {
   const supabase = await createClient()
-  const { data: warehouses } = await supabase
-    .from('warehouses')
-    .select('id, code')
+  // Totales de warehouse_stock_counters (migración 20260307), sin contar assets
+  const { data: totals } = await supabase
+    .from('warehouse_stock_totals')
+    .select('code, quantity')
     .in('code', ['BOD-REC', 'BOD-REM', 'BOD-VAL'])
     .eq('is_active', true)
 
-  if (!warehouses) return {}
+  if (!totals) return {}
 
-  const counts = await Promise.all(
-    warehouses.map(async (warehouse) => {
-      const { count } = await supabase
-        .from('assets')
-        .select('*', { count: 'exact', head: true })
-        .eq('current_warehouse_id', warehouse.id)
-      return { code: warehouse.code, count: count || 0 }
-    })
-  )
-
-  return counts.reduce<Record<string, number>>((acc, entry) => {
-    acc[entry.code] = entry.count
+  return totals.reduce<Record<string, number>>((acc, entry) => {
+    acc[entry.code] = Number(entry.quantity ?? 0)
     return acc
   }, {})
 }
 
 export default async function InventoryPage() {
-  const [{ data, error }, warehouseCounts] = await Promise.all([
+  const [{ data, error }, warehouseCounts, abcSnapshot] = await Promise.all([
     getInventoryMaster(),
-    getWarehouseCounts()
+    getWarehouseCounts(),
+    getInventoryAbcSnapshot()
   ])
 
   return (
@@ -75,7 +67,7 @@ export default async function InventoryPage() {
           )}
 
           {/* Dashboard (Client Component) */}
-          <InventoryDashboard data={data} />
+          <InventoryDashboard data={data} abcSnapshot={abcSnapshot} />
         </div>
       </div>
     </div>
@@ -157,118 +157,29 @@ export async function processDispatch(data: ProcessDispatchData): Promise<{ succ
   }
 
   try {
-    // =====================================================
-    // PASO 1: Verificar stock_good > 0
-    // =====================================================
-    const { data: part, error: partError } = await supabase
-      .from('parts_catalog')
-      .select('id, stock_quantity, name')
-      .eq('sku', data.partSku)
-      .eq('is_active', true)
-      .single()
-
-    if (partError || !part) {
-      return { success: false, error: `Pieza no encontrada: ${data.partSku}` }
-    }
-
-    if (part.stock_quantity < 1) {
-      return { success: false, error: 'Sin stock disponible. No se puede despachar.' }
-    }
-
-    // =====================================================
-    // PASO 2: UPDATE parts_catalog - Restar 1 al stock_good
-    // =====================================================
-    const { error: stockError } = await supabase
-      .from('parts_catalog')
-      .update({
-        stock_quantity: part.stock_quantity - 1,
-        updated_at: new Date().toISOString()
-      })
-      .eq('id', part.id)
-
-    if (stockError) {
-      console.error('Error updating stock:', stockError)
-      return { success: false, error: 'Error al actualizar stock' }
-    }
-
-    // =====================================================
-    // PASO 3: INSERT bad_warehouse_inventory - Pieza dañada recibida
-    // =====================================================
-    const { error: badError } = await supabase
-      .from('bad_warehouse_inventory')
-      .insert({
-        sku: data.returnedPartSku,
-        part_name: part.name,
-        quantity: 1,
-        condition: data.returnedPartCondition || 'defective',
-        work_order_id: data.workOrderId,
-        part_request_id: data.partRequestId,
-        received_from: 'Workshop Exchange',
-        received_by: user.id,
-        notes: 'Intercambio obligatorio - Pieza dañada del equipo'
-      })
-
-    if (badError) {
-      console.error('Error adding to bad warehouse:', badError)
-      // CRÍTICO: Revertir el stock si falla
-      await supabase
-        .from('parts_catalog')
-        .update({ stock_quantity: part.stock_quantity })
-        .eq('id', part.id)
-      return { success: false, error: 'Error al registrar pieza dañada' }
-    }
+    // La unidad se reclama de la cola de stock (SKIP LOCKED) y la pieza
+    // dañada, la solicitud, la OS y los movimientos se registran en la misma
+    // transacción: si algo falla no hay stock que revertir
+    const { data: result, error } = await supabase.rpc('dispatch_part', {
+      p_work_order_id: data.workOrderId,
+      p_part_request_id: data.partRequestId,
+      p_part_sku: data.partSku,
+      p_returned_sku: data.returnedPartSku,
+      p_returned_serial: null,
+      p_returned_condition: data.returnedPartCondition || 'defective',
+      p_performed_by: user.id,
+      p_request_status: 'dispensed'
+    })
 
-    // =====================================================
-    // PASO 4: UPDATE part_requests - status = 'dispensed'
-    // =====================================================
-    const { error: reqError } = await supabase
-      .from('part_requests')
-      .update({
-        status: 'dispensed',
-        dispatch_date: new Date().toISOString(),
-        returned_part_sku: data.returnedPartSku,
-        returned_part_status: 'returned',
-        returned_part_condition: data.returnedPartCondition || 'defective',
-        returned_at: new Date().toISOString()
-      })
-      .eq('id', data.partRequestId)
-
-    if (reqError) {
-      console.error('Error updating part request:', reqError)
-      return { success: false, error: 'Error al actualizar solicitud' }
+    if (error) {
+      console.error('Error dispatching part:', error)
+      return { success: false, error: error.message }
     }
 
-    // =====================================================
-    // PASO 5: UPDATE work_orders - status = 'in_progress'
-    // Desbloquea al técnico para continuar la reparación
-    // =====================================================
-    const { error: woError } = await supabase
-      .from('work_orders')
-      .update({
-        status: 'in_progress',
-        updated_at: new Date().toISOString()
-      })
-      .eq('id', data.workOrderId)
-
-    if (woError) {
-      console.error('Error updating work order:', woError)
-      // No fallar - la solicitud ya se procesó
+    if (!result?.success) {
+      return { success: false, error: result?.error || 'Error en el despacho' }
     }
 
-    // =====================================================
-    // PASO 6: Registrar movimiento de inventario (Audit Trail)
-    // =====================================================
-    await supabase.from('inventory_movements').insert({
-      movement_type: 'dispatch',
-      item_type: 'part',
-      item_id: part.id,
-      item_sku: data.partSku,
-      quantity: -1,
-      work_order_id: data.workOrderId,
-      performed_by: user.id,
-      notes: `Intercambio: Entregado ${data.partSku} | Recibido ${data.returnedPartSku}`
-    })
-
     // Revalidar rutas
     revalidatePath('/dashboard/inventario/solicitudes')
     revalidatePath('/dashboard/inventario/despacho')
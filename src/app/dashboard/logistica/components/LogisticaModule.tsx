@@ -141,7 +141,8 @@ const LogisticaModule: React.FC<LogisticaModuleProps> = ({ ticket, brands, model
   const initialMode = searchParams.get('mode')
 
   // Declara currentBox primero
-  const [currentBox, setCurrentBox] = useState<BoxStructure>({ boxNumber: 10001, items: [] })
+  // boxNumber 0 = caja en armado sin número; se reserva al guardarla
+  const [currentBox, setCurrentBox] = useState<BoxStructure>({ boxNumber: 0, items: [] })
 
   // Para DATA WIPE, view empieza como 'main' (vista principal), para otros tickets usa 'details' o 'manifest' si tiene items
   const [view, setView] = useState<'details' | 'boxes' | 'main' | 'manifest' | 'data_wipe' | 'data_wipe_boxes'>(
@@ -370,24 +371,24 @@ const LogisticaModule: React.FC<LogisticaModuleProps> = ({ ticket, brands, model
     }
   }, [ticket.id, collector])
 
-  // Cargar el siguiente número de caja global
-  const fetchNextBoxNumber = useCallback(async () => {
+  // Reserva un número de caja global. Cada llamada consume un número de la
+  // secuencia: solo se llama cuando la caja realmente se crea.
+  const reserveBoxNumber = useCallback(async (): Promise<number | null> => {
     try {
-      const res = await fetch('/api/logistica/next-box-number')
+      const res = await fetch('/api/logistica/next-box-number', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ ticketId: ticket.id || null })
+      })
       if (res.ok) {
         const data = await res.json()
-        if (data.nextBoxNumber) {
-          setCurrentBox(prev => ({ ...prev, boxNumber: data.nextBoxNumber }))
-        }
+        return data.nextBoxNumber ?? null
       }
     } catch (e) {
       console.error('Error fetching next box number', e)
     }
-  }, [])
-
-  useEffect(() => {
-    fetchNextBoxNumber()
-  }, [fetchNextBoxNumber])
+    return null
+  }, [ticket.id])
 
   // Cargar assets para tickets DATA WIPE
   useEffect(() => {
@@ -768,8 +769,12 @@ const LogisticaModule: React.FC<LogisticaModuleProps> = ({ ticket, brands, model
     }
   }
 
-  const handleAddNewBox = () => {
-    const nextBoxNumber = Math.max(...boxes.map(b => b.boxNumber), currentBox.boxNumber) + 1
+  const handleAddNewBox = async () => {
+    const nextBoxNumber = await reserveBoxNumber()
+    if (!nextBoxNumber) {
+      alert('No se pudo reservar un número de caja. Intente de nuevo.')
+      return
+    }
     const newBox: BoxStructure = {
       boxNumber: nextBoxNumber,
       items: [],
@@ -783,11 +788,16 @@ const LogisticaModule: React.FC<LogisticaModuleProps> = ({ ticket, brands, model
 
   const handleCreateBoxAndStartLoading = async () => {
     try {
+      const boxNumber = currentBox.boxNumber > 0 ? currentBox.boxNumber : await reserveBoxNumber()
+      if (!boxNumber) {
+        alert('No se pudo reservar un número de caja. Intente de nuevo.')
+        return
+      }
       const newBox: BoxStructure = {
-        boxNumber: currentBox.boxNumber,
+        boxNumber,
         items: [],
-        sku: generateBoxSku(currentBox.boxNumber),
-        seal: `DW-${currentBox.boxNumber}-${Date.now().toString().slice(-4)}`
+        sku: generateBoxSku(boxNumber),
+        seal: `DW-${boxNumber}-${Date.now().toString().slice(-4)}`
       }
 
       setBoxes([...boxes, newBox])
@@ -1150,16 +1160,17 @@ const LogisticaModule: React.FC<LogisticaModuleProps> = ({ ticket, brands, model
     }
 
     const isEditingExisting = editingBoxId !== null
-    const finalBoxNumber = currentBox.boxNumber
+    // Caja nueva: el número se reserva ahora, cuando ya se va a guardar
+    const finalBoxNumber = currentBox.boxNumber > 0 ? currentBox.boxNumber : await reserveBoxNumber()
 
     if (!finalBoxNumber || finalBoxNumber <= 0) {
-      alert('Error: No se ha asignado un número de caja válido.')
+      alert('Error: No se pudo reservar un número de caja. Intente de nuevo.')
       return
     }
 
     if (!isEditingExisting && boxes.some(b => b.boxNumber === finalBoxNumber)) {
-      await fetchNextBoxNumber()
-      alert(`El número de caja ha sido actualizado al siguiente disponible. Por favor intente guardar de nuevo.`)
+      alert(`La caja #${finalBoxNumber} ya existe en este ticket. Por favor intente guardar de nuevo.`)
+      setCurrentBox(prev => ({ ...prev, boxNumber: 0 }))
       return
     }
 
@@ -1182,6 +1193,8 @@ const LogisticaModule: React.FC<LogisticaModuleProps> = ({ ticket, brands, model
     try {
       await saveBoxToSupabase(newBox)
     } catch (error) {
+      // El número ya reservado se conserva para el reintento
+      setCurrentBox(prev => ({ ...prev, boxNumber: finalBoxNumber }))
       const message = error instanceof Error ? error.message : 'No fue posible guardar la caja'
       alert(message)
       return
@@ -1195,7 +1208,6 @@ const LogisticaModule: React.FC<LogisticaModuleProps> = ({ ticket, brands, model
     setBoxes(updatedBoxes)
 
     setCurrentBox({ boxNumber: 0, items: [] })
-    await fetchNextBoxNumber()
     setCurrentItem({ brandId: '', modelId: '', tipoProducto: '', cantidad: 1 })
     setEditingBoxId(null)
   }
@@ -1257,11 +1269,7 @@ const LogisticaModule: React.FC<LogisticaModuleProps> = ({ ticket, brands, model
       return
     }
 
-    const nextNumber = remainingBoxes.length > 0
-      ? Math.max(...remainingBoxes.map((b) => b.boxNumber), 10000) + 1
-      : 10001
-    const finalNextNumber = Math.max(nextNumber, 10001)
-    setCurrentBox({ boxNumber: finalNextNumber, items: [] })
+    setCurrentBox({ boxNumber: 0, items: [] })
   }
 
   const handleReopenLogistics = async () => {
@@ -2051,7 +2059,7 @@ const LogisticaModule: React.FC<LogisticaModuleProps> = ({ ticket, brands, model
                   <Box className="h-5 w-5 text-purple-400" />
                 </div>
                 <div className="flex flex-col">
-                  <h3 className="text-xl font-black text-white leading-none">Caja #{currentBox.boxNumber}</h3>
+                  <h3 className="text-xl font-black text-white leading-none">{currentBox.boxNumber > 0 ? `Caja #${currentBox.boxNumber}` : 'Caja nueva'}</h3>
                   <p className="text-[10px] font-bold text-gray-500 uppercase tracking-widest mt-2 px-1">Precinto de Seguridad (Marchamo)</p>
                   <div className="mt-1 flex items-center gap-2">
                     <input
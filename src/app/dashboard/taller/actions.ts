@@ -8,9 +8,6 @@ import { createAuditLog } from '@/lib/audit'
 // Re-exportar tipo para uso externo
 export type { WorkOrder }
 
-const OS_START_SEQUENCE = 100
-const OS_FETCH_LIMIT = 500
-
 type ServerSupabaseClient = Awaited<ReturnType<typeof createClient>>
 
 const REMARKETING_WAREHOUSE_CODE = 'BOD-REM'
@@ -31,26 +28,6 @@ const parseOsSequence = (value?: string | null) => {
   return Number(match[1])
 }
 
-async function getNextWorkOrderSequence(supabase: ServerSupabaseClient) {
-  const { data } = await supabase
-    .from('work_orders')
-    .select('work_order_number')
-    .like('work_order_number', `${OS_NUMBER_PREFIX}%`)
-    .order('created_at', { ascending: false })
-    .limit(OS_FETCH_LIMIT)
-
-  let maxSequence = OS_START_SEQUENCE - 1
-
-  data?.forEach((row) => {
-    const seq = parseOsSequence(row.work_order_number)
-    if (seq !== null) {
-      maxSequence = Math.max(maxSequence, seq)
-    }
-  })
-
-  return maxSequence + 1
-}
-
 // =====================================================
 // INTERFACE EXTENDIDA PARA DETALLE COMPLETO
 // =====================================================
@@ -230,13 +207,10 @@ export async function getWorkOrderById(id: string) {
 export async function createWorkOrder(assetId: string, reportedIssue: string) {
   const supabase = await createClient()
 
-  const nextSequence = await getNextWorkOrderSequence(supabase)
-  const workOrderNumber = `${OS_NUMBER_PREFIX}${nextSequence}`
-
+  // work_order_number lo asigna la secuencia por defecto de la columna
   const { data, error } = await supabase
     .from('work_orders')
     .insert({
-      work_order_number: workOrderNumber,
       asset_id: assetId,
       reported_issue: reportedIssue,
       status: 'open',
@@ -250,6 +224,8 @@ export async function createWorkOrder(assetId: string, reportedIssue: string) {
     return { success: false, error: error.message }
   }
 
+  const workOrderNumber: string = data.work_order_number
+
   // Sincronizar clasificaciones de recepción a asset si aún no existen
   if (assetId) {
     try {
@@ -349,6 +325,50 @@ export async function createWorkOrder(assetId: string, reportedIssue: string) {
   return { success: true, data }
 }
 
+export interface BulkWorkOrderSelection {
+  assetIds?: string[]
+  batchId?: string
+  ticketId?: string
+}
+
+export interface BulkWorkOrderResult {
+  found: number
+  created: number
+  skipped: number
+  work_orders: { id: string; work_order_number: string; asset_id: string }[]
+}
+
+/**
+ * Abre una orden por equipo de la selección (lote, ticket o ids) con
+ * open_work_orders_bulk: órdenes, traslado a BOD-REP y auditoría en una
+ * sola transacción. Omite destruidos y equipos con orden abierta.
+ */
+export async function createWorkOrdersBulk(
+  selection: BulkWorkOrderSelection,
+  reportedIssue: string,
+  priority: string = 'normal'
+) {
+  const supabase = await createClient()
+  const { data: { user } } = await supabase.auth.getUser()
+
+  const { data, error } = await supabase.rpc('open_work_orders_bulk', {
+    p_asset_ids: selection.assetIds?.length ? selection.assetIds : null,
+    p_batch_id: selection.batchId ?? null,
+    p_ticket_id: selection.ticketId ?? null,
+    p_reported_issue: reportedIssue,
+    p_priority: priority,
+    p_created_by: user?.id ?? null,
+  })
+
+  if (error) {
+    console.error('Error creating work orders in bulk:', error)
+    return { success: false, error: error.message }
+  }
+
+  revalidatePath('/dashboard/taller')
+  return { success: true, data: data as BulkWorkOrderResult }
+}
+
 // =====================================================
 // ACTUALIZAR DIAGNÓSTICO
 // =====================================================
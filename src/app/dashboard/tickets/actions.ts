@@ -134,62 +134,131 @@ async function parseManifestItems(file: File): Promise<ManifestRow[]> {
   }
 }
 
+export interface TicketSummary extends OperationsTicket {
+  item_count: number
+  expected_count: number
+  received_count: number
+  validated_count: number
+  box_count: number
+}
+
+export interface TicketSummaryFilters {
+  status?: TicketStatus
+  ticketType?: TicketType
+  search?: string
+}
+
+export interface TicketSummaryCursor {
+  createdAt: string
+  id: string
+}
+
+const TICKET_PAGE_SIZE = 50
+
+const TICKET_ITEM_DETAIL_SELECT = `
+  id,
+  brand,
+  model,
+  color,
+  product_type,
+  expected_serial,
+  collected_serial,
+  validation_status,
+  expected_quantity,
+  received_quantity,
+  status,
+  box_number,
+  brand_id,
+  model_id,
+  product_type_id,
+  catalog_brand:catalog_brands!brand_id (
+    id,
+    name
+  ),
+  catalog_model:catalog_models!model_id (
+    id,
+    name
+  ),
+  catalog_product_type:catalog_product_types!product_type_id (
+    id,
+    name
+  )
+`
+
+/**
+ * Una página de tickets con cliente, creador y conteos de renglones
+ * (get_ticket_summaries). Sin estado se ocultan los cancelados.
+ */
+export async function getTicketSummaries(
+  filters: TicketSummaryFilters = {},
+  cursor: TicketSummaryCursor | null = null,
+  limit: number = TICKET_PAGE_SIZE
+): Promise<{ data: TicketSummary[]; nextCursor: TicketSummaryCursor | null; error: string | null }> {
+  const supabase = await createClient()
+  const pageSize = Math.min(Math.max(limit, 1), 499)
+
+  const { data, error } = await supabase.rpc('get_ticket_summaries', {
+    p_status: filters.status || null,
+    p_ticket_type: filters.ticketType || null,
+    p_search: filters.search?.trim() || null,
+    p_after_created_at: cursor?.createdAt ?? null,
+    p_after_id: cursor?.id ?? null,
+    // Una fila extra para saber si hay más páginas
+    p_limit: pageSize + 1
+  })
+
+  if (error) {
+    console.error('Error fetching tickets:', error)
+    return { data: [], nextCursor: null, error: error.message }
+  }
+
+  const rows = (data || []) as TicketSummary[]
+  const page = rows.slice(0, pageSize)
+  const last = page[page.length - 1]
+
+  return {
+    data: page,
+    nextCursor: rows.length > pageSize && last ? { createdAt: last.created_at, id: last.id } : null,
+    error: null
+  }
+}
+
 /**
- * Obtiene todos los tickets con información del cliente
+ * Cantidad de tickets por estado (tarjetas del dashboard)
  */
-export async function getTickets(): Promise<{ data: OperationsTicket[] | null; error: string | null }> {
+export async function getTicketStatusCounts(): Promise<Record<string, number>> {
+  const supabase = await createClient()
+  const { data, error } = await supabase.rpc('get_ticket_status_counts')
+
+  if (error) {
+    console.error('Error fetching ticket counts:', error)
+    return {}
+  }
+
+  return ((data || []) as { status: string; total: number }[]).reduce<Record<string, number>>((acc, row) => {
+    acc[row.status] = Number(row.total) || 0
+    return acc
+  }, {})
+}
+
+/**
+ * Renglones de un ticket con sus catálogos; se cargan al expandir el ticket
+ */
+export async function getTicketItemsAction(ticketId: string): Promise<{ data: TicketItem[] | null; error: string | null }> {
   const supabase = await createClient()
 
   const { data, error } = await supabase
-    .from('operations_tickets')
-    .select(`
-      *,
-      created_by_user:profiles!operations_tickets_created_by_fkey (
-        id,
-        full_name
-      ),
-      client:crm_entities!client_id (
-        id,
-        commercial_name,
-        tax_id_nit
-      ),
-      ticket_items (
-        id,
-        brand,
-        model,
-        color,
-        product_type,
-        expected_serial,
-        collected_serial,
-        validation_status,
-        expected_quantity,
-        received_quantity,
-        status,
-        brand_id,
-        model_id,
-        product_type_id,
-        catalog_brand:catalog_brands!brand_id (
-          id,
-          name
-        ),
-        catalog_model:catalog_models!model_id (
-          id,
-          name
-        ),
-        catalog_product_type:catalog_product_types!product_type_id (
-          id,
-          name
-        )
-      )
-    `)
-    .order('created_at', { ascending: false })
+    .from('ticket_items')
+    .select(TICKET_ITEM_DETAIL_SELECT)
+    .eq('ticket_id', ticketId)
+    .order('created_at', { ascending: true })
 
   if (error) {
-    console.error('Error fetching tickets:', error)
+    console.error('Error fetching ticket items:', error)
     return { data: null, error: error.message }
   }
 
-  return { data: data as OperationsTicket[], error: null }
+  return { data: data as unknown as TicketItem[], error: null }
 }
 
 /**
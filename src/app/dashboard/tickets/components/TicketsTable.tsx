@@ -1,6 +1,6 @@
 'use client'
 
-import { useState, useTransition, useMemo } from 'react'
+import { useState, useTransition, useMemo, useEffect, useRef } from 'react'
 import { useRouter } from 'next/navigation'
 import {
   Plus,
@@ -22,6 +22,7 @@ import {
   Eye,
   Edit,
   ChevronDown,
+  ChevronRight,
   Download,
   MapPin,
   User,
@@ -32,7 +33,20 @@ import {
   Eraser
 } from 'lucide-react'
 import { cn } from '@/lib/utils'
-import { createTicketAction, updateTicketAction, updateTicketStatus, deleteTicketCompletely, type OperationsTicket, type TicketStatus, type TicketType } from '../actions'
+import {
+  createTicketAction,
+  updateTicketAction,
+  updateTicketStatus,
+  deleteTicketCompletely,
+  getTicketSummaries,
+  getTicketItemsAction,
+  type OperationsTicket,
+  type TicketStatus,
+  type TicketType,
+  type TicketSummary,
+  type TicketSummaryCursor
+} from '../actions'
+import type { TicketItem } from '@/lib/supabase/types'
 import { type CrmEntity } from '../../clientes/actions'
 import { type CatalogItem } from '../../configuracion/usuarios/actions'
 import { Badge, type BadgeVariant } from '@/components/ui/Badge'
@@ -42,7 +56,8 @@ import { Text } from '@/components/ui/Text'
 import { FormLabel } from '@/components/ui/FormLabel'
 
 interface TicketsTableProps {
-  initialTickets: OperationsTicket[]
+  initialTickets: TicketSummary[]
+  initialCursor?: TicketSummaryCursor | null
   clients: CrmEntity[]
   serviceTypes: CatalogItem[]
   brands: CatalogItem[]
@@ -137,8 +152,11 @@ const formatTicketId = (readableId?: string | null) => {
   return readableId
 }
 
-export default function TicketsTable({ initialTickets, clients, serviceTypes, brands, models, productTypes }: TicketsTableProps) {
-  const [tickets, setTickets] = useState(initialTickets)
+export default function TicketsTable({ initialTickets, initialCursor = null, clients, serviceTypes, brands, models, productTypes }: TicketsTableProps) {
+  const [tickets, setTickets] = useState<TicketSummary[]>(initialTickets)
+  const [nextCursor, setNextCursor] = useState<TicketSummaryCursor | null>(initialCursor)
+  const [isLoadingPage, setIsLoadingPage] = useState(false)
+  const [pageError, setPageError] = useState<string | null>(null)
   const [searchTerm, setSearchTerm] = useState('')
   const [filterStatus, setFilterStatus] = useState<TicketStatus | 'all'>('all')
   const [filterType, setFilterType] = useState<TicketType | 'all'>('all')
@@ -156,10 +174,80 @@ export default function TicketsTable({ initialTickets, clients, serviceTypes, br
     setIsViewModalOpen(true)
   }
 
-  // Sincronizar estado local con props del servidor cuando hay cambios (ej. router.refresh)
-  useMemo(() => {
-    setTickets(initialTickets)
-  }, [initialTickets])
+  // Filtros y paginación en el servidor (get_ticket_summaries). Con los
+  // filtros por defecto se usa la primera página que trae page.tsx; al
+  // cambiar (o tras router.refresh) se vuelve a pedir la primera página.
+  const requestId = useRef(0)
+  useEffect(() => {
+    const isDefault = !searchTerm.trim() && filterStatus === 'all' && filterType === 'all'
+    if (isDefault) {
+      requestId.current++
+      setTickets(initialTickets)
+      setNextCursor(initialCursor)
+      setPageError(null)
+      setIsLoadingPage(false)
+      return
+    }
+
+    const current = ++requestId.current
+    const timer = setTimeout(async () => {
+      setIsLoadingPage(true)
+      const result = await getTicketSummaries({
+        status: filterStatus === 'all' ? undefined : filterStatus,
+        ticketType: filterType === 'all' ? undefined : filterType,
+        search: searchTerm
+      })
+      if (current !== requestId.current) return
+      setTickets(result.data)
+      setNextCursor(result.nextCursor)
+      setPageError(result.error)
+      setIsLoadingPage(false)
+    }, 300)
+
+    return () => clearTimeout(timer)
+  }, [searchTerm, filterStatus, filterType, initialTickets, initialCursor])
+
+  const loadMoreTickets = async () => {
+    if (!nextCursor || isLoadingPage) return
+    const current = requestId.current
+    setIsLoadingPage(true)
+    const result = await getTicketSummaries({
+      status: filterStatus === 'all' ? undefined : filterStatus,
+      ticketType: filterType === 'all' ? undefined : filterType,
+      search: searchTerm
+    }, nextCursor)
+    if (current === requestId.current) {
+      setTickets(prev => [...prev, ...result.data])
+      setNextCursor(result.nextCursor)
+      setPageError(result.error)
+    }
+    setIsLoadingPage(false)
+  }
+
+  // Renglones del ticket: se piden al expandir la fila y quedan en caché
+  const [expandedTicketId, setExpandedTicketId] = useState<string | null>(null)
+  const [itemsByTicket, setItemsByTicket] = useState<Record<string, TicketItem[]>>({})
+  const [itemsLoadingId, setItemsLoadingId] = useState<string | null>(null)
+  const [itemsError, setItemsError] = useState<string | null>(null)
+
+  const toggleTicketItems = async (ticketId: string) => {
+    if (expandedTicketId === ticketId) {
+      setExpandedTicketId(null)
+      return
+    }
+    setExpandedTicketId(ticketId)
+    setItemsError(null)
+    if (itemsByTicket[ticketId]) return
+
+    setItemsLoadingId(ticketId)
+    const { data, error } = await getTicketItemsAction(ticketId)
+    if (error) {
+      setItemsError(error)
+    } else {
+      setItemsByTicket(prev => ({ ...prev, [ticketId]: data || [] }))
+    }
+    setItemsLoadingId(null)
+  }
 
   // Estado para modal de editar
   const [isEditModalOpen, setIsEditModalOpen] = useState(false)
@@ -214,28 +302,6 @@ export default function TicketsTable({ initialTickets, clients, serviceTypes, br
     })
   }
 
-  // Filtrar tickets
-  const filteredTickets = tickets.filter(ticket => {
-    const searchLower = searchTerm.toLowerCase()
-
-    // Búsqueda por ticket ID (soporta formatos: TK-2026-00002, TK-00002, 00002)
-    const ticketIdMatch = ticket.readable_id?.toLowerCase().includes(searchLower) ||
-      (searchTerm.match(/^\d+$/) && ticket.readable_id?.match(/TK-\d{4}-(\d{5})/)?.[1]?.endsWith(searchTerm))
-
-    const matchesSearch =
-      ticketIdMatch ||
-      ticket.title.toLowerCase().includes(searchLower) ||
-      ticket.client?.commercial_name?.toLowerCase().includes(searchLower)
-
-    // Ocultar cancelados por defecto, solo mostrar si se filtra específicamente por ellos
-    const matchesStatus = filterStatus === 'all'
-      ? ticket.status !== 'cancelled'
-      : ticket.status === filterStatus
-    const matchesType = filterType === 'all' || (ticket as any).ticket_type === filterType
-
-    return matchesSearch && matchesStatus && matchesType
-  })
-
   // Manejar creación de ticket
   const handleCreateTicket = async (formData: FormData) => {
     setFormError(null)
@@ -333,7 +399,13 @@ export default function TicketsTable({ initialTickets, clients, serviceTypes, br
       </div>
 
       {/* Table or Empty State */}
-      {filteredTickets.length === 0 ? (
+      {pageError && (
+        <div className="p-4 bg-red-500/10 border border-red-500/20 rounded-xl text-sm text-red-400">
+          {pageError}
+        </div>
+      )}
+
+      {tickets.length === 0 && !isLoadingPage ? (
         <EmptyState
           onCreateClick={() => setIsModalOpen(true)}
           searchTerm={searchTerm}
@@ -413,10 +485,17 @@ export default function TicketsTable({ initialTickets, clients, serviceTypes, br
               header: 'Unidades',
               key: 'units',
               render: (ticket) => (
-                <div className="flex items-center gap-2 font-mono text-xs font-bold">
+                <button
+                  onClick={() => toggleTicketItems(ticket.id)}
+                  className="flex items-center gap-2 font-mono text-xs font-bold hover:text-brand-600 dark:hover:text-brand-400 transition-colors"
+                  title={`${ticket.item_count} renglones · ${ticket.validated_count} validados · ${ticket.box_count} cajas`}
+                >
+                  {expandedTicketId === ticket.id
+                    ? <ChevronDown className="w-4 h-4 text-gray-500 dark:text-gray-400" />
+                    : <ChevronRight className="w-4 h-4 text-gray-500 dark:text-gray-400" />}
                   <Package className="w-4 h-4 text-gray-500 dark:text-gray-400" />
                   <Text variant="body" className="font-bold">{ticket.received_units}/{ticket.expected_units}</Text>
-                </div>
+                </button>
               )
             },
             {
@@ -466,10 +545,31 @@ export default function TicketsTable({ initialTickets, clients, serviceTypes, br
               )
             }
           ]}
-          data={filteredTickets}
+          data={tickets}
+          renderExpanded={(ticket) => expandedTicketId === ticket.id ? (
+            <TicketItemsDetail
+              ticket={ticket}
+              items={itemsByTicket[ticket.id]}
+              isLoading={itemsLoadingId === ticket.id}
+              error={itemsError}
+            />
+          ) : null}
         />
       )}
 
+      {nextCursor && (
+        <div className="flex justify-center">
+          <button
+            onClick={loadMoreTickets}
+            disabled={isLoadingPage}
+            className="flex items-center gap-2 px-6 py-2.5 border border-gray-200 dark:border-surface-800 rounded-xl text-sm font-bold text-gray-600 dark:text-surface-300 hover:bg-gray-100 dark:hover:bg-surface-800 transition-all disabled:opacity-50"
+          >
+            {isLoadingPage && <Loader2 className="w-4 h-4 animate-spin" />}
+            {isLoadingPage ? 'Cargando...' : 'Cargar más tickets'}
+          </button>
+        </div>
+      )}
+
       {/* Modal para crear ticket */}
       {isModalOpen && (
         <CreateTicketModal
@@ -1026,6 +1126,93 @@ function CreateTicketModal({
   )
 }
 
+type TicketItemDetail = TicketItem & {
+  expected_quantity?: number | null
+  received_quantity?: number | null
+  catalog_brand?: { name: string } | null
+  catalog_model?: { name: string } | null
+  catalog_product_type?: { name: string } | null
+}
+
+const validationLabels: Record<string, string> = {
+  PENDIENTE_VALIDACION: 'Pendiente',
+  VALIDADO: 'Validado',
+  EXTRA: 'Extra',
+  FALTANTE: 'Faltante',
+  ILEGIBLE: 'Ilegible'
+}
+
+// Detalle de renglones bajo la fila del ticket (se carga al expandir)
+function TicketItemsDetail({
+  ticket,
+  items,
+  isLoading,
+  error
+}: {
+  ticket: TicketSummary
+  items?: TicketItem[]
+  isLoading: boolean
+  error: string | null
+}) {
+  if (isLoading) {
+    return (
+      <div className="flex items-center gap-2 text-sm text-gray-500 dark:text-surface-400">
+        <Loader2 className="w-4 h-4 animate-spin" />
+        Cargando renglones...
+      </div>
+    )
+  }
+
+  if (error && !items) {
+    return <p className="text-sm text-red-400">{error}</p>
+  }
+
+  const rows = (items || []) as TicketItemDetail[]
+
+  return (
+    <div className="space-y-3">
+      <div className="flex flex-wrap gap-4 text-xs font-bold text-gray-600 dark:text-surface-400">
+        <span>{ticket.item_count} renglones</span>
+        <span>{ticket.received_count} de {ticket.expected_count} recibidos</span>
+        <span>{ticket.validated_count} validados</span>
+        <span>{ticket.box_count} cajas</span>
+      </div>
+      {rows.length === 0 ? (
+        <p className="text-sm text-gray-500 dark:text-surface-500 italic">Sin renglones registrados.</p>
+      ) : (
+        <table className="w-full text-left text-xs">
+          <thead>
+            <tr className="text-gray-500 dark:text-surface-500 uppercase tracking-wider">
+              <th className="py-2 pr-4">Tipo</th>
+              <th className="py-2 pr-4">Marca</th>
+              <th className="py-2 pr-4">Modelo</th>
+              <th className="py-2 pr-4">Serie esperada</th>
+              <th className="py-2 pr-4">Serie recolectada</th>
+              <th className="py-2 pr-4">Caja</th>
+              <th className="py-2 pr-4">Cant.</th>
+              <th className="py-2">Validación</th>
+            </tr>
+          </thead>
+          <tbody className="divide-y divide-gray-100 dark:divide-gray-800 text-gray-800 dark:text-gray-200">
+            {rows.map((item) => (
+              <tr key={item.id}>
+                <td className="py-2 pr-4">{item.catalog_product_type?.name || item.product_type || '-'}</td>
+                <td className="py-2 pr-4">{item.catalog_brand?.name || item.brand || '-'}</td>
+                <td className="py-2 pr-4">{item.catalog_model?.name || item.model || '-'}</td>
+                <td className="py-2 pr-4 font-mono">{item.expected_serial || '-'}</td>
+                <td className="py-2 pr-4 font-mono">{item.collected_serial || '-'}</td>
+                <td className="py-2 pr-4">{item.box_number ?? '-'}</td>
+                <td className="py-2 pr-4 font-mono">{item.received_quantity ?? 0}/{item.expected_quantity ?? 1}</td>
+                <td className="py-2">{validationLabels[item.validation_status] || item.validation_status}</td>
+              </tr>
+            ))}
+          </tbody>
+        </table>
+      )}
+    </div>
+  )
+}
+
 // View Ticket Modal Component
 function ViewTicketModal({
   ticket,
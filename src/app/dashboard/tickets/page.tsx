@@ -1,6 +1,6 @@
 import { Suspense } from 'react'
 import { FileText, Loader2, ClipboardCheck, Clock, CheckCircle2 } from 'lucide-react'
-import { getTickets } from './actions'
+import { getTicketSummaries, getTicketStatusCounts } from './actions'
 import { getClients } from '../clientes/actions'
 import { getCatalogItems } from '../configuracion/usuarios/actions'
 import TicketsTable from './components/TicketsTable'
@@ -12,8 +12,9 @@ import { StatsCard } from '@/components/ui/StatsCard'
  * Gestión de órdenes de trabajo y servicios
  */
 export default async function TicketsPage() {
-  const [ticketsResult, clientsResult, serviceTypes, brands, models, productTypes] = await Promise.all([
-    getTickets(),
+  const [ticketsResult, statusCounts, clientsResult, serviceTypes, brands, models, productTypes] = await Promise.all([
+    getTicketSummaries(),
+    getTicketStatusCounts(),
     getClients(),
     getCatalogItems('catalog_service_types'),
     getCatalogItems('catalog_brands'),
@@ -21,16 +22,17 @@ export default async function TicketsPage() {
     getCatalogItems('catalog_product_types')
   ])
 
-  const tickets = ticketsResult.data || []
+  const tickets = ticketsResult.data
   const clients = clientsResult.data || []
 
   const inProgressStatuses = ['open', 'assigned', 'confirmed', 'in_progress']
 
+  // Conteos por estado calculados en SQL; la tabla solo trae la primera página
   const stats = {
-    total: tickets.length,
-    draft: tickets.filter(t => t.status === 'draft').length,
-    inProgress: tickets.filter(t => inProgressStatuses.includes(t.status)).length,
-    completed: tickets.filter(t => t.status === 'completed').length,
+    total: Object.values(statusCounts).reduce((sum, count) => sum + count, 0),
+    draft: statusCounts.draft || 0,
+    inProgress: inProgressStatuses.reduce((sum, status) => sum + (statusCounts[status] || 0), 0),
+    completed: statusCounts.completed || 0,
   }
 
   return (
@@ -60,6 +62,7 @@ export default async function TicketsPage() {
         <Suspense fallback={<LoadingState />}>
           <TicketsTable
             initialTickets={tickets}
+            initialCursor={ticketsResult.nextCursor}
             clients={clients}
             serviceTypes={serviceTypes}
             brands={brands}
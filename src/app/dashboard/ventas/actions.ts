@@ -1,5 +1,6 @@
 'use server'
 
+import { randomUUID } from 'crypto'
 import { createClient } from '@/lib/supabase/server'
 import { revalidatePath } from 'next/cache'
 
@@ -33,6 +34,16 @@ export interface AssetForSale {
   created_at: string
 }
 
+export interface StockForSaleGroup {
+  manufacturer: string | null
+  model: string | null
+  asset_type: string | null
+  condition_grade: string | null
+  available_count: number
+  avg_cost: number | null
+  suggested_price: number
+}
+
 const REMARKETING_WAREHOUSE_CODE = 'BOD-REM'
 const REMARKETING_READY_STATUS = 'ready_for_sale'
 
@@ -80,10 +91,33 @@ export async function searchCustomers(query: string) {
 
 // =====================================================
 // BUSCAR ACTIVOS PARA VENTA
-// Filtra por status 'ready_for_sale' y busca por serial/modelo
+// Filtra por status 'ready_for_sale' y busca por serial/modelo; omite los
+// equipos apartados por otro carrito (holdId = el carrito que busca)
 // =====================================================
 
-export async function searchAssetsForSale(query: string) {
+async function withoutForeignHolds(
+  supabase: Awaited<ReturnType<typeof createClient>>,
+  assets: AssetForSale[],
+  holdId?: string
+) {
+  if (assets.length === 0) return { data: assets, error: null }
+
+  const { data: holds, error } = await supabase
+    .from('asset_reservations')
+    .select('asset_id, hold_id')
+    .in('asset_id', assets.map((asset) => asset.id))
+    .gt('expires_at', new Date().toISOString())
+
+  if (error) {
+    console.error('Error checking reservations:', error)
+    return { data: [] as AssetForSale[], error: error.message }
+  }
+
+  const held = new Set((holds ?? []).filter((row) => row.hold_id !== holdId).map((row) => row.asset_id))
+  return { data: assets.filter((asset) => !held.has(asset.id)), error: null }
+}
+
+export async function searchAssetsForSale(query: string, holdId?: string) {
   const supabase = await createClient()
 
   if (query.length < 2) {
@@ -98,7 +132,7 @@ export async function searchAssetsForSale(query: string) {
     if (error) {
       return { data: [], error: error.message }
     }
-    return { data: data as AssetForSale[], error: null }
+    return withoutForeignHolds(supabase, data as AssetForSale[], holdId)
   }
 
   const { data, error } = await supabase
@@ -114,35 +148,82 @@ export async function searchAssetsForSale(query: string) {
     return { data: [], error: error.message }
   }
 
-  return { data: data as AssetForSale[], error: null }
+  return withoutForeignHolds(supabase, data as AssetForSale[], holdId)
 }
 
 export async function getRemarketingWarehouseStock() {
   const supabase = await createClient()
 
-  const { data: warehouse, error: warehouseError } = await supabase
-    .from('warehouses')
-    .select('id')
-    .eq('code', REMARKETING_WAREHOUSE_CODE)
-    .single()
+  // Contadores por bodega/estado/tipo (20260307_warehouse_stock_counters.sql)
+  const { data, error } = await supabase
+    .from('warehouse_stock_counters')
+    .select('quantity, warehouse:warehouses!inner(code)')
+    .eq('warehouse.code', REMARKETING_WAREHOUSE_CODE)
+    .eq('status', REMARKETING_READY_STATUS)
 
-  if (warehouseError || !warehouse?.id) {
-    console.error('Remarketing warehouse lookup failed:', warehouseError)
-    return { count: 0, error: warehouseError?.message ?? 'Bodega Remarketing no encontrada' }
+  if (error) {
+    console.error('Error counting Remarketing assets:', error)
+    return { count: 0, error: error.message }
   }
 
-  const { count, error: assetsError } = await supabase
-    .from('assets')
-    .select('*', { count: 'exact', head: true })
-    .eq('current_warehouse_id', warehouse.id)
-    .eq('status', REMARKETING_READY_STATUS)
+  const count = (data ?? []).reduce((sum, row) => sum + Number(row.quantity ?? 0), 0)
+  return { count, error: null }
+}
 
-  if (assetsError) {
-    console.error('Error counting Remarketing assets:', assetsError)
-    return { count: 0, error: assetsError.message }
+// =====================================================
+// STOCK DISPONIBLE POR MARCA / MODELO / GRADO
+// Lee stock_for_sale (20260317_stock_for_sale.sql), mantenida por trigger,
+// sin los equipos con reserva vigente (20260318_asset_reservations.sql)
+// =====================================================
+
+export async function getStockForSale() {
+  const supabase = await createClient()
+
+  const { data, error } = await supabase
+    .from('available_stock_for_sale')
+    .select('manufacturer, model, asset_type, condition_grade, available_count, avg_cost, suggested_price')
+
+  if (error) {
+    console.error('Error loading stock for sale:', error)
+    return { data: [] as StockForSaleGroup[], error: error.message }
+  }
+
+  return { data: (data ?? []) as StockForSaleGroup[], error: null }
+}
+
+// Equipos disponibles de una marca/modelo; con serials, solo los que
+// coinciden por serie o etiqueta interna (una sola consulta). Los apartados
+// por un carrito distinto de holdId no se devuelven.
+export async function getStockForSaleAssets(params: {
+  manufacturer: string
+  model: string
+  assetType?: string
+  conditionGrade?: string
+  serials?: string[]
+  limit?: number
+  holdId?: string
+}) {
+  const supabase = await createClient()
+
+  const { data, error } = await supabase.rpc('get_stock_for_sale_assets', {
+    p_manufacturer: params.manufacturer,
+    p_model: params.model,
+    p_asset_type: params.assetType ?? null,
+    p_condition_grade: params.conditionGrade ?? null,
+    p_serials: params.serials?.length ? params.serials : null,
+    p_limit: params.limit ?? 100,
+    p_hold_id: params.holdId ?? null
+  })
+
+  if (error) {
+    console.error('Error loading assets for sale:', error)
+    return { data: [] as AssetForSale[], error: error.message }
   }
 
-  return { count: count ?? 0, error: null }
+  return {
+    data: ((data ?? []) as AssetForSale[]).map((asset) => ({ ...asset, photos: asset.photos ?? [] })),
+    error: null
+  }
 }
 
 // =====================================================
@@ -192,6 +273,85 @@ export async function getRemarketingPrice(params: { manufacturer: string; model:
   return { price: Math.round(avgPrice * 100) / 100, error: null }
 }
 
+// =====================================================
+// RESERVAS DE CARRITO
+// Aparta equipos por carrito (holdId) mientras se arma la venta; vencen
+// solas (20260318_asset_reservations.sql)
+// =====================================================
+
+export interface ReservationResult {
+  success: boolean
+  error?: string
+  expiresAt?: string
+  unavailable?: Array<{ asset_id: string; serial_number: string | null; internal_tag: string | null; reason: string }>
+}
+
+export async function reserveAssetsForCart(holdId: string, assetIds: string[]): Promise<ReservationResult> {
+  const supabase = await createClient()
+
+  const { data, error } = await supabase.rpc('reserve_assets', {
+    p_hold_id: holdId,
+    p_asset_ids: assetIds
+  })
+
+  if (error) {
+    console.error('Error reserving assets:', error)
+    return { success: false, error: error.message }
+  }
+
+  return {
+    success: Boolean(data?.success),
+    error: data?.error,
+    expiresAt: data?.expires_at,
+    unavailable: data?.unavailable ?? []
+  }
+}
+
+export async function allocateAssetsForCart(params: {
+  holdId: string
+  manufacturer: string
+  model: string
+  quantity: number
+  conditionGrade?: string
+}) {
+  const supabase = await createClient()
+
+  const { data, error } = await supabase.rpc('reserve_assets_by_quantity', {
+    p_hold_id: params.holdId,
+    p_manufacturer: params.manufacturer,
+    p_model: params.model,
+    p_quantity: params.quantity,
+    p_condition_grade: params.conditionGrade ?? null
+  })
+
+  if (error) {
+    console.error('Error allocating assets:', error)
+    return { data: [] as AssetForSale[], error: error.message }
+  }
+
+  if (!data?.success) {
+    return { data: [] as AssetForSale[], error: (data?.error as string) ?? 'No se pudieron apartar los equipos' }
+  }
+
+  return { data: (data.assets ?? []) as AssetForSale[], error: null }
+}
+
+export async function releaseCartReservations(holdId: string, assetIds?: string[]) {
+  const supabase = await createClient()
+
+  const { data, error } = await supabase.rpc('release_asset_reservations', {
+    p_hold_id: holdId,
+    p_asset_ids: assetIds?.length ? assetIds : null
+  })
+
+  if (error) {
+    console.error('Error releasing reservations:', error)
+    return { released: 0, error: error.message }
+  }
+
+  return { released: (data as number) ?? 0, error: null }
+}
+
 // =====================================================
 // PROCESAR VENTA (TRANSACCIONAL)
 // =====================================================
@@ -208,6 +368,7 @@ interface ProcessSaleData {
   warrantyDays?: number
   paymentMethod?: string
   notes?: string
+  holdId?: string
 }
 
 export async function processSale(data: ProcessSaleData) {
@@ -228,6 +389,29 @@ export async function processSale(data: ProcessSaleData) {
     return { success: false, error: 'El carrito está vacío' }
   }
 
+  // Los equipos deben seguir apartados por este carrito (o libres). Sin
+  // carrito se apartan con uno de un solo uso, para no vender equipos que
+  // otro vendedor tiene reservados.
+  const ownsHold = !data.holdId
+  const holdId = data.holdId || randomUUID()
+
+  // Nadie más conoce el carrito de un solo uso: si la venta falla se libera
+  // aquí para no dejar los equipos apartados hasta que venza
+  const fail = async (error?: string) => {
+    if (ownsHold) {
+      await releaseCartReservations(holdId)
+    }
+    return { success: false, error }
+  }
+
+  const reservation = await reserveAssetsForCart(holdId, data.cartItems.map(item => item.assetId))
+  if (!reservation.success) {
+    const taken = (reservation.unavailable ?? [])
+      .map(item => item.serial_number ?? item.internal_tag ?? item.asset_id)
+      .join(', ')
+    return fail(taken ? `Equipos reservados por otra venta o no disponibles: ${taken}` : reservation.error)
+  }
+
   // Calcular total
   const totalAmount = data.cartItems.reduce((sum, item) => sum + item.unitPrice, 0)
 
@@ -274,12 +458,12 @@ export async function processSale(data: ProcessSaleData) {
       .in('id', assetIds)
 
     if (checkError) {
-      return { success: false, error: 'Error verificando disponibilidad' }
+      return fail('Error verificando disponibilidad')
     }
 
     const unavailable = assets?.filter(a => a.status !== 'ready_for_sale')
     if (unavailable && unavailable.length > 0) {
-      return { success: false, error: 'Algunos equipos ya no están disponibles' }
+      return fail('Algunos equipos ya no están disponibles')
     }
 
     // 2. Crear orden de venta
@@ -303,7 +487,7 @@ export async function processSale(data: ProcessSaleData) {
 
     if (orderError) {
       console.error('Error creating order:', orderError)
-      return { success: false, error: orderError.message }
+      return fail(orderError.message)
     }
 
     // 3. Crear items de la orden
@@ -330,7 +514,7 @@ export async function processSale(data: ProcessSaleData) {
     if (itemsError) {
       // Rollback: eliminar orden
       await supabase.from('sales_orders').delete().eq('id', order.id)
-      return { success: false, error: itemsError.message }
+      return fail(itemsError.message)
     }
 
     // 4. Actualizar activos a vendido
@@ -361,7 +545,7 @@ export async function processSale(data: ProcessSaleData) {
 
   } catch (err) {
     console.error('Error in processSale:', err)
-    return { success: false, error: 'Error inesperado al procesar la venta' }
+    return fail('Error inesperado al procesar la venta')
   }
 }
 
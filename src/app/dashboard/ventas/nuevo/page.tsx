@@ -27,9 +27,15 @@ import {
   processSale,
   getRemarketingWarehouseStock,
   getRemarketingPrice,
+  getStockForSale,
+  getStockForSaleAssets,
+  reserveAssetsForCart,
+  allocateAssetsForCart,
+  releaseCartReservations,
   type AssetForSale,
   type CartItem,
-  type Customer
+  type Customer,
+  type StockForSaleGroup
 } from '../actions'
 
 import {
@@ -84,6 +90,7 @@ export default function NuevaVentaPage() {
   const [remarketingCount, setRemarketingCount] = useState<number | null>(null)
   const [remarketingLoading, setRemarketingLoading] = useState(false)
   const [remarketingError, setRemarketingError] = useState<string | null>(null)
+  const [stockGroups, setStockGroups] = useState<StockForSaleGroup[]>([])
   const [isCatalogModalOpen, setIsCatalogModalOpen] = useState(false)
   const [catalogBrands, setCatalogBrands] = useState<CatalogBrand[]>([])
   const [catalogModels, setCatalogModels] = useState<CatalogModel[]>([])
@@ -117,6 +124,20 @@ export default function NuevaVentaPage() {
     ? selectedModel.product_type?.name ?? catalogProductTypeLookup.get(selectedModel.product_type_id ?? '') ?? '—'
     : '—'
 
+  // Disponibles y precio de lista de la marca/modelo, sumando tipos y grados
+  const selectedStock = useMemo(() => {
+    if (!selectedBrand || !selectedModel) return null
+    const brand = selectedBrand.name.toLowerCase()
+    const model = selectedModel.name.toLowerCase()
+    const groups = stockGroups.filter(
+      (group) => group.manufacturer?.toLowerCase() === brand && group.model?.toLowerCase() === model
+    )
+    const available = groups.reduce((sum, group) => sum + group.available_count, 0)
+    const priced = groups.filter((group) => group.suggested_price > 0)
+    const listPrice = priced.length ? Math.min(...priced.map((group) => group.suggested_price)) : null
+    return { available, listPrice }
+  }, [stockGroups, selectedBrand, selectedModel])
+
   const formatCurrency = useCallback((value: number) =>
     value
       .toLocaleString('es-GT', {
@@ -128,10 +149,17 @@ export default function NuevaVentaPage() {
 
   const customerDebounce = useRef<ReturnType<typeof setTimeout> | null>(null)
   const productDebounce = useRef<ReturnType<typeof setTimeout> | null>(null)
+  // Carrito para las reservas de equipos; se renueva con cada venta
+  const holdIdRef = useRef<string>('')
 
   useEffect(() => {
     setSaleDate(new Date())
     setInvoiceNumber(`FACT-${Date.now().toString().slice(-8)}`)
+    holdIdRef.current = crypto.randomUUID()
+
+    return () => {
+      releaseCartReservations(holdIdRef.current).catch(console.error)
+    }
   }, [])
 
   const fetchCustomers = useCallback(async (query: string) => {
@@ -161,7 +189,7 @@ export default function NuevaVentaPage() {
   const fetchProducts = useCallback(async (query: string) => {
     setSearchingProducts(true)
     try {
-      const { data, error: clientError } = await searchAssetsForSale(query.trim())
+      const { data, error: clientError } = await searchAssetsForSale(query.trim(), holdIdRef.current)
       if (clientError) {
         setError(clientError)
         setProductResults([])
@@ -227,10 +255,14 @@ export default function NuevaVentaPage() {
       setRemarketingLoading(true)
       setRemarketingError(null)
       try {
-        const { count, error: countError } = await getRemarketingWarehouseStock()
+        const [{ count, error: countError }, { data: groups }] = await Promise.all([
+          getRemarketingWarehouseStock(),
+          getStockForSale()
+        ])
         if (cancelled) return
         setRemarketingCount(count)
         setRemarketingError(countError)
+        setStockGroups(groups)
       } catch (err) {
         console.error(err)
         if (!cancelled) {
@@ -360,40 +392,70 @@ export default function NuevaVentaPage() {
       setModalError('Selecciona marca y modelo antes de continuar')
       return
     }
-    if (serialNumbers.some((serial) => !serial.trim())) {
-      setModalError('Ingresa todos los números de serie')
+    const autoAssign = serialNumbers.every((serial) => !serial.trim())
+    if (!autoAssign && serialNumbers.some((serial) => !serial.trim())) {
+      setModalError('Ingresa todos los números de serie o déjalos vacíos para asignarlos automáticamente')
       return
     }
 
     setModalProcessing(true)
     try {
-      const assetsToAdd: AssetForSale[] = []
-      for (const serial of serialNumbers) {
-        const trimmed = serial.trim()
-        if (trimmed.length < 2) {
-          setModalError('El número de serie debe tener al menos dos caracteres')
-          return
-        }
-        const { data, error: searchError } = await searchAssetsForSale(trimmed)
-        if (searchError) {
-          setModalError(`Error buscando el serial ${trimmed}`)
+      if (autoAssign) {
+        const { data, error: allocateError } = await allocateAssetsForCart({
+          holdId: holdIdRef.current,
+          manufacturer: selectedBrand.name,
+          model: selectedModel.name,
+          quantity: quantityForModal
+        })
+        if (allocateError) {
+          setModalError(allocateError)
           return
         }
-        const match = (data ?? []).find((asset) => {
-          const matchesSerial =
-            asset.serial_number?.toLowerCase() === trimmed.toLowerCase() ||
-            asset.internal_tag?.toLowerCase() === trimmed.toLowerCase()
-          const matchesBrand = asset.manufacturer?.toLowerCase() === selectedBrand.name.toLowerCase()
-          const matchesModel = asset.model?.toLowerCase() === selectedModel.name.toLowerCase()
-          return matchesSerial && matchesBrand && matchesModel
-        })
+        data.forEach(addToCart)
+        closeCatalogModal()
+        return
+      }
+
+      const serials = serialNumbers.map((serial) => serial.trim())
+      if (serials.some((serial) => serial.length < 2)) {
+        setModalError('El número de serie debe tener al menos dos caracteres')
+        return
+      }
+
+      const { data, error: searchError } = await getStockForSaleAssets({
+        manufacturer: selectedBrand.name,
+        model: selectedModel.name,
+        serials,
+        holdId: holdIdRef.current
+      })
+      if (searchError) {
+        setModalError('Error buscando los números de serie')
+        return
+      }
+
+      const assetsToAdd: AssetForSale[] = []
+      for (const serial of serials) {
+        const lower = serial.toLowerCase()
+        const match = data.find((asset) =>
+          asset.serial_number?.toLowerCase() === lower ||
+          asset.internal_tag?.toLowerCase() === lower
+        )
         if (!match) {
-          setModalError(`No se encontró activo para el serial "${trimmed}"`)
+          setModalError(`No se encontró activo para el serial "${serial}"`)
           return
         }
         assetsToAdd.push(match)
       }
 
+      const reservation = await reserveAssetsForCart(holdIdRef.current, assetsToAdd.map((asset) => asset.id))
+      if (!reservation.success) {
+        const taken = (reservation.unavailable ?? [])
+          .map((item) => item.serial_number ?? item.internal_tag ?? item.asset_id)
+          .join(', ')
+        setModalError(taken ? `Reservados por otra venta: ${taken}` : reservation.error ?? 'No se pudieron apartar los equipos')
+        return
+      }
+
       assetsToAdd.forEach(addToCart)
       closeCatalogModal()
     } finally {
@@ -416,6 +478,7 @@ export default function NuevaVentaPage() {
       setProductResults((prev) => [removedItem.asset, ...prev])
     }
     setCart((prev) => prev.filter((item) => item.asset.id !== assetId))
+    releaseCartReservations(holdIdRef.current, [assetId]).catch(console.error)
   }
 
   const updatePrice = (assetId: string, price: number) => {
@@ -460,7 +523,8 @@ export default function NuevaVentaPage() {
         serialNumber: item.asset.serial_number,
         conditionGrade: item.asset.condition
       })),
-      warrantyDays: 30
+      warrantyDays: 30,
+      holdId: holdIdRef.current
     })
 
     setIsProcessing(false)
@@ -477,6 +541,7 @@ export default function NuevaVentaPage() {
     setSuccess(null)
     setSelectedCustomer(null)
     setCart([])
+    holdIdRef.current = crypto.randomUUID()
     setCustomerQuery('')
     setProductQuery('')
     fetchProducts('')
@@ -882,12 +947,19 @@ export default function NuevaVentaPage() {
                       ? `Q${formatCurrency(modalUnitPrice)}`
                       : '—'}
                 </p>
+                {selectedStock && (
+                  <p className="text-xs font-bold text-emerald-700/70 dark:text-emerald-400/70 tabular-nums">
+                    {selectedStock.available} disponibles
+                    {selectedStock.listPrice !== null && ` · Lista Q${formatCurrency(selectedStock.listPrice)}`}
+                  </p>
+                )}
                 {catalogPriceError && <p className="text-[10px] font-black uppercase text-amber-600 dark:text-amber-500 bg-amber-50 dark:bg-amber-500/10 px-2 py-1 rounded w-fit">{catalogPriceError}</p>}
               </div>
 
               {/* Números de serie */}
               <div className="space-y-3">
                 <label className="block text-xs font-black uppercase tracking-widest text-gray-400 dark:text-surface-500">Números de Serie</label>
+                <p className="text-[10px] font-bold text-gray-400 dark:text-surface-500">Vacíos = se apartan los equipos disponibles más antiguos</p>
                 <div className="space-y-2 max-h-40 overflow-y-auto px-1">
                   {serialNumbers.map((serial, index) => (
                     <input
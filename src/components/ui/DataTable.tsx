@@ -1,3 +1,4 @@
+import { Fragment } from 'react'
 import { cn } from '@/lib/utils'
 
 import { AppPermission, AppRole } from '@/lib/schemas'
@@ -17,6 +18,7 @@ interface DataTableProps<T> {
     onRowClick?: (row: T) => void
     className?: string
     userRole?: AppRole | string // Rol del usuario actual
+    renderExpanded?: (row: T) => React.ReactNode // Fila de detalle bajo la fila (null = cerrada)
 }
 
 export function DataTable<T extends { id?: string | number }>({
@@ -24,7 +26,8 @@ export function DataTable<T extends { id?: string | number }>({
     data,
     onRowClick,
     className,
-    userRole
+    userRole,
+    renderExpanded
 }: DataTableProps<T>) {
     // Filtrar columnas por permiso
     const visibleColumns = columns.filter(col => {
@@ -66,28 +69,39 @@ export function DataTable<T extends { id?: string | number }>({
                                 </td>
                             </tr>
                         ) : (
-                            data.map((row, rowIdx) => (
-                                <tr
-                                    key={row.id || rowIdx}
-                                    onClick={() => onRowClick?.(row)}
-                                    className={cn(
-                                        "group transition-colors",
-                                        onRowClick ? "cursor-pointer hover:bg-gray-50 dark:hover:bg-gray-800/50" : ""
-                                    )}
-                                >
-                                    {visibleColumns.map((column, colIdx) => (
-                                        <td
-                                            key={colIdx}
+                            data.map((row, rowIdx) => {
+                                const expanded = renderExpanded?.(row)
+                                return (
+                                    <Fragment key={row.id || rowIdx}>
+                                        <tr
+                                            onClick={() => onRowClick?.(row)}
                                             className={cn(
-                                                "px-6 py-4 text-sm text-gray-900 dark:text-gray-200",
-                                                column.className
+                                                "group transition-colors",
+                                                onRowClick ? "cursor-pointer hover:bg-gray-50 dark:hover:bg-gray-800/50" : ""
                                             )}
                                         >
-                                            {column.render ? column.render(row) : (row as any)[column.key]}
-                                        </td>
-                                    ))}
-                                </tr>
-                            ))
+                                            {visibleColumns.map((column, colIdx) => (
+                                                <td
+                                                    key={colIdx}
+                                                    className={cn(
+                                                        "px-6 py-4 text-sm text-gray-900 dark:text-gray-200",
+                                                        column.className
+                                                    )}
+                                                >
+                                                    {column.render ? column.render(row) : (row as any)[column.key]}
+                                                </td>
+                                            ))}
+                                        </tr>
+                                        {expanded && (
+                                            <tr className="bg-gray-50/50 dark:bg-gray-900/30">
+                                                <td colSpan={visibleColumns.length} className="px-6 py-4">
+                                                    {expanded}
+                                                </td>
+                                            </tr>
+                                        )}
+                                    </Fragment>
+                                )
+                            })
                         )}
                     </tbody>
                 </table>
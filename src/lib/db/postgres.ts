@@ -0,0 +1,20 @@
+import postgres from 'postgres'
+
+let sql: ReturnType<typeof postgres> | null = null
+
+/**
+ * Conexión directa a Postgres (solo en servidor) para lo que PostgREST no
+ * permite, como leer con un cursor del lado del servidor.
+ * Usa DATABASE_URL o POSTGRES_URL, igual que scripts/apply_schema_fix.js.
+ * No aplica RLS: quien la use debe validar la sesión antes.
+ */
+export function getSql() {
+  if (!sql) {
+    const connectionString = process.env.DATABASE_URL || process.env.POSTGRES_URL
+    if (!connectionString) {
+      throw new Error('DATABASE_URL no está configurada en el entorno')
+    }
+    sql = postgres(connectionString, { max: 4, idle_timeout: 30 })
+  }
+  return sql
+}
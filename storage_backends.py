@@ -0,0 +1,62 @@
+"""
+Backends de almacenamiento para los scripts de generación y carga de archivos.
+
+LocalStorage escribe en una carpeta local y sirve como sustituto del bucket
+de Supabase en desarrollo o en lotes nocturnos; SupabaseStorage sube al
+bucket real. Ambos exponen la misma interfaz put/exists/url.
+"""
+
+import os
+from pathlib import Path
+
+
+class LocalStorage:
+    def __init__(self, root):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key):
+        path = (self.root / key).resolve()
+        if self.root.resolve() not in path.parents:
+            raise ValueError(f'Ruta fuera del almacenamiento: {key}')
+        return path
+
+    def put(self, key, data, content_type=None):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+        return self.url(key)
+
+    def exists(self, key):
+        return self._path(key).exists()
+
+    def delete(self, key):
+        path = self._path(key)
+        if path.exists():
+            path.unlink()
+
+    def url(self, key):
+        return self._path(key).as_uri()
+
+
+class SupabaseStorage:
+    def __init__(self, supabase, bucket):
+        self.bucket = bucket
+        self.client = supabase.storage.from_(bucket)
+
+    def put(self, key, data, content_type='application/octet-stream'):
+        self.client.upload(key, data, {'content-type': content_type, 'upsert': 'true'})
+        return self.url(key)
+
+    def exists(self, key):
+        folder, _, name = key.rpartition('/')
+        return any(entry.get('name') == name for entry in self.client.list(folder, {'search': name}))
+
+    def delete(self, key):
+        self.client.remove([key])
+
+    def url(self, key):
+        return self.client.get_public_url(key)
@@ -0,0 +1,95 @@
+-- =========================================================================
+-- Migración: Carga masiva de evidencias de borrado
+-- Hash de contenido para deduplicar y función de inserción por lotes
+-- =========================================================================
+
+ALTER TABLE asset_wipe_evidence
+ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+COMMENT ON COLUMN asset_wipe_evidence.content_hash IS 'SHA-256 del contenido del archivo (deduplicación)';
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_asset_wipe_evidence_asset_hash
+  ON asset_wipe_evidence(asset_id, content_hash)
+  WHERE content_hash IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_asset_wipe_evidence_content_hash
+  ON asset_wipe_evidence(content_hash)
+  WHERE content_hash IS NOT NULL;
+
+-- Inserta un lote de evidencias en una sola sentencia.
+-- p_rows: arreglo JSON de objetos con asset_id, type, file_name, file_url,
+-- content_type, file_size y content_hash. Las filas cuyo (asset_id, content_hash)
+-- ya existe se omiten.
+CREATE OR REPLACE FUNCTION public.insert_wipe_evidence_batch(
+  p_rows JSONB,
+  p_uploaded_by UUID DEFAULT NULL
+)
+RETURNS TABLE (
+  inserted INTEGER,
+  skipped INTEGER
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $function$
+DECLARE
+  v_total INTEGER;
+  v_inserted INTEGER;
+BEGIN
+  IF p_rows IS NULL OR jsonb_typeof(p_rows) <> 'array' THEN
+    RAISE EXCEPTION 'p_rows debe ser un arreglo JSON';
+  END IF;
+
+  v_total := jsonb_array_length(p_rows);
+
+  WITH incoming AS (
+    SELECT DISTINCT ON (r.asset_id, r.content_hash)
+      r.asset_id,
+      lower(r.type) AS type,
+      r.file_name,
+      r.file_url,
+      r.content_type,
+      r.file_size,
+      r.content_hash
+    FROM jsonb_to_recordset(p_rows) AS r(
+      asset_id UUID,
+      type TEXT,
+      file_name TEXT,
+      file_url TEXT,
+      content_type TEXT,
+      file_size BIGINT,
+      content_hash TEXT
+    )
+    WHERE r.asset_id IS NOT NULL
+  ),
+  ins AS (
+    INSERT INTO asset_wipe_evidence (
+      asset_id,
+      type,
+      file_name,
+      file_url,
+      content_type,
+      file_size,
+      content_hash,
+      uploaded_by
+    )
+    SELECT
+      i.asset_id,
+      i.type,
+      i.file_name,
+      i.file_url,
+      i.content_type,
+      i.file_size,
+      i.content_hash,
+      p_uploaded_by
+    FROM incoming i
+    JOIN assets a ON a.id = i.asset_id
+    ON CONFLICT (asset_id, content_hash) WHERE content_hash IS NOT NULL DO NOTHING
+    RETURNING 1
+  )
+  SELECT COUNT(*) INTO v_inserted FROM ins;
+
+  RETURN QUERY SELECT v_inserted, v_total - v_inserted;
+END;
+$function$;
+
+NOTIFY pgrst, 'reload config';
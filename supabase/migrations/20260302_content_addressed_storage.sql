@@ -0,0 +1,267 @@
+-- =========================================================================
+-- Migración: Almacenamiento por contenido (deduplicación de archivos)
+-- Cada archivo se guarda una sola vez bajo su SHA-256; las evidencias de
+-- borrado solo referencian el hash.
+-- =========================================================================
+
+CREATE TABLE IF NOT EXISTS storage_blobs (
+  hash TEXT PRIMARY KEY CHECK (hash ~ '^[0-9a-f]{64}$'),
+  bucket TEXT NOT NULL,
+  object_path TEXT NOT NULL,
+  size BIGINT NOT NULL,
+  content_type TEXT,
+  ref_count INTEGER NOT NULL DEFAULT 0 CHECK (ref_count >= 0),
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  last_referenced_at TIMESTAMPTZ,
+  orphaned_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+ALTER TABLE storage_blobs
+ADD COLUMN IF NOT EXISTS gc_claimed_at TIMESTAMPTZ;
+
+CREATE INDEX IF NOT EXISTS idx_storage_blobs_orphaned
+  ON storage_blobs(orphaned_at)
+  WHERE ref_count = 0;
+
+COMMENT ON TABLE storage_blobs IS 'Archivos únicos por contenido (SHA-256) y sus conteos de referencias';
+COMMENT ON COLUMN storage_blobs.orphaned_at IS 'Momento en que ref_count llegó a 0 (candidato para recolección)';
+COMMENT ON COLUMN storage_blobs.gc_claimed_at IS 'Reclamado por el recolector; la fila se borra cuando el objeto ya no está en el bucket';
+
+ALTER TABLE storage_blobs ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "storage_blobs_select" ON storage_blobs;
+CREATE POLICY "storage_blobs_select" ON storage_blobs FOR SELECT TO authenticated USING (true);
+
+-- Registra un blob recién subido (o devuelve el existente). Volver a
+-- registrar un blob reclamado por el recolector cancela el reclamo.
+CREATE OR REPLACE FUNCTION public.register_storage_blob(
+  p_hash TEXT,
+  p_bucket TEXT,
+  p_object_path TEXT,
+  p_size BIGINT,
+  p_content_type TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+  hash TEXT,
+  object_path TEXT,
+  already_existed BOOLEAN
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $function$
+BEGIN
+  RETURN QUERY
+  INSERT INTO storage_blobs AS b (hash, bucket, object_path, size, content_type)
+  VALUES (p_hash, p_bucket, p_object_path, p_size, p_content_type)
+  ON CONFLICT ON CONSTRAINT storage_blobs_pkey
+  DO UPDATE SET orphaned_at = CASE WHEN b.ref_count = 0 THEN NOW() ELSE b.orphaned_at END,
+                gc_claimed_at = NULL
+  RETURNING b.hash, b.object_path, (xmax <> 0);
+END;
+$function$;
+
+-- insert_wipe_evidence acepta el hash del contenido. Se elimina la versión de
+-- 7 parámetros para que PostgREST no encuentre dos sobrecargas; las llamadas
+-- existentes siguen funcionando porque p_content_hash tiene valor por defecto.
+DROP FUNCTION IF EXISTS public.insert_wipe_evidence(UUID, TEXT, TEXT, TEXT, TEXT, BIGINT, UUID);
+
+CREATE OR REPLACE FUNCTION public.insert_wipe_evidence(
+  p_asset_id UUID,
+  p_type TEXT,
+  p_file_name TEXT,
+  p_file_url TEXT,
+  p_content_type TEXT,
+  p_file_size BIGINT,
+  p_uploaded_by UUID,
+  p_content_hash TEXT DEFAULT NULL
+) RETURNS TABLE (
+  id UUID,
+  asset_id UUID,
+  type TEXT,
+  file_name TEXT,
+  file_url TEXT,
+  content_type TEXT,
+  file_size BIGINT,
+  uploaded_by UUID,
+  created_at TIMESTAMPTZ,
+  updated_at TIMESTAMPTZ
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $function$
+#variable_conflict use_column
+BEGIN
+  RETURN QUERY
+  INSERT INTO asset_wipe_evidence AS e (
+    asset_id,
+    type,
+    file_name,
+    file_url,
+    content_type,
+    file_size,
+    uploaded_by,
+    content_hash
+  )
+  VALUES (
+    p_asset_id,
+    p_type,
+    p_file_name,
+    p_file_url,
+    p_content_type,
+    p_file_size,
+    p_uploaded_by,
+    p_content_hash
+  )
+  ON CONFLICT (asset_id, content_hash) WHERE content_hash IS NOT NULL
+  DO UPDATE SET updated_at = NOW()
+  RETURNING
+    e.id,
+    e.asset_id,
+    e.type,
+    e.file_name,
+    e.file_url,
+    e.content_type,
+    e.file_size,
+    e.uploaded_by,
+    e.created_at,
+    e.updated_at;
+END;
+$function$;
+
+-- Trigger genérico de conteo de referencias.
+-- TG_ARGV[0] es el nombre de la columna que contiene el hash.
+CREATE OR REPLACE FUNCTION public.track_storage_blob_refs()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $function$
+DECLARE
+  v_old TEXT;
+  v_new TEXT;
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    v_old := to_jsonb(OLD) ->> TG_ARGV[0];
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    v_new := to_jsonb(NEW) ->> TG_ARGV[0];
+  END IF;
+
+  IF v_old IS NOT DISTINCT FROM v_new THEN
+    RETURN NULL;
+  END IF;
+
+  IF v_old IS NOT NULL THEN
+    UPDATE storage_blobs
+    SET ref_count = GREATEST(ref_count - 1, 0),
+        orphaned_at = CASE WHEN ref_count <= 1 THEN NOW() ELSE orphaned_at END
+    WHERE hash = v_old;
+  END IF;
+
+  IF v_new IS NOT NULL THEN
+    UPDATE storage_blobs
+    SET ref_count = ref_count + 1,
+        last_referenced_at = NOW(),
+        orphaned_at = NULL,
+        gc_claimed_at = NULL
+    WHERE hash = v_new;
+  END IF;
+
+  RETURN NULL;
+END;
+$function$;
+
+DROP TRIGGER IF EXISTS trg_wipe_evidence_blob_refs ON asset_wipe_evidence;
+CREATE TRIGGER trg_wipe_evidence_blob_refs
+  AFTER INSERT OR UPDATE OF content_hash OR DELETE ON asset_wipe_evidence
+  FOR EACH ROW
+  EXECUTE FUNCTION public.track_storage_blob_refs('content_hash');
+
+-- Recalcula todos los conteos desde las tablas que referencian blobs.
+CREATE OR REPLACE FUNCTION public.rebuild_storage_blob_ref_counts()
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $function$
+DECLARE
+  v_changed INTEGER;
+BEGIN
+  WITH refs AS (
+    SELECT content_hash AS hash FROM asset_wipe_evidence WHERE content_hash IS NOT NULL
+  ),
+  counts AS (
+    SELECT b.hash, COUNT(r.hash)::INTEGER AS refs
+    FROM storage_blobs b
+    LEFT JOIN refs r ON r.hash = b.hash
+    GROUP BY b.hash
+  )
+  UPDATE storage_blobs b
+  SET ref_count = c.refs,
+      orphaned_at = CASE
+        WHEN c.refs = 0 THEN COALESCE(b.orphaned_at, NOW())
+        ELSE NULL
+      END
+  FROM counts c
+  WHERE c.hash = b.hash
+    AND c.refs <> b.ref_count;
+
+  GET DIAGNOSTICS v_changed = ROW_COUNT;
+  RETURN v_changed;
+END;
+$function$;
+
+-- Reclama blobs huérfanos más antiguos que p_grace para que el job de
+-- recolección borre sus objetos. La fila no se borra aquí: el recolector
+-- llama a delete_storage_blob después de borrar el objeto del bucket, así
+-- que si falla el borrado el blob vuelve a reclamarse pasado p_lease.
+-- SKIP LOCKED permite varios recolectores.
+DROP FUNCTION IF EXISTS public.claim_orphan_storage_blobs(INTERVAL, INTEGER);
+
+CREATE OR REPLACE FUNCTION public.claim_orphan_storage_blobs(
+  p_grace INTERVAL DEFAULT INTERVAL '24 hours',
+  p_limit INTEGER DEFAULT 500,
+  p_lease INTERVAL DEFAULT INTERVAL '1 hour'
+)
+RETURNS TABLE (
+  hash TEXT,
+  bucket TEXT,
+  object_path TEXT,
+  size BIGINT
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $function$
+BEGIN
+  RETURN QUERY
+  UPDATE storage_blobs b
+  SET gc_claimed_at = NOW()
+  WHERE b.hash IN (
+    SELECT o.hash
+    FROM storage_blobs o
+    WHERE o.ref_count = 0
+      AND o.orphaned_at < NOW() - p_grace
+      AND (o.gc_claimed_at IS NULL OR o.gc_claimed_at < NOW() - p_lease)
+    ORDER BY o.orphaned_at
+    LIMIT p_limit
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING b.hash, b.bucket, b.object_path, b.size;
+END;
+$function$;
+
+-- Borra la fila de un blob reclamado una vez que su objeto ya no está en el
+-- bucket. No borra si mientras tanto volvió a referenciarse o a registrarse.
+CREATE OR REPLACE FUNCTION public.delete_storage_blob(p_hash TEXT)
+RETURNS BOOLEAN
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $function$
+BEGIN
+  DELETE FROM storage_blobs
+  WHERE hash = p_hash
+    AND ref_count = 0
+    AND gc_claimed_at IS NOT NULL;
+  RETURN FOUND;
+END;
+$function$;
+
+NOTIFY pgrst, 'reload config';
@@ -0,0 +1,168 @@
+-- =========================================================================
+-- Migración: Despacho de destrucción por conjuntos
+-- create_destruction_dispatch recorre los activos uno por uno (snapshot,
+-- línea, UPDATE y movimiento por activo). Esta variante procesa todo el
+-- arreglo con una sentencia por tabla, así un despacho de miles de equipos
+-- confirma en una transacción corta.
+-- =========================================================================
+
+CREATE INDEX IF NOT EXISTS idx_dispatch_items_dispatch_id
+  ON public.dispatch_items(dispatch_id);
+
+-- Reparto del peso total entre los activos.
+-- p_type_factors (opcional): peso relativo por asset_type, ej. {"Laptop": 5, "Monitor": 12}.
+-- Los tipos sin factor cuentan como 1. Cada activo recibe su parte truncada a
+-- centésimas y los centavos sobrantes se asignan a las partes con mayor
+-- residuo, de modo que la suma de las líneas es exactamente el peso total.
+CREATE OR REPLACE FUNCTION public.allocate_dispatch_weight(
+  p_asset_ids UUID[],
+  p_total_weight NUMERIC,
+  p_type_factors JSONB DEFAULT NULL
+)
+RETURNS TABLE (
+  asset_id UUID,
+  asset_type TEXT,
+  product_summary TEXT,
+  weight_lb NUMERIC
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+AS $function$
+  WITH selected AS (
+    SELECT
+      a.id,
+      a.asset_type::TEXT AS asset_type,
+      concat_ws(' ', a.manufacturer, a.model, a.asset_type) AS product_summary,
+      CASE
+        WHEN (p_type_factors ->> a.asset_type::TEXT)::NUMERIC > 0
+          THEN (p_type_factors ->> a.asset_type::TEXT)::NUMERIC
+        ELSE 1
+      END AS factor
+    FROM public.assets a
+    WHERE a.id = ANY(p_asset_ids)
+  ),
+  shares AS (
+    SELECT
+      s.*,
+      round(COALESCE(p_total_weight, 0), 2) * s.factor / SUM(s.factor) OVER () * 100 AS exact_cents
+    FROM selected s
+  ),
+  floored AS (
+    SELECT
+      sh.*,
+      floor(sh.exact_cents) AS base_cents,
+      ROW_NUMBER() OVER (ORDER BY sh.exact_cents - floor(sh.exact_cents) DESC, sh.id) AS rn
+    FROM shares sh
+  )
+  SELECT
+    f.id,
+    f.asset_type,
+    f.product_summary,
+    (f.base_cents + CASE
+      WHEN f.rn <= round(COALESCE(p_total_weight, 0), 2) * 100 - SUM(f.base_cents) OVER () THEN 1
+      ELSE 0
+    END) / 100
+  FROM floored f;
+$function$;
+
+CREATE OR REPLACE FUNCTION public.create_destruction_dispatch_bulk(
+  p_origin_warehouse TEXT,
+  p_client_id UUID,
+  p_driver_name TEXT,
+  p_vehicle_plate TEXT,
+  p_total_weight NUMERIC,
+  p_asset_ids UUID[],
+  p_user_id UUID,
+  p_type_factors JSONB DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $function$
+DECLARE
+  v_dispatch_id UUID;
+  v_dispatch_code TEXT;
+  v_origin_warehouse_id UUID;
+  v_requested INTEGER;
+  v_locked INTEGER;
+  v_items INTEGER;
+BEGIN
+  SELECT COUNT(DISTINCT x) INTO v_requested FROM unnest(p_asset_ids) AS x;
+  IF v_requested = 0 THEN
+    RAISE EXCEPTION 'No se proporcionaron activos';
+  END IF;
+
+  SELECT id INTO v_origin_warehouse_id
+  FROM public.warehouses
+  WHERE code = p_origin_warehouse;
+
+  -- Bloquear todos los activos en orden de id (evita interbloqueos con otros
+  -- despachos que compartan activos)
+  PERFORM 1
+  FROM public.assets a
+  WHERE a.id = ANY(p_asset_ids)
+  ORDER BY a.id
+  FOR UPDATE;
+
+  GET DIAGNOSTICS v_locked = ROW_COUNT;
+  IF v_locked <> v_requested THEN
+    RAISE EXCEPTION 'Activos no encontrados: % de %', v_requested - v_locked, v_requested;
+  END IF;
+
+  v_dispatch_code := generate_dispatch_code();
+
+  INSERT INTO public.dispatches (
+    dispatch_code, origin_warehouse, movement_type, status,
+    dispatched_by, client_id, driver_name, vehicle_plate, total_weight_lb
+  ) VALUES (
+    v_dispatch_code, p_origin_warehouse, 'DESTRUCTION', 'DISPATCHED',
+    p_user_id, p_client_id, p_driver_name, p_vehicle_plate, p_total_weight
+  ) RETURNING id INTO v_dispatch_id;
+
+  INSERT INTO public.dispatch_items (dispatch_id, asset_id, product_summary, weight_lb)
+  SELECT v_dispatch_id, w.asset_id, w.product_summary, w.weight_lb
+  FROM public.allocate_dispatch_weight(p_asset_ids, p_total_weight, p_type_factors) w;
+
+  GET DIAGNOSTICS v_items = ROW_COUNT;
+
+  UPDATE public.assets AS a
+  SET
+    location = 'Fuera de Almacén (Despachado)',
+    status = 'scrapped'::public.asset_status,
+    current_warehouse_id = NULL,
+    sold_to = p_client_id,
+    sold_at = NOW(),
+    notes = coalesce(a.notes, '') || E'\nDespacho: ' || v_dispatch_code
+  FROM public.dispatch_items di
+  WHERE di.dispatch_id = v_dispatch_id
+    AND a.id = di.asset_id;
+
+  IF v_origin_warehouse_id IS NOT NULL THEN
+    INSERT INTO public.inventory_movements (
+      asset_id, from_warehouse_id, to_warehouse_id,
+      movement_type, notes, created_by, created_at,
+      item_type, item_id, item_sku, quantity
+    )
+    SELECT
+      di.asset_id, v_origin_warehouse_id, v_origin_warehouse_id,
+      'dispatch', 'Salida por despacho ' || v_dispatch_code,
+      p_user_id, NOW(),
+      'asset', di.asset_id, COALESCE(a.asset_type, 'N/A'), 1
+    FROM public.dispatch_items di
+    JOIN public.assets a ON a.id = di.asset_id
+    WHERE di.dispatch_id = v_dispatch_id;
+  END IF;
+
+  RETURN jsonb_build_object(
+    'success', true,
+    'dispatch_id', v_dispatch_id,
+    'dispatch_code', v_dispatch_code,
+    'count', v_items
+  );
+EXCEPTION WHEN OTHERS THEN
+  RAISE EXCEPTION 'Error creando despacho: % (Estado: %)', SQLERRM, SQLSTATE;
+END;
+$function$;
+
+NOTIFY pgrst, 'reload config';
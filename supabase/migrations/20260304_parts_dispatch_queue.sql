@@ -0,0 +1,574 @@
+-- =========================================================================
+-- Migración: Cola de despacho de piezas
+-- dispatch_part bloquea la fila de parts_catalog del SKU (FOR UPDATE), así
+-- que todas las solicitudes de una pieza común se atienden en fila india.
+-- Ahora cada unidad en stock es una fila de part_stock_units y los despachos
+-- reclaman unidades con FOR UPDATE SKIP LOCKED: dos técnicos que piden la
+-- misma pieza toman unidades distintas sin esperarse.
+--
+-- parts_catalog.stock_quantity se conserva como el conteo que muestra la UI:
+--   * los despachos lo recalculan al final sin esperar (SKIP LOCKED). Con
+--     despachos simultáneos del mismo SKU puede quedar atrasado unas unidades
+--     hasta el siguiente despacho; refresh_part_stock_quantity(NULL) lo
+--     recalcula para todo el catálogo. La disponibilidad real la deciden
+--     siempre las unidades, nunca este conteo.
+--   * al crear una pieza se escribe stock_quantity y un trigger crea las
+--     unidades. Los ajustes de stock posteriores pasan por adjust_part_stock
+--     como delta; una escritura directa de stock_quantity sigue igualando
+--     las unidades, pero no es segura con despachos en curso.
+-- =========================================================================
+
+CREATE TABLE IF NOT EXISTS part_stock_units (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  part_id UUID NOT NULL REFERENCES parts_catalog(id) ON DELETE CASCADE,
+  status TEXT NOT NULL DEFAULT 'available' CHECK (status IN (
+    'available',    -- En bodega
+    'dispatched',   -- Entregada a taller
+    'removed'       -- Retirada por ajuste de inventario
+  )),
+  work_order_id UUID REFERENCES work_orders(id) ON DELETE SET NULL,
+  part_request_id UUID REFERENCES part_requests(id) ON DELETE SET NULL,
+  dispatched_at TIMESTAMPTZ,
+  dispatched_by UUID,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_part_stock_units_available
+  ON part_stock_units(part_id, created_at)
+  WHERE status = 'available';
+
+CREATE INDEX IF NOT EXISTS idx_part_stock_units_work_order
+  ON part_stock_units(work_order_id)
+  WHERE work_order_id IS NOT NULL;
+
+COMMENT ON TABLE part_stock_units IS 'Una fila por unidad de pieza en stock; los despachos las reclaman con SKIP LOCKED';
+
+ALTER TABLE part_stock_units ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "part_stock_units_select" ON part_stock_units;
+CREATE POLICY "part_stock_units_select" ON part_stock_units FOR SELECT TO authenticated USING (true);
+
+-- Iguala las unidades disponibles de una pieza a parts_catalog.stock_quantity.
+CREATE OR REPLACE FUNCTION public.sync_part_stock_units(p_part_id UUID)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $function$
+DECLARE
+  v_target INTEGER;
+  v_available INTEGER;
+BEGIN
+  SELECT GREATEST(COALESCE(stock_quantity, 0), 0) INTO v_target
+  FROM parts_catalog
+  WHERE id = p_part_id;
+
+  IF v_target IS NULL THEN
+    RETURN 0;
+  END IF;
+
+  SELECT COUNT(*) INTO v_available
+  FROM part_stock_units
+  WHERE part_id = p_part_id AND status = 'available';
+
+  IF v_target > v_available THEN
+    INSERT INTO part_stock_units (part_id)
+    SELECT p_part_id
+    FROM generate_series(1, v_target - v_available);
+  ELSIF v_target < v_available THEN
+    UPDATE part_stock_units u
+    SET status = 'removed',
+        updated_at = NOW()
+    WHERE u.id IN (
+      SELECT id
+      FROM part_stock_units
+      WHERE part_id = p_part_id AND status = 'available'
+      ORDER BY created_at DESC
+      LIMIT v_available - v_target
+      FOR UPDATE
+    );
+  END IF;
+
+  RETURN v_target - v_available;
+END;
+$function$;
+
+-- Recalcula stock_quantity desde las unidades sin esperar por filas ocupadas.
+-- p_part_ids NULL = todas las piezas.
+CREATE OR REPLACE FUNCTION public.refresh_part_stock_quantity(p_part_ids UUID[] DEFAULT NULL)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $function$
+DECLARE
+  v_updated INTEGER;
+BEGIN
+  PERFORM set_config('app.part_stock_sync', 'on', true);
+
+  UPDATE parts_catalog p
+  SET stock_quantity = (
+        SELECT COUNT(*)
+        FROM part_stock_units u
+        WHERE u.part_id = p.id AND u.status = 'available'
+      ),
+      updated_at = NOW()
+  WHERE p.id IN (
+    SELECT id
+    FROM parts_catalog
+    WHERE p_part_ids IS NULL OR id = ANY(p_part_ids)
+    FOR UPDATE SKIP LOCKED
+  );
+
+  GET DIAGNOSTICS v_updated = ROW_COUNT;
+  PERFORM set_config('app.part_stock_sync', 'off', true);
+  RETURN v_updated;
+END;
+$function$;
+
+CREATE OR REPLACE FUNCTION public.trigger_sync_part_stock_units()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $function$
+BEGIN
+  IF current_setting('app.part_stock_sync', true) = 'on' THEN
+    RETURN NULL;
+  END IF;
+  IF TG_OP = 'UPDATE' AND NEW.stock_quantity IS NOT DISTINCT FROM OLD.stock_quantity THEN
+    RETURN NULL;
+  END IF;
+  PERFORM public.sync_part_stock_units(NEW.id);
+  RETURN NULL;
+END;
+$function$;
+
+DROP TRIGGER IF EXISTS trg_parts_catalog_sync_units ON parts_catalog;
+CREATE TRIGGER trg_parts_catalog_sync_units
+  AFTER INSERT OR UPDATE OF stock_quantity ON parts_catalog
+  FOR EACH ROW
+  EXECUTE FUNCTION public.trigger_sync_part_stock_units();
+
+-- Carga inicial de unidades para el stock existente
+SELECT public.sync_part_stock_units(id) FROM parts_catalog;
+
+-- Ajuste manual de stock como delta sobre las unidades. Un valor absoluto
+-- leído antes de un despacho concurrente crearía o retiraría unidades de más
+-- al pasar por el trigger; el delta se aplica a las unidades disponibles y
+-- stock_quantity se recalcula desde ellas.
+CREATE OR REPLACE FUNCTION public.adjust_part_stock(
+  p_sku TEXT,
+  p_delta INTEGER
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $function$
+DECLARE
+  v_part_id UUID;
+  v_changed INTEGER := 0;
+  v_stock INTEGER;
+BEGIN
+  SELECT id INTO v_part_id
+  FROM parts_catalog
+  WHERE sku = p_sku;
+
+  IF v_part_id IS NULL THEN
+    RETURN jsonb_build_object('success', false, 'error', 'SKU no encontrado');
+  END IF;
+
+  IF COALESCE(p_delta, 0) > 0 THEN
+    INSERT INTO part_stock_units (part_id)
+    SELECT v_part_id
+    FROM generate_series(1, p_delta);
+    GET DIAGNOSTICS v_changed = ROW_COUNT;
+  ELSIF COALESCE(p_delta, 0) < 0 THEN
+    UPDATE part_stock_units u
+    SET status = 'removed',
+        updated_at = NOW()
+    WHERE u.id IN (
+      SELECT id
+      FROM part_stock_units
+      WHERE part_id = v_part_id AND status = 'available'
+      ORDER BY created_at DESC
+      LIMIT -p_delta
+      FOR UPDATE SKIP LOCKED
+    );
+    GET DIAGNOSTICS v_changed = ROW_COUNT;
+    IF v_changed < -p_delta THEN
+      RAISE EXCEPTION 'Solo hay % unidades disponibles para retirar', v_changed;
+    END IF;
+    v_changed := -v_changed;
+  END IF;
+
+  PERFORM set_config('app.part_stock_sync', 'on', true);
+  UPDATE parts_catalog p
+  SET stock_quantity = (
+        SELECT COUNT(*)
+        FROM part_stock_units u
+        WHERE u.part_id = p.id AND u.status = 'available'
+      ),
+      updated_at = NOW()
+  WHERE p.id = v_part_id
+  RETURNING p.stock_quantity INTO v_stock;
+  PERFORM set_config('app.part_stock_sync', 'off', true);
+
+  RETURN jsonb_build_object('success', true, 'adjusted', v_changed, 'stock_quantity', v_stock);
+
+EXCEPTION WHEN OTHERS THEN
+  RETURN jsonb_build_object('success', false, 'error', SQLERRM);
+END;
+$function$;
+
+-- Despacha varias solicitudes de piezas de una orden en una transacción.
+-- p_items: [{"part_request_id": "...", "part_id": "...", "quantity": 1}, ...]
+-- (quantity por defecto 1; no puede exceder lo pendiente de la solicitud).
+-- Si alguna pieza no tiene unidades libres no se despacha nada.
+CREATE OR REPLACE FUNCTION public.dispatch_part_requests(
+  p_work_order_id UUID,
+  p_items JSONB,
+  p_performed_by UUID,
+  p_source_warehouse TEXT DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $function$
+DECLARE
+  v_items JSONB;
+  v_item RECORD;
+  v_claimed INTEGER;
+  v_total INTEGER := 0;
+  v_part_ids UUID[];
+  v_pending INTEGER;
+  v_status TEXT;
+BEGIN
+  IF p_items IS NULL OR jsonb_typeof(p_items) <> 'array' OR jsonb_array_length(p_items) = 0 THEN
+    RETURN jsonb_build_object('success', false, 'error', 'No se indicaron piezas a despachar');
+  END IF;
+
+  -- Normalizar: una entrada por (solicitud, pieza)
+  SELECT jsonb_agg(to_jsonb(g)), array_agg(DISTINCT g.part_id)
+  INTO v_items, v_part_ids
+  FROM (
+    SELECT i.part_request_id, i.part_id, SUM(GREATEST(COALESCE(i.quantity, 1), 1))::INTEGER AS quantity
+    FROM jsonb_to_recordset(p_items) AS i(part_request_id UUID, part_id UUID, quantity INTEGER)
+    GROUP BY i.part_request_id, i.part_id
+  ) g;
+
+  -- Las solicitudes son de esta orden: bloquearlas no compite con otros técnicos
+  PERFORM 1
+  FROM part_requests r
+  WHERE r.id IN (
+    SELECT t.part_request_id
+    FROM jsonb_to_recordset(v_items) AS t(part_request_id UUID)
+  )
+  ORDER BY r.id
+  FOR UPDATE;
+
+  IF EXISTS (
+    SELECT 1
+    FROM jsonb_to_recordset(v_items) AS t(part_request_id UUID, part_id UUID)
+    LEFT JOIN part_requests r ON r.id = t.part_request_id
+    LEFT JOIN parts_catalog p ON p.id = t.part_id
+    WHERE r.id IS NULL
+       OR p.id IS NULL
+       OR r.work_order_id <> p_work_order_id
+       OR r.status = 'installed'
+  ) THEN
+    RETURN jsonb_build_object('success', false, 'error', 'Pieza o solicitud no encontrada, ya instalada o de otra orden');
+  END IF;
+
+  IF EXISTS (
+    SELECT 1
+    FROM jsonb_to_recordset(v_items) AS t(part_request_id UUID, quantity INTEGER)
+    JOIN part_requests r ON r.id = t.part_request_id
+    GROUP BY r.id, r.quantity
+    HAVING SUM(t.quantity) > COALESCE(r.quantity, 1)
+  ) THEN
+    RETURN jsonb_build_object('success', false, 'error', 'La cantidad excede lo solicitado');
+  END IF;
+
+  -- Reclamar unidades; las que otro despacho tiene bloqueadas se saltan
+  FOR v_item IN
+    SELECT *
+    FROM jsonb_to_recordset(v_items) AS t(part_request_id UUID, part_id UUID, quantity INTEGER)
+    ORDER BY t.part_id
+  LOOP
+    UPDATE part_stock_units u
+    SET status = 'dispatched',
+        work_order_id = p_work_order_id,
+        part_request_id = v_item.part_request_id,
+        dispatched_at = NOW(),
+        dispatched_by = p_performed_by,
+        updated_at = NOW()
+    WHERE u.id IN (
+      SELECT id
+      FROM part_stock_units
+      WHERE part_id = v_item.part_id AND status = 'available'
+      ORDER BY created_at
+      LIMIT v_item.quantity
+      FOR UPDATE SKIP LOCKED
+    );
+
+    GET DIAGNOSTICS v_claimed = ROW_COUNT;
+    IF v_claimed < v_item.quantity THEN
+      RAISE EXCEPTION 'Sin stock disponible para %',
+        (SELECT sku FROM parts_catalog WHERE id = v_item.part_id);
+    END IF;
+    v_total := v_total + v_claimed;
+  END LOOP;
+
+  -- Igual que dispatchPartSimple: si quedan unidades pendientes se descuenta
+  -- la cantidad, si no la solicitud queda instalada
+  UPDATE part_requests r
+  SET quantity = CASE WHEN COALESCE(r.quantity, 1) > t.quantity THEN r.quantity - t.quantity ELSE r.quantity END,
+      status = CASE WHEN COALESCE(r.quantity, 1) > t.quantity THEN r.status ELSE 'installed' END,
+      dispatch_date = CASE WHEN COALESCE(r.quantity, 1) > t.quantity THEN r.dispatch_date ELSE NOW() END,
+      installed_at = CASE WHEN COALESCE(r.quantity, 1) > t.quantity THEN r.installed_at ELSE NOW() END
+  FROM (
+    SELECT i.part_request_id, SUM(i.quantity) AS quantity
+    FROM jsonb_to_recordset(v_items) AS i(part_request_id UUID, quantity INTEGER)
+    GROUP BY i.part_request_id
+  ) t
+  WHERE r.id = t.part_request_id;
+
+  INSERT INTO inventory_movements (
+    movement_type, item_type, item_id, item_sku, quantity,
+    work_order_id, performed_by, notes
+  )
+  SELECT
+    'dispatch', 'part', t.part_id, p.sku, -SUM(t.quantity)::INTEGER,
+    p_work_order_id, p_performed_by,
+    CASE WHEN p_source_warehouse IS NULL THEN 'Despacho a taller' ELSE 'Despacho desde ' || p_source_warehouse END
+  FROM jsonb_to_recordset(v_items) AS t(part_id UUID, quantity INTEGER)
+  JOIN parts_catalog p ON p.id = t.part_id
+  GROUP BY t.part_id, p.sku;
+
+  SELECT COUNT(*) INTO v_pending
+  FROM part_requests
+  WHERE work_order_id = p_work_order_id
+    AND status = 'pending'
+    AND quantity > 0;
+
+  -- Literales separados: work_orders.status puede ser el enum work_order_status
+  IF v_pending > 0 THEN
+    v_status := 'waiting_parts';
+    UPDATE work_orders SET status = 'waiting_parts', updated_at = NOW() WHERE id = p_work_order_id;
+  ELSE
+    v_status := 'in_progress';
+    UPDATE work_orders SET status = 'in_progress', updated_at = NOW() WHERE id = p_work_order_id;
+  END IF;
+
+  PERFORM public.refresh_part_stock_quantity(v_part_ids);
+
+  RETURN jsonb_build_object(
+    'success', true,
+    'dispatched_units', v_total,
+    'pending_requests', v_pending,
+    'work_order_status', v_status
+  );
+
+EXCEPTION WHEN OTHERS THEN
+  RETURN jsonb_build_object('success', false, 'error', SQLERRM);
+END;
+$function$;
+
+-- dispatch_part (intercambio con pieza dañada) reclama una unidad de la cola
+-- en lugar de bloquear la fila del catálogo. p_request_status es el estado
+-- en que queda la solicitud: 'installed' desde despacho, 'dispensed' desde
+-- solicitudes. Se elimina la versión de 7 parámetros para que PostgREST no
+-- encuentre dos sobrecargas.
+DROP FUNCTION IF EXISTS public.dispatch_part(UUID, UUID, TEXT, TEXT, TEXT, TEXT, UUID);
+
+CREATE OR REPLACE FUNCTION public.dispatch_part(
+  p_work_order_id UUID,
+  p_part_request_id UUID,
+  p_part_sku TEXT,
+  p_returned_sku TEXT,
+  p_returned_serial TEXT,
+  p_returned_condition TEXT,
+  p_performed_by UUID,
+  p_request_status TEXT DEFAULT 'installed'
+) RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $function$
+DECLARE
+  v_part_id UUID;
+  v_unit_id UUID;
+  v_bad_inventory_id UUID;
+BEGIN
+  IF p_request_status NOT IN ('installed', 'dispensed') THEN
+    RETURN jsonb_build_object('success', false, 'error', 'Estado de solicitud inválido');
+  END IF;
+
+  SELECT id INTO v_part_id
+  FROM parts_catalog
+  WHERE sku = p_part_sku AND is_active = TRUE;
+
+  IF v_part_id IS NULL THEN
+    RETURN jsonb_build_object('success', false, 'error', 'SKU no encontrado');
+  END IF;
+
+  UPDATE part_stock_units u
+  SET status = 'dispatched',
+      work_order_id = p_work_order_id,
+      part_request_id = p_part_request_id,
+      dispatched_at = NOW(),
+      dispatched_by = p_performed_by,
+      updated_at = NOW()
+  WHERE u.id = (
+    SELECT id
+    FROM part_stock_units
+    WHERE part_id = v_part_id AND status = 'available'
+    ORDER BY created_at
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING u.id INTO v_unit_id;
+
+  IF v_unit_id IS NULL THEN
+    RETURN jsonb_build_object('success', false, 'error', 'Sin stock disponible');
+  END IF;
+
+  INSERT INTO bad_warehouse_inventory (
+    sku,
+    part_name,
+    quantity,
+    condition,
+    work_order_id,
+    part_request_id,
+    original_serial,
+    received_from,
+    received_by,
+    notes
+  ) VALUES (
+    p_returned_sku,
+    (SELECT name FROM parts_catalog WHERE sku = p_returned_sku LIMIT 1),
+    1,
+    COALESCE(p_returned_condition, 'defective'),
+    p_work_order_id,
+    p_part_request_id,
+    p_returned_serial,
+    'Workshop Exchange',
+    p_performed_by,
+    'Intercambio de pieza en reparación'
+  )
+  RETURNING id INTO v_bad_inventory_id;
+
+  UPDATE part_requests
+  SET status = p_request_status,
+      installed_at = CASE WHEN p_request_status = 'installed' THEN NOW() ELSE installed_at END,
+      dispatch_date = NOW(),
+      returned_part_sku = p_returned_sku,
+      returned_part_serial = p_returned_serial,
+      returned_part_status = 'returned',
+      returned_part_condition = p_returned_condition,
+      returned_at = NOW()
+  WHERE id = p_part_request_id;
+
+  INSERT INTO inventory_movements (
+    movement_type, item_type, item_id, item_sku, quantity,
+    work_order_id, performed_by, notes
+  ) VALUES (
+    'dispatch', 'part', v_part_id, p_part_sku, -1,
+    p_work_order_id, p_performed_by, 'Despacho a taller'
+  );
+
+  INSERT INTO inventory_movements (
+    movement_type, item_type, item_id, item_sku, quantity,
+    work_order_id, performed_by, notes
+  ) VALUES (
+    'return', 'part', v_bad_inventory_id, p_returned_sku, 1,
+    p_work_order_id, p_performed_by, 'Ingreso a bodega mala por intercambio'
+  );
+
+  UPDATE work_orders
+  SET status = 'in_progress',
+      updated_at = NOW()
+  WHERE id = p_work_order_id;
+
+  PERFORM public.refresh_part_stock_quantity(ARRAY[v_part_id]);
+
+  RETURN jsonb_build_object(
+    'success', true,
+    'dispatched_part_id', v_part_id,
+    'bad_inventory_id', v_bad_inventory_id
+  );
+
+EXCEPTION WHEN OTHERS THEN
+  RETURN jsonb_build_object('success', false, 'error', SQLERRM);
+END;
+$function$;
+
+-- dispatch_seedstock: si otro técnico está despachando la misma unidad se
+-- responde de inmediato en lugar de esperar a que termine.
+CREATE OR REPLACE FUNCTION public.dispatch_seedstock(
+  p_work_order_id UUID,
+  p_seedstock_id UUID,
+  p_new_imei TEXT,
+  p_performed_by UUID
+) RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $function$
+DECLARE
+  v_original_imei TEXT;
+  v_original_serial TEXT;
+  v_seedstock_record RECORD;
+BEGIN
+  SELECT * INTO v_seedstock_record
+  FROM seedstock_inventory
+  WHERE id = p_seedstock_id AND status = 'available'
+  FOR UPDATE SKIP LOCKED;
+
+  IF v_seedstock_record IS NULL THEN
+    RETURN jsonb_build_object('success', false, 'error', 'Seedstock no disponible');
+  END IF;
+
+  SELECT original_imei, original_serial
+  INTO v_original_imei, v_original_serial
+  FROM work_orders
+  WHERE id = p_work_order_id;
+
+  UPDATE seedstock_inventory
+  SET status = 'dispatched',
+      work_order_id = p_work_order_id,
+      dispatched_at = NOW(),
+      dispatched_by = p_performed_by,
+      updated_at = NOW()
+  WHERE id = p_seedstock_id;
+
+  UPDATE work_orders
+  SET seedstock_exchange = TRUE,
+      original_imei = COALESCE(v_original_imei, original_imei),
+      new_imei = p_new_imei,
+      new_serial = v_seedstock_record.serial_number,
+      seedstock_date = NOW(),
+      status = 'in_progress',
+      updated_at = NOW()
+  WHERE id = p_work_order_id;
+
+  INSERT INTO inventory_movements (
+    movement_type, item_type, item_id, item_sku, quantity,
+    work_order_id, performed_by, notes
+  ) VALUES (
+    'dispatch', 'seedstock', p_seedstock_id, v_seedstock_record.imei, -1,
+    p_work_order_id, p_performed_by,
+    FORMAT('Seedstock despachado. Original IMEI: %s -> Nuevo IMEI: %s',
+           COALESCE(v_original_imei, 'N/A'), p_new_imei)
+  );
+
+  RETURN jsonb_build_object(
+    'success', true,
+    'seedstock_id', p_seedstock_id,
+    'original_imei', v_original_imei,
+    'new_imei', p_new_imei
+  );
+
+EXCEPTION WHEN OTHERS THEN
+  RETURN jsonb_build_object('success', false, 'error', SQLERRM);
+END;
+$function$;
+
+NOTIFY pgrst, 'reload config';
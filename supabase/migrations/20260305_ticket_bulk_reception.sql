@@ -0,0 +1,396 @@
+-- =========================================================================
+-- Migración: Recepción de un ticket completo en una transacción
+-- save_box_reception recibe una caja por llamada y crea los activos uno por
+-- uno. save_ticket_reception recibe todas las cajas pendientes del ticket
+-- (o las indicadas) con sentencias por conjuntos y devuelve el código de
+-- recepción de cada caja. Incluye también lo que /api/logistica/reception
+-- hace alrededor del RPC: resolver marca/modelo/tipo desde los catálogos,
+-- crear el lote si falta y dejar los activos en la bodega de recepción.
+-- =========================================================================
+
+CREATE INDEX IF NOT EXISTS idx_assets_serial_number
+  ON assets(serial_number)
+  WHERE serial_number IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_ticket_items_ticket_box
+  ON ticket_items(ticket_id, box_number);
+
+-- Mismo JSON de especificaciones que arma save_box_reception por ítem
+CREATE OR REPLACE FUNCTION public.ticket_item_reception_spec(p_item ticket_items)
+RETURNS JSONB
+LANGUAGE sql
+IMMUTABLE
+AS $function$
+  SELECT NULLIF(
+    jsonb_strip_nulls(
+      jsonb_build_object(
+        'workshop_classifications',
+        jsonb_strip_nulls(
+          jsonb_build_object(
+            'rec', p_item.classification_rec,
+            'f', p_item.classification_f,
+            'c', p_item.classification_c
+          )
+        ),
+        'hardware_specs',
+        jsonb_strip_nulls(
+          jsonb_build_object(
+            'processor', p_item.processor,
+            'bios_version', p_item.bios_version,
+            'ram_capacity', p_item.ram_capacity,
+            'ram_type', p_item.ram_type,
+            'disk_capacity', p_item.disk_capacity,
+            'disk_type', p_item.disk_type,
+            'keyboard_type', p_item.keyboard_type,
+            'keyboard_version', p_item.keyboard_version
+          )
+        ),
+        'reception_notes', p_item.observations
+      )
+    ),
+    '{}'::jsonb
+  );
+$function$;
+
+-- p_box_numbers NULL = todas las cajas del ticket que aún no tienen registro
+-- en ticket_reception_log. Si se indican cajas se reciben aunque ya se hayan
+-- recibido antes (igual que volver a llamar save_box_reception).
+CREATE OR REPLACE FUNCTION public.save_ticket_reception(
+  p_ticket_id UUID,
+  p_warehouse_code TEXT DEFAULT 'BOD-REC',
+  p_item_type TEXT DEFAULT 'asset',
+  p_box_numbers INTEGER[] DEFAULT NULL
+)
+RETURNS TABLE (
+  box_number INTEGER,
+  reception_code CHAR(4),
+  moved_assets INTEGER,
+  warehouse_code TEXT
+)
+LANGUAGE plpgsql
+AS $function$
+#variable_conflict use_column
+DECLARE
+  v_warehouse_id UUID;
+  v_batch_id UUID;
+  v_ticket_reference TEXT;
+  v_inventory_item_type TEXT := 'asset';
+  v_boxes INTEGER[];
+  v_missing INTEGER[];
+BEGIN
+  -- Bloquear el ticket: dos recepciones simultáneas del mismo ticket se
+  -- ejecutan una tras otra (los códigos no se duplican)
+  SELECT t.readable_id INTO v_ticket_reference
+  FROM operations_tickets t
+  WHERE t.id = p_ticket_id
+  FOR UPDATE;
+
+  IF v_ticket_reference IS NULL THEN
+    RAISE EXCEPTION 'Ticket no encontrado';
+  END IF;
+
+  SELECT w.id INTO v_warehouse_id
+  FROM warehouses w
+  WHERE w.code = p_warehouse_code OR w.name = p_warehouse_code
+  LIMIT 1;
+
+  IF v_warehouse_id IS NULL THEN
+    RAISE EXCEPTION 'Bodega de recepción % no está configurada', p_warehouse_code;
+  END IF;
+
+  v_inventory_item_type := lower(COALESCE(NULLIF(trim(p_item_type), ''), v_inventory_item_type));
+
+  IF v_inventory_item_type NOT IN ('asset', 'part', 'seedstock') THEN
+    RAISE EXCEPTION 'Tipo de ítem % no está permitido', p_item_type;
+  END IF;
+
+  IF p_box_numbers IS NULL THEN
+    SELECT array_agg(DISTINCT ti.box_number ORDER BY ti.box_number) INTO v_boxes
+    FROM ticket_items ti
+    WHERE ti.ticket_id = p_ticket_id
+      AND ti.box_number IS NOT NULL
+      AND NOT EXISTS (
+        SELECT 1
+        FROM ticket_reception_log l
+        WHERE l.ticket_id = p_ticket_id
+          AND l.box_number = ti.box_number
+      );
+  ELSE
+    SELECT array_agg(DISTINCT b ORDER BY b) INTO v_boxes
+    FROM unnest(p_box_numbers) AS b;
+
+    SELECT array_agg(b ORDER BY b) INTO v_missing
+    FROM unnest(v_boxes) AS b
+    WHERE NOT EXISTS (
+      SELECT 1
+      FROM ticket_items ti
+      WHERE ti.ticket_id = p_ticket_id
+        AND ti.box_number = b
+    );
+
+    IF v_missing IS NOT NULL THEN
+      RAISE EXCEPTION 'No se encontraron items para las cajas %', array_to_string(v_missing, ', ');
+    END IF;
+  END IF;
+
+  IF v_boxes IS NULL THEN
+    RETURN;
+  END IF;
+
+  -- Resolver marca/modelo/tipo desde los catálogos cuando vienen vacíos o
+  -- con texto genérico (misma regla que /api/logistica/reception)
+  UPDATE ticket_items ti
+  SET
+    brand = r.brand_full,
+    model = r.model_full,
+    product_type = r.product_type,
+    brand_full = r.brand_full,
+    model_full = r.model_full,
+    updated_at = NOW()
+  FROM (
+    SELECT
+      i.id,
+      CASE WHEN lower(trim(COALESCE(i.brand_full, ''))) IN ('', 'sin marca', 'sin modelo', 'equipo')
+        THEN (SELECT b.name FROM catalog_brands b WHERE b.id = i.brand_id)
+        ELSE i.brand_full END AS brand_full,
+      CASE WHEN lower(trim(COALESCE(i.model_full, ''))) IN ('', 'sin marca', 'sin modelo', 'equipo')
+        THEN (SELECT m.name FROM catalog_models m WHERE m.id = i.model_id)
+        ELSE i.model_full END AS model_full,
+      CASE WHEN lower(trim(COALESCE(i.product_type, ''))) IN ('', 'sin marca', 'sin modelo', 'equipo')
+        THEN (SELECT pt.name FROM catalog_product_types pt WHERE pt.id = i.product_type_id)
+        ELSE i.product_type END AS product_type
+    FROM ticket_items i
+    WHERE i.ticket_id = p_ticket_id
+      AND i.box_number = ANY(v_boxes)
+  ) r
+  WHERE ti.id = r.id
+    AND (r.brand_full IS DISTINCT FROM ti.brand_full
+      OR r.model_full IS DISTINCT FROM ti.model_full
+      OR r.product_type IS DISTINCT FROM ti.product_type);
+
+  SELECT array_agg(DISTINCT ti.box_number ORDER BY ti.box_number) INTO v_missing
+  FROM ticket_items ti
+  WHERE ti.ticket_id = p_ticket_id
+    AND ti.box_number = ANY(v_boxes)
+    AND ti.collected_serial IS NOT NULL
+    AND (ti.product_type IS NULL OR trim(ti.product_type) = '');
+
+  IF v_missing IS NOT NULL THEN
+    RAISE EXCEPTION 'Falta el Tipo de Activo en algunos ítems antes de crear los activos (cajas %)',
+      array_to_string(v_missing, ', ');
+  END IF;
+
+  -- Lote del ticket (se crea si falta, como ensureBatchForTicket)
+  SELECT b.id INTO v_batch_id
+  FROM batches b
+  WHERE b.ticket_id = p_ticket_id
+  ORDER BY b.created_at DESC
+  LIMIT 1;
+
+  IF v_batch_id IS NULL THEN
+    INSERT INTO batches (
+      internal_batch_id, ticket_id, status, expected_units,
+      received_units, reception_date, pallet_count
+    )
+    SELECT
+      'AUTO-' || (extract(epoch FROM clock_timestamp()) * 1000)::BIGINT,
+      p_ticket_id,
+      'received',
+      COALESCE(t.expected_units, (SELECT COUNT(*) FROM ticket_items WHERE ticket_id = p_ticket_id)),
+      (SELECT COUNT(*) FROM ticket_items WHERE ticket_id = p_ticket_id),
+      NOW(),
+      1
+    FROM operations_tickets t
+    WHERE t.id = p_ticket_id
+    RETURNING id INTO v_batch_id;
+  END IF;
+
+  INSERT INTO ticket_reception_log (ticket_id, box_number)
+  SELECT p_ticket_id, b
+  FROM unnest(v_boxes) AS b
+  ON CONFLICT (ticket_id, box_number) DO NOTHING;
+
+  -- Códigos de recepción: las cajas que ya tienen uno lo conservan; las demás
+  -- reciben códigos de 4 dígitos distintos entre sí dentro del ticket
+  WITH box_codes AS (
+    SELECT ti.box_number, MAX(ti.box_reception_code) AS code
+    FROM ticket_items ti
+    WHERE ti.ticket_id = p_ticket_id
+      AND ti.box_number = ANY(v_boxes)
+    GROUP BY ti.box_number
+  ),
+  needed AS (
+    SELECT bc.box_number, ROW_NUMBER() OVER (ORDER BY bc.box_number) AS rn
+    FROM box_codes bc
+    WHERE bc.code IS NULL
+  ),
+  free_codes AS (
+    SELECT lpad(n::TEXT, 4, '0') AS code, ROW_NUMBER() OVER (ORDER BY random()) AS rn
+    FROM generate_series(1000, 9999) AS n
+    WHERE lpad(n::TEXT, 4, '0') NOT IN (
+      SELECT ti.box_reception_code
+      FROM ticket_items ti
+      WHERE ti.ticket_id = p_ticket_id
+        AND ti.box_reception_code IS NOT NULL
+    )
+  ),
+  assigned AS (
+    SELECT bc.box_number, COALESCE(bc.code, fc.code) AS code
+    FROM box_codes bc
+    LEFT JOIN needed n ON n.box_number = bc.box_number
+    LEFT JOIN free_codes fc ON fc.rn = n.rn
+  )
+  UPDATE ticket_items ti
+  SET box_reception_code = a.code
+  FROM assigned a
+  WHERE ti.ticket_id = p_ticket_id
+    AND ti.box_number = a.box_number
+    AND ti.box_reception_code IS DISTINCT FROM a.code;
+
+  -- Activos existentes (por serial): completar datos como save_box_reception
+  UPDATE assets a
+  SET
+    batch_id = v_batch_id,
+    manufacturer = COALESCE(s.brand_full, a.manufacturer),
+    model = COALESCE(s.model_full, a.model),
+    color = COALESCE(s.color_detail, a.color),
+    specifications = CASE
+      WHEN s.spec IS NULL THEN a.specifications
+      ELSE COALESCE(a.specifications, '{}'::jsonb) || s.spec
+    END,
+    updated_at = NOW()
+  FROM (
+    SELECT DISTINCT ON (ti.collected_serial)
+      ti.collected_serial,
+      ti.brand_full,
+      ti.model_full,
+      ti.color_detail,
+      public.ticket_item_reception_spec(ti) AS spec
+    FROM ticket_items ti
+    WHERE ti.ticket_id = p_ticket_id
+      AND ti.box_number = ANY(v_boxes)
+      AND ti.collected_serial IS NOT NULL
+    ORDER BY ti.collected_serial, ti.box_number DESC, ti.id DESC
+  ) s
+  WHERE a.serial_number = s.collected_serial;
+
+  -- Activos nuevos: un INSERT para todos los seriales sin activo
+  INSERT INTO assets (
+    serial_number,
+    batch_id,
+    asset_type,
+    status,
+    current_warehouse_id,
+    currency,
+    cost_amount,
+    manufacturer,
+    model,
+    color,
+    specifications,
+    created_at,
+    updated_at
+  )
+  SELECT DISTINCT ON (ti.collected_serial)
+    ti.collected_serial,
+    v_batch_id,
+    ti.product_type,
+    'received'::public.asset_status,
+    v_warehouse_id,
+    'GTQ',
+    0,
+    ti.brand_full,
+    ti.model_full,
+    ti.color_detail,
+    public.ticket_item_reception_spec(ti),
+    NOW(),
+    NOW()
+  FROM ticket_items ti
+  WHERE ti.ticket_id = p_ticket_id
+    AND ti.box_number = ANY(v_boxes)
+    AND ti.collected_serial IS NOT NULL
+    AND NOT EXISTS (
+      SELECT 1 FROM assets a WHERE a.serial_number = ti.collected_serial
+    )
+  ORDER BY ti.collected_serial, ti.box_number, ti.id;
+
+  UPDATE ticket_items ti
+  SET asset_id = m.asset_id
+  FROM (
+    SELECT DISTINCT ON (a.serial_number) a.serial_number, a.id AS asset_id
+    FROM assets a
+    WHERE a.serial_number IN (
+      SELECT i.collected_serial
+      FROM ticket_items i
+      WHERE i.ticket_id = p_ticket_id
+        AND i.box_number = ANY(v_boxes)
+        AND i.collected_serial IS NOT NULL
+    )
+    ORDER BY a.serial_number, a.created_at
+  ) m
+  WHERE ti.ticket_id = p_ticket_id
+    AND ti.box_number = ANY(v_boxes)
+    AND ti.collected_serial = m.serial_number
+    AND ti.asset_id IS DISTINCT FROM m.asset_id;
+
+  INSERT INTO inventory_movements (
+    asset_id,
+    batch_id,
+    item_type,
+    item_id,
+    item_sku,
+    quantity,
+    from_warehouse_id,
+    to_warehouse_id,
+    movement_type,
+    notes,
+    created_by
+  )
+  SELECT
+    ti.asset_id,
+    v_batch_id,
+    v_inventory_item_type,
+    ti.asset_id,
+    ti.product_type,
+    1,
+    NULL,
+    v_warehouse_id,
+    'receipt',
+    CONCAT('Recepción caja ', ti.box_number),
+    NULL
+  FROM ticket_items ti
+  WHERE ti.ticket_id = p_ticket_id
+    AND ti.box_number = ANY(v_boxes)
+    AND ti.collected_serial IS NOT NULL
+    AND ti.asset_id IS NOT NULL;
+
+  -- Todos los activos de las cajas quedan en la bodega de recepción
+  UPDATE assets a
+  SET
+    current_warehouse_id = v_warehouse_id,
+    status = 'received',
+    batch_id = v_batch_id,
+    last_transfer_date = NOW(),
+    updated_at = NOW()
+  WHERE a.id IN (
+    SELECT ti.asset_id
+    FROM ticket_items ti
+    WHERE ti.ticket_id = p_ticket_id
+      AND ti.box_number = ANY(v_boxes)
+      AND ti.asset_id IS NOT NULL
+  );
+
+  RETURN QUERY
+  SELECT
+    ti.box_number,
+    MAX(ti.box_reception_code)::CHAR(4),
+    COUNT(ti.collected_serial)::INTEGER,
+    p_warehouse_code
+  FROM ticket_items ti
+  WHERE ti.ticket_id = p_ticket_id
+    AND ti.box_number = ANY(v_boxes)
+  GROUP BY ti.box_number
+  ORDER BY ti.box_number;
+END;
+$function$;
+
+NOTIFY pgrst, 'reload config';
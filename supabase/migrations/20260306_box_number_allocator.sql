@@ -0,0 +1,113 @@
+-- =========================================================================
+-- Migración: Asignación de números de caja con secuencia
+-- /api/logistica/next-box-number calculaba max(box_number)+1 sobre
+-- ticket_items; dos usuarios de logística a la vez recibían el mismo número
+-- (así aparecieron la caja #10006 duplicada y los box_number = 0).
+-- reserve_box_numbers toma de una secuencia un rango contiguo de números y
+-- lo registra por ticket en box_number_reservations. Los números que se
+-- reservan y no se usan quedan como huecos, igual que en cualquier secuencia.
+-- =========================================================================
+
+CREATE SEQUENCE IF NOT EXISTS public.ticket_box_number_seq
+  AS INTEGER
+  START WITH 10001
+  MINVALUE 10001;
+
+CREATE TABLE IF NOT EXISTS public.box_number_reservations (
+  id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+  ticket_id UUID REFERENCES operations_tickets(id) ON DELETE SET NULL,
+  first_box INTEGER NOT NULL,
+  last_box INTEGER NOT NULL,
+  reserved_by UUID,
+  source TEXT NOT NULL DEFAULT 'reserve',
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  CHECK (last_box >= first_box)
+);
+
+CREATE INDEX IF NOT EXISTS idx_box_number_reservations_ticket
+  ON box_number_reservations(ticket_id);
+
+CREATE INDEX IF NOT EXISTS idx_box_number_reservations_range
+  ON box_number_reservations(first_box, last_box);
+
+COMMENT ON TABLE box_number_reservations IS 'Rangos de números de caja entregados por reserve_box_numbers';
+
+-- La secuencia arranca después del número más alto ya usado o reservado
+SELECT setval(
+  'public.ticket_box_number_seq',
+  GREATEST(
+    10000,
+    COALESCE((SELECT MAX(box_number) FROM ticket_items), 0),
+    COALESCE((SELECT MAX(last_box) FROM box_number_reservations), 0)
+  ) + 1,
+  false
+);
+
+-- Reserva p_quantity números contiguos. nextval/setval no son atómicos entre
+-- sí, así que el par se protege con un advisory lock de transacción; la
+-- transacción del RPC solo hace esto, por lo que el lock dura microsegundos
+-- y no hay que leer ticket_items.
+CREATE OR REPLACE FUNCTION public.reserve_box_numbers(
+  p_ticket_id UUID DEFAULT NULL,
+  p_quantity INTEGER DEFAULT 1,
+  p_reserved_by UUID DEFAULT NULL
+)
+RETURNS TABLE (
+  first_box INTEGER,
+  last_box INTEGER
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $function$
+#variable_conflict use_column
+DECLARE
+  v_first INTEGER;
+  v_last INTEGER;
+BEGIN
+  IF p_quantity IS NULL OR p_quantity < 1 OR p_quantity > 1000 THEN
+    RAISE EXCEPTION 'Cantidad de cajas inválida: %', p_quantity;
+  END IF;
+
+  PERFORM pg_advisory_xact_lock(hashtext('public.ticket_box_number_seq'));
+
+  v_first := nextval('public.ticket_box_number_seq');
+  v_last := v_first + p_quantity - 1;
+  IF p_quantity > 1 THEN
+    PERFORM setval('public.ticket_box_number_seq', v_last, true);
+  END IF;
+
+  INSERT INTO box_number_reservations (ticket_id, first_box, last_box, reserved_by)
+  VALUES (p_ticket_id, v_first, v_last, COALESCE(p_reserved_by, auth.uid()));
+
+  RETURN QUERY SELECT v_first, v_last;
+END;
+$function$;
+
+-- Usado por reconcile_box_numbers.py después de renumerar cajas a mano:
+-- vuelve a colocar la secuencia por encima de todo lo usado o reservado.
+CREATE OR REPLACE FUNCTION public.sync_box_number_sequence()
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $function$
+DECLARE
+  v_next INTEGER;
+BEGIN
+  PERFORM pg_advisory_xact_lock(hashtext('public.ticket_box_number_seq'));
+
+  SELECT GREATEST(
+    10000,
+    COALESCE((SELECT MAX(box_number) FROM ticket_items), 0),
+    COALESCE((SELECT MAX(last_box) FROM box_number_reservations), 0),
+    (SELECT last_value - CASE WHEN is_called THEN 0 ELSE 1 END FROM public.ticket_box_number_seq)
+  ) + 1
+  INTO v_next;
+
+  PERFORM setval('public.ticket_box_number_seq', v_next, false);
+  RETURN v_next;
+END;
+$function$;
+
+NOTIFY pgrst, 'reload config';
@@ -0,0 +1,200 @@
+-- =========================================================================
+-- Migración: Contadores de stock por bodega
+-- Las pantallas de inventario y los scripts de movimiento contaban activos
+-- con count='exact' filtrando por current_warehouse_id: un recorrido de
+-- assets por cada bodega. warehouse_stock_counters guarda la cantidad por
+-- bodega / estado / tipo de activo y la mantiene un trigger por sentencia
+-- sobre assets, en la misma transacción que el movimiento. La vista
+-- warehouse_stock_totals da el total por bodega leyendo unas pocas filas.
+--
+-- rebuild_warehouse_stock_counters() recalcula todo desde assets y
+-- verify_warehouse_stock_counters() lista las diferencias
+-- (ver warehouse_stock_counters.py).
+-- =========================================================================
+
+CREATE TABLE IF NOT EXISTS public.warehouse_stock_counters (
+  warehouse_id UUID NOT NULL REFERENCES warehouses(id) ON DELETE CASCADE,
+  status TEXT NOT NULL DEFAULT '',
+  asset_type TEXT NOT NULL DEFAULT '',
+  quantity BIGINT NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (warehouse_id, status, asset_type)
+);
+
+COMMENT ON TABLE warehouse_stock_counters IS 'Cantidad de activos por bodega, estado y tipo; mantenida por trg_assets_stock_counters_*';
+
+ALTER TABLE warehouse_stock_counters ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "warehouse_stock_counters_select" ON warehouse_stock_counters;
+CREATE POLICY "warehouse_stock_counters_select" ON warehouse_stock_counters FOR SELECT TO authenticated USING (true);
+
+-- Aplica la diferencia entre las filas anteriores y nuevas de la sentencia.
+-- Las claves se actualizan en orden para que dos movimientos simultáneos
+-- sobre las mismas bodegas no se bloqueen en cruz. SECURITY DEFINER porque
+-- quien mueve el activo solo tiene lectura sobre los contadores.
+CREATE OR REPLACE FUNCTION public.apply_warehouse_stock_delta(p_delta JSONB)
+RETURNS VOID
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $function$
+  INSERT INTO warehouse_stock_counters AS c (warehouse_id, status, asset_type, quantity, updated_at)
+  SELECT (d->>'warehouse_id')::UUID, d->>'status', d->>'asset_type', (d->>'delta')::BIGINT, NOW()
+  FROM jsonb_array_elements(p_delta) AS d
+  ORDER BY 1, 2, 3
+  ON CONFLICT (warehouse_id, status, asset_type)
+  DO UPDATE SET quantity = c.quantity + EXCLUDED.quantity,
+                updated_at = EXCLUDED.updated_at;
+$function$;
+
+CREATE OR REPLACE FUNCTION public.assets_stock_counters_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $function$
+DECLARE
+  v_delta JSONB;
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    SELECT jsonb_agg(jsonb_build_object('warehouse_id', warehouse_id, 'status', status,
+                                        'asset_type', asset_type, 'delta', delta))
+    INTO v_delta
+    FROM (
+      SELECT current_warehouse_id AS warehouse_id, COALESCE(status::TEXT, '') AS status,
+             COALESCE(asset_type::TEXT, '') AS asset_type, COUNT(*) AS delta
+      FROM new_rows
+      WHERE current_warehouse_id IS NOT NULL
+      GROUP BY 1, 2, 3
+    ) d;
+  ELSIF TG_OP = 'DELETE' THEN
+    SELECT jsonb_agg(jsonb_build_object('warehouse_id', warehouse_id, 'status', status,
+                                        'asset_type', asset_type, 'delta', delta))
+    INTO v_delta
+    FROM (
+      SELECT current_warehouse_id AS warehouse_id, COALESCE(status::TEXT, '') AS status,
+             COALESCE(asset_type::TEXT, '') AS asset_type, -COUNT(*) AS delta
+      FROM old_rows
+      WHERE current_warehouse_id IS NOT NULL
+      GROUP BY 1, 2, 3
+    ) d;
+  ELSE
+    SELECT jsonb_agg(jsonb_build_object('warehouse_id', warehouse_id, 'status', status,
+                                        'asset_type', asset_type, 'delta', delta))
+    INTO v_delta
+    FROM (
+      SELECT warehouse_id, status, asset_type, SUM(delta) AS delta
+      FROM (
+        SELECT current_warehouse_id AS warehouse_id, COALESCE(status::TEXT, '') AS status,
+               COALESCE(asset_type::TEXT, '') AS asset_type, -1 AS delta
+        FROM old_rows
+        WHERE current_warehouse_id IS NOT NULL
+        UNION ALL
+        SELECT current_warehouse_id, COALESCE(status::TEXT, ''), COALESCE(asset_type::TEXT, ''), 1
+        FROM new_rows
+        WHERE current_warehouse_id IS NOT NULL
+      ) changes
+      GROUP BY 1, 2, 3
+      HAVING SUM(delta) <> 0
+    ) d;
+  END IF;
+
+  IF v_delta IS NOT NULL THEN
+    PERFORM apply_warehouse_stock_delta(v_delta);
+  END IF;
+  RETURN NULL;
+END;
+$function$;
+
+DROP TRIGGER IF EXISTS trg_assets_stock_counters_insert ON assets;
+CREATE TRIGGER trg_assets_stock_counters_insert
+  AFTER INSERT ON assets
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION assets_stock_counters_trigger();
+
+DROP TRIGGER IF EXISTS trg_assets_stock_counters_update ON assets;
+CREATE TRIGGER trg_assets_stock_counters_update
+  AFTER UPDATE ON assets
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION assets_stock_counters_trigger();
+
+DROP TRIGGER IF EXISTS trg_assets_stock_counters_delete ON assets;
+CREATE TRIGGER trg_assets_stock_counters_delete
+  AFTER DELETE ON assets
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION assets_stock_counters_trigger();
+
+-- Recalcula los contadores desde assets. Bloquea las escrituras sobre
+-- assets mientras corre para que ningún movimiento quede a medias.
+CREATE OR REPLACE FUNCTION public.rebuild_warehouse_stock_counters()
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $function$
+DECLARE
+  v_rows INTEGER;
+BEGIN
+  LOCK TABLE assets IN SHARE MODE;
+  LOCK TABLE warehouse_stock_counters IN EXCLUSIVE MODE;
+
+  DELETE FROM warehouse_stock_counters;
+
+  INSERT INTO warehouse_stock_counters (warehouse_id, status, asset_type, quantity)
+  SELECT current_warehouse_id, COALESCE(status::TEXT, ''), COALESCE(asset_type::TEXT, ''), COUNT(*)
+  FROM assets
+  WHERE current_warehouse_id IS NOT NULL
+  GROUP BY 1, 2, 3;
+
+  GET DIAGNOSTICS v_rows = ROW_COUNT;
+  RETURN v_rows;
+END;
+$function$;
+
+CREATE OR REPLACE FUNCTION public.verify_warehouse_stock_counters()
+RETURNS TABLE (
+  warehouse_id UUID,
+  status TEXT,
+  asset_type TEXT,
+  counted BIGINT,
+  actual BIGINT
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $function$
+  WITH actual AS (
+    SELECT current_warehouse_id AS warehouse_id, COALESCE(status::TEXT, '') AS status,
+           COALESCE(asset_type::TEXT, '') AS asset_type, COUNT(*) AS quantity
+    FROM assets
+    WHERE current_warehouse_id IS NOT NULL
+    GROUP BY 1, 2, 3
+  )
+  SELECT
+    COALESCE(c.warehouse_id, a.warehouse_id),
+    COALESCE(c.status, a.status),
+    COALESCE(c.asset_type, a.asset_type),
+    COALESCE(c.quantity, 0),
+    COALESCE(a.quantity, 0)
+  FROM warehouse_stock_counters c
+  FULL JOIN actual a
+    ON a.warehouse_id = c.warehouse_id
+   AND a.status = c.status
+   AND a.asset_type = c.asset_type
+  WHERE COALESCE(c.quantity, 0) <> COALESCE(a.quantity, 0)
+  ORDER BY 1, 2, 3;
+$function$;
+
+CREATE OR REPLACE VIEW public.warehouse_stock_totals AS
+SELECT
+  w.id AS warehouse_id,
+  w.code,
+  w.name,
+  w.is_active,
+  COALESCE(SUM(c.quantity), 0)::BIGINT AS quantity
+FROM warehouses w
+LEFT JOIN warehouse_stock_counters c ON c.warehouse_id = w.id
+GROUP BY w.id, w.code, w.name, w.is_active;
+
+SELECT public.rebuild_warehouse_stock_counters();
+
+NOTIFY pgrst, 'reload config';
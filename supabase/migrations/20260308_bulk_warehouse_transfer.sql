@@ -0,0 +1,124 @@
+-- =========================================================================
+-- Migración: Traslado masivo entre bodegas
+-- /api/inventario/bodega/move-assets, /api/admin/move-to-harv,
+-- /api/admin/move-to-val y los scripts move_asset_to_* movían activos uno
+-- por uno o en varias llamadas sin transacción, y algunos no dejaban fila en
+-- inventory_movements. transfer_assets_bulk mueve la selección completa con
+-- un solo UPDATE y escribe un movimiento 'transfer' por activo (bodega
+-- origen, bodega destino, created_by, correlativo) en un solo INSERT.
+-- Los activos que ya están en la bodega destino se omiten.
+-- =========================================================================
+
+CREATE INDEX IF NOT EXISTS idx_inventory_movements_reference_number
+  ON inventory_movements(reference_number)
+  WHERE reference_number IS NOT NULL;
+
+CREATE OR REPLACE FUNCTION public.transfer_assets_bulk(
+  p_destination_code TEXT,
+  p_asset_ids UUID[] DEFAULT NULL,
+  p_serials TEXT[] DEFAULT NULL,
+  p_reason TEXT DEFAULT NULL,
+  p_reference_number TEXT DEFAULT NULL,
+  p_transfer_date TIMESTAMPTZ DEFAULT NULL,
+  p_created_by UUID DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $function$
+DECLARE
+  v_destination_id UUID;
+  v_destination_name TEXT;
+  v_ids UUID[];
+  v_requested INTEGER;
+  v_found INTEGER;
+  v_destroyed TEXT;
+  v_moved INTEGER;
+  v_transfer_date TIMESTAMPTZ := COALESCE(p_transfer_date, NOW());
+  v_created_by UUID := COALESCE(p_created_by, auth.uid());
+BEGIN
+  SELECT id, name INTO v_destination_id, v_destination_name
+  FROM warehouses
+  WHERE code = p_destination_code;
+
+  IF v_destination_id IS NULL THEN
+    RAISE EXCEPTION 'Bodega destino no encontrada: %', p_destination_code;
+  END IF;
+
+  -- Selección: ids explícitos y/o seriales
+  SELECT array_agg(DISTINCT a.id ORDER BY a.id)
+  INTO v_ids
+  FROM assets a
+  WHERE a.id = ANY(COALESCE(p_asset_ids, '{}'))
+     OR a.serial_number = ANY(COALESCE(p_serials, '{}'));
+
+  v_requested := COALESCE(cardinality(p_asset_ids), 0) + COALESCE(cardinality(p_serials), 0);
+  IF v_requested = 0 THEN
+    RAISE EXCEPTION 'No se seleccionaron equipos';
+  END IF;
+
+  IF v_ids IS NULL THEN
+    RAISE EXCEPTION 'Ninguno de los equipos seleccionados existe';
+  END IF;
+
+  -- Bloquear en orden de id para no cruzarse con otros traslados o despachos
+  PERFORM 1
+  FROM assets a
+  WHERE a.id = ANY(v_ids)
+  ORDER BY a.id
+  FOR UPDATE;
+
+  GET DIAGNOSTICS v_found = ROW_COUNT;
+
+  SELECT string_agg(COALESCE(a.serial_number, a.internal_tag), ', ' ORDER BY a.serial_number)
+  INTO v_destroyed
+  FROM assets a
+  WHERE a.id = ANY(v_ids)
+    AND a.status::TEXT = 'destroyed';
+
+  IF v_destroyed IS NOT NULL THEN
+    RAISE EXCEPTION 'No se pueden mover equipos destruidos: %', v_destroyed;
+  END IF;
+
+  WITH moved AS (
+    UPDATE assets AS a
+    SET current_warehouse_id = v_destination_id,
+        last_transfer_date = v_transfer_date,
+        updated_at = NOW()
+    FROM (
+      SELECT id, current_warehouse_id AS from_warehouse_id
+      FROM assets
+      WHERE id = ANY(v_ids)
+    ) s
+    WHERE a.id = s.id
+      AND a.current_warehouse_id IS DISTINCT FROM v_destination_id
+    RETURNING a.id, a.asset_type, a.batch_id, s.from_warehouse_id
+  )
+  INSERT INTO inventory_movements (
+    asset_id, batch_id, from_warehouse_id, to_warehouse_id,
+    movement_type, transfer_date, notes, reference_number,
+    created_by, created_at, item_type, item_id, item_sku, quantity
+  )
+  SELECT
+    m.id, m.batch_id, m.from_warehouse_id, v_destination_id,
+    'transfer', v_transfer_date, p_reason, p_reference_number,
+    v_created_by, NOW(), 'asset', m.id, COALESCE(m.asset_type::TEXT, 'N/A'), 1
+  FROM moved m;
+
+  GET DIAGNOSTICS v_moved = ROW_COUNT;
+
+  RETURN jsonb_build_object(
+    'success', true,
+    'destination_id', v_destination_id,
+    'destination_name', v_destination_name,
+    'requested', v_requested,
+    'found', v_found,
+    'moved', v_moved,
+    'skipped', v_found - v_moved,
+    'reference_number', p_reference_number
+  );
+END;
+$function$;
+
+NOTIFY pgrst, 'reload config';
@@ -0,0 +1,88 @@
+-- =========================================================================
+-- Migración: Instantánea de analítica de inventario (ABC y antigüedad)
+-- inventory_analytics_view / inventory_abc_summary (sql/009) recalculan todo
+-- sobre assets en cada consulta y solo dan promedios. inventory_analytics.py
+-- calcula por marca/modelo/tipo la clase ABC, percentiles de antigüedad,
+-- cubetas de antigüedad y rotación de los últimos 90 días, y los guarda aquí.
+-- Los reportes leen estas tablas directamente.
+--
+-- inventory_analytics_runs guarda la marca de agua (assets.updated_at más
+-- reciente procesado) para que la siguiente corrida solo recalcule los
+-- modelos con activos modificados.
+-- =========================================================================
+
+CREATE TABLE IF NOT EXISTS public.inventory_model_analytics (
+  brand TEXT NOT NULL,
+  model TEXT NOT NULL,
+  type TEXT NOT NULL,
+  available_count INTEGER NOT NULL DEFAULT 0,
+  in_process_count INTEGER NOT NULL DEFAULT 0,
+  total_quantity INTEGER NOT NULL DEFAULT 0,
+  total_cost_value NUMERIC(14,2) NOT NULL DEFAULT 0,
+  cumulative_pct NUMERIC(6,2),
+  abc_class CHAR(1) CHECK (abc_class IN ('A', 'B', 'C')),
+  age_avg_days NUMERIC(8,1),
+  age_p50_days NUMERIC(8,1),
+  age_p90_days NUMERIC(8,1),
+  age_p99_days NUMERIC(8,1),
+  age_max_days NUMERIC(8,1),
+  age_0_30 INTEGER NOT NULL DEFAULT 0,
+  age_31_60 INTEGER NOT NULL DEFAULT 0,
+  age_61_90 INTEGER NOT NULL DEFAULT 0,
+  age_91_180 INTEGER NOT NULL DEFAULT 0,
+  age_over_180 INTEGER NOT NULL DEFAULT 0,
+  cost_p50 NUMERIC(12,2),
+  units_out_90d INTEGER NOT NULL DEFAULT 0,
+  turnover_90d NUMERIC(8,3),
+  days_of_supply NUMERIC(10,1),
+  oldest_entry_date TIMESTAMPTZ,
+  computed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (brand, model, type)
+);
+
+CREATE INDEX IF NOT EXISTS idx_inventory_model_analytics_abc
+  ON inventory_model_analytics(abc_class, total_cost_value DESC);
+
+CREATE TABLE IF NOT EXISTS public.inventory_abc_snapshot (
+  abc_class CHAR(1) PRIMARY KEY CHECK (abc_class IN ('A', 'B', 'C')),
+  model_count INTEGER NOT NULL DEFAULT 0,
+  total_units INTEGER NOT NULL DEFAULT 0,
+  total_value NUMERIC(14,2) NOT NULL DEFAULT 0,
+  avg_rotation_days INTEGER,
+  units_over_90_days INTEGER NOT NULL DEFAULT 0,
+  computed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS public.inventory_analytics_runs (
+  id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+  mode TEXT NOT NULL CHECK (mode IN ('full', 'incremental')),
+  watermark TIMESTAMPTZ,
+  assets_scanned INTEGER NOT NULL DEFAULT 0,
+  models_written INTEGER NOT NULL DEFAULT 0,
+  models_removed INTEGER NOT NULL DEFAULT 0,
+  started_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  finished_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_inventory_analytics_runs_finished
+  ON inventory_analytics_runs(finished_at DESC)
+  WHERE finished_at IS NOT NULL;
+
+-- Para la pasada incremental (activos modificados desde la marca de agua)
+CREATE INDEX IF NOT EXISTS idx_assets_updated_at
+  ON assets(updated_at);
+
+ALTER TABLE inventory_model_analytics ENABLE ROW LEVEL SECURITY;
+ALTER TABLE inventory_abc_snapshot ENABLE ROW LEVEL SECURITY;
+ALTER TABLE inventory_analytics_runs ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "inventory_model_analytics_select" ON inventory_model_analytics;
+CREATE POLICY "inventory_model_analytics_select" ON inventory_model_analytics FOR SELECT TO authenticated USING (true);
+
+DROP POLICY IF EXISTS "inventory_abc_snapshot_select" ON inventory_abc_snapshot;
+CREATE POLICY "inventory_abc_snapshot_select" ON inventory_abc_snapshot FOR SELECT TO authenticated USING (true);
+
+DROP POLICY IF EXISTS "inventory_analytics_runs_select" ON inventory_analytics_runs;
+CREATE POLICY "inventory_analytics_runs_select" ON inventory_analytics_runs FOR SELECT TO authenticated USING (true);
+
+NOTIFY pgrst, 'reload config';
@@ -0,0 +1,272 @@
+-- =========================================================================
+-- Migración: Fecha de llegada a la bodega actual en assets
+-- Para "días en bodega" se leía todo inventory_movements del activo y se
+-- tomaba el último movimiento hacia su bodega actual (getWarehouseAssets,
+-- /api/auditoria/estado-actual, get_warehouse_assets_page).
+-- assets.current_warehouse_since guarda esa fecha y la mantiene un trigger
+-- BEFORE sobre assets: cualquier camino que cambie current_warehouse_id
+-- (recepción, traslados, transfer_assets_bulk, despachos, scripts) la
+-- actualiza en la misma fila. Si el camino no puso last_transfer_date, el
+-- trigger también la llena.
+--
+-- backfill_current_warehouse_since() la calcula para los activos existentes
+-- con un solo UPDATE usando DISTINCT ON sobre inventory_movements; sin
+-- movimiento hacia la bodega actual se usa created_at, como antes.
+-- =========================================================================
+
+ALTER TABLE assets
+  ADD COLUMN IF NOT EXISTS current_warehouse_since TIMESTAMPTZ;
+
+COMMENT ON COLUMN assets.current_warehouse_since IS
+  'Fecha de llegada del activo a su bodega actual (current_warehouse_id)';
+
+CREATE INDEX IF NOT EXISTS idx_assets_warehouse_since
+  ON assets(current_warehouse_id, current_warehouse_since)
+  WHERE current_warehouse_id IS NOT NULL;
+
+CREATE OR REPLACE FUNCTION public.assets_set_current_warehouse_since()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $function$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    IF NEW.current_warehouse_id IS NOT NULL THEN
+      NEW.current_warehouse_since := COALESCE(NEW.current_warehouse_since, NOW());
+      NEW.last_transfer_date := COALESCE(NEW.last_transfer_date, NEW.current_warehouse_since);
+    ELSE
+      NEW.current_warehouse_since := NULL;
+    END IF;
+    RETURN NEW;
+  END IF;
+
+  IF NEW.current_warehouse_id IS NOT DISTINCT FROM OLD.current_warehouse_id THEN
+    RETURN NEW;
+  END IF;
+
+  IF NEW.current_warehouse_id IS NULL THEN
+    NEW.current_warehouse_since := NULL;
+  ELSE
+    NEW.current_warehouse_since := NOW();
+    IF NEW.last_transfer_date IS NOT DISTINCT FROM OLD.last_transfer_date THEN
+      NEW.last_transfer_date := NEW.current_warehouse_since;
+    END IF;
+  END IF;
+
+  RETURN NEW;
+END;
+$function$;
+
+DROP TRIGGER IF EXISTS trg_assets_current_warehouse_since ON assets;
+CREATE TRIGGER trg_assets_current_warehouse_since
+  BEFORE INSERT OR UPDATE OF current_warehouse_id ON assets
+  FOR EACH ROW EXECUTE FUNCTION assets_set_current_warehouse_since();
+
+-- Backfill: último movimiento de cada activo hacia su bodega actual
+CREATE OR REPLACE FUNCTION public.backfill_current_warehouse_since(p_only_missing BOOLEAN DEFAULT TRUE)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $function$
+DECLARE
+  v_updated INTEGER;
+BEGIN
+  UPDATE assets a
+  SET current_warehouse_since = s.since
+  FROM (
+    SELECT a2.id, COALESCE(la.created_at, a2.created_at) AS since
+    FROM assets a2
+    LEFT JOIN (
+      SELECT DISTINCT ON (m.asset_id, m.to_warehouse_id)
+        m.asset_id, m.to_warehouse_id, m.created_at
+      FROM inventory_movements m
+      WHERE m.asset_id IS NOT NULL
+        AND m.to_warehouse_id IS NOT NULL
+      ORDER BY m.asset_id, m.to_warehouse_id, m.created_at DESC
+    ) la ON la.asset_id = a2.id AND la.to_warehouse_id = a2.current_warehouse_id
+    WHERE a2.current_warehouse_id IS NOT NULL
+      AND (NOT p_only_missing OR a2.current_warehouse_since IS NULL)
+  ) s
+  WHERE a.id = s.id
+    AND a.current_warehouse_since IS DISTINCT FROM s.since;
+
+  GET DIAGNOSTICS v_updated = ROW_COUNT;
+  RETURN v_updated;
+END;
+$function$;
+
+SELECT backfill_current_warehouse_since(FALSE);
+
+-- get_warehouse_assets_page lee la columna en lugar de inventory_movements
+CREATE OR REPLACE FUNCTION public.get_warehouse_assets_page(
+  p_warehouse_code TEXT DEFAULT NULL,
+  p_grade TEXT DEFAULT NULL,
+  p_status TEXT DEFAULT NULL,
+  p_search TEXT DEFAULT NULL,
+  p_after_created_at TIMESTAMPTZ DEFAULT NULL,
+  p_after_id UUID DEFAULT NULL,
+  p_limit INTEGER DEFAULT 100
+)
+RETURNS TABLE (
+  id UUID,
+  serial_number TEXT,
+  internal_tag TEXT,
+  manufacturer TEXT,
+  model TEXT,
+  asset_type TEXT,
+  color TEXT,
+  status TEXT,
+  condition_grade TEXT,
+  created_at TIMESTAMPTZ,
+  batch_id UUID,
+  specifications JSONB,
+  current_warehouse_id UUID,
+  sales_price NUMERIC,
+  last_transfer_date TIMESTAMPTZ,
+  warehouse_code TEXT,
+  warehouse_name TEXT,
+  batch_code TEXT,
+  batch_location TEXT,
+  container_type TEXT,
+  ticket_id UUID,
+  ticket_code TEXT,
+  expected_color TEXT,
+  warehouse_received_at TIMESTAMPTZ,
+  ticket_item JSONB,
+  accessories JSONB,
+  work_order_classifications JSONB
+)
+LANGUAGE plpgsql
+STABLE
+SET search_path = public
+AS $function$
+#variable_conflict use_column
+DECLARE
+  v_warehouse_id UUID;
+  v_search TEXT := NULLIF(btrim(p_search), '');
+  v_limit INTEGER := LEAST(GREATEST(COALESCE(p_limit, 100), 1), 500);
+BEGIN
+  IF p_warehouse_code IS NOT NULL THEN
+    SELECT w.id INTO v_warehouse_id FROM warehouses w WHERE w.code = p_warehouse_code;
+    IF v_warehouse_id IS NULL THEN
+      RETURN;
+    END IF;
+  END IF;
+
+  RETURN QUERY
+  SELECT
+    a.id,
+    a.serial_number::TEXT,
+    a.internal_tag::TEXT,
+    a.manufacturer::TEXT,
+    a.model::TEXT,
+    a.asset_type::TEXT,
+    a.color::TEXT,
+    a.status::TEXT,
+    a.condition_grade::TEXT,
+    a.created_at,
+    a.batch_id,
+    a.specifications::JSONB,
+    a.current_warehouse_id,
+    a.sales_price::NUMERIC,
+    a.last_transfer_date,
+    w.code::TEXT,
+    w.name::TEXT,
+    b.internal_batch_id::TEXT,
+    b.location::TEXT,
+    b.container_type::TEXT,
+    b.ticket_id,
+    t.readable_id::TEXT,
+    ec.color,
+    COALESCE(a.current_warehouse_since, a.created_at),
+    ti.item,
+    acc.items,
+    wo.classifications
+  FROM assets a
+  LEFT JOIN warehouses w ON w.id = a.current_warehouse_id
+  LEFT JOIN batches b ON b.id = a.batch_id
+  LEFT JOIN operations_tickets t ON t.id = b.ticket_id
+  -- Color del conduce: primero el renglón que coincide con el equipo
+  LEFT JOIN LATERAL (
+    SELECT e.color
+    FROM batch_expected_items e
+    WHERE e.batch_id = a.batch_id
+      AND NULLIF(btrim(e.color), '') IS NOT NULL
+    ORDER BY
+      CASE
+        WHEN lower(btrim(e.brand)) = lower(btrim(a.manufacturer))
+         AND lower(btrim(e.model)) = lower(btrim(a.model)) THEN 0
+        WHEN lower(btrim(e.model)) = lower(btrim(a.model))
+         AND lower(btrim(e.product_type)) = lower(btrim(a.asset_type)) THEN 0
+        WHEN lower(btrim(e.product_type)) = lower(btrim(a.asset_type)) THEN 0
+        ELSE 1
+      END,
+      e.created_at
+    LIMIT 1
+  ) ec ON true
+  -- Renglón de recepción: por asset_id y, si no hay, por serie
+  LEFT JOIN LATERAL (
+    SELECT to_jsonb(x) - 'pref' AS item, x.id AS ticket_item_id
+    FROM (
+      (SELECT 0 AS pref, i.id, i.asset_id, i.collected_serial, i.color_detail,
+              i.classification_rec, i.classification_f, i.classification_c,
+              i.processor, i.bios_version, i.ram_capacity, i.ram_type,
+              i.disk_capacity, i.disk_type, i.keyboard_type, i.keyboard_version,
+              i.observations, i.box_number
+       FROM ticket_items i WHERE i.asset_id = a.id LIMIT 1)
+      UNION ALL
+      (SELECT 1, i.id, i.asset_id, i.collected_serial, i.color_detail,
+              i.classification_rec, i.classification_f, i.classification_c,
+              i.processor, i.bios_version, i.ram_capacity, i.ram_type,
+              i.disk_capacity, i.disk_type, i.keyboard_type, i.keyboard_version,
+              i.observations, i.box_number
+       FROM ticket_items i WHERE i.collected_serial = a.serial_number LIMIT 1)
+    ) x
+    ORDER BY x.pref
+    LIMIT 1
+  ) ti ON true
+  LEFT JOIN LATERAL (
+    SELECT jsonb_agg(jsonb_build_object(
+      'name', COALESCE(ca.name, 'Accesorio'),
+      'quantity', COALESCE(tia.quantity, 1)
+    )) AS items
+    FROM ticket_item_accessories tia
+    LEFT JOIN catalog_accessories ca ON ca.id = tia.accessory_id
+    WHERE tia.ticket_item_id = ti.ticket_item_id
+  ) acc ON true
+  -- Clasificaciones de salida (control de calidad) de la última orden
+  LEFT JOIN LATERAL (
+    SELECT jsonb_build_object(
+      'rec_classification', o.rec_classification,
+      'f_classification', o.f_classification,
+      'c_classification', o.c_classification
+    ) AS classifications
+    FROM work_orders o
+    WHERE o.asset_id = a.id
+      AND (o.rec_classification IS NOT NULL
+        OR o.f_classification IS NOT NULL
+        OR o.c_classification IS NOT NULL)
+    ORDER BY o.updated_at DESC
+    LIMIT 1
+  ) wo ON true
+  WHERE a.current_warehouse_id IS NOT NULL
+    AND (v_warehouse_id IS NULL OR a.current_warehouse_id = v_warehouse_id)
+    AND (p_grade IS NULL OR upper(a.condition_grade::TEXT) = upper(p_grade))
+    AND (p_status IS NULL OR a.status::TEXT = p_status)
+    AND (p_after_created_at IS NULL OR (a.created_at, a.id) < (p_after_created_at, p_after_id))
+    AND (
+      v_search IS NULL
+      OR a.serial_number ILIKE '%' || v_search || '%'
+      OR a.internal_tag ILIKE '%' || v_search || '%'
+      OR a.manufacturer ILIKE '%' || v_search || '%'
+      OR a.model ILIKE '%' || v_search || '%'
+      OR t.readable_id ILIKE '%' || v_search || '%'
+      OR b.internal_batch_id ILIKE '%' || v_search || '%'
+      OR b.location ILIKE '%' || v_search || '%'
+    )
+  ORDER BY a.created_at DESC, a.id DESC
+  LIMIT v_limit;
+END;
+$function$;
+
+NOTIFY pgrst, 'reload config';
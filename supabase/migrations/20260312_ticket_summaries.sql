@@ -0,0 +1,96 @@
+-- =========================================================================
+-- Migración: Resumen paginado de tickets
+-- getTickets (dashboard/tickets/actions.ts) traía todos los tickets con
+-- cada ticket_items anidado y tres catálogos por renglón, y TicketsTable
+-- solo mostraba un resumen. get_ticket_summaries devuelve una página de
+-- tickets (cliente, creador y conteos de renglones calculados en SQL) con
+-- filtros de estado/tipo/búsqueda y paginación por (created_at, id)
+-- descendente. El detalle de renglones se pide al expandir el ticket.
+-- get_ticket_status_counts da los totales por estado para las tarjetas.
+-- =========================================================================
+
+CREATE INDEX IF NOT EXISTS idx_operations_tickets_created
+  ON operations_tickets(created_at DESC, id DESC);
+
+-- Filas JSONB: el resumen lleva todas las columnas del ticket sin depender
+-- de sus tipos exactos (ticket_type y status cambiaron de tipo entre
+-- migraciones).
+CREATE OR REPLACE FUNCTION public.get_ticket_summaries(
+  p_status TEXT DEFAULT NULL,
+  p_ticket_type TEXT DEFAULT NULL,
+  p_search TEXT DEFAULT NULL,
+  p_after_created_at TIMESTAMPTZ DEFAULT NULL,
+  p_after_id UUID DEFAULT NULL,
+  p_limit INTEGER DEFAULT 50
+)
+RETURNS SETOF JSONB
+LANGUAGE plpgsql
+STABLE
+SET search_path = public
+AS $function$
+DECLARE
+  v_search TEXT := NULLIF(btrim(p_search), '');
+  v_limit INTEGER := LEAST(GREATEST(COALESCE(p_limit, 50), 1), 500);
+BEGIN
+  RETURN QUERY
+  SELECT
+    to_jsonb(t)
+    || jsonb_build_object(
+      'client', CASE WHEN c.id IS NULL THEN NULL ELSE jsonb_build_object(
+        'id', c.id,
+        'commercial_name', c.commercial_name,
+        'tax_id_nit', c.tax_id_nit
+      ) END,
+      'created_by_user', CASE WHEN p.id IS NULL THEN NULL ELSE jsonb_build_object(
+        'id', p.id,
+        'full_name', p.full_name
+      ) END,
+      'item_count', COALESCE(s.item_count, 0),
+      'expected_count', COALESCE(s.expected_count, 0),
+      'received_count', COALESCE(s.received_count, 0),
+      'validated_count', COALESCE(s.validated_count, 0),
+      'box_count', COALESCE(s.box_count, 0)
+    )
+  FROM operations_tickets t
+  LEFT JOIN crm_entities c ON c.id = t.client_id
+  LEFT JOIN profiles p ON p.id = t.created_by
+  LEFT JOIN LATERAL (
+    SELECT
+      COUNT(*) AS item_count,
+      SUM(COALESCE(i.expected_quantity, 1)) AS expected_count,
+      SUM(COALESCE(i.received_quantity, 0)) AS received_count,
+      COUNT(*) FILTER (WHERE i.validation_status::TEXT = 'VALIDADO') AS validated_count,
+      COUNT(DISTINCT i.box_number) AS box_count
+    FROM ticket_items i
+    WHERE i.ticket_id = t.id
+  ) s ON true
+  WHERE (
+      -- Sin filtro de estado se ocultan los cancelados
+      (p_status IS NULL AND t.status::TEXT <> 'cancelled')
+      OR t.status::TEXT = p_status
+    )
+    AND (p_ticket_type IS NULL OR t.ticket_type::TEXT = p_ticket_type)
+    AND (p_after_created_at IS NULL OR (t.created_at, t.id) < (p_after_created_at, p_after_id))
+    AND (
+      v_search IS NULL
+      OR t.readable_id ILIKE '%' || v_search || '%'
+      OR t.title ILIKE '%' || v_search || '%'
+      OR c.commercial_name ILIKE '%' || v_search || '%'
+    )
+  ORDER BY t.created_at DESC, t.id DESC
+  LIMIT v_limit;
+END;
+$function$;
+
+CREATE OR REPLACE FUNCTION public.get_ticket_status_counts()
+RETURNS TABLE (status TEXT, total BIGINT)
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $function$
+  SELECT t.status::TEXT, COUNT(*)
+  FROM operations_tickets t
+  GROUP BY t.status;
+$function$;
+
+NOTIFY pgrst, 'reload config';
@@ -0,0 +1,73 @@
+-- =========================================================================
+-- Migración: Secuencia para números de orden de servicio (OS-###)
+-- getNextWorkOrderSequence (taller/actions.ts) leía las últimas 500 órdenes,
+-- parseaba los números en JS y tomaba max + 1: una consulta extra por orden
+-- y dos técnicos a la vez podían recibir el mismo número (el UNIQUE de
+-- work_order_number hacía fallar al segundo).
+--
+-- work_order_number_seq emite los números; work_orders.work_order_number
+-- toma 'OS-' || nextval por defecto, así que un INSERT sin número (o un
+-- INSERT ... SELECT de cientos de filas) recibe números únicos sin leer la
+-- tabla. next_work_order_numbers(n) entrega n números para quien los
+-- necesite antes de insertar. Los números no usados quedan como huecos.
+-- =========================================================================
+
+CREATE SEQUENCE IF NOT EXISTS public.work_order_number_seq
+  AS INTEGER
+  START WITH 100
+  MINVALUE 100;
+
+-- Mayor número OS-### en uso (o reservado por la secuencia) + 1
+CREATE OR REPLACE FUNCTION public.sync_work_order_number_sequence()
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $function$
+DECLARE
+  v_next INTEGER;
+BEGIN
+  SELECT GREATEST(
+    99,
+    COALESCE((
+      SELECT MAX(substring(work_order_number FROM '^[Oo][Ss]-(\d{1,9})$')::INTEGER)
+      FROM work_orders
+      WHERE work_order_number ~* '^OS-\d{1,9}$'
+    ), 0),
+    (SELECT last_value - CASE WHEN is_called THEN 0 ELSE 1 END FROM public.work_order_number_seq)
+  ) + 1
+  INTO v_next;
+
+  PERFORM setval('public.work_order_number_seq', v_next, false);
+  RETURN v_next;
+END;
+$function$;
+
+SELECT sync_work_order_number_sequence();
+
+ALTER TABLE work_orders
+  ALTER COLUMN work_order_number SET DEFAULT ('OS-' || nextval('public.work_order_number_seq'));
+
+-- Entrega p_quantity números OS-### en orden ascendente
+CREATE OR REPLACE FUNCTION public.next_work_order_numbers(p_quantity INTEGER DEFAULT 1)
+RETURNS SETOF TEXT
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $function$
+BEGIN
+  IF p_quantity IS NULL OR p_quantity < 1 OR p_quantity > 5000 THEN
+    RAISE EXCEPTION 'Cantidad de órdenes inválida: %', p_quantity;
+  END IF;
+
+  RETURN QUERY
+  SELECT 'OS-' || n
+  FROM (
+    SELECT nextval('public.work_order_number_seq') AS n
+    FROM generate_series(1, p_quantity)
+  ) s
+  ORDER BY n;
+END;
+$function$;
+
+NOTIFY pgrst, 'reload config';
@@ -0,0 +1,221 @@
+-- =========================================================================
+-- Migración: Apertura masiva de órdenes de servicio
+-- createWorkOrder (taller/actions.ts) abre una orden por llamada y, por
+-- cada equipo, lee el ticket_item, lee y actualiza el activo, busca BOD-REP,
+-- mueve el activo, escribe asset_history y la auditoría: unas seis idas a la
+-- base por unidad. open_work_orders_bulk hace lo mismo para la selección
+-- completa (ids, seriales, lote o ticket) con una sentencia por tabla en una
+-- sola transacción. Los números OS-### salen de work_order_number_seq
+-- (20260313). Se omiten los equipos destruidos y los que ya tienen una
+-- orden abierta (cualquier estado que no sea de cierre, en inglés o en los
+-- valores en español de 20260220_hotfix_add_spanish_statuses_batch.sql).
+-- =========================================================================
+
+CREATE INDEX IF NOT EXISTS idx_work_orders_asset_status
+  ON work_orders(asset_id, status);
+
+CREATE OR REPLACE FUNCTION public.open_work_orders_bulk(
+  p_asset_ids UUID[] DEFAULT NULL,
+  p_serials TEXT[] DEFAULT NULL,
+  p_batch_id UUID DEFAULT NULL,
+  p_ticket_id UUID DEFAULT NULL,
+  p_reported_issue TEXT DEFAULT NULL,
+  p_priority TEXT DEFAULT 'normal',
+  p_created_by UUID DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $function$
+DECLARE
+  v_rep_id UUID;
+  v_ids UUID[];
+  v_found INTEGER;
+  v_created INTEGER;
+  v_orders JSONB;
+  v_created_by UUID := COALESCE(p_created_by, auth.uid());
+  v_user_name TEXT;
+  v_user_email TEXT;
+  v_user_role TEXT;
+BEGIN
+  IF p_asset_ids IS NULL AND p_serials IS NULL AND p_batch_id IS NULL AND p_ticket_id IS NULL THEN
+    RAISE EXCEPTION 'No se seleccionaron equipos';
+  END IF;
+
+  SELECT id INTO v_rep_id
+  FROM warehouses
+  WHERE code = 'BOD-REP';
+
+  IF v_rep_id IS NULL THEN
+    RAISE EXCEPTION 'Bodega BOD-REP no encontrada';
+  END IF;
+
+  -- Selección: ids, seriales, lote y/o equipos recibidos en el ticket
+  SELECT array_agg(DISTINCT a.id ORDER BY a.id)
+  INTO v_ids
+  FROM assets a
+  WHERE a.id = ANY(COALESCE(p_asset_ids, '{}'))
+     OR a.serial_number = ANY(COALESCE(p_serials, '{}'))
+     OR (p_batch_id IS NOT NULL AND a.batch_id = p_batch_id)
+     OR (p_ticket_id IS NOT NULL AND EXISTS (
+          SELECT 1 FROM ticket_items i
+          WHERE i.ticket_id = p_ticket_id AND i.asset_id = a.id
+        ));
+
+  IF v_ids IS NULL THEN
+    RETURN jsonb_build_object(
+      'success', true, 'found', 0, 'created', 0, 'skipped', 0, 'work_orders', '[]'::JSONB
+    );
+  END IF;
+
+  -- Bloquear en orden de id para no cruzarse con traslados o despachos
+  PERFORM 1
+  FROM assets a
+  WHERE a.id = ANY(v_ids)
+  ORDER BY a.id
+  FOR UPDATE;
+
+  GET DIAGNOSTICS v_found = ROW_COUNT;
+
+  IF v_created_by IS NOT NULL THEN
+    SELECT p.full_name, p.role::TEXT INTO v_user_name, v_user_role
+    FROM profiles p
+    WHERE p.id = v_created_by;
+
+    SELECT u.email INTO v_user_email
+    FROM auth.users u
+    WHERE u.id = v_created_by;
+  END IF;
+
+  DROP TABLE IF EXISTS tmp_bulk_work_orders;
+  CREATE TEMP TABLE tmp_bulk_work_orders (
+    work_order_id UUID,
+    work_order_number TEXT,
+    asset_id UUID,
+    ticket_id UUID,
+    batch_id UUID,
+    asset_type TEXT,
+    from_warehouse_id UUID,
+    classification_rec TEXT,
+    classification_f TEXT,
+    classification_c TEXT
+  ) ON COMMIT DROP;
+
+  WITH candidates AS (
+    SELECT a.id AS asset_id, a.batch_id, a.asset_type, a.current_warehouse_id AS from_warehouse_id
+    FROM assets a
+    WHERE a.id = ANY(v_ids)
+      AND a.status::TEXT <> 'destroyed'
+      AND NOT EXISTS (
+        SELECT 1 FROM work_orders o
+        WHERE o.asset_id = a.id
+          AND o.status::TEXT NOT IN (
+            'completed', 'cancelled',
+            'Completada', 'Completado', 'Finalizado', 'Cerrado', 'Cancelada', 'Cancelado'
+          )
+      )
+  ),
+  -- Último renglón de recepción de cada equipo (clasificaciones y ticket)
+  latest_item AS (
+    SELECT DISTINCT ON (i.asset_id)
+      i.asset_id, i.ticket_id,
+      i.classification_rec, i.classification_f, i.classification_c
+    FROM ticket_items i
+    JOIN candidates c ON c.asset_id = i.asset_id
+    ORDER BY i.asset_id, i.created_at DESC
+  ),
+  inserted AS (
+    INSERT INTO work_orders (asset_id, ticket_id, reported_issue, status, priority)
+    SELECT c.asset_id, COALESCE(p_ticket_id, li.ticket_id), p_reported_issue, 'open', COALESCE(p_priority, 'normal')
+    FROM candidates c
+    LEFT JOIN latest_item li ON li.asset_id = c.asset_id
+    ORDER BY c.asset_id
+    RETURNING id, work_order_number, asset_id, ticket_id
+  )
+  INSERT INTO tmp_bulk_work_orders
+  SELECT
+    ins.id, ins.work_order_number, ins.asset_id, ins.ticket_id,
+    c.batch_id, c.asset_type::TEXT, c.from_warehouse_id,
+    li.classification_rec, li.classification_f, li.classification_c
+  FROM inserted ins
+  JOIN candidates c ON c.asset_id = ins.asset_id
+  LEFT JOIN latest_item li ON li.asset_id = ins.asset_id;
+
+  GET DIAGNOSTICS v_created = ROW_COUNT;
+
+  -- Clasificaciones de recepción al activo (si aún no existen) y paso a BOD-REP
+  UPDATE assets AS a
+  SET specifications = CASE
+        WHEN a.specifications ? 'workshop_classifications'
+          OR COALESCE(t.classification_rec, t.classification_f, t.classification_c) IS NULL
+          THEN a.specifications
+        ELSE COALESCE(a.specifications, '{}'::JSONB) || jsonb_build_object(
+          'workshop_classifications', jsonb_build_object(
+            'rec', t.classification_rec,
+            'f', t.classification_f,
+            'c', t.classification_c
+          )
+        )
+      END,
+      location = 'BOD-REP',
+      current_warehouse_id = v_rep_id,
+      last_transfer_date = CASE
+        WHEN a.current_warehouse_id IS DISTINCT FROM v_rep_id THEN NOW()
+        ELSE a.last_transfer_date
+      END,
+      updated_at = NOW()
+  FROM tmp_bulk_work_orders t
+  WHERE a.id = t.asset_id;
+
+  INSERT INTO inventory_movements (
+    asset_id, batch_id, from_warehouse_id, to_warehouse_id,
+    movement_type, transfer_date, notes, reference_number,
+    created_by, created_at, item_type, item_id, item_sku, quantity
+  )
+  SELECT
+    t.asset_id, t.batch_id, t.from_warehouse_id, v_rep_id,
+    'transfer', NOW(), 'Apertura de orden de servicio', t.work_order_number,
+    v_created_by, NOW(), 'asset', t.asset_id, COALESCE(t.asset_type, 'N/A'), 1
+  FROM tmp_bulk_work_orders t
+  WHERE t.from_warehouse_id IS DISTINCT FROM v_rep_id;
+
+  INSERT INTO asset_history (asset_id, action, location, description)
+  SELECT
+    t.asset_id, 'MOVE', 'BOD-REP',
+    'Movimiento automático a BOD-REP al crear orden de trabajo #' || t.work_order_number
+  FROM tmp_bulk_work_orders t;
+
+  INSERT INTO audit_logs (
+    action, module, entity_type, entity_id, entity_reference,
+    description, user_id, user_name, user_email, user_role,
+    ticket_id, batch_id, asset_id, work_order_id, created_at
+  )
+  SELECT
+    'CREATE', 'WORKSHOP', 'WORK_ORDER', t.work_order_id, t.work_order_number,
+    'Orden de Servicio #' || t.work_order_number || ' creada',
+    v_created_by, COALESCE(v_user_name, 'sistema'), COALESCE(v_user_email, 'sistema@itad.gt'), COALESCE(v_user_role, 'system'),
+    t.ticket_id, t.batch_id, t.asset_id, t.work_order_id, NOW()
+  FROM tmp_bulk_work_orders t;
+
+  SELECT COALESCE(jsonb_agg(jsonb_build_object(
+    'id', t.work_order_id,
+    'work_order_number', t.work_order_number,
+    'asset_id', t.asset_id
+  ) ORDER BY length(t.work_order_number), t.work_order_number), '[]'::JSONB)
+  INTO v_orders
+  FROM tmp_bulk_work_orders t;
+
+  DROP TABLE tmp_bulk_work_orders;
+
+  RETURN jsonb_build_object(
+    'success', true,
+    'found', v_found,
+    'created', v_created,
+    'skipped', v_found - v_created,
+    'work_orders', v_orders
+  );
+END;
+$function$;
+
+NOTIFY pgrst, 'reload config';
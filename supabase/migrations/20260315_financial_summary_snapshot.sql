@@ -0,0 +1,254 @@
+-- =========================================================================
+-- Migración: Resumen financiero precalculado
+-- getFinancialSummary (dashboard/finanzas/actions.ts) descargaba todas las
+-- liquidaciones finalizadas y las ventas confirmadas del mes y las sumaba
+-- con reduce en Node. financial_summary_snapshot guarda los totales de
+-- liquidaciones finalizadas (una fila) y financial_monthly_sales las ventas
+-- confirmadas por mes. Los refrescan triggers por sentencia sobre
+-- settlements y sales_orders, en la misma transacción que la finalización
+-- o la confirmación. get_financial_summary() lee dos filas.
+--
+-- Los meses son de calendario en hora de Guatemala.
+-- rebuild_financial_summary() recalcula todo desde las tablas de origen.
+-- =========================================================================
+
+CREATE INDEX IF NOT EXISTS idx_sales_orders_status_created
+  ON sales_orders(status, created_at);
+
+CREATE TABLE IF NOT EXISTS public.financial_summary_snapshot (
+  id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+  settlement_count INTEGER NOT NULL DEFAULT 0,
+  total_revenue NUMERIC(16,2) NOT NULL DEFAULT 0,
+  total_expenses NUMERIC(16,2) NOT NULL DEFAULT 0,
+  net_profit NUMERIC(16,2) NOT NULL DEFAULT 0,
+  refreshed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+COMMENT ON TABLE financial_summary_snapshot IS 'Totales de liquidaciones finalizadas; mantenida por trg_settlements_financial_summary';
+
+CREATE TABLE IF NOT EXISTS public.financial_monthly_sales (
+  month DATE PRIMARY KEY,
+  order_count INTEGER NOT NULL DEFAULT 0,
+  total_amount NUMERIC(16,2) NOT NULL DEFAULT 0,
+  refreshed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+COMMENT ON TABLE financial_monthly_sales IS 'Ventas confirmadas por mes (hora de Guatemala); mantenida por trg_sales_orders_financial_summary_*';
+
+ALTER TABLE financial_summary_snapshot ENABLE ROW LEVEL SECURITY;
+ALTER TABLE financial_monthly_sales ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "financial_summary_snapshot_select" ON financial_summary_snapshot;
+CREATE POLICY "financial_summary_snapshot_select" ON financial_summary_snapshot FOR SELECT TO authenticated USING (true);
+
+DROP POLICY IF EXISTS "financial_monthly_sales_select" ON financial_monthly_sales;
+CREATE POLICY "financial_monthly_sales_select" ON financial_monthly_sales FOR SELECT TO authenticated USING (true);
+
+CREATE OR REPLACE FUNCTION public.financial_month(p_at TIMESTAMPTZ)
+RETURNS DATE
+LANGUAGE sql
+IMMUTABLE
+AS $function$
+  SELECT date_trunc('month', timezone('America/Guatemala', p_at))::DATE;
+$function$;
+
+-- Recalcula los totales de liquidaciones finalizadas. La fila se bloquea
+-- antes de sumar para que dos finalizaciones simultáneas no se pisen con
+-- sumas que no ven la otra.
+CREATE OR REPLACE FUNCTION public.refresh_financial_settlement_totals()
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $function$
+BEGIN
+  INSERT INTO financial_summary_snapshot (id) VALUES (TRUE)
+  ON CONFLICT (id) DO NOTHING;
+
+  PERFORM 1 FROM financial_summary_snapshot WHERE id FOR UPDATE;
+
+  UPDATE financial_summary_snapshot AS f
+  SET settlement_count = s.settlement_count,
+      total_revenue = s.total_revenue,
+      total_expenses = s.total_expenses,
+      net_profit = s.net_profit,
+      refreshed_at = NOW()
+  FROM (
+    SELECT
+      COUNT(*)::INTEGER AS settlement_count,
+      COALESCE(SUM(total_revenue), 0) AS total_revenue,
+      COALESCE(SUM(total_expenses), 0) AS total_expenses,
+      COALESCE(SUM(net_profit), 0) AS net_profit
+    FROM settlements
+    WHERE status = 'finalized'
+  ) s
+  WHERE f.id;
+END;
+$function$;
+
+-- Recalcula las ventas confirmadas de los meses indicados (en orden, para
+-- no bloquearse en cruz con otra confirmación)
+CREATE OR REPLACE FUNCTION public.refresh_financial_monthly_sales(p_months DATE[])
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $function$
+BEGIN
+  IF p_months IS NULL OR cardinality(p_months) = 0 THEN
+    RETURN;
+  END IF;
+
+  INSERT INTO financial_monthly_sales (month)
+  SELECT DISTINCT m FROM unnest(p_months) AS m ORDER BY m
+  ON CONFLICT (month) DO NOTHING;
+
+  PERFORM 1
+  FROM financial_monthly_sales
+  WHERE month = ANY(p_months)
+  ORDER BY month
+  FOR UPDATE;
+
+  UPDATE financial_monthly_sales AS f
+  SET order_count = s.order_count,
+      total_amount = s.total_amount,
+      refreshed_at = NOW()
+  FROM (
+    SELECT
+      m.month,
+      COUNT(o.id)::INTEGER AS order_count,
+      COALESCE(SUM(o.total_amount), 0) AS total_amount
+    FROM (SELECT DISTINCT unnest(p_months) AS month) m
+    LEFT JOIN sales_orders o
+      ON o.status = 'confirmed'
+     AND o.created_at >= timezone('America/Guatemala', m.month::TIMESTAMP)
+     AND o.created_at < timezone('America/Guatemala', (m.month + INTERVAL '1 month')::TIMESTAMP)
+    GROUP BY m.month
+  ) s
+  WHERE f.month = s.month;
+END;
+$function$;
+
+CREATE OR REPLACE FUNCTION public.settlements_financial_summary_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $function$
+BEGIN
+  PERFORM refresh_financial_settlement_totals();
+  RETURN NULL;
+END;
+$function$;
+
+DROP TRIGGER IF EXISTS trg_settlements_financial_summary ON settlements;
+CREATE TRIGGER trg_settlements_financial_summary
+  AFTER INSERT OR DELETE OR UPDATE OF status, total_revenue, total_expenses, net_profit ON settlements
+  FOR EACH STATEMENT EXECUTE FUNCTION settlements_financial_summary_trigger();
+
+-- Solo los meses de órdenes que estaban o quedaron confirmadas
+CREATE OR REPLACE FUNCTION public.sales_orders_financial_summary_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $function$
+DECLARE
+  v_months DATE[];
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    SELECT array_agg(DISTINCT financial_month(created_at))
+    INTO v_months
+    FROM new_rows
+    WHERE status = 'confirmed';
+  ELSIF TG_OP = 'DELETE' THEN
+    SELECT array_agg(DISTINCT financial_month(created_at))
+    INTO v_months
+    FROM old_rows
+    WHERE status = 'confirmed';
+  ELSE
+    SELECT array_agg(DISTINCT m)
+    INTO v_months
+    FROM (
+      SELECT financial_month(created_at) AS m FROM old_rows WHERE status = 'confirmed'
+      UNION
+      SELECT financial_month(created_at) FROM new_rows WHERE status = 'confirmed'
+    ) changed;
+  END IF;
+
+  PERFORM refresh_financial_monthly_sales(v_months);
+  RETURN NULL;
+END;
+$function$;
+
+DROP TRIGGER IF EXISTS trg_sales_orders_financial_summary_insert ON sales_orders;
+CREATE TRIGGER trg_sales_orders_financial_summary_insert
+  AFTER INSERT ON sales_orders
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION sales_orders_financial_summary_trigger();
+
+DROP TRIGGER IF EXISTS trg_sales_orders_financial_summary_update ON sales_orders;
+CREATE TRIGGER trg_sales_orders_financial_summary_update
+  AFTER UPDATE ON sales_orders
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION sales_orders_financial_summary_trigger();
+
+DROP TRIGGER IF EXISTS trg_sales_orders_financial_summary_delete ON sales_orders;
+CREATE TRIGGER trg_sales_orders_financial_summary_delete
+  AFTER DELETE ON sales_orders
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION sales_orders_financial_summary_trigger();
+
+-- Recalcula el resumen completo desde settlements y sales_orders
+CREATE OR REPLACE FUNCTION public.rebuild_financial_summary()
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $function$
+DECLARE
+  v_months DATE[];
+BEGIN
+  PERFORM refresh_financial_settlement_totals();
+
+  DELETE FROM financial_monthly_sales;
+
+  SELECT array_agg(DISTINCT financial_month(created_at))
+  INTO v_months
+  FROM sales_orders
+  WHERE status = 'confirmed';
+
+  PERFORM refresh_financial_monthly_sales(v_months);
+  RETURN COALESCE(cardinality(v_months), 0);
+END;
+$function$;
+
+-- Resumen para la página de finanzas: dos lecturas por llave primaria
+CREATE OR REPLACE FUNCTION public.get_financial_summary(p_month DATE DEFAULT NULL)
+RETURNS TABLE (
+  settlement_count INTEGER,
+  total_revenue NUMERIC,
+  total_expenses NUMERIC,
+  net_profit NUMERIC,
+  month DATE,
+  month_revenue NUMERIC,
+  month_order_count INTEGER,
+  refreshed_at TIMESTAMPTZ
+)
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $function$
+  SELECT
+    COALESCE(f.settlement_count, 0),
+    COALESCE(f.total_revenue, 0),
+    COALESCE(f.total_expenses, 0),
+    COALESCE(f.net_profit, 0),
+    m.month,
+    COALESCE(s.total_amount, 0),
+    COALESCE(s.order_count, 0),
+    f.refreshed_at
+  FROM (SELECT COALESCE(p_month, financial_month(NOW())) AS month) m
+  LEFT JOIN financial_summary_snapshot f ON f.id
+  LEFT JOIN financial_monthly_sales s ON s.month = m.month;
+$function$;
+
+SELECT public.rebuild_financial_summary();
+
+NOTIFY pgrst, 'reload config';
@@ -0,0 +1,248 @@
+-- =========================================================================
+-- Migración: Confirmación de ventas por conjuntos
+-- confirm_sale (sql/010_sales_module_schema.sql) recorría sales_order_items
+-- con un FOR y actualizaba cada activo y cada renglón por separado: una
+-- orden mayorista de cientos de equipos retenía el bloqueo de la orden
+-- mientras tanto. Además insertaba en columnas de audit_logs que ya no
+-- existen (table_name, record_id).
+--
+-- confirm_sales_bulk confirma una o varias órdenes con una sentencia por
+-- tabla: activos vendidos, fechas de garantía de los renglones, un renglón
+-- 'sale' por equipo en revenue_ledger, estado de la orden y auditoría. Cada
+-- orden se valida por separado (existe, está en borrador, tiene equipos,
+-- todos siguen en ready_for_sale y no se repiten en otra orden de la misma
+-- llamada); las que fallan se reportan y las demás se confirman.
+-- confirm_sale queda como envoltura de una sola orden.
+-- =========================================================================
+
+CREATE INDEX IF NOT EXISTS idx_revenue_ledger_sale_order
+  ON revenue_ledger(sale_order_id)
+  WHERE sale_order_id IS NOT NULL;
+
+CREATE OR REPLACE FUNCTION public.confirm_sales_bulk(
+  p_order_ids UUID[],
+  p_confirmed_by UUID DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $function$
+DECLARE
+  v_confirmed_by UUID := COALESCE(p_confirmed_by, auth.uid());
+  v_user_name TEXT;
+  v_user_email TEXT;
+  v_user_role TEXT;
+  v_confirmed INTEGER;
+  v_units INTEGER;
+  v_orders JSONB;
+BEGIN
+  IF p_order_ids IS NULL OR cardinality(p_order_ids) = 0 THEN
+    RAISE EXCEPTION 'No se seleccionaron órdenes';
+  END IF;
+
+  IF v_confirmed_by IS NOT NULL THEN
+    SELECT p.full_name, p.role::TEXT INTO v_user_name, v_user_role
+    FROM profiles p
+    WHERE p.id = v_confirmed_by;
+
+    SELECT u.email INTO v_user_email
+    FROM auth.users u
+    WHERE u.id = v_confirmed_by;
+  END IF;
+
+  DROP TABLE IF EXISTS tmp_confirm_orders;
+  CREATE TEMP TABLE tmp_confirm_orders (
+    order_id UUID PRIMARY KEY,
+    order_number TEXT,
+    customer_id UUID,
+    total_amount NUMERIC,
+    warranty_end DATE,
+    items_count INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+  ) ON COMMIT DROP;
+
+  -- Órdenes pedidas, bloqueadas en orden de id
+  PERFORM 1
+  FROM sales_orders so
+  WHERE so.id = ANY(p_order_ids)
+  ORDER BY so.id
+  FOR UPDATE;
+
+  INSERT INTO tmp_confirm_orders (order_id, order_number, customer_id, total_amount, warranty_end, error)
+  SELECT
+    req.id, o.order_number, o.customer_id, o.total_amount,
+    CURRENT_DATE + o.warranty_days,
+    CASE
+      WHEN o.id IS NULL THEN 'Orden no encontrada'
+      WHEN o.status IS DISTINCT FROM 'draft' THEN 'La orden ya fue procesada'
+    END
+  FROM (SELECT DISTINCT unnest(p_order_ids) AS id) req
+  LEFT JOIN sales_orders o ON o.id = req.id;
+
+  -- Equipos de las órdenes válidas, bloqueados en orden de id
+  PERFORM 1
+  FROM assets a
+  WHERE a.id IN (
+    SELECT i.asset_id
+    FROM sales_order_items i
+    JOIN tmp_confirm_orders t ON t.order_id = i.order_id
+    WHERE t.error IS NULL
+  )
+  ORDER BY a.id
+  FOR UPDATE;
+
+  UPDATE tmp_confirm_orders t
+  SET items_count = s.items_count,
+      error = CASE
+        WHEN s.unavailable IS NOT NULL THEN 'Equipos no disponibles: ' || s.unavailable
+        WHEN s.repeated IS NOT NULL THEN 'Equipos incluidos en otra orden: ' || s.repeated
+      END
+  FROM (
+    SELECT
+      i.order_id,
+      COUNT(*)::INTEGER AS items_count,
+      string_agg(COALESCE(a.serial_number, i.serial_number, a.id::TEXT), ', ')
+        FILTER (WHERE a.id IS NULL OR a.status::TEXT <> 'ready_for_sale') AS unavailable,
+      string_agg(COALESCE(a.serial_number, i.serial_number, a.id::TEXT), ', ')
+        FILTER (WHERE dup.first_order_id <> i.order_id) AS repeated
+    FROM sales_order_items i
+    JOIN tmp_confirm_orders o ON o.order_id = i.order_id AND o.error IS NULL
+    LEFT JOIN assets a ON a.id = i.asset_id
+    LEFT JOIN (
+      -- Un equipo en varias órdenes de la llamada: se queda con la primera
+      SELECT i2.asset_id, MIN(i2.order_id::TEXT)::UUID AS first_order_id
+      FROM sales_order_items i2
+      JOIN tmp_confirm_orders o2 ON o2.order_id = i2.order_id AND o2.error IS NULL
+      GROUP BY i2.asset_id
+    ) dup ON dup.asset_id = i.asset_id
+    GROUP BY i.order_id
+  ) s
+  WHERE t.order_id = s.order_id;
+
+  UPDATE tmp_confirm_orders
+  SET error = 'La orden no tiene equipos'
+  WHERE error IS NULL AND items_count = 0;
+
+  UPDATE assets AS a
+  SET status = 'sold',
+      sold_to = t.customer_id,
+      sold_at = NOW(),
+      sold_by = v_confirmed_by,
+      sale_order_id = t.order_id,
+      warranty_end_date = t.warranty_end,
+      updated_at = NOW()
+  FROM sales_order_items i
+  JOIN tmp_confirm_orders t ON t.order_id = i.order_id
+  WHERE a.id = i.asset_id
+    AND t.error IS NULL;
+
+  GET DIAGNOSTICS v_units = ROW_COUNT;
+
+  UPDATE sales_order_items AS i
+  SET warranty_start_date = CURRENT_DATE,
+      warranty_end_date = t.warranty_end
+  FROM tmp_confirm_orders t
+  WHERE i.order_id = t.order_id
+    AND t.error IS NULL;
+
+  INSERT INTO revenue_ledger (
+    batch_id, asset_id, sale_order_id, revenue_type, description,
+    reference_number, amount, revenue_date, created_by
+  )
+  SELECT
+    a.batch_id, i.asset_id, i.order_id, 'sale',
+    'Venta ' || t.order_number || ': ' || i.product_description,
+    t.order_number, i.unit_price, CURRENT_DATE, v_confirmed_by
+  FROM sales_order_items i
+  JOIN tmp_confirm_orders t ON t.order_id = i.order_id AND t.error IS NULL
+  JOIN assets a ON a.id = i.asset_id
+  WHERE NOT EXISTS (
+    SELECT 1 FROM revenue_ledger r
+    WHERE r.sale_order_id = i.order_id AND r.asset_id = i.asset_id
+  );
+
+  UPDATE sales_orders AS o
+  SET status = 'confirmed',
+      approved_by = v_confirmed_by,
+      approved_at = NOW(),
+      updated_at = NOW()
+  FROM tmp_confirm_orders t
+  WHERE o.id = t.order_id
+    AND t.error IS NULL;
+
+  GET DIAGNOSTICS v_confirmed = ROW_COUNT;
+
+  INSERT INTO audit_logs (
+    action, module, entity_type, entity_id, entity_reference,
+    description, user_id, user_name, user_email, user_role,
+    changes_summary, data_after, created_at
+  )
+  SELECT
+    'STATUS_CHANGE', 'SALES', 'SALE', t.order_id, t.order_number,
+    'Venta ' || t.order_number || ' confirmada (' || t.items_count || ' equipos)',
+    v_confirmed_by, COALESCE(v_user_name, 'sistema'), COALESCE(v_user_email, 'sistema@itad.gt'), COALESCE(v_user_role, 'system'),
+    jsonb_build_object('status', jsonb_build_object('old', 'draft', 'new', 'confirmed')),
+    jsonb_build_object(
+      'order_number', t.order_number,
+      'customer_id', t.customer_id,
+      'total_amount', t.total_amount,
+      'items_count', t.items_count,
+      'warranty_end', t.warranty_end
+    ),
+    NOW()
+  FROM tmp_confirm_orders t
+  WHERE t.error IS NULL;
+
+  SELECT jsonb_agg(jsonb_strip_nulls(jsonb_build_object(
+    'order_id', t.order_id,
+    'order_number', t.order_number,
+    'success', t.error IS NULL,
+    'error', t.error,
+    'items_count', t.items_count,
+    'warranty_end', CASE WHEN t.error IS NULL THEN t.warranty_end END
+  )) ORDER BY t.order_number)
+  INTO v_orders
+  FROM tmp_confirm_orders t;
+
+  DROP TABLE tmp_confirm_orders;
+
+  RETURN jsonb_build_object(
+    'success', true,
+    'requested', jsonb_array_length(v_orders),
+    'confirmed', v_confirmed,
+    'failed', jsonb_array_length(v_orders) - v_confirmed,
+    'units', v_units,
+    'orders', v_orders
+  );
+END;
+$function$;
+
+-- Misma firma y respuesta que la versión de 010_sales_module_schema.sql
+CREATE OR REPLACE FUNCTION public.confirm_sale(
+  p_order_id UUID,
+  p_confirmed_by UUID
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $function$
+DECLARE
+  v_order JSONB;
+BEGIN
+  v_order := confirm_sales_bulk(ARRAY[p_order_id], p_confirmed_by)->'orders'->0;
+
+  IF NOT (v_order->>'success')::BOOLEAN THEN
+    RETURN jsonb_build_object('success', false, 'error', v_order->>'error');
+  END IF;
+
+  RETURN jsonb_build_object(
+    'success', true,
+    'order_number', v_order->>'order_number',
+    'warranty_end', v_order->>'warranty_end'
+  );
+END;
+$function$;
+
+NOTIFY pgrst, 'reload config';
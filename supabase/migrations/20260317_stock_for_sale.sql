@@ -0,0 +1,324 @@
+-- =========================================================================
+-- Migración: Stock para venta precalculado
+-- La vista available_stock_for_sale (sql/010_sales_module_schema.sql)
+-- agrupaba todos los activos ready_for_sale en cada consulta, armaba
+-- ARRAY_AGG de ids y seriales por grupo y buscaba el precio de lista con
+-- una subconsulta correlacionada por grupo.
+--
+-- stock_for_sale guarda por marca / modelo / tipo / grado la cantidad
+-- disponible, el costo acumulado y el precio de lista vigente. Lo mantiene
+-- un trigger por sentencia sobre assets (como warehouse_stock_counters) y
+-- otro sobre price_list para los precios. La vista conserva su nombre y
+-- columnas, sin las listas de ids; los equipos de un grupo se piden con
+-- get_stock_for_sale_assets cuando se necesitan.
+--
+-- refresh_stock_for_sale_prices() recalcula los precios de todos los
+-- grupos; lo dispara cada cambio de price_list. Los precios que vencen por
+-- fecha los resuelve la vista desde 20260320_stock_for_sale_price_expiry.sql.
+-- rebuild_stock_for_sale() recalcula todo desde assets.
+-- =========================================================================
+
+CREATE INDEX IF NOT EXISTS idx_assets_ready_for_sale_created
+  ON assets(created_at DESC)
+  WHERE status = 'ready_for_sale';
+
+CREATE INDEX IF NOT EXISTS idx_assets_ready_for_sale_group
+  ON assets(lower(manufacturer), lower(model), created_at)
+  WHERE status = 'ready_for_sale';
+
+CREATE TABLE IF NOT EXISTS public.stock_for_sale (
+  manufacturer TEXT NOT NULL DEFAULT '',
+  model TEXT NOT NULL DEFAULT '',
+  asset_type TEXT NOT NULL DEFAULT '',
+  condition_grade TEXT NOT NULL DEFAULT '',
+  available_count BIGINT NOT NULL DEFAULT 0,
+  cost_sum NUMERIC(16,2) NOT NULL DEFAULT 0,
+  list_price NUMERIC(10,2),
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (manufacturer, model, asset_type, condition_grade)
+);
+
+COMMENT ON TABLE stock_for_sale IS 'Activos ready_for_sale por marca/modelo/tipo/grado con precio de lista vigente; mantenida por trg_assets_stock_for_sale_*';
+
+ALTER TABLE stock_for_sale ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "stock_for_sale_select" ON stock_for_sale;
+CREATE POLICY "stock_for_sale_select" ON stock_for_sale FOR SELECT TO authenticated USING (true);
+
+-- Precio de lista vigente de un grupo (misma regla que la vista original)
+CREATE OR REPLACE FUNCTION public.effective_list_price(
+  p_manufacturer TEXT,
+  p_model TEXT,
+  p_asset_type TEXT,
+  p_condition_grade TEXT
+)
+RETURNS NUMERIC
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $function$
+  SELECT pl.list_price
+  FROM price_list pl
+  WHERE pl.manufacturer = p_manufacturer
+    AND pl.model = p_model
+    AND pl.asset_type = p_asset_type
+    AND pl.condition_grade = p_condition_grade
+    AND pl.is_active = TRUE
+    AND (pl.effective_to IS NULL OR pl.effective_to >= CURRENT_DATE)
+  ORDER BY pl.effective_from DESC
+  LIMIT 1;
+$function$;
+
+-- Aplica la diferencia de la sentencia. Las claves se actualizan en orden
+-- para que dos ventas simultáneas no se bloqueen en cruz. El precio se toma
+-- al crear el grupo; los cambios de price_list los aplica su propio trigger.
+CREATE OR REPLACE FUNCTION public.apply_stock_for_sale_delta(p_delta JSONB)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $function$
+BEGIN
+  INSERT INTO stock_for_sale AS s (
+    manufacturer, model, asset_type, condition_grade,
+    available_count, cost_sum, list_price, updated_at
+  )
+  SELECT
+    d->>'manufacturer', d->>'model', d->>'asset_type', d->>'condition_grade',
+    (d->>'delta')::BIGINT, (d->>'cost')::NUMERIC,
+    effective_list_price(d->>'manufacturer', d->>'model', d->>'asset_type', d->>'condition_grade'),
+    NOW()
+  FROM jsonb_array_elements(p_delta) AS d
+  ORDER BY 1, 2, 3, 4
+  ON CONFLICT (manufacturer, model, asset_type, condition_grade)
+  DO UPDATE SET available_count = s.available_count + EXCLUDED.available_count,
+                cost_sum = s.cost_sum + EXCLUDED.cost_sum,
+                updated_at = EXCLUDED.updated_at;
+
+  DELETE FROM stock_for_sale
+  WHERE available_count <= 0
+    AND (manufacturer, model, asset_type, condition_grade) IN (
+      SELECT d->>'manufacturer', d->>'model', d->>'asset_type', d->>'condition_grade'
+      FROM jsonb_array_elements(p_delta) AS d
+    );
+END;
+$function$;
+
+CREATE OR REPLACE FUNCTION public.assets_stock_for_sale_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $function$
+DECLARE
+  v_delta JSONB;
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    SELECT jsonb_agg(to_jsonb(d))
+    INTO v_delta
+    FROM (
+      SELECT COALESCE(manufacturer, '') AS manufacturer, COALESCE(model, '') AS model,
+             COALESCE(asset_type::TEXT, '') AS asset_type, COALESCE(condition::TEXT, '') AS condition_grade,
+             COUNT(*) AS delta, SUM(COALESCE(cost_amount, 0)) AS cost
+      FROM new_rows
+      WHERE status::TEXT = 'ready_for_sale'
+      GROUP BY 1, 2, 3, 4
+    ) d;
+  ELSIF TG_OP = 'DELETE' THEN
+    SELECT jsonb_agg(to_jsonb(d))
+    INTO v_delta
+    FROM (
+      SELECT COALESCE(manufacturer, '') AS manufacturer, COALESCE(model, '') AS model,
+             COALESCE(asset_type::TEXT, '') AS asset_type, COALESCE(condition::TEXT, '') AS condition_grade,
+             -COUNT(*) AS delta, -SUM(COALESCE(cost_amount, 0)) AS cost
+      FROM old_rows
+      WHERE status::TEXT = 'ready_for_sale'
+      GROUP BY 1, 2, 3, 4
+    ) d;
+  ELSE
+    SELECT jsonb_agg(to_jsonb(d))
+    INTO v_delta
+    FROM (
+      SELECT manufacturer, model, asset_type, condition_grade, SUM(delta) AS delta, SUM(cost) AS cost
+      FROM (
+        SELECT COALESCE(manufacturer, '') AS manufacturer, COALESCE(model, '') AS model,
+               COALESCE(asset_type::TEXT, '') AS asset_type, COALESCE(condition::TEXT, '') AS condition_grade,
+               -1 AS delta, -COALESCE(cost_amount, 0) AS cost
+        FROM old_rows
+        WHERE status::TEXT = 'ready_for_sale'
+        UNION ALL
+        SELECT COALESCE(manufacturer, ''), COALESCE(model, ''),
+               COALESCE(asset_type::TEXT, ''), COALESCE(condition::TEXT, ''),
+               1, COALESCE(cost_amount, 0)
+        FROM new_rows
+        WHERE status::TEXT = 'ready_for_sale'
+      ) changes
+      GROUP BY 1, 2, 3, 4
+      HAVING SUM(delta) <> 0 OR SUM(cost) <> 0
+    ) d;
+  END IF;
+
+  IF v_delta IS NOT NULL THEN
+    PERFORM apply_stock_for_sale_delta(v_delta);
+  END IF;
+  RETURN NULL;
+END;
+$function$;
+
+DROP TRIGGER IF EXISTS trg_assets_stock_for_sale_insert ON assets;
+CREATE TRIGGER trg_assets_stock_for_sale_insert
+  AFTER INSERT ON assets
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION assets_stock_for_sale_trigger();
+
+DROP TRIGGER IF EXISTS trg_assets_stock_for_sale_update ON assets;
+CREATE TRIGGER trg_assets_stock_for_sale_update
+  AFTER UPDATE ON assets
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION assets_stock_for_sale_trigger();
+
+DROP TRIGGER IF EXISTS trg_assets_stock_for_sale_delete ON assets;
+CREATE TRIGGER trg_assets_stock_for_sale_delete
+  AFTER DELETE ON assets
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION assets_stock_for_sale_trigger();
+
+-- Recalcula el precio vigente de todos los grupos (price_list es pequeña)
+CREATE OR REPLACE FUNCTION public.refresh_stock_for_sale_prices()
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $function$
+DECLARE
+  v_rows INTEGER;
+BEGIN
+  UPDATE stock_for_sale AS s
+  SET list_price = p.list_price,
+      updated_at = NOW()
+  FROM (
+    SELECT
+      g.manufacturer, g.model, g.asset_type, g.condition_grade,
+      effective_list_price(g.manufacturer, g.model, g.asset_type, g.condition_grade) AS list_price
+    FROM stock_for_sale g
+  ) p
+  WHERE s.manufacturer = p.manufacturer
+    AND s.model = p.model
+    AND s.asset_type = p.asset_type
+    AND s.condition_grade = p.condition_grade
+    AND s.list_price IS DISTINCT FROM p.list_price;
+
+  GET DIAGNOSTICS v_rows = ROW_COUNT;
+  RETURN v_rows;
+END;
+$function$;
+
+CREATE OR REPLACE FUNCTION public.price_list_stock_for_sale_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $function$
+BEGIN
+  PERFORM refresh_stock_for_sale_prices();
+  RETURN NULL;
+END;
+$function$;
+
+DROP TRIGGER IF EXISTS trg_price_list_stock_for_sale ON price_list;
+CREATE TRIGGER trg_price_list_stock_for_sale
+  AFTER INSERT OR UPDATE OR DELETE ON price_list
+  FOR EACH STATEMENT EXECUTE FUNCTION price_list_stock_for_sale_trigger();
+
+-- Recalcula stock_for_sale desde assets. Bloquea las escrituras sobre
+-- assets mientras corre para que ninguna venta quede a medias.
+CREATE OR REPLACE FUNCTION public.rebuild_stock_for_sale()
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $function$
+DECLARE
+  v_rows INTEGER;
+BEGIN
+  LOCK TABLE assets IN SHARE MODE;
+  LOCK TABLE stock_for_sale IN EXCLUSIVE MODE;
+
+  DELETE FROM stock_for_sale;
+
+  INSERT INTO stock_for_sale (manufacturer, model, asset_type, condition_grade, available_count, cost_sum, list_price)
+  SELECT g.*, effective_list_price(g.manufacturer, g.model, g.asset_type, g.condition_grade)
+  FROM (
+    SELECT COALESCE(manufacturer, '') AS manufacturer, COALESCE(model, '') AS model,
+           COALESCE(asset_type::TEXT, '') AS asset_type, COALESCE(condition::TEXT, '') AS condition_grade,
+           COUNT(*) AS available_count, SUM(COALESCE(cost_amount, 0)) AS cost_sum
+    FROM assets
+    WHERE status = 'ready_for_sale'
+    GROUP BY 1, 2, 3, 4
+  ) g;
+
+  GET DIAGNOSTICS v_rows = ROW_COUNT;
+  RETURN v_rows;
+END;
+$function$;
+
+-- Misma forma que la vista original, sin asset_ids ni serials
+DROP VIEW IF EXISTS public.available_stock_for_sale;
+CREATE VIEW public.available_stock_for_sale AS
+SELECT
+  NULLIF(s.manufacturer, '') AS manufacturer,
+  NULLIF(s.model, '') AS model,
+  NULLIF(s.asset_type, '') AS asset_type,
+  NULLIF(s.condition_grade, '') AS condition_grade,
+  s.available_count,
+  (s.cost_sum / NULLIF(s.available_count, 0))::NUMERIC(10,2) AS avg_cost,
+  COALESCE(s.list_price, 0) AS suggested_price
+FROM stock_for_sale s
+WHERE s.available_count > 0
+ORDER BY s.manufacturer, s.model, s.available_count DESC;
+
+-- Equipos disponibles de un grupo (marca y modelo sin distinguir
+-- mayúsculas), opcionalmente solo los seriales / etiquetas indicados
+CREATE OR REPLACE FUNCTION public.get_stock_for_sale_assets(
+  p_manufacturer TEXT,
+  p_model TEXT,
+  p_asset_type TEXT DEFAULT NULL,
+  p_condition_grade TEXT DEFAULT NULL,
+  p_serials TEXT[] DEFAULT NULL,
+  p_limit INTEGER DEFAULT 100
+)
+RETURNS TABLE (
+  id UUID,
+  internal_tag TEXT,
+  serial_number TEXT,
+  manufacturer TEXT,
+  model TEXT,
+  asset_type TEXT,
+  condition TEXT,
+  cost_amount NUMERIC,
+  sales_price NUMERIC,
+  photos JSONB,
+  created_at TIMESTAMPTZ
+)
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $function$
+  SELECT
+    a.id, a.internal_tag::TEXT, a.serial_number::TEXT, a.manufacturer::TEXT, a.model::TEXT,
+    a.asset_type::TEXT, a.condition::TEXT, a.cost_amount::NUMERIC, a.sales_price::NUMERIC,
+    to_jsonb(a.photos), a.created_at
+  FROM assets a
+  WHERE a.status = 'ready_for_sale'
+    AND lower(a.manufacturer) = lower(p_manufacturer)
+    AND lower(a.model) = lower(p_model)
+    AND (p_asset_type IS NULL OR a.asset_type::TEXT = p_asset_type)
+    AND (p_condition_grade IS NULL OR a.condition::TEXT = p_condition_grade)
+    AND (
+      p_serials IS NULL
+      OR lower(a.serial_number) = ANY(SELECT lower(s) FROM unnest(p_serials) s)
+      OR lower(a.internal_tag) = ANY(SELECT lower(s) FROM unnest(p_serials) s)
+    )
+  ORDER BY a.created_at
+  LIMIT LEAST(GREATEST(COALESCE(p_limit, 100), 1), 1000);
+$function$;
+
+SELECT public.rebuild_stock_for_sale();
+
+NOTIFY pgrst, 'reload config';
@@ -0,0 +1,699 @@
+-- =========================================================================
+-- Migración: Reservas temporales de equipos para venta
+-- Nada impedía que dos vendedores pusieran los mismos seriales
+-- ready_for_sale en carritos distintos: el conflicto aparecía recién al
+-- confirmar (confirm_sales_bulk) o, en la ruta manual de processSale,
+-- vendiendo dos veces el mismo equipo.
+--
+-- asset_reservations guarda una fila por equipo apartado, con el carrito
+-- (hold_id) que lo aparta y su vencimiento. Los equipos se reclaman con
+-- FOR UPDATE SKIP LOCKED sobre assets: dos vendedores que piden el mismo
+-- grupo toman equipos distintos sin esperarse, y el INSERT ... ON CONFLICT
+-- sobre la llave primaria garantiza que un equipo tenga una sola reserva
+-- vigente aunque el snapshot de la consulta esté atrasado.
+--
+--   reserve_assets              seriales concretos (carrito, modal)
+--   reserve_assets_by_quantity  N equipos de una marca / modelo / grado
+--   release_asset_reservations  libera un carrito o parte de él
+--   expire_asset_reservations   borra reservas vencidas (barrido)
+--
+-- Una reserva vencida ya no aparta el equipo aunque el barrido no haya
+-- pasado: las funciones de reserva la reemplazan. El barrido
+-- (sweep_asset_reservations.py, por cron o con --loop) solo limpia filas.
+-- Cada reserva nueva o repetida del mismo carrito extiende el vencimiento
+-- de todo el carrito.
+--
+-- Las reservas se respetan sin que el llamador lo pida:
+--   available_stock_for_sale    descuenta los equipos apartados
+--   get_stock_for_sale_assets   omite los apartados por otro carrito
+--                               (p_hold_id = el carrito que consulta)
+--   confirm_sales_bulk          rechaza órdenes con equipos apartados por
+--                               otro carrito (p_hold_id; redefine la versión
+--                               de 20260316_bulk_confirm_sale.sql)
+-- =========================================================================
+
+CREATE TABLE IF NOT EXISTS public.asset_reservations (
+  asset_id UUID PRIMARY KEY REFERENCES assets(id) ON DELETE CASCADE,
+  hold_id UUID NOT NULL,
+  reserved_by UUID,
+  reserved_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  expires_at TIMESTAMPTZ NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_asset_reservations_hold
+  ON asset_reservations(hold_id);
+
+CREATE INDEX IF NOT EXISTS idx_asset_reservations_expires
+  ON asset_reservations(expires_at);
+
+COMMENT ON TABLE asset_reservations IS 'Equipos ready_for_sale apartados por un carrito de venta hasta expires_at';
+
+ALTER TABLE asset_reservations ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "asset_reservations_select" ON asset_reservations;
+CREATE POLICY "asset_reservations_select" ON asset_reservations FOR SELECT TO authenticated USING (true);
+
+-- Reclama los equipos indicados para el carrito. Los que otro carrito está
+-- reclamando en este momento (fila bloqueada) se saltan, igual que los que
+-- tienen una reserva vigente de otro carrito o ya no están ready_for_sale.
+-- Devuelve los ids reclamados.
+CREATE OR REPLACE FUNCTION public.claim_asset_reservations(
+  p_hold_id UUID,
+  p_asset_ids UUID[],
+  p_expires_at TIMESTAMPTZ,
+  p_reserved_by UUID
+)
+RETURNS SETOF UUID
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $function$
+  INSERT INTO asset_reservations AS r (asset_id, hold_id, reserved_by, reserved_at, expires_at)
+  SELECT c.id, p_hold_id, p_reserved_by, NOW(), p_expires_at
+  FROM (
+    SELECT a.id
+    FROM assets a
+    WHERE a.id = ANY(p_asset_ids)
+      AND a.status::TEXT = 'ready_for_sale'
+    ORDER BY a.id
+    FOR UPDATE SKIP LOCKED
+  ) c
+  ORDER BY c.id
+  ON CONFLICT (asset_id) DO UPDATE
+    SET hold_id = EXCLUDED.hold_id,
+        reserved_by = EXCLUDED.reserved_by,
+        reserved_at = CASE WHEN r.hold_id = EXCLUDED.hold_id THEN r.reserved_at ELSE EXCLUDED.reserved_at END,
+        expires_at = EXCLUDED.expires_at
+    WHERE r.hold_id = EXCLUDED.hold_id
+       OR r.expires_at <= NOW()
+  RETURNING r.asset_id;
+$function$;
+
+-- Extiende el vencimiento de todas las reservas vigentes de un carrito
+CREATE OR REPLACE FUNCTION public.touch_asset_reservations(
+  p_hold_id UUID,
+  p_expires_at TIMESTAMPTZ
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $function$
+DECLARE
+  v_touched INTEGER;
+BEGIN
+  UPDATE asset_reservations
+  SET expires_at = p_expires_at
+  WHERE hold_id = p_hold_id
+    AND expires_at > NOW();
+
+  GET DIAGNOSTICS v_touched = ROW_COUNT;
+  RETURN v_touched;
+END;
+$function$;
+
+-- Aparta seriales concretos. Con p_allow_partial FALSE (por defecto) no se
+-- aparta nada si alguno no está disponible.
+CREATE OR REPLACE FUNCTION public.reserve_assets(
+  p_hold_id UUID,
+  p_asset_ids UUID[],
+  p_minutes INTEGER DEFAULT 15,
+  p_reserved_by UUID DEFAULT NULL,
+  p_allow_partial BOOLEAN DEFAULT FALSE
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $function$
+DECLARE
+  v_expires_at TIMESTAMPTZ := NOW() + make_interval(mins => LEAST(GREATEST(COALESCE(p_minutes, 15), 1), 240));
+  v_reserved UUID[];
+  v_unavailable JSONB;
+BEGIN
+  IF p_hold_id IS NULL THEN
+    RETURN jsonb_build_object('success', false, 'error', 'Falta el identificador del carrito');
+  END IF;
+
+  IF p_asset_ids IS NULL OR cardinality(p_asset_ids) = 0 THEN
+    RETURN jsonb_build_object('success', false, 'error', 'No se indicaron equipos');
+  END IF;
+
+  SELECT array_agg(id)
+  INTO v_reserved
+  FROM claim_asset_reservations(
+    p_hold_id,
+    p_asset_ids,
+    v_expires_at,
+    COALESCE(p_reserved_by, auth.uid())
+  ) AS id;
+
+  SELECT jsonb_agg(jsonb_build_object(
+           'asset_id', req.id,
+           'serial_number', a.serial_number,
+           'internal_tag', a.internal_tag,
+           'reason', CASE
+             WHEN a.id IS NULL THEN 'not_found'
+             WHEN a.status::TEXT <> 'ready_for_sale' THEN 'not_for_sale'
+             ELSE 'reserved'
+           END
+         ) ORDER BY a.serial_number)
+  INTO v_unavailable
+  FROM (SELECT DISTINCT unnest(p_asset_ids) AS id) req
+  LEFT JOIN assets a ON a.id = req.id
+  WHERE req.id <> ALL(COALESCE(v_reserved, '{}'));
+
+  IF v_unavailable IS NOT NULL AND NOT p_allow_partial THEN
+    RAISE EXCEPTION 'Algunos equipos no están disponibles';
+  END IF;
+
+  PERFORM touch_asset_reservations(p_hold_id, v_expires_at);
+
+  RETURN jsonb_build_object(
+    'success', true,
+    'hold_id', p_hold_id,
+    'reserved', to_jsonb(COALESCE(v_reserved, '{}')),
+    'unavailable', COALESCE(v_unavailable, '[]'::JSONB),
+    'expires_at', v_expires_at
+  );
+
+EXCEPTION
+  WHEN raise_exception THEN
+    RETURN jsonb_build_object(
+      'success', false,
+      'error', SQLERRM,
+      'unavailable', COALESCE(v_unavailable, '[]'::JSONB)
+    );
+  WHEN OTHERS THEN
+    RETURN jsonb_build_object('success', false, 'error', SQLERRM);
+END;
+$function$;
+
+-- Aparta N equipos de una marca / modelo (sin distinguir mayúsculas) y,
+-- opcionalmente, tipo y grado, los más antiguos primero y sin contar los
+-- que el carrito ya tiene. Los candidatos se bloquean con SKIP LOCKED; si
+-- otro carrito ganó alguno entre la lectura y el INSERT se piden más, hasta
+-- tres pasadas. Sin p_allow_partial, si no alcanzan no se aparta ninguno.
+CREATE OR REPLACE FUNCTION public.reserve_assets_by_quantity(
+  p_hold_id UUID,
+  p_manufacturer TEXT,
+  p_model TEXT,
+  p_quantity INTEGER,
+  p_condition_grade TEXT DEFAULT NULL,
+  p_asset_type TEXT DEFAULT NULL,
+  p_minutes INTEGER DEFAULT 15,
+  p_reserved_by UUID DEFAULT NULL,
+  p_allow_partial BOOLEAN DEFAULT FALSE
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $function$
+DECLARE
+  v_expires_at TIMESTAMPTZ := NOW() + make_interval(mins => LEAST(GREATEST(COALESCE(p_minutes, 15), 1), 240));
+  v_reserved_by UUID := COALESCE(p_reserved_by, auth.uid());
+  v_reserved UUID[] := '{}';
+  v_candidates UUID[];
+  v_claimed UUID[];
+  v_assets JSONB;
+BEGIN
+  IF p_hold_id IS NULL THEN
+    RETURN jsonb_build_object('success', false, 'error', 'Falta el identificador del carrito');
+  END IF;
+
+  IF p_quantity IS NULL OR p_quantity < 1 OR p_quantity > 500 THEN
+    RETURN jsonb_build_object('success', false, 'error', 'Cantidad inválida (1 a 500)');
+  END IF;
+
+  FOR v_pass IN 1..3 LOOP
+    SELECT array_agg(c.id)
+    INTO v_candidates
+    FROM (
+      SELECT a.id
+      FROM assets a
+      WHERE a.status = 'ready_for_sale'
+        AND lower(a.manufacturer) = lower(p_manufacturer)
+        AND lower(a.model) = lower(p_model)
+        AND (p_condition_grade IS NULL OR a.condition::TEXT = p_condition_grade)
+        AND (p_asset_type IS NULL OR a.asset_type::TEXT = p_asset_type)
+        AND a.id <> ALL(v_reserved)
+        AND NOT EXISTS (
+          SELECT 1
+          FROM asset_reservations r
+          WHERE r.asset_id = a.id
+            AND r.expires_at > NOW()
+        )
+      ORDER BY a.created_at
+      LIMIT p_quantity - cardinality(v_reserved)
+      FOR UPDATE OF a SKIP LOCKED
+    ) c;
+
+    EXIT WHEN v_candidates IS NULL;
+
+    SELECT array_agg(id)
+    INTO v_claimed
+    FROM claim_asset_reservations(p_hold_id, v_candidates, v_expires_at, v_reserved_by) AS id;
+
+    v_reserved := v_reserved || COALESCE(v_claimed, '{}');
+    EXIT WHEN cardinality(v_reserved) >= p_quantity;
+  END LOOP;
+
+  IF cardinality(v_reserved) < p_quantity AND NOT p_allow_partial THEN
+    RAISE EXCEPTION 'Solo hay % de % equipos disponibles de % %',
+      cardinality(v_reserved), p_quantity, p_manufacturer, p_model;
+  END IF;
+
+  PERFORM touch_asset_reservations(p_hold_id, v_expires_at);
+
+  SELECT jsonb_agg(jsonb_build_object(
+           'id', a.id,
+           'internal_tag', a.internal_tag,
+           'serial_number', a.serial_number,
+           'manufacturer', a.manufacturer,
+           'model', a.model,
+           'asset_type', a.asset_type,
+           'condition', a.condition,
+           'cost_amount', a.cost_amount,
+           'sales_price', a.sales_price,
+           'photos', COALESCE(to_jsonb(a.photos), '[]'::JSONB),
+           'created_at', a.created_at
+         ) ORDER BY a.created_at)
+  INTO v_assets
+  FROM assets a
+  WHERE a.id = ANY(v_reserved);
+
+  RETURN jsonb_build_object(
+    'success', true,
+    'hold_id', p_hold_id,
+    'requested', p_quantity,
+    'reserved', cardinality(v_reserved),
+    'assets', COALESCE(v_assets, '[]'::JSONB),
+    'expires_at', v_expires_at
+  );
+
+EXCEPTION WHEN OTHERS THEN
+  RETURN jsonb_build_object('success', false, 'error', SQLERRM);
+END;
+$function$;
+
+-- Libera las reservas de un carrito; p_asset_ids NULL = todo el carrito
+CREATE OR REPLACE FUNCTION public.release_asset_reservations(
+  p_hold_id UUID,
+  p_asset_ids UUID[] DEFAULT NULL
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $function$
+DECLARE
+  v_released INTEGER;
+BEGIN
+  DELETE FROM asset_reservations
+  WHERE hold_id = p_hold_id
+    AND (p_asset_ids IS NULL OR asset_id = ANY(p_asset_ids));
+
+  GET DIAGNOSTICS v_released = ROW_COUNT;
+  RETURN v_released;
+END;
+$function$;
+
+-- Barrido de reservas vencidas, por lotes. Las filas que una reserva está
+-- reemplazando en este momento se saltan.
+CREATE OR REPLACE FUNCTION public.expire_asset_reservations(p_limit INTEGER DEFAULT 5000)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $function$
+DECLARE
+  v_expired INTEGER;
+BEGIN
+  DELETE FROM asset_reservations r
+  WHERE r.asset_id IN (
+    SELECT asset_id
+    FROM asset_reservations
+    WHERE expires_at <= NOW()
+    ORDER BY expires_at
+    LIMIT GREATEST(COALESCE(p_limit, 5000), 1)
+    FOR UPDATE SKIP LOCKED
+  )
+    AND r.expires_at <= NOW();
+
+  GET DIAGNOSTICS v_expired = ROW_COUNT;
+  RETURN v_expired;
+END;
+$function$;
+
+-- Los equipos que dejan ready_for_sale (vendidos, devueltos a taller) ya
+-- no necesitan su reserva
+CREATE OR REPLACE FUNCTION public.assets_release_reservations_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $function$
+BEGIN
+  DELETE FROM asset_reservations r
+  USING new_rows n
+  WHERE r.asset_id = n.id
+    AND n.status::TEXT <> 'ready_for_sale';
+  RETURN NULL;
+END;
+$function$;
+
+DROP TRIGGER IF EXISTS trg_assets_release_reservations ON assets;
+CREATE TRIGGER trg_assets_release_reservations
+  AFTER UPDATE ON assets
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION assets_release_reservations_trigger();
+
+-- Stock por grupo sin los equipos con reserva vigente
+CREATE OR REPLACE VIEW public.available_stock_for_sale AS
+SELECT
+  NULLIF(s.manufacturer, '') AS manufacturer,
+  NULLIF(s.model, '') AS model,
+  NULLIF(s.asset_type, '') AS asset_type,
+  NULLIF(s.condition_grade, '') AS condition_grade,
+  s.available_count - COALESCE(h.held_count, 0) AS available_count,
+  (s.cost_sum / NULLIF(s.available_count, 0))::NUMERIC(10,2) AS avg_cost,
+  COALESCE(s.list_price, 0) AS suggested_price
+FROM stock_for_sale s
+LEFT JOIN (
+  SELECT
+    COALESCE(a.manufacturer, '') AS manufacturer, COALESCE(a.model, '') AS model,
+    COALESCE(a.asset_type::TEXT, '') AS asset_type, COALESCE(a.condition::TEXT, '') AS condition_grade,
+    COUNT(*) AS held_count
+  FROM asset_reservations r
+  JOIN assets a ON a.id = r.asset_id
+  WHERE r.expires_at > NOW()
+    AND a.status::TEXT = 'ready_for_sale'
+  GROUP BY 1, 2, 3, 4
+) h ON h.manufacturer = s.manufacturer
+   AND h.model = s.model
+   AND h.asset_type = s.asset_type
+   AND h.condition_grade = s.condition_grade
+WHERE s.available_count - COALESCE(h.held_count, 0) > 0
+ORDER BY s.manufacturer, s.model, s.available_count - COALESCE(h.held_count, 0) DESC;
+
+-- get_stock_for_sale_assets (20260317) omite los equipos apartados por otro
+-- carrito; los del carrito p_hold_id se siguen mostrando. Se elimina la
+-- versión de 6 parámetros para que PostgREST no encuentre dos sobrecargas.
+DROP FUNCTION IF EXISTS public.get_stock_for_sale_assets(TEXT, TEXT, TEXT, TEXT, TEXT[], INTEGER);
+
+CREATE OR REPLACE FUNCTION public.get_stock_for_sale_assets(
+  p_manufacturer TEXT,
+  p_model TEXT,
+  p_asset_type TEXT DEFAULT NULL,
+  p_condition_grade TEXT DEFAULT NULL,
+  p_serials TEXT[] DEFAULT NULL,
+  p_limit INTEGER DEFAULT 100,
+  p_hold_id UUID DEFAULT NULL
+)
+RETURNS TABLE (
+  id UUID,
+  internal_tag TEXT,
+  serial_number TEXT,
+  manufacturer TEXT,
+  model TEXT,
+  asset_type TEXT,
+  condition TEXT,
+  cost_amount NUMERIC,
+  sales_price NUMERIC,
+  photos JSONB,
+  created_at TIMESTAMPTZ
+)
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $function$
+  SELECT
+    a.id, a.internal_tag::TEXT, a.serial_number::TEXT, a.manufacturer::TEXT, a.model::TEXT,
+    a.asset_type::TEXT, a.condition::TEXT, a.cost_amount::NUMERIC, a.sales_price::NUMERIC,
+    to_jsonb(a.photos), a.created_at
+  FROM assets a
+  WHERE a.status = 'ready_for_sale'
+    AND lower(a.manufacturer) = lower(p_manufacturer)
+    AND lower(a.model) = lower(p_model)
+    AND (p_asset_type IS NULL OR a.asset_type::TEXT = p_asset_type)
+    AND (p_condition_grade IS NULL OR a.condition::TEXT = p_condition_grade)
+    AND (
+      p_serials IS NULL
+      OR lower(a.serial_number) = ANY(SELECT lower(s) FROM unnest(p_serials) s)
+      OR lower(a.internal_tag) = ANY(SELECT lower(s) FROM unnest(p_serials) s)
+    )
+    AND NOT EXISTS (
+      SELECT 1 FROM asset_reservations r
+      WHERE r.asset_id = a.id
+        AND r.expires_at > NOW()
+        AND r.hold_id IS DISTINCT FROM p_hold_id
+    )
+  ORDER BY a.created_at
+  LIMIT LEAST(GREATEST(COALESCE(p_limit, 100), 1), 1000);
+$function$;
+
+-- confirm_sales_bulk (20260316) rechaza además las órdenes con equipos
+-- apartados por un carrito distinto de p_hold_id. La comprobación corre con
+-- los equipos ya bloqueados, así que una reserva nueva no puede colarse. Se
+-- elimina la versión de 2 parámetros para que PostgREST no encuentre dos
+-- sobrecargas.
+DROP FUNCTION IF EXISTS public.confirm_sales_bulk(UUID[], UUID);
+
+CREATE OR REPLACE FUNCTION public.confirm_sales_bulk(
+  p_order_ids UUID[],
+  p_confirmed_by UUID DEFAULT NULL,
+  p_hold_id UUID DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $function$
+DECLARE
+  v_confirmed_by UUID := COALESCE(p_confirmed_by, auth.uid());
+  v_user_name TEXT;
+  v_user_email TEXT;
+  v_user_role TEXT;
+  v_confirmed INTEGER;
+  v_units INTEGER;
+  v_orders JSONB;
+BEGIN
+  IF p_order_ids IS NULL OR cardinality(p_order_ids) = 0 THEN
+    RAISE EXCEPTION 'No se seleccionaron órdenes';
+  END IF;
+
+  IF v_confirmed_by IS NOT NULL THEN
+    SELECT p.full_name, p.role::TEXT INTO v_user_name, v_user_role
+    FROM profiles p
+    WHERE p.id = v_confirmed_by;
+
+    SELECT u.email INTO v_user_email
+    FROM auth.users u
+    WHERE u.id = v_confirmed_by;
+  END IF;
+
+  DROP TABLE IF EXISTS tmp_confirm_orders;
+  CREATE TEMP TABLE tmp_confirm_orders (
+    order_id UUID PRIMARY KEY,
+    order_number TEXT,
+    customer_id UUID,
+    total_amount NUMERIC,
+    warranty_end DATE,
+    items_count INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+  ) ON COMMIT DROP;
+
+  -- Órdenes pedidas, bloqueadas en orden de id
+  PERFORM 1
+  FROM sales_orders so
+  WHERE so.id = ANY(p_order_ids)
+  ORDER BY so.id
+  FOR UPDATE;
+
+  INSERT INTO tmp_confirm_orders (order_id, order_number, customer_id, total_amount, warranty_end, error)
+  SELECT
+    req.id, o.order_number, o.customer_id, o.total_amount,
+    CURRENT_DATE + o.warranty_days,
+    CASE
+      WHEN o.id IS NULL THEN 'Orden no encontrada'
+      WHEN o.status IS DISTINCT FROM 'draft' THEN 'La orden ya fue procesada'
+    END
+  FROM (SELECT DISTINCT unnest(p_order_ids) AS id) req
+  LEFT JOIN sales_orders o ON o.id = req.id;
+
+  -- Equipos de las órdenes válidas, bloqueados en orden de id
+  PERFORM 1
+  FROM assets a
+  WHERE a.id IN (
+    SELECT i.asset_id
+    FROM sales_order_items i
+    JOIN tmp_confirm_orders t ON t.order_id = i.order_id
+    WHERE t.error IS NULL
+  )
+  ORDER BY a.id
+  FOR UPDATE;
+
+  UPDATE tmp_confirm_orders t
+  SET items_count = s.items_count,
+      error = CASE
+        WHEN s.unavailable IS NOT NULL THEN 'Equipos no disponibles: ' || s.unavailable
+        WHEN s.held IS NOT NULL THEN 'Equipos reservados por otra venta: ' || s.held
+        WHEN s.repeated IS NOT NULL THEN 'Equipos incluidos en otra orden: ' || s.repeated
+      END
+  FROM (
+    SELECT
+      i.order_id,
+      COUNT(*)::INTEGER AS items_count,
+      string_agg(COALESCE(a.serial_number, i.serial_number, a.id::TEXT), ', ')
+        FILTER (WHERE a.id IS NULL OR a.status::TEXT <> 'ready_for_sale') AS unavailable,
+      string_agg(COALESCE(a.serial_number, i.serial_number, a.id::TEXT), ', ')
+        FILTER (WHERE EXISTS (
+          SELECT 1 FROM asset_reservations r
+          WHERE r.asset_id = i.asset_id
+            AND r.expires_at > NOW()
+            AND r.hold_id IS DISTINCT FROM p_hold_id
+        )) AS held,
+      string_agg(COALESCE(a.serial_number, i.serial_number, a.id::TEXT), ', ')
+        FILTER (WHERE dup.first_order_id <> i.order_id) AS repeated
+    FROM sales_order_items i
+    JOIN tmp_confirm_orders o ON o.order_id = i.order_id AND o.error IS NULL
+    LEFT JOIN assets a ON a.id = i.asset_id
+    LEFT JOIN (
+      -- Un equipo en varias órdenes de la llamada: se queda con la primera
+      SELECT i2.asset_id, MIN(i2.order_id::TEXT)::UUID AS first_order_id
+      FROM sales_order_items i2
+      JOIN tmp_confirm_orders o2 ON o2.order_id = i2.order_id AND o2.error IS NULL
+      GROUP BY i2.asset_id
+    ) dup ON dup.asset_id = i.asset_id
+    GROUP BY i.order_id
+  ) s
+  WHERE t.order_id = s.order_id;
+
+  UPDATE tmp_confirm_orders
+  SET error = 'La orden no tiene equipos'
+  WHERE error IS NULL AND items_count = 0;
+
+  UPDATE assets AS a
+  SET status = 'sold',
+      sold_to = t.customer_id,
+      sold_at = NOW(),
+      sold_by = v_confirmed_by,
+      sale_order_id = t.order_id,
+      warranty_end_date = t.warranty_end,
+      updated_at = NOW()
+  FROM sales_order_items i
+  JOIN tmp_confirm_orders t ON t.order_id = i.order_id
+  WHERE a.id = i.asset_id
+    AND t.error IS NULL;
+
+  GET DIAGNOSTICS v_units = ROW_COUNT;
+
+  UPDATE sales_order_items AS i
+  SET warranty_start_date = CURRENT_DATE,
+      warranty_end_date = t.warranty_end
+  FROM tmp_confirm_orders t
+  WHERE i.order_id = t.order_id
+    AND t.error IS NULL;
+
+  INSERT INTO revenue_ledger (
+    batch_id, asset_id, sale_order_id, revenue_type, description,
+    reference_number, amount, revenue_date, created_by
+  )
+  SELECT
+    a.batch_id, i.asset_id, i.order_id, 'sale',
+    'Venta ' || t.order_number || ': ' || i.product_description,
+    t.order_number, i.unit_price, CURRENT_DATE, v_confirmed_by
+  FROM sales_order_items i
+  JOIN tmp_confirm_orders t ON t.order_id = i.order_id AND t.error IS NULL
+  JOIN assets a ON a.id = i.asset_id
+  WHERE NOT EXISTS (
+    SELECT 1 FROM revenue_ledger r
+    WHERE r.sale_order_id = i.order_id AND r.asset_id = i.asset_id
+  );
+
+  UPDATE sales_orders AS o
+  SET status = 'confirmed',
+      approved_by = v_confirmed_by,
+      approved_at = NOW(),
+      updated_at = NOW()
+  FROM tmp_confirm_orders t
+  WHERE o.id = t.order_id
+    AND t.error IS NULL;
+
+  GET DIAGNOSTICS v_confirmed = ROW_COUNT;
+
+  INSERT INTO audit_logs (
+    action, module, entity_type, entity_id, entity_reference,
+    description, user_id, user_name, user_email, user_role,
+    changes_summary, data_after, created_at
+  )
+  SELECT
+    'STATUS_CHANGE', 'SALES', 'SALE', t.order_id, t.order_number,
+    'Venta ' || t.order_number || ' confirmada (' || t.items_count || ' equipos)',
+    v_confirmed_by, COALESCE(v_user_name, 'sistema'), COALESCE(v_user_email, 'sistema@itad.gt'), COALESCE(v_user_role, 'system'),
+    jsonb_build_object('status', jsonb_build_object('old', 'draft', 'new', 'confirmed')),
+    jsonb_build_object(
+      'order_number', t.order_number,
+      'customer_id', t.customer_id,
+      'total_amount', t.total_amount,
+      'items_count', t.items_count,
+      'warranty_end', t.warranty_end
+    ),
+    NOW()
+  FROM tmp_confirm_orders t
+  WHERE t.error IS NULL;
+
+  SELECT jsonb_agg(jsonb_strip_nulls(jsonb_build_object(
+    'order_id', t.order_id,
+    'order_number', t.order_number,
+    'success', t.error IS NULL,
+    'error', t.error,
+    'items_count', t.items_count,
+    'warranty_end', CASE WHEN t.error IS NULL THEN t.warranty_end END
+  )) ORDER BY t.order_number)
+  INTO v_orders
+  FROM tmp_confirm_orders t;
+
+  DROP TABLE tmp_confirm_orders;
+
+  RETURN jsonb_build_object(
+    'success', true,
+    'requested', jsonb_array_length(v_orders),
+    'confirmed', v_confirmed,
+    'failed', jsonb_array_length(v_orders) - v_confirmed,
+    'units', v_units,
+    'orders', v_orders
+  );
+END;
+$function$;
+
+-- Misma firma y respuesta que en 20260316; sin carrito, cualquier reserva
+-- vigente bloquea la confirmación
+CREATE OR REPLACE FUNCTION public.confirm_sale(
+  p_order_id UUID,
+  p_confirmed_by UUID
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $function$
+DECLARE
+  v_order JSONB;
+BEGIN
+  v_order := confirm_sales_bulk(ARRAY[p_order_id], p_confirmed_by, NULL)->'orders'->0;
+
+  IF NOT (v_order->>'success')::BOOLEAN THEN
+    RETURN jsonb_build_object('success', false, 'error', v_order->>'error');
+  END IF;
+
+  RETURN jsonb_build_object(
+    'success', true,
+    'order_number', v_order->>'order_number',
+    'warranty_end', v_order->>'warranty_end'
+  );
+END;
+$function$;
+
+NOTIFY pgrst, 'reload config';
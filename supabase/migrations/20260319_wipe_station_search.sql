@@ -0,0 +1,232 @@
+-- =========================================================================
+-- Migración: Búsqueda de equipos para las estaciones de borrado
+-- Cada escaneo en borrado (searchAssetBySerial en
+-- dashboard/borrado/actions.ts) hacía un ILIKE '%...%' sin índice sobre
+-- serial e internal_tag, una consulta para el cliente del ticket y otra para
+-- las evidencias, y la cola de borrado (getPendingWipeAssets) repetía lo
+-- mismo para toda la lista contando evidencias en Node.
+--
+-- search_wipe_assets devuelve en una consulta el equipo, su lote, ticket,
+-- cliente, estado de borrado y conteo de evidencias, ordenado por
+-- relevancia:
+--   1.0  serial o etiqueta exactos (sin distinguir mayúsculas)
+--   0.9  serial o etiqueta que empiezan con el texto
+--        (searchAssetBySerial solo acepta sin confirmar estos dos rangos)
+--   0.8  equipos del ticket cuyo readable_id coincide
+--   0.6  serial o etiqueta que contienen el texto (índice trigram)
+--   <0.5 parecidos por trigramas (errores de lectura del escáner)
+-- get_pending_wipe_assets devuelve la cola (órdenes en data_wipe) con las
+-- mismas columnas.
+--
+-- El texto buscado no es constante al planear, así que el prefijo no puede
+-- escribirse como LIKE 'abc%': se expresa como rango con los operadores de
+-- patrón (~>=~ / ~<~), que sí usan los índices text_pattern_ops igual que
+-- la igualdad de los exactos. El LIKE queda solo como verificación.
+-- =========================================================================
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA extensions;
+
+CREATE INDEX IF NOT EXISTS idx_assets_serial_lower
+  ON assets(lower(serial_number) text_pattern_ops);
+
+CREATE INDEX IF NOT EXISTS idx_assets_internal_tag_lower
+  ON assets(lower(internal_tag) text_pattern_ops);
+
+CREATE INDEX IF NOT EXISTS idx_assets_serial_trgm
+  ON assets USING gin (lower(serial_number) extensions.gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_assets_internal_tag_trgm
+  ON assets USING gin (lower(internal_tag) extensions.gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_operations_tickets_readable_id_lower
+  ON operations_tickets(lower(readable_id));
+
+CREATE INDEX IF NOT EXISTS idx_batches_ticket_id
+  ON batches(ticket_id);
+
+CREATE INDEX IF NOT EXISTS idx_assets_batch_id
+  ON assets(batch_id);
+
+CREATE INDEX IF NOT EXISTS idx_work_orders_data_wipe_created
+  ON work_orders(created_at)
+  WHERE status = 'data_wipe';
+
+-- Una fila por equipo con lo que muestra la estación de borrado. Las
+-- consultas filtran por id, así que el conteo de evidencias se hace solo
+-- para las filas devueltas.
+CREATE OR REPLACE VIEW public.wipe_station_assets AS
+SELECT
+  a.id,
+  a.internal_tag::TEXT AS internal_tag,
+  a.serial_number::TEXT AS serial_number,
+  a.asset_type::TEXT AS asset_type,
+  a.manufacturer::TEXT AS manufacturer,
+  a.model::TEXT AS model,
+  a.status::TEXT AS status,
+  a.batch_id,
+  b.internal_batch_id::TEXT AS batch_code,
+  b.ticket_id,
+  t.readable_id::TEXT AS ticket_reference,
+  c.commercial_name::TEXT AS client_name,
+  a.wipe_started_at,
+  a.wipe_completed_at,
+  a.wipe_certificate_id::TEXT AS wipe_certificate_id,
+  a.wipe_software::TEXT AS wipe_software,
+  CASE
+    WHEN a.wipe_completed_at IS NOT NULL THEN 'completed'
+    WHEN a.wipe_started_at IS NOT NULL THEN 'in_progress'
+    ELSE 'pending'
+  END AS wipe_state,
+  a.created_at,
+  COALESCE(e.photo_count, 0) AS photo_count,
+  COALESCE(e.xml_count, 0) AS xml_count,
+  COALESCE(e.pdf_count, 0) AS pdf_count,
+  COALESCE(e.evidence_count, 0) AS evidence_count
+FROM assets a
+LEFT JOIN batches b ON b.id = a.batch_id
+LEFT JOIN operations_tickets t ON t.id = b.ticket_id
+LEFT JOIN crm_entities c ON c.id = t.client_id
+LEFT JOIN LATERAL (
+  SELECT
+    COUNT(*) FILTER (WHERE ev.type = 'photo')::INTEGER AS photo_count,
+    COUNT(*) FILTER (WHERE ev.type = 'xml')::INTEGER AS xml_count,
+    COUNT(*) FILTER (WHERE ev.type = 'pdf')::INTEGER AS pdf_count,
+    COUNT(*)::INTEGER AS evidence_count
+  FROM asset_wipe_evidence ev
+  WHERE ev.asset_id = a.id
+) e ON TRUE;
+
+-- p_statuses NULL = cualquier estado
+CREATE OR REPLACE FUNCTION public.search_wipe_assets(
+  p_query TEXT,
+  p_statuses TEXT[] DEFAULT ARRAY['received', 'wiping'],
+  p_limit INTEGER DEFAULT 20
+)
+RETURNS TABLE (
+  id UUID,
+  internal_tag TEXT,
+  serial_number TEXT,
+  asset_type TEXT,
+  manufacturer TEXT,
+  model TEXT,
+  status TEXT,
+  batch_id UUID,
+  batch_code TEXT,
+  ticket_id UUID,
+  ticket_reference TEXT,
+  client_name TEXT,
+  wipe_started_at TIMESTAMPTZ,
+  wipe_completed_at TIMESTAMPTZ,
+  wipe_certificate_id TEXT,
+  wipe_software TEXT,
+  wipe_state TEXT,
+  created_at TIMESTAMPTZ,
+  photo_count INTEGER,
+  xml_count INTEGER,
+  pdf_count INTEGER,
+  evidence_count INTEGER,
+  match_rank REAL
+)
+LANGUAGE sql
+STABLE
+SET search_path = public, extensions
+AS $function$
+  WITH q AS (
+    SELECT
+      lower(btrim(p_query)) AS term,
+      replace(replace(replace(lower(btrim(p_query)), '\', '\\'), '%', '\%'), '_', '\_') AS pattern
+  ),
+  matches AS (
+    -- Exactos
+    SELECT a.id, 1.0::REAL AS match_rank
+    FROM assets a, q
+    WHERE lower(a.serial_number) = q.term
+    UNION ALL
+    SELECT a.id, 1.0::REAL
+    FROM assets a, q
+    WHERE lower(a.internal_tag) = q.term
+    UNION ALL
+    -- Prefijo: rango [term, term || U+10FFFF) en orden de bytes
+    SELECT a.id, 0.9::REAL
+    FROM assets a, q
+    WHERE q.term <> ''
+      AND lower(a.serial_number) ~>=~ q.term
+      AND lower(a.serial_number) ~<~ (q.term || chr(1114111))
+      AND lower(a.serial_number) LIKE q.pattern || '%'
+    UNION ALL
+    SELECT a.id, 0.9::REAL
+    FROM assets a, q
+    WHERE q.term <> ''
+      AND lower(a.internal_tag) ~>=~ q.term
+      AND lower(a.internal_tag) ~<~ (q.term || chr(1114111))
+      AND lower(a.internal_tag) LIKE q.pattern || '%'
+    UNION ALL
+    -- Referencia de ticket
+    SELECT a.id, 0.8::REAL
+    FROM operations_tickets t
+    JOIN q ON lower(t.readable_id) = q.term
+    JOIN batches b ON b.ticket_id = t.id
+    JOIN assets a ON a.batch_id = b.id
+    UNION ALL
+    -- Contiene o parecido (trigramas, desde 3 caracteres)
+    SELECT a.id, GREATEST(
+             CASE WHEN lower(a.serial_number) LIKE '%' || q.pattern || '%'
+                    OR lower(a.internal_tag) LIKE '%' || q.pattern || '%' THEN 0.6 ELSE 0 END,
+             0.5 * GREATEST(
+               similarity(lower(COALESCE(a.serial_number, '')), q.term),
+               similarity(lower(COALESCE(a.internal_tag, '')), q.term)
+             )
+           )::REAL
+    FROM assets a, q
+    WHERE length(q.term) >= 3
+      AND (
+        lower(a.serial_number) LIKE '%' || q.pattern || '%'
+        OR lower(a.internal_tag) LIKE '%' || q.pattern || '%'
+        OR lower(a.serial_number) % q.term
+        OR lower(a.internal_tag) % q.term
+      )
+  ),
+  ranked AS (
+    SELECT m.id, MAX(m.match_rank) AS match_rank
+    FROM matches m
+    GROUP BY m.id
+  )
+  SELECT
+    w.id, w.internal_tag, w.serial_number, w.asset_type, w.manufacturer, w.model,
+    w.status, w.batch_id, w.batch_code, w.ticket_id, w.ticket_reference, w.client_name,
+    w.wipe_started_at, w.wipe_completed_at, w.wipe_certificate_id, w.wipe_software,
+    w.wipe_state, w.created_at, w.photo_count, w.xml_count, w.pdf_count, w.evidence_count,
+    r.match_rank
+  FROM ranked r
+  JOIN wipe_station_assets w ON w.id = r.id
+  WHERE p_statuses IS NULL OR w.status = ANY(p_statuses)
+  ORDER BY r.match_rank DESC, length(w.serial_number), w.created_at
+  LIMIT LEAST(GREATEST(COALESCE(p_limit, 20), 1), 200);
+$function$;
+
+-- Cola de borrado: equipos con orden de trabajo en data_wipe, la más
+-- antigua primero. p_limit NULL = toda la cola
+CREATE OR REPLACE FUNCTION public.get_pending_wipe_assets(
+  p_statuses TEXT[] DEFAULT NULL,
+  p_limit INTEGER DEFAULT NULL
+)
+RETURNS SETOF wipe_station_assets
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $function$
+  SELECT w.*
+  FROM (
+    SELECT wo.asset_id, MIN(wo.created_at) AS queued_at
+    FROM work_orders wo
+    WHERE wo.status = 'data_wipe'
+      AND wo.asset_id IS NOT NULL
+    GROUP BY wo.asset_id
+  ) q
+  JOIN wipe_station_assets w ON w.id = q.asset_id
+  WHERE p_statuses IS NULL OR w.status = ANY(p_statuses)
+  ORDER BY q.queued_at
+  LIMIT p_limit;
+$function$;
+
+NOTIFY pgrst, 'reload config';
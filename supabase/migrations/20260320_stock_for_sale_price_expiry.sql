@@ -0,0 +1,180 @@
+-- =========================================================================
+-- Migración: Vencimiento del precio de lista en stock_for_sale
+-- stock_for_sale (20260317_stock_for_sale.sql) guarda el precio de lista
+-- vigente al crear el grupo o al cambiar price_list, pero nada recalculaba
+-- los precios cuando su effective_to pasaba: la vista original lo revisaba
+-- en cada lectura y la tabla conservaba el precio vencido.
+--
+-- Cada grupo guarda ahora también el effective_to del precio tomado
+-- (list_price_valid_to). available_stock_for_sale usa el precio guardado
+-- mientras siga vigente y, una vez vencido, lo busca de nuevo con
+-- effective_list_price, igual que la vista original. No hace falta
+-- programar refresh_stock_for_sale_prices(); sigue disponible para
+-- reescribir los precios guardados.
+-- =========================================================================
+
+ALTER TABLE stock_for_sale ADD COLUMN IF NOT EXISTS list_price_valid_to DATE;
+
+-- Vigencia del precio que devuelve effective_list_price (NULL = sin fin)
+CREATE OR REPLACE FUNCTION public.effective_list_price_valid_to(
+  p_manufacturer TEXT,
+  p_model TEXT,
+  p_asset_type TEXT,
+  p_condition_grade TEXT
+)
+RETURNS DATE
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $function$
+  SELECT pl.effective_to
+  FROM price_list pl
+  WHERE pl.manufacturer = p_manufacturer
+    AND pl.model = p_model
+    AND pl.asset_type = p_asset_type
+    AND pl.condition_grade = p_condition_grade
+    AND pl.is_active = TRUE
+    AND (pl.effective_to IS NULL OR pl.effective_to >= CURRENT_DATE)
+  ORDER BY pl.effective_from DESC
+  LIMIT 1;
+$function$;
+
+CREATE OR REPLACE FUNCTION public.apply_stock_for_sale_delta(p_delta JSONB)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $function$
+BEGIN
+  INSERT INTO stock_for_sale AS s (
+    manufacturer, model, asset_type, condition_grade,
+    available_count, cost_sum, list_price, list_price_valid_to, updated_at
+  )
+  SELECT
+    d->>'manufacturer', d->>'model', d->>'asset_type', d->>'condition_grade',
+    (d->>'delta')::BIGINT, (d->>'cost')::NUMERIC,
+    effective_list_price(d->>'manufacturer', d->>'model', d->>'asset_type', d->>'condition_grade'),
+    effective_list_price_valid_to(d->>'manufacturer', d->>'model', d->>'asset_type', d->>'condition_grade'),
+    NOW()
+  FROM jsonb_array_elements(p_delta) AS d
+  ORDER BY 1, 2, 3, 4
+  ON CONFLICT (manufacturer, model, asset_type, condition_grade)
+  DO UPDATE SET available_count = s.available_count + EXCLUDED.available_count,
+                cost_sum = s.cost_sum + EXCLUDED.cost_sum,
+                updated_at = EXCLUDED.updated_at;
+
+  DELETE FROM stock_for_sale
+  WHERE available_count <= 0
+    AND (manufacturer, model, asset_type, condition_grade) IN (
+      SELECT d->>'manufacturer', d->>'model', d->>'asset_type', d->>'condition_grade'
+      FROM jsonb_array_elements(p_delta) AS d
+    );
+END;
+$function$;
+
+CREATE OR REPLACE FUNCTION public.refresh_stock_for_sale_prices()
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $function$
+DECLARE
+  v_rows INTEGER;
+BEGIN
+  UPDATE stock_for_sale AS s
+  SET list_price = p.list_price,
+      list_price_valid_to = p.valid_to,
+      updated_at = NOW()
+  FROM (
+    SELECT
+      g.manufacturer, g.model, g.asset_type, g.condition_grade,
+      effective_list_price(g.manufacturer, g.model, g.asset_type, g.condition_grade) AS list_price,
+      effective_list_price_valid_to(g.manufacturer, g.model, g.asset_type, g.condition_grade) AS valid_to
+    FROM stock_for_sale g
+  ) p
+  WHERE s.manufacturer = p.manufacturer
+    AND s.model = p.model
+    AND s.asset_type = p.asset_type
+    AND s.condition_grade = p.condition_grade
+    AND (s.list_price IS DISTINCT FROM p.list_price
+         OR s.list_price_valid_to IS DISTINCT FROM p.valid_to);
+
+  GET DIAGNOSTICS v_rows = ROW_COUNT;
+  RETURN v_rows;
+END;
+$function$;
+
+CREATE OR REPLACE FUNCTION public.rebuild_stock_for_sale()
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $function$
+DECLARE
+  v_rows INTEGER;
+BEGIN
+  LOCK TABLE assets IN SHARE MODE;
+  LOCK TABLE stock_for_sale IN EXCLUSIVE MODE;
+
+  DELETE FROM stock_for_sale;
+
+  INSERT INTO stock_for_sale (
+    manufacturer, model, asset_type, condition_grade,
+    available_count, cost_sum, list_price, list_price_valid_to
+  )
+  SELECT g.*,
+         effective_list_price(g.manufacturer, g.model, g.asset_type, g.condition_grade),
+         effective_list_price_valid_to(g.manufacturer, g.model, g.asset_type, g.condition_grade)
+  FROM (
+    SELECT COALESCE(manufacturer, '') AS manufacturer, COALESCE(model, '') AS model,
+           COALESCE(asset_type::TEXT, '') AS asset_type, COALESCE(condition::TEXT, '') AS condition_grade,
+           COUNT(*) AS available_count, SUM(COALESCE(cost_amount, 0)) AS cost_sum
+    FROM assets
+    WHERE status = 'ready_for_sale'
+    GROUP BY 1, 2, 3, 4
+  ) g;
+
+  GET DIAGNOSTICS v_rows = ROW_COUNT;
+  RETURN v_rows;
+END;
+$function$;
+
+-- Igual que en 20260318_asset_reservations.sql; el precio vencido se
+-- vuelve a buscar en price_list
+CREATE OR REPLACE VIEW public.available_stock_for_sale AS
+SELECT
+  NULLIF(s.manufacturer, '') AS manufacturer,
+  NULLIF(s.model, '') AS model,
+  NULLIF(s.asset_type, '') AS asset_type,
+  NULLIF(s.condition_grade, '') AS condition_grade,
+  s.available_count - COALESCE(h.held_count, 0) AS available_count,
+  (s.cost_sum / NULLIF(s.available_count, 0))::NUMERIC(10,2) AS avg_cost,
+  COALESCE(
+    CASE
+      WHEN s.list_price_valid_to < CURRENT_DATE
+        THEN effective_list_price(s.manufacturer, s.model, s.asset_type, s.condition_grade)
+      ELSE s.list_price
+    END,
+    0
+  ) AS suggested_price
+FROM stock_for_sale s
+LEFT JOIN (
+  SELECT
+    COALESCE(a.manufacturer, '') AS manufacturer, COALESCE(a.model, '') AS model,
+    COALESCE(a.asset_type::TEXT, '') AS asset_type, COALESCE(a.condition::TEXT, '') AS condition_grade,
+    COUNT(*) AS held_count
+  FROM asset_reservations r
+  JOIN assets a ON a.id = r.asset_id
+  WHERE r.expires_at > NOW()
+    AND a.status::TEXT = 'ready_for_sale'
+  GROUP BY 1, 2, 3, 4
+) h ON h.manufacturer = s.manufacturer
+   AND h.model = s.model
+   AND h.asset_type = s.asset_type
+   AND h.condition_grade = s.condition_grade
+WHERE s.available_count - COALESCE(h.held_count, 0) > 0
+ORDER BY s.manufacturer, s.model, s.available_count - COALESCE(h.held_count, 0) DESC;
+
+SELECT public.refresh_stock_for_sale_prices();
+
+NOTIFY pgrst, 'reload config';
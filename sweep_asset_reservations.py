@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Barrido de reservas vencidas de equipos para venta.
+
+Las reservas de carrito (asset_reservations, migración
+20260318_asset_reservations.sql) dejan de apartar el equipo al vencer
+aunque nadie las borre; este script borra las filas vencidas por lotes
+para que la tabla no crezca. Pensado para cron cada pocos minutos o para
+correr en un proceso aparte con --loop.
+
+Uso:
+    python sweep_asset_reservations.py              # un barrido
+    python sweep_asset_reservations.py --loop 60    # cada 60 segundos
+    python sweep_asset_reservations.py --status     # reservas vigentes por carrito
+"""
+
+import argparse
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from document_renderer import create_supabase_client
+
+
+def sweep(supabase, batch):
+    """Borra reservas vencidas hasta vaciar; devuelve cuántas."""
+    total = 0
+    while True:
+        res = supabase.rpc('expire_asset_reservations', {'p_limit': batch}).execute()
+        expired = int(res.data or 0)
+        total += expired
+        if expired < batch:
+            return total
+
+
+def show_status(supabase):
+    now = datetime.now(timezone.utc).isoformat()
+    res = (
+        supabase.table('asset_reservations')
+        .select('hold_id, expires_at')
+        .gt('expires_at', now)
+        .execute()
+    )
+    rows = res.data or []
+    if not rows:
+        print("No hay reservas vigentes")
+        return
+
+    holds = Counter(row['hold_id'] for row in rows)
+    expires = {}
+    for row in rows:
+        expires[row['hold_id']] = max(expires.get(row['hold_id'], ''), row['expires_at'])
+
+    print(f"{'Carrito':<38} {'Equipos':>8}  Vence")
+    print('-' * 72)
+    for hold_id, count in holds.most_common():
+        print(f"{hold_id:<38} {count:>8}  {expires[hold_id]}")
+    print('-' * 72)
+    print(f"{'Total':<38} {len(rows):>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Barrido de reservas de equipos vencidas')
+    parser.add_argument('--loop', type=float, metavar='SEGUNDOS', help='Repetir cada N segundos')
+    parser.add_argument('--batch', type=int, default=5000, help='Reservas borradas por llamada')
+    parser.add_argument('--status', action='store_true', help='Listar reservas vigentes por carrito')
+    args = parser.parse_args()
+
+    supabase = create_supabase_client()
+
+    if args.status:
+        show_status(supabase)
+        return
+
+    while True:
+        expired = sweep(supabase, max(args.batch, 1))
+        stamp = datetime.now().strftime('%H:%M:%S')
+        if expired or not args.loop:
+            print(f"🧹 [{stamp}] {expired} reservas vencidas eliminadas")
+        if not args.loop:
+            break
+        time.sleep(args.loop)
+
+
+if __name__ == '__main__':
+    main()
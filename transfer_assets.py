@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Traslado masivo de activos entre bodegas.
+
+Mueve una selección de activos a la bodega destino con transfer_assets_bulk
+(migración 20260308_bulk_warehouse_transfer.sql): un UPDATE para todos los
+activos y un movimiento 'transfer' por activo en inventory_movements, con
+bodega origen, destino, usuario y correlativo. Reemplaza a los scripts de un
+solo activo (move_asset_to_harv.py, move_asset_to_val.py).
+
+La selección puede ser por ids, por un archivo de seriales (uno por línea) o
+por filtro de bodega origen / estado / tipo / lote. Sin --execute solo
+muestra el resumen de lo que se movería.
+
+Uso:
+    python transfer_assets.py --to BOD-HARV --serials-file pallet_17.txt
+    python transfer_assets.py --to BOD-VAL --from BOD-REC --status wiped --execute
+    python transfer_assets.py --to BOD-REM --batch LOTE-2026-0042 --reason "Pallet 42" \\
+        --reference TRAS-0150 --user-id <uuid> --execute
+    python transfer_assets.py --to BOD-DES --ids <uuid> <uuid> --execute
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter
+
+from document_renderer import create_supabase_client
+
+PAGE_SIZE = 1000
+IN_CHUNK = 200
+DEFAULT_CHUNK = 5000
+
+
+def fetch_warehouse(supabase, code):
+    res = supabase.table('warehouses').select('id, code, name').eq('code', code).limit(1).execute()
+    return res.data[0] if res.data else None
+
+
+def read_serials(path):
+    with open(path, encoding='utf-8') as f:
+        serials = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    return list(dict.fromkeys(serials))
+
+
+def fetch_by_filter(supabase, warehouse_id=None, statuses=None, asset_types=None, batch_id=None, limit=None):
+    """Activos que cumplen el filtro, paginando por id (keyset)."""
+    assets = []
+    last_id = None
+    while True:
+        query = supabase.table('assets').select('id, serial_number, asset_type, current_warehouse_id')
+        if warehouse_id:
+            query = query.eq('current_warehouse_id', warehouse_id)
+        if statuses:
+            query = query.in_('status', statuses)
+        if asset_types:
+            query = query.in_('asset_type', asset_types)
+        if batch_id:
+            query = query.eq('batch_id', batch_id)
+        if last_id:
+            query = query.gt('id', last_id)
+        page = query.order('id').limit(PAGE_SIZE).execute().data or []
+        assets.extend(page)
+        if limit and len(assets) >= limit:
+            return assets[:limit]
+        if len(page) < PAGE_SIZE:
+            return assets
+        last_id = page[-1]['id']
+
+
+def fetch_by_column(supabase, column, values):
+    assets = []
+    for offset in range(0, len(values), IN_CHUNK):
+        res = supabase.table('assets').select('id, serial_number, asset_type, current_warehouse_id').in_(
+            column, values[offset:offset + IN_CHUNK]
+        ).execute()
+        assets.extend(res.data or [])
+    return assets
+
+
+def print_summary(supabase, assets, destination):
+    warehouses = supabase.table('warehouses').select('id, code').execute().data or []
+    codes = {w['id']: w['code'] for w in warehouses}
+    by_origin = Counter(codes.get(a['current_warehouse_id'], 'SIN BODEGA') for a in assets)
+    by_type = Counter(a.get('asset_type') or 'N/A' for a in assets)
+
+    print(f"\n{'Bodega origen':<20} {'Equipos':>8}")
+    print('-' * 29)
+    for code, count in by_origin.most_common():
+        note = '  (ya en destino, se omiten)' if code == destination['code'] else ''
+        print(f"{code:<20} {count:>8}{note}")
+    print(f"\n{'Tipo':<20} {'Equipos':>8}")
+    print('-' * 29)
+    for asset_type, count in by_type.most_common():
+        print(f"{asset_type:<20} {count:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Traslado masivo de activos entre bodegas')
+    parser.add_argument('--to', required=True, help='Código de la bodega destino')
+    parser.add_argument('--ids', nargs='+', help='UUIDs de activos')
+    parser.add_argument('--serials-file', help='Archivo con un serial por línea')
+    parser.add_argument('--from', dest='origin', help='Código de la bodega origen (filtro)')
+    parser.add_argument('--status', action='append', help='Filtrar por estado (repetible)')
+    parser.add_argument('--type', dest='asset_types', action='append', help='Filtrar por asset_type (repetible)')
+    parser.add_argument('--batch', help='internal_batch_id del lote (filtro)')
+    parser.add_argument('--limit', type=int, help='Máximo de activos a mover')
+    parser.add_argument('--reason', help='Motivo del traslado (notes del movimiento)')
+    parser.add_argument('--reference', help='Correlativo del traslado, ej. TRAS-0150')
+    parser.add_argument('--user-id', help='UUID del usuario que traslada (created_by)')
+    parser.add_argument('--chunk', type=int, default=DEFAULT_CHUNK, help='Activos por transacción')
+    parser.add_argument('--execute', action='store_true', help='Mover (sin esto solo es vista previa)')
+    args = parser.parse_args()
+
+    has_filter = any((args.origin, args.status, args.asset_types, args.batch))
+    if not (args.ids or args.serials_file or has_filter):
+        parser.error('Indica --ids, --serials-file o un filtro (--from/--status/--type/--batch)')
+
+    supabase = create_supabase_client()
+    destination = fetch_warehouse(supabase, args.to)
+    if not destination:
+        print(f"❌ Bodega destino {args.to} no encontrada")
+        sys.exit(1)
+
+    missing = []
+    if args.ids:
+        assets = fetch_by_column(supabase, 'id', args.ids)
+        missing = sorted(set(args.ids) - {a['id'] for a in assets})
+    elif args.serials_file:
+        serials = read_serials(args.serials_file)
+        assets = fetch_by_column(supabase, 'serial_number', serials)
+        missing = sorted(set(serials) - {a['serial_number'] for a in assets})
+    else:
+        origin_id = None
+        if args.origin:
+            origin = fetch_warehouse(supabase, args.origin)
+            if not origin:
+                print(f"❌ Bodega origen {args.origin} no encontrada")
+                sys.exit(1)
+            origin_id = origin['id']
+        batch_id = None
+        if args.batch:
+            res = supabase.table('batches').select('id').eq('internal_batch_id', args.batch).limit(1).execute()
+            if not res.data:
+                print(f"❌ Lote {args.batch} no encontrado")
+                sys.exit(1)
+            batch_id = res.data[0]['id']
+        print("🔍 Buscando activos...")
+        assets = fetch_by_filter(supabase, origin_id, args.status, args.asset_types, batch_id, args.limit)
+
+    if missing:
+        print(f"⚠️  {len(missing)} no encontrados: {', '.join(missing[:10])}{' ...' if len(missing) > 10 else ''}")
+    if not assets:
+        print("⚠️  No hay activos para trasladar")
+        sys.exit(0)
+
+    print(f"📦 {len(assets)} activos → {destination['code']} ({destination.get('name') or ''})")
+    print_summary(supabase, assets, destination)
+
+    if not args.execute:
+        print("\nℹ️  Vista previa: usa --execute para trasladar")
+        return
+
+    ids = [a['id'] for a in assets]
+    chunk = max(args.chunk, 1)
+    moved = skipped = 0
+    start = time.perf_counter()
+    for offset in range(0, len(ids), chunk):
+        res = supabase.rpc('transfer_assets_bulk', {
+            'p_destination_code': destination['code'],
+            'p_asset_ids': ids[offset:offset + chunk],
+            'p_reason': args.reason,
+            'p_reference_number': args.reference,
+            'p_created_by': args.user_id,
+        }).execute()
+        result = res.data or {}
+        moved += int(result.get('moved') or 0)
+        skipped += int(result.get('skipped') or 0)
+
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ {moved} activos trasladados a {destination['code']} en {elapsed:.2f}s"
+          f"{f', {skipped} ya estaban en destino' if skipped else ''}")
+
+
+if __name__ == '__main__':
+    main()
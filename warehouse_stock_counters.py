@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Verificación y reconstrucción de warehouse_stock_counters.
+
+Los contadores por bodega / estado / tipo los mantiene un trigger sobre
+assets (migración 20260307_warehouse_stock_counters.sql). Este script
+compara los contadores contra un conteo real de assets y, si se pide,
+los reconstruye (por ejemplo después de cargar datos con los triggers
+deshabilitados).
+
+Uso:
+    python warehouse_stock_counters.py              # totales por bodega
+    python warehouse_stock_counters.py --verify     # diferencias contra assets
+    python warehouse_stock_counters.py --rebuild    # recalcular desde assets
+"""
+
+import argparse
+import sys
+
+from document_renderer import create_supabase_client
+
+
+def show_totals(supabase):
+    res = supabase.table('warehouse_stock_totals').select('code, name, quantity').order('code').execute()
+    rows = res.data or []
+    print(f"{'Bodega':<12} {'Nombre':<32} {'Equipos':>10}")
+    print('-' * 56)
+    for row in rows:
+        print(f"{row['code']:<12} {(row['name'] or '')[:32]:<32} {int(row['quantity'] or 0):>10}")
+    print('-' * 56)
+    print(f"{'Total':<45} {sum(int(r['quantity'] or 0) for r in rows):>10}")
+
+
+def verify(supabase):
+    res = supabase.rpc('verify_warehouse_stock_counters', {}).execute()
+    diffs = res.data or []
+    if not diffs:
+        print("✅ Los contadores coinciden con assets")
+        return True
+
+    warehouses = supabase.table('warehouses').select('id, code').execute().data or []
+    codes = {w['id']: w['code'] for w in warehouses}
+    print(f"⚠️  {len(diffs)} contadores no coinciden:")
+    for row in diffs:
+        print(f"   {codes.get(row['warehouse_id'], row['warehouse_id'])} "
+              f"{row['status'] or '-'} / {row['asset_type'] or '-'}: "
+              f"contador {row['counted']}, real {row['actual']}")
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Contadores de stock por bodega')
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--verify', action='store_true', help='Comparar contadores contra assets')
+    group.add_argument('--rebuild', action='store_true', help='Recalcular los contadores desde assets')
+    args = parser.parse_args()
+
+    supabase = create_supabase_client()
+
+    if args.rebuild:
+        print("🔄 Reconstruyendo contadores...")
+        res = supabase.rpc('rebuild_warehouse_stock_counters', {}).execute()
+        print(f"✅ {res.data} contadores recalculados")
+        ok = verify(supabase)
+    elif args.verify:
+        print("🔍 Verificando contadores...")
+        ok = verify(supabase)
+    else:
+        show_totals(supabase)
+        ok = True
+
+    if not ok:
+        print("\nEjecuta con --rebuild para recalcularlos")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()